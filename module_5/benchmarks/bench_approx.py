@@ -0,0 +1,74 @@
+"""Benchmark: sampled dashboard latency and accuracy at several sample rates.
+
+For each rate, runs :func:`approximate.dashboard` repeatedly (new sample
+each time) and reports the median latency, the mean relative error of the
+headline metrics against the exact :func:`query_data.dashboard`, and how
+often the exact value fell inside the reported 95% interval. Runs against
+the database configured by the ``PG*`` environment variables and only
+reads from it. The query cache is disabled so every call reaches Postgres.
+
+.. code-block:: bash
+
+   cd module_5
+   python -m benchmarks.bench_approx --rates 0.1 1 5 10 --method system
+"""
+
+import argparse
+import statistics
+import time
+
+from src.app import approximate, query_data
+from src.app.cache import query_cache
+
+# name -> attribute getter, applied to both dashboards
+METRICS = {
+    "count": lambda d: d.applicant_count,
+    "avg_gpa": lambda d: d.avg_scores["avg_gpa"],
+    "accept%": lambda d: d.accept_rate,
+    "intl%": lambda d: d.percent_international,
+}
+
+
+def timed(fn, *args) -> tuple[float, object]:
+    """Return ``(milliseconds, result)`` for one call."""
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return (time.perf_counter() - t0) * 1000, out
+
+
+def main() -> None:
+    """Print latency, relative error and interval coverage per sample rate."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rates", type=float, nargs="+", default=[0.1, 1.0, 5.0, 10.0])
+    parser.add_argument("--method", choices=list(approximate.METHODS), default="system")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    query_cache.ttl = 0
+    exact_ms = statistics.median(timed(query_data.dashboard)[0] for _ in range(args.repeat))
+    exact = query_data.dashboard()
+    truth = {name: float(get(exact)) for name, get in METRICS.items()}
+    print(f"exact dashboard: {exact_ms:.2f} ms  {truth}")
+
+    header = " ".join(f"{name + ' err%':>13}" for name in METRICS)
+    print(f"{'rate %':>7} {'p50 ms':>8} {header} {'CI coverage':>12}")
+    for rate in args.rates:
+        ms, errors, covered = [], {name: [] for name in METRICS}, 0
+        for _ in range(args.repeat):
+            elapsed, approx = timed(approximate.dashboard, rate, args.method)
+            ms.append(elapsed)
+            for name, get in METRICS.items():
+                est = get(approx)
+                if truth[name]:
+                    errors[name].append(abs(est.value - truth[name]) / truth[name] * 100)
+                covered += est.low <= truth[name] <= est.high
+        cells = " ".join(
+            f"{statistics.fmean(errors[name]) if errors[name] else 0.0:>13.2f}"
+            for name in METRICS
+        )
+        coverage = covered / (args.repeat * len(METRICS)) * 100
+        print(f"{rate:>7g} {statistics.median(ms):>8.2f} {cells} {coverage:>11.1f}%")
+
+
+if __name__ == "__main__":
+    main()
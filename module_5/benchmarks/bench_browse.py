@@ -0,0 +1,104 @@
+"""Benchmark: keyset pages vs. ``OFFSET`` pages of ``/api/applicants`` (see :mod:`browse`).
+
+Adds ``--rows`` synthetic rows spread over a year of ``date_added`` values,
+then reports, for pages at increasing depth, the median latency of
+:func:`browse.page` with a cursor and of the same page fetched with
+``LIMIT/OFFSET``, unfiltered and filtered on ``term_year``. The keyset
+column should stay flat; the ``OFFSET`` one grows with the depth.
+
+Runs against the database configured by the ``PG*`` environment variables
+(use a scratch database with migration ``v011_browse_indexes`` applied);
+the synthetic rows are removed at the end.
+
+.. code-block:: bash
+
+   cd module_5
+   python -m benchmarks.bench_browse --rows 1000000
+"""
+
+import argparse
+from datetime import date, timedelta
+import statistics
+import time
+
+from src.app import browse, db_helper
+from src.app.db import pool
+from src.app.pagination import encode_cursor
+
+from .bench_insert import cleanup, make_records
+
+OFFSET_PAGE = """
+SELECT p_id, date_added FROM applicant_rows {where}
+ORDER BY date_added DESC NULLS LAST, p_id DESC
+LIMIT %s OFFSET %s
+"""
+
+LISTINGS = {
+    "all rows": ({}, ""),
+    "term_year": ({"term_year": [2025]}, "WHERE term_year = 2025"),
+}
+
+
+def add_rows(n: int) -> None:
+    """Insert ``n`` synthetic records added over the past year."""
+    records = make_records(n)
+    start = date(2025, 9, 5)
+    for i, rec in enumerate(records):
+        rec["date_added"] = (start - timedelta(days=i % 365)).strftime("%B %d, %Y")
+    db_helper.insert_records_by_url(records)
+
+
+def fetch(stmt: str, params) -> list:
+    """Run one statement and return its rows."""
+    with pool.connection() as conn, conn.cursor() as cur:
+        cur.execute(stmt, params)
+        return cur.fetchall()
+
+
+def median_ms(fn, n: int) -> float:
+    """Median wall time of ``n`` calls of ``fn``, in milliseconds."""
+    out = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(out)
+
+
+def main() -> None:
+    """Print keyset vs. OFFSET page latency by page depth."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=browse.DEFAULT_LIMIT)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    cleanup()
+    try:
+        add_rows(args.rows)
+        with pool.connection(statement_timeout_ms=0) as conn:
+            conn.execute("ANALYZE applicant_rows")
+        print(f"{args.rows} synthetic rows, {args.limit} rows per page\n")
+        print(f"{'listing':<10} {'page':>6} {'keyset ms':>10} {'OFFSET ms':>10}")
+        for name, (filters, where) in LISTINGS.items():
+            lst = browse.listing(["url", "degree", "gpa", "decision"], **filters)
+            stmt = OFFSET_PAGE.format(where=where)
+            for number in args.pages:
+                offset = (number - 1) * args.limit
+                cursor = None
+                if offset:
+                    last = fetch(stmt, (1, offset - 1))
+                    if not last:
+                        break
+                    cursor = encode_cursor([last[0][1], last[0][0]])
+                keyset = median_ms(lambda c=cursor, q=lst: browse.page(q, c, args.limit),
+                                   args.repeat)
+                skip = median_ms(lambda o=offset, s=stmt: fetch(s, (args.limit, o)), args.repeat)
+                print(f"{name:<10} {number:>6} {keyset:>10.2f} {skip:>10.2f}")
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
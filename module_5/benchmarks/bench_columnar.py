@@ -0,0 +1,71 @@
+"""Benchmark: dashboard metrics from Postgres vs. the columnar snapshot.
+
+Loads the in-memory snapshot of ``applicants`` (:mod:`src.app.columnar`)
+with one COPY, then times every :mod:`query_data` metric answered by SQL
+over ``applicant_summary`` and by NumPy masks over the snapshot. The
+query cache is disabled so each call does the work. Only reads from the
+database configured by the ``PG*`` environment variables.
+
+.. code-block:: bash
+
+   cd module_5
+   python -m benchmarks.bench_columnar --repeat 200
+"""
+
+import argparse
+import time
+
+from src.app import columnar, query_data
+from src.app.cache import query_cache
+
+METRICS = (
+    "count_fall_2025",
+    "percent_international",
+    "avg_scores",
+    "avg_gpa_american_fall2025",
+    "acceptance_rate_fall2025",
+    "avg_gpa_fall2025_acceptances",
+    "count_jhu_masters_cs",
+    "count_gt_phd_accept",
+    "degree_counts_2025",
+    "top_5_programs",
+)
+
+
+def best_ms(fn, repeat: int) -> float:
+    """Fastest of ``repeat`` calls, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main() -> None:
+    """Load the snapshot and print per-metric SQL vs. in-memory timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    query_cache.ttl = 0
+    store = columnar.store
+    t0 = time.perf_counter()
+    rows = store.load()
+    stats = store.stats()
+    print(f"loaded {rows} rows in {time.perf_counter() - t0:.2f}s, "
+          f"{stats['bytes'] / 1e6:.1f} MB, distinct {stats['distinct']}")
+
+    print(f"{'metric':<30} {'sql ms':>8} {'numpy ms':>9} {'same':>5}")
+    for name in METRICS:
+        fn = getattr(query_data, name)
+        store.enabled = False
+        sql_ms, expected = best_ms(fn, args.repeat), fn()
+        store.enabled = True
+        mem_ms, got = best_ms(fn, args.repeat), fn()
+        same = got == expected or (isinstance(got, float) and abs(got - float(expected)) < 1e-9)
+        print(f"{name:<30} {sql_ms:>8.3f} {mem_ms:>9.3f} {str(same):>5}")
+
+
+if __name__ == "__main__":
+    main()
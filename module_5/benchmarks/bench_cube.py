@@ -0,0 +1,91 @@
+"""Benchmark: cube queries vs. the same aggregates scanned from ``applicants``.
+
+Grows ``applicants`` with synthetic rows in steps and, after each step,
+times three slices answered from ``applicant_summary`` through
+:mod:`analytics` and the equivalent ``GROUP BY`` over the raw table. The
+cube's latency should stay flat while the scan grows with the row count.
+Runs against the database configured by the ``PG*`` environment variables
+(use a scratch database); the synthetic rows are deleted at the end. The
+query cache is disabled so every call reaches Postgres.
+
+.. code-block:: bash
+
+   cd module_5
+   python -m benchmarks.bench_cube --steps 10000 100000 1000000
+"""
+
+import argparse
+import statistics
+import time
+
+from src.app import analytics, db_helper
+from src.app.cache import query_cache
+from src.app.db import pool
+
+from .bench_insert import cleanup, make_records
+
+SLICES = {
+    "by term": analytics.query(group_by=["term_year"], aggregates=["count", "avg_gpa"]),
+    "top-5 programs": analytics.query(
+        term="Fall 2025", group_by=["university", "program"], aggregates=["count"], limit=5
+    ),
+    "gpa stddev": analytics.query(
+        term="Fall 2025", group_by=["degree"], aggregates=["stddev_gpa", "stddev_gre"]
+    ),
+}
+
+SCANS = {
+    "by term": "SELECT term_year, COUNT(*), AVG(gpa) FILTER (WHERE gpa BETWEEN 0.01 AND 4.3)"
+               " FROM applicants GROUP BY term_year",
+    "top-5 programs": "SELECT llm_generated_university, llm_generated_program, COUNT(*)"
+                      " FROM applicants WHERE term_season = 'Fall' AND term_year = 2025"
+                      " GROUP BY 1, 2 ORDER BY 3 DESC LIMIT 5",
+    "gpa stddev": "SELECT degree, stddev_samp(gpa) FILTER (WHERE gpa BETWEEN 0.01 AND 4.3),"
+                  " stddev_samp(gre) FILTER (WHERE gre BETWEEN 130 AND 170)"
+                  " FROM applicants WHERE term_season = 'Fall' AND term_year = 2025"
+                  " GROUP BY degree",
+}
+
+
+def scan(stmt: str) -> list:
+    """Run a raw aggregate over ``applicants``."""
+    with pool.connection() as conn, conn.cursor() as cur:
+        cur.execute(stmt)
+        return cur.fetchall()
+
+
+def median_ms(fn, n: int) -> float:
+    """Median wall time of ``n`` calls of ``fn``, in milliseconds."""
+    out = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(out)
+
+
+def main() -> None:
+    """Grow the table step by step and print cube vs. scan latency per slice."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    query_cache.ttl = 0
+    cleanup()
+    print(f"{'synthetic rows':>14} {'slice':<15} {'cube ms':>8} {'scan ms':>8}")
+    inserted = 0
+    try:
+        for target in sorted(args.steps):
+            db_helper.insert_records_by_url(make_records(target - inserted, start=inserted))
+            inserted = target
+            for name, q in SLICES.items():
+                cube = median_ms(lambda q=q: analytics.run(q), args.repeat)
+                raw = median_ms(lambda name=name: scan(SCANS[name]), args.repeat)
+                print(f"{target:>14} {name:<15} {cube:>8.2f} {raw:>8.2f}")
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark: ten per-metric queries vs. the single ``dashboard()`` statement.
+
+Times what one ``/analysis`` request costs in the query layer: the old
+sequence of ten :mod:`query_data` calls (ten pool checkouts and round
+trips) and the combined :func:`query_data.dashboard` query. Runs against
+the database configured by the ``PG*`` environment variables and only
+reads from it. The query cache is disabled so every call reaches Postgres.
+
+.. code-block:: bash
+
+   cd module_5
+   python -m benchmarks.bench_dashboard --requests 500
+"""
+
+import argparse
+import statistics
+import time
+
+from src.app import query_data
+from src.app.cache import query_cache
+from src.app.db import pool
+
+PER_METRIC = (
+    query_data.count_fall_2025,
+    query_data.percent_international,
+    query_data.avg_scores,
+    query_data.avg_gpa_american_fall2025,
+    query_data.acceptance_rate_fall2025,
+    query_data.avg_gpa_fall2025_acceptances,
+    query_data.count_jhu_masters_cs,
+    query_data.count_gt_phd_accept,
+    query_data.degree_counts_2025,
+    query_data.top_5_programs,
+)
+
+
+def ten_queries() -> list:
+    """One request the old way: every metric on its own connection."""
+    return [fn() for fn in PER_METRIC]
+
+
+def latencies_ms(fn, n: int) -> list[float]:
+    """Return the wall time of ``n`` calls of ``fn``, in milliseconds."""
+    out = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t0) * 1000)
+    return out
+
+
+def main() -> None:
+    """Warm the pool, time both paths and print p50/p95/mean per request."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    args = parser.parse_args()
+
+    query_cache.ttl = 0
+    old, new = ten_queries(), query_data.dashboard()
+    if new.applicant_count != old[0] or new.top_programs != [tuple(r) for r in old[9]]:
+        raise SystemExit("dashboard() disagrees with the per-metric queries")
+
+    print(f"{'path':<12} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8} {'checkouts':>9}")
+    for name, fn, checkouts in (("10 queries", ten_queries, 10),
+                                ("dashboard", query_data.dashboard, 1)):
+        latencies_ms(fn, args.warmup)
+        ms = sorted(latencies_ms(fn, args.requests))
+        p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+        print(f"{name:<12} {statistics.median(ms):>8.2f} {p95:>8.2f} "
+              f"{statistics.fmean(ms):>8.2f} {checkouts:>9}")
+    print(pool.stats())
+
+
+if __name__ == "__main__":
+    main()
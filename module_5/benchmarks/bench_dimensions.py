@@ -0,0 +1,148 @@
+"""Benchmark: text columns vs. dictionary-encoded dimensions (see :mod:`dimensions`).
+
+Copies the ``applicants`` view into a plain table with the text columns
+(the layout before ``v009_dimension_tables``) and compares it with
+``applicant_rows``:
+
+* table size (heap and with indexes/TOAST) and the dimension tables;
+* shared buffers each aggregate touches (``EXPLAIN (ANALYZE, BUFFERS)``)
+  and, if the ``pg_buffercache`` extension is installed, how many buffers
+  of each table are resident afterwards;
+* median latency of the ``degree_counts_2025`` and ``top_5_programs``
+  ``GROUP BY`` over the text table, over the ``applicants`` view, and
+  grouped on the ids with the values joined afterwards.
+
+Runs against the database configured by the ``PG*`` environment variables
+(use a scratch database). ``--rows`` first adds synthetic rows; they and
+the copy are removed at the end.
+
+.. code-block:: bash
+
+   cd module_5
+   python -m benchmarks.bench_dimensions --rows 1000000
+"""
+
+import argparse
+import statistics
+import time
+
+import psycopg
+
+from src.app import db_helper
+from src.app.db import pool
+from src.app.dimensions import ENCODED
+
+from .bench_insert import cleanup, make_records
+
+FLAT = "bench_applicants_flat"
+
+QUERIES = {
+    "degree_counts_2025": {
+        "text": "SELECT degree, COUNT(*) FROM {src} WHERE term_year = 2025 GROUP BY degree",
+        "ids": "SELECT d.value, g.k FROM (SELECT degree_id, COUNT(*) AS k FROM applicant_rows"
+               " WHERE term_year = 2025 GROUP BY degree_id) AS g"
+               " LEFT JOIN dim_degree AS d ON d.id = g.degree_id",
+    },
+    "top_5_programs": {
+        "text": "SELECT llm_generated_program, COUNT(*) AS k FROM {src}"
+                " WHERE term_year = 2025 GROUP BY 1 ORDER BY k DESC LIMIT 5",
+        "ids": "SELECT p.value, g.k FROM (SELECT llm_generated_program_id, COUNT(*) AS k"
+               " FROM applicant_rows WHERE term_year = 2025 GROUP BY 1 ORDER BY k DESC LIMIT 5)"
+               " AS g LEFT JOIN dim_llm_generated_program AS p"
+               " ON p.id = g.llm_generated_program_id ORDER BY g.k DESC",
+    },
+}
+
+VARIANTS = {
+    "text table": lambda q: q["text"].format(src=FLAT),
+    "view": lambda q: q["text"].format(src="applicants"),
+    "ids": lambda q: q["ids"],
+}
+
+SIZES = "SELECT pg_relation_size(%s::regclass), pg_total_relation_size(%s::regclass)"
+
+RESIDENT = """
+SELECT COUNT(*) FROM pg_buffercache b
+JOIN pg_class c ON b.relfilenode = pg_relation_filenode(c.oid)
+WHERE c.oid = %s::regclass
+"""
+
+
+def fetch(stmt: str, params=None) -> list:
+    """Run one statement and return its rows."""
+    with pool.connection() as conn, conn.cursor() as cur:
+        cur.execute(stmt, params)
+        return cur.fetchall()
+
+
+def buffers(stmt: str) -> int:
+    """Shared buffers (hit + read) touched by one execution of ``stmt``."""
+    plan = fetch("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + stmt)[0][0][0]["Plan"]
+    return plan["Shared Hit Blocks"] + plan["Shared Read Blocks"]
+
+
+def resident(relation: str) -> int | None:
+    """Buffers of ``relation`` in shared_buffers (``None`` without pg_buffercache)."""
+    try:
+        return fetch(RESIDENT, (relation,))[0][0]
+    except psycopg.errors.UndefinedTable:
+        return None
+
+
+def drop_flat() -> None:
+    """Remove the text-layout copy."""
+    with pool.connection() as conn:
+        conn.execute(f"DROP TABLE IF EXISTS {FLAT}")
+        conn.commit()
+
+
+def median_ms(stmt: str, n: int) -> float:
+    """Median wall time of ``n`` executions of ``stmt``, in milliseconds."""
+    out = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fetch(stmt)
+        out.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(out)
+
+
+def main() -> None:
+    """Print sizes, buffer footprint and aggregate latency, text vs. encoded."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=0, help="synthetic rows to add first")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    cleanup()
+    drop_flat()
+    try:
+        if args.rows:
+            db_helper.insert_records_by_url(make_records(args.rows))
+        with pool.connection(statement_timeout_ms=0) as conn:
+            conn.execute(f"CREATE TABLE {FLAT} AS SELECT * FROM applicants")
+            conn.execute(f"ANALYZE {FLAT}")
+            conn.execute("ANALYZE applicant_rows")
+
+        print(f"{'relation':<34} {'heap MB':>9} {'total MB':>9}")
+        dims = [f"dim_{col}" for col in ENCODED]
+        for relation in [FLAT, "applicant_rows"] + dims:
+            heap, total = fetch(SIZES, (relation, relation))[0]
+            print(f"{relation:<34} {heap / 2**20:>9.2f} {total / 2**20:>9.2f}")
+
+        print(f"\n{'query':<20} {'variant':<11} {'p50 ms':>8} {'buffers':>8}")
+        for name, q in QUERIES.items():
+            for variant, build in VARIANTS.items():
+                stmt = build(q)
+                ms = median_ms(stmt, args.repeat)
+                print(f"{name:<20} {variant:<11} {ms:>8.2f} {buffers(stmt):>8}")
+
+        counts = {relation: resident(relation) for relation in (FLAT, "applicant_rows")}
+        if None not in counts.values():
+            print("\nresident buffers: " + ", ".join(f"{r}={n}" for r, n in counts.items()))
+    finally:
+        drop_flat()
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark: ``COPY TO`` bulk export vs. fetching rows into Python (see :mod:`export`).
+
+Adds ``--rows`` synthetic rows, then exports ``applicants`` with
+:func:`export.to_file` in each format (Parquet only if ``pyarrow`` is
+installed) and, last, with the pattern it replaces: ``fetchall()`` of the
+view and one ``json.dump`` of the rows. For each it prints rows, MB read,
+MB written, seconds, MB/s and the growth of the process's peak RSS, which
+stays flat for the ``COPY`` exports and grows with the table for the
+baseline.
+
+Runs against the database configured by the ``PG*`` environment variables
+(use a scratch database); the synthetic rows and output files are removed
+at the end.
+
+.. code-block:: bash
+
+   cd module_5
+   python -m benchmarks.bench_export --rows 1000000
+"""
+
+import argparse
+import json
+import resource
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from src.app import browse, db_helper, export
+from src.app.db import pool
+
+from .bench_insert import cleanup, make_records
+
+
+def peak_mb() -> float:
+    """Peak resident set size of this process so far, in MB (Linux: KiB units)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def fetch_all_json(path: Path) -> export.ExportStats:
+    """The baseline: materialize every row, then write one JSON document."""
+    started = time.perf_counter()
+    with pool.connection(statement_timeout_ms=0) as conn, conn.cursor() as cur:
+        cur.execute("SELECT * FROM applicants")
+        names = [d.name for d in cur.description]
+        rows = [dict(zip(names, row)) for row in cur.fetchall()]
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(rows, f, default=str)
+    size = path.stat().st_size
+    return export.ExportStats(len(rows), size, size, time.perf_counter() - started)
+
+
+def main() -> None:
+    """Print throughput and memory growth per export format."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    formats = list(export.FORMATS)
+    try:
+        export.require_pyarrow()
+    except RuntimeError:
+        formats.remove("parquet")
+
+    out = Path(tempfile.mkdtemp(prefix="bench_export_"))
+    cleanup()
+    try:
+        db_helper.insert_records_by_url(make_records(args.rows))
+        lst = browse.listing()
+        print(f"{'format':<10} {'rows':>9} {'MB in':>8} {'MB out':>8} {'s':>7} "
+              f"{'MB/s':>7} {'+peak MB':>9}")
+        runs = [(fmt, lambda f=fmt: export.to_file(lst, f, out / f"applicants.{f}"))
+                for fmt in formats]
+        runs.append(("fetchall", lambda: fetch_all_json(out / "applicants.json")))
+        for name, run in runs:
+            before = peak_mb()
+            stats = run()
+            print(f"{name:<10} {stats.rows:>9} {stats.bytes_in / 2**20:>8.1f} "
+                  f"{stats.bytes_out / 2**20:>8.1f} {stats.seconds:>7.2f} "
+                  f"{stats.mb_per_s:>7.1f} {peak_mb() - before:>9.1f}")
+    finally:
+        shutil.rmtree(out, ignore_errors=True)
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark: per-row insert loop vs. COPY-staged bulk insert.
+
+Runs against the database configured by the ``PG*`` environment variables
+(use a scratch database). Synthetic rows use ``https://bench.invalid/...``
+URLs and are deleted again after each measurement.
+
+.. code-block:: bash
+
+   cd module_5
+   python -m benchmarks.bench_insert --sizes 100 10000 1000000 --loop-max 10000
+"""
+
+import argparse
+import time
+
+from src.app import db_helper
+from src.app.db import pool
+
+BENCH_PREFIX = "https://bench.invalid/result/"
+
+
+def make_records(n: int, start: int = 0) -> list[dict]:
+    """Build ``n`` synthetic scraped records with unique URLs."""
+    return [
+        {
+            "program": f"Program {i % 300}, University {i % 900}",
+            "comments": "",
+            "date_added": "September 05, 2025",
+            "url": f"{BENCH_PREFIX}{start + i}",
+            "status": "Accepted on 5 Sep",
+            "term": "Fall 2025",
+            "US/International": "American" if i % 2 else "International",
+            "GPA": "GPA 3.50",
+            "GRE": "160",
+            "GRE_V": "155",
+            "GRE_AW": "4.0",
+            "Degree": "Masters",
+            "llm-generated-program": f"Program {i % 300}",
+            "llm-generated-university": f"University {i % 900}",
+        }
+        for i in range(n)
+    ]
+
+
+def cleanup() -> None:
+    """Delete the synthetic benchmark rows."""
+    with pool.connection() as conn, conn.cursor() as cur:
+        cur.execute("DELETE FROM applicant_rows WHERE url LIKE %s", (BENCH_PREFIX + "%",))
+        conn.commit()
+
+
+def timed(fn, *args, **kwargs) -> tuple[float, object]:
+    """Return ``(seconds, result)`` for one call."""
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return time.perf_counter() - t0, out
+
+
+def main() -> None:
+    """Time both insert paths for each requested size and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 1_000_000])
+    parser.add_argument("--batch-size", type=int, default=db_helper.INSERT_BATCH_SIZE)
+    parser.add_argument("--loop-max", type=int, default=10_000,
+                        help="Skip the per-row loop above this many rows.")
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'path':>6} {'seconds':>9} {'rows/s':>11} {'inserted':>9}")
+    for n in args.sizes:
+        records = make_records(n)
+        paths = [("bulk", args.batch_size)]
+        if n <= args.loop_max:
+            paths.insert(0, ("loop", 0))
+        for name, batch_size in paths:
+            cleanup()
+            secs, inserted = timed(
+                db_helper.insert_records_by_url, records, batch_size=batch_size
+            )
+            print(f"{n:>9} {name:>6} {secs:>9.3f} {n / secs:>11.0f} {inserted:>9}")
+        # Re-inserting the same batch must insert nothing.
+        secs, inserted = timed(
+            db_helper.insert_records_by_url, records, batch_size=args.batch_size
+        )
+        print(f"{n:>9} {'dup':>6} {secs:>9.3f} {n / secs:>11.0f} {inserted:>9}")
+    cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark: offline dashboard from the Parquet lake, before and after compaction.
+
+Appends ``--batches`` pipeline-sized batches of ``--batch`` synthetic rows
+to a scratch lake with :func:`lake.append` (automatic compaction off), then
+times :func:`lake.report` over the many small files, runs
+:func:`lake.compact` and times the report again. Prints the file count,
+size and seconds of each step.
+
+Needs ``pyarrow`` but no database: the report reads only the lake.
+
+.. code-block:: bash
+
+   cd module_5
+   python -m benchmarks.bench_lake --batches 200 --batch 5000
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from src.app import lake
+from src.app.records import data_type
+
+from .bench_insert import make_records
+
+
+def files(root: Path) -> tuple[int, float]:
+    """Number of Parquet files under ``root`` and their total size in MB."""
+    paths = list(root.rglob("*.parquet"))
+    return len(paths), sum(p.stat().st_size for p in paths) / 2**20
+
+
+def main() -> None:
+    """Print report time over small files vs. compacted files."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batches", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=5_000)
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="bench_lake_"))
+    lake.COMPACT_MIN_FILES = args.batches + 1  # keep every batch file for the first report
+    try:
+        started = time.perf_counter()
+        for b in range(args.batches):
+            lake.append([data_type(r) for r in make_records(args.batch, b * args.batch)], root)
+        steps = [("append", time.perf_counter() - started, *files(root))]
+
+        for name, run in (
+            ("report", lambda: lake.report(root)),
+            ("compact", lambda: lake.compact(root, min_files=2)),
+            ("report", lambda: lake.report(root)),
+        ):
+            started = time.perf_counter()
+            run()
+            steps.append((name, time.perf_counter() - started, *files(root)))
+
+        print(f"{'step':<8} {'files':>7} {'MB':>8} {'s':>8}")
+        for name, seconds, count, size in steps:
+            print(f"{name:<8} {count:>7} {size:>8.1f} {seconds:>8.3f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
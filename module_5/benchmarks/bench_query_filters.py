@@ -0,0 +1,105 @@
+"""Benchmark: ``LIKE`` filters vs. the indexed term/decision columns.
+
+Builds a scratch copy of ``applicant_rows`` (``applicants_bench``, same
+columns and indexes, plus the free-text ``term`` and ``status`` columns the
+old predicates read) filled with synthetic rows, then prints ``EXPLAIN
+ANALYZE`` execution times for the old free-text predicates used by
+``query_data`` next to their replacements. Requires a live database
+configured by the ``PG*`` environment variables; the scratch table is
+dropped afterwards.
+
+.. code-block:: bash
+
+   cd module_5
+   python -m benchmarks.bench_query_filters --rows 1000000
+"""
+
+import argparse
+import json
+
+from psycopg import sql
+
+from src.app.db import pool
+from src.app.migrations import migrate
+
+BENCH = sql.Identifier("applicants_bench")
+
+# ``applicants`` is a view since v009; the indexes live on ``applicant_rows``.
+# The text columns stand in for the pre-v009 ``term``/``status`` values.
+CREATE = sql.SQL("""
+    DROP TABLE IF EXISTS {tbl};
+    CREATE UNLOGGED TABLE {tbl} (LIKE applicant_rows INCLUDING ALL);
+    ALTER TABLE {tbl} ADD COLUMN term TEXT, ADD COLUMN status TEXT;
+""").format(tbl=BENCH)
+
+# ~1/4 seasons, years 2022-2026, decisions spread over the enum + NULL.
+# ``%%`` is a literal modulo: the statement also takes a ``%s`` parameter.
+FILL = sql.SQL("""
+    INSERT INTO {tbl} (url, status, term, gpa, term_season, term_year, decision)
+    SELECT 'https://bench.invalid/result/' || i,
+           (ARRAY['Accepted on 1 Mar', 'Rejected on 2 Feb', 'Wait listed',
+                  'Interview on 3 Jan', 'Other'])[1 + i %% 5],
+           s.season || ' ' || y.year,
+           2.0 + (i %% 200) / 100.0,
+           s.season, y.year,
+           (ARRAY['Accepted', 'Rejected', 'Waitlisted', 'Interview', NULL])[1 + i %% 5]
+               ::decision_kind
+    FROM generate_series(1, %s) AS i,
+         LATERAL (SELECT (ARRAY['Fall', 'Spring', 'Summer', 'Winter'])[1 + i %% 4] AS season) s,
+         LATERAL (SELECT 2022 + (i / 7) %% 5 AS year) y;
+""").format(tbl=BENCH)
+
+# (label, old predicate, new predicate)
+CASES = [
+    ("Fall 2025", "term = 'Fall 2025'", "term_year = 2025 AND term_season = 'Fall'"),
+    ("2025", "term LIKE '%2025%'", "term_year = 2025"),
+    ("Fall 2025 accepted",
+     "term = 'Fall 2025' AND status LIKE '%Accepted%'",
+     "term_year = 2025 AND term_season = 'Fall' AND decision = 'Accepted'"),
+    ("2025 accepted",
+     "term LIKE '%2025%' AND status LIKE '%Accepted%'",
+     "term_year = 2025 AND decision = 'Accepted'"),
+]
+
+
+def explain_ms(cur, where: str) -> tuple[float, str]:
+    """Return execution time (ms) and top plan node for a COUNT(*) filter."""
+    explain = sql.SQL("EXPLAIN (ANALYZE, FORMAT JSON) SELECT COUNT(*) FROM {tbl} WHERE ")
+    cur.execute(explain.format(tbl=BENCH) + sql.SQL(where))
+    plan = cur.fetchone()[0]
+    plan = plan[0] if isinstance(plan, list) else json.loads(plan)[0]
+    node = plan["Plan"]
+    while node.get("Plans") and node["Node Type"] in ("Aggregate", "Gather", "Finalize Aggregate",
+                                                      "Partial Aggregate"):
+        node = node["Plans"][0]
+    return plan["Execution Time"], node["Node Type"]
+
+
+def main() -> None:
+    """Fill the scratch table and print before/after timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs.")
+    args = parser.parse_args()
+
+    migrate()  # decision_kind type and applicant_rows indexes
+    with pool.connection() as conn, conn.cursor() as cur:
+        cur.execute(CREATE)
+        cur.execute(FILL, (args.rows,))
+        cur.execute(sql.SQL("ANALYZE {tbl}").format(tbl=BENCH))
+        conn.commit()
+        try:
+            print(f"{args.rows} rows")
+            print(f"{'filter':<20} {'LIKE ms':>9} {'plan':<16} {'indexed ms':>10} {'plan':<18}")
+            for label, old, new in CASES:
+                before = min(explain_ms(cur, old) for _ in range(args.repeat))
+                after = min(explain_ms(cur, new) for _ in range(args.repeat))
+                print(f"{label:<20} {before[0]:>9.1f} {before[1]:<16} "
+                      f"{after[0]:>10.1f} {after[1]:<18}")
+        finally:
+            cur.execute(sql.SQL("DROP TABLE IF EXISTS {tbl}").format(tbl=BENCH))
+            conn.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Benchmark: full-text comment search vs. a ``LIKE`` scan (see :mod:`search`).
+
+Adds ``--rows`` synthetic rows whose comments are drawn from a small
+vocabulary (a few common words, a few rare ones), then reports the median
+latency of:
+
+* :func:`search.search` for a common word, a rare word, a phrase and a
+  filtered query, for the first page and for a page ``--depth`` pages in
+  (reached by following the cursors, so it costs what page 1 costs);
+* the ``ILIKE '%word%'`` scan it replaces.
+
+Runs against the database configured by the ``PG*`` environment variables
+(use a scratch database with migration ``v010_comment_search`` applied);
+the synthetic rows are removed at the end.
+
+.. code-block:: bash
+
+   cd module_5
+   python -m benchmarks.bench_search --rows 1000000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from src.app import db_helper, search
+from src.app.db import pool
+
+from .bench_insert import BENCH_PREFIX, cleanup, make_records
+
+COMMON = ["interview", "funding", "email", "portal", "waitlist", "stipend", "advisor", "visit"]
+RARE = ["fellowship", "rescinded", "zoom", "deferral"]
+FILLER = ["got", "the", "an", "after", "today", "from", "for", "with", "and", "program", "offer"]
+
+# name -> (search text, filters)
+QUERIES = {
+    "common word": ("funding", search.Filters()),
+    "rare word": ("rescinded", search.Filters()),
+    "phrase": ('"phone interview"', search.Filters()),
+    "filtered": ("funding -waitlist", search.Filters(term="Fall 2025", decision="Accepted")),
+}
+
+LIKE_SCAN = "SELECT p_id, comments FROM applicant_rows WHERE comments ILIKE %s LIMIT %s"
+
+
+def comment(rng: random.Random) -> str:
+    """One synthetic comment of 8-30 words."""
+    words = rng.choices(FILLER + COMMON, k=rng.randint(8, 30))
+    if rng.random() < 0.01:
+        words.insert(rng.randrange(len(words)), rng.choice(RARE))
+    if rng.random() < 0.05:
+        i = rng.randrange(len(words))
+        words[i:i] = ["phone", "interview"]
+    return " ".join(words)
+
+
+def add_rows(n: int, seed: int = 0) -> None:
+    """Insert ``n`` synthetic records with comments."""
+    rng = random.Random(seed)
+    records = make_records(n)
+    for rec in records:
+        rec["comments"] = comment(rng)
+    db_helper.insert_records_by_url(records)
+
+
+def median_ms(fn, n: int) -> float:
+    """Median wall time of ``n`` calls of ``fn``, in milliseconds."""
+    out = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(out)
+
+
+def cursor_at(depth: int, limit: int, text: str, filters: search.Filters) -> str | None:
+    """Cursor of page ``depth + 1`` (``None`` if the results end first)."""
+    cursor = None
+    for _ in range(depth):
+        cursor = search.search(text, filters, cursor=cursor, limit=limit)["next"]
+        if cursor is None:
+            break
+    return cursor
+
+
+def like_scan(word: str, limit: int) -> list:
+    """The ``ILIKE`` scan that full-text search replaces."""
+    with pool.connection() as conn, conn.cursor() as cur:
+        cur.execute(LIKE_SCAN, (f"%{word}%", limit))
+        return cur.fetchall()
+
+
+def main() -> None:
+    """Print search latency per query and page depth next to the LIKE scan."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=search.DEFAULT_LIMIT)
+    parser.add_argument("--depth", type=int, default=50, help="page to time besides page 1")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    cleanup()
+    try:
+        add_rows(args.rows)
+        with pool.connection(statement_timeout_ms=0) as conn:
+            conn.execute("ANALYZE applicant_rows")
+        print(f"{args.rows} synthetic rows ({BENCH_PREFIX}*), {args.limit} results per page\n")
+        print(f"{'query':<12} {'page 1 ms':>10} {f'page {args.depth + 1} ms':>12} {'ILIKE ms':>9}")
+        for name, (text, filters) in QUERIES.items():
+            first = median_ms(
+                lambda t=text, f=filters: search.search(t, f, limit=args.limit), args.repeat
+            )
+            cursor = cursor_at(args.depth, args.limit, text, filters)
+            deep = median_ms(
+                lambda t=text, f=filters, c=cursor: search.search(
+                    t, f, cursor=c, limit=args.limit
+                ),
+                args.repeat,
+            ) if cursor else float("nan")
+            word = text.strip('"').split()[0]
+            scan = median_ms(lambda w=word: like_scan(w, args.limit), args.repeat)
+            print(f"{name:<12} {first:>10.2f} {deep:>12.2f} {scan:>9.2f}")
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,6 @@
 This module provides a ``create_app`` function that:
 
 * Creates and configures a Flask application.
-* Ensures the database schema exists.
 * Registers the main blueprint (:mod:`routes`).
 
 Usage
@@ -15,17 +14,18 @@ Usage
 
    app = create_app()
    app.run()
+
+The database schema is not touched here; apply it once with
+``python -m src.run migrate`` (see :mod:`migrations`).
 """
 
 from flask import Flask
-from .db import ensure_table
 
 
 def create_app():
     """Create and configure the Flask application.
 
     - Sets a development secret key.
-    - Ensures the database schema exists.
     - Registers the main blueprint.
 
     :return: A configured Flask application instance.
@@ -35,8 +35,6 @@ def create_app():
 
     app.config["SECRET_KEY"] = "dev-only-change-me"
 
-    ensure_table()
-
     from .routes import bp
 
     app.register_blueprint(bp)
@@ -0,0 +1,344 @@
+"""Parameterized aggregate queries over ``applicant_summary``.
+
+A :class:`Query` names filters, group-by dimensions and aggregates; it is
+compiled by :func:`build` into one ``psycopg.sql`` statement in which
+column names come only from the whitelists below and every value is a
+bound parameter. :func:`run` executes it and caches the rows per query in
+:data:`cache.query_cache`. The fixed :mod:`query_data` metrics are thin
+wrappers over this module, and ``/api/analytics`` exposes it as JSON.
+
+Dimensions (filter and group-by names):
+
+* ``term_year``, ``term_season`` (or ``term="Fall 2025"`` as a filter)
+* ``university``, ``program`` (LLM-standardized names)
+* ``degree``, ``citizenship``, ``decision``
+
+Aggregates: ``count``, ``avg_gpa``, ``avg_gre``, ``avg_gre_v``,
+``avg_gre_aw``, ``stddev_gpa``, ``stddev_gre``, ``stddev_gre_v``,
+``stddev_gre_aw`` and ``accept_rate`` (percent ``Accepted``).
+
+Every aggregate is a combination of per-cell sums of ``applicant_summary``
+(the cube), so answers cost the same however many applicants there are.
+:func:`drilldown` returns one level of a slice together with the
+dimensions left to drill into (``/api/cube``).
+
+Example
+-------
+
+.. code-block:: python
+
+   from app import analytics
+
+   q = analytics.query(term="Fall 2025", group_by=["degree"],
+                       aggregates=["count", "avg_gpa"], limit=5)
+   analytics.run(q)  # [{"degree": "Masters", "count": 812, "avg_gpa": 3.61}, ...]
+"""
+
+from dataclasses import asdict, dataclass
+
+from psycopg import sql
+
+from .records import term_parts
+from . import columnar
+from .cache import query_cache
+from .db import pool
+from .summary import DIMENSIONS
+
+SUMMARY = sql.Identifier("applicant_summary")
+MAX_LIMIT = 1000
+
+# Filter values are compared as text except for these columns.
+_INT_DIMENSIONS = {"term_year"}
+
+
+def _avg(score: str) -> sql.Composed:
+    return sql.SQL("SUM({s}) / NULLIF(SUM({n}), 0)").format(
+        s=sql.Identifier(f"{score}_sum"), n=sql.Identifier(f"{score}_n")
+    )
+
+
+def _stddev(score: str) -> sql.Composed:
+    """Sample standard deviation from the cell sums (``NULL`` below two values)."""
+    return sql.SQL(
+        "CASE WHEN SUM({n}) > 1 THEN sqrt(GREATEST("
+        "(SUM({sq}) - SUM({s}) * SUM({s}) / SUM({n})) / (SUM({n}) - 1), 0)) END"
+    ).format(
+        n=sql.Identifier(f"{score}_n"),
+        s=sql.Identifier(f"{score}_sum"),
+        sq=sql.Identifier(f"{score}_sq"),
+    )
+
+
+AGGREGATES = {
+    "count": sql.SQL("COALESCE(SUM(n), 0)"),
+    "avg_gpa": _avg("gpa"),
+    "avg_gre": _avg("gre"),
+    "avg_gre_v": _avg("gre_v"),
+    "avg_gre_aw": _avg("gre_aw"),
+    "stddev_gpa": _stddev("gpa"),
+    "stddev_gre": _stddev("gre"),
+    "stddev_gre_v": _stddev("gre_v"),
+    "stddev_gre_aw": _stddev("gre_aw"),
+    "accept_rate": sql.SQL(
+        "COALESCE(SUM(n) FILTER (WHERE decision = 'Accepted'), 0)::float8 * 100"
+        " / NULLIF(SUM(n), 0)"
+    ),
+}
+
+
+@dataclass(frozen=True)
+class Query:
+    """A validated, hashable aggregate query (build it with :func:`query`).
+
+    :param filters: ``(dimension, values)`` pairs; a row matches when its
+                    value is one of ``values`` (``None`` matches NULL).
+    :param group_by: Dimensions to group on, in output order.
+    :param aggregates: Aggregate names, in output order.
+    :param order_by: Aggregate (descending) or dimension (ascending) to
+                     sort on; defaults to the first aggregate when grouped.
+    :param limit: Maximum number of groups returned.
+    """
+
+    filters: tuple[tuple[str, tuple], ...] = ()
+    group_by: tuple[str, ...] = ()
+    aggregates: tuple[str, ...] = ("count",)
+    order_by: str | None = None
+    limit: int | None = None
+
+
+def _as_tuple(value) -> tuple:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(value)
+    return (value,)
+
+
+def _filter_value(dim: str, value):
+    if value is None or dim not in _INT_DIMENSIONS:
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"{dim} must be an integer, got {value!r}") from exc
+
+
+def query(
+    group_by=(),
+    aggregates=("count",),
+    order_by: str | None = None,
+    limit: int | None = None,
+    term: str | None = None,
+    **filters,
+) -> Query:
+    """Validate arguments and return a :class:`Query`.
+
+    :param group_by: Dimension names.
+    :param aggregates: Aggregate names (default ``["count"]``).
+    :param order_by: Aggregate or dimension to sort on.
+    :type order_by: str | None
+    :param limit: Maximum number of rows (1 to :data:`MAX_LIMIT`).
+    :type limit: int | None
+    :param term: Shorthand for ``term_season``/``term_year``, e.g. ``"Fall 2025"``.
+    :type term: str | None
+    :param filters: ``dimension=value`` or ``dimension=[values]``.
+    :return: The query.
+    :rtype: Query
+    :raises ValueError: On an unknown name or an invalid value.
+    """
+    if term is not None:
+        season, year = term_parts(term)
+        if season is None and year is None:
+            raise ValueError(f"unrecognized term {term!r}")
+        if season is not None:
+            filters.setdefault("term_season", season)
+        if year is not None:
+            filters.setdefault("term_year", year)
+
+    unknown = (set(filters) | set(group_by)) - DIMENSIONS.keys()
+    unknown |= set(aggregates) - AGGREGATES.keys()
+    if unknown:
+        raise ValueError(f"unknown dimension or aggregate: {', '.join(sorted(unknown))}")
+    if not aggregates:
+        raise ValueError("at least one aggregate is required")
+    if order_by is not None and order_by not in set(aggregates) | set(group_by):
+        raise ValueError(f"order_by must be a selected aggregate or dimension: {order_by!r}")
+    if limit is not None:
+        limit = int(limit)
+        if not 1 <= limit <= MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+
+    return Query(
+        filters=tuple(sorted(
+            (dim, tuple(_filter_value(dim, v) for v in _as_tuple(values)))
+            for dim, values in filters.items()
+        )),
+        group_by=tuple(dict.fromkeys(group_by)),
+        aggregates=tuple(dict.fromkeys(aggregates)),
+        order_by=order_by,
+        limit=limit,
+    )
+
+
+def _condition(dim: str, values: tuple) -> tuple[sql.Composable, list]:
+    col = sql.Identifier(DIMENSIONS[dim])
+    if dim not in _INT_DIMENSIONS:
+        col = sql.SQL("{}::text").format(col)
+    present = [v for v in values if v is not None]
+    parts, params = [], []
+    if len(present) == 1:
+        parts.append(sql.SQL("{} = %s").format(col))
+        params.append(present[0])
+    elif present:
+        parts.append(sql.SQL("{} = ANY(%s)").format(col))
+        params.append(present)
+    if len(present) < len(values):
+        parts.append(sql.SQL("{} IS NULL").format(sql.Identifier(DIMENSIONS[dim])))
+    if not parts:
+        return sql.SQL("FALSE"), []
+    return sql.SQL("({})").format(sql.SQL(" OR ").join(parts)), params
+
+
+def where(filters) -> tuple[sql.Composed, list]:
+    """Compile :attr:`Query.filters` into one ``AND``-ed condition.
+
+    Works on any table keyed by the :data:`summary.KEY_COLUMNS`.
+
+    :param filters: ``(dimension, values)`` pairs.
+    :return: ``(condition, params)``; ``TRUE`` when there are no filters.
+    :rtype: tuple[psycopg.sql.Composed, list]
+    """
+    conds, params = [], []
+    for dim, values in filters:
+        cond, cond_params = _condition(dim, values)
+        conds.append(cond)
+        params += cond_params
+    if not conds:
+        return sql.SQL("TRUE").format(), []
+    return sql.SQL(" AND ").join(conds), params
+
+
+def build(q: Query) -> tuple[sql.Composed, list]:
+    """Compile ``q`` into one statement and its parameters.
+
+    :param q: The query.
+    :type q: Query
+    :return: ``(statement, params)`` for ``cursor.execute``.
+    :rtype: tuple[psycopg.sql.Composed, list]
+    """
+    select = [
+        sql.SQL("{} AS {}").format(sql.Identifier(DIMENSIONS[d]), sql.Identifier(d))
+        for d in q.group_by
+    ]
+    select += [
+        sql.SQL("{} AS {}").format(AGGREGATES[a], sql.Identifier(a)) for a in q.aggregates
+    ]
+    stmt = sql.SQL("SELECT {} FROM {}").format(sql.SQL(", ").join(select), SUMMARY)
+
+    params: list = []
+    if q.filters:
+        cond, params = where(q.filters)
+        stmt += sql.SQL(" WHERE ") + cond
+
+    if q.group_by:
+        stmt += sql.SQL(" GROUP BY {} HAVING SUM(n) > 0").format(
+            sql.SQL(", ").join(sql.Identifier(DIMENSIONS[d]) for d in q.group_by)
+        )
+        order_by = q.order_by or q.aggregates[0]
+        direction = sql.SQL("DESC") if order_by in AGGREGATES else sql.SQL("ASC")
+        stmt += sql.SQL(" ORDER BY {} {} NULLS LAST").format(sql.Identifier(order_by), direction)
+    if q.limit is not None:
+        stmt += sql.SQL(" LIMIT %s")
+        params.append(q.limit)
+    return stmt, params
+
+
+def execute(cur, q: Query) -> list[tuple]:
+    """Run ``q`` on an open cursor and return its rows.
+
+    :param cur: Open cursor.
+    :param q: The query.
+    :type q: Query
+    :return: One tuple per group: dimensions, then aggregates.
+    :rtype: list[tuple]
+    """
+    stmt, params = build(q)
+    cur.execute(stmt, params)
+    return cur.fetchall()
+
+
+def run(q: Query) -> list[dict]:
+    """Execute ``q``, caching the rows per query.
+
+    Uses a pooled connection, or the in-memory :mod:`columnar` snapshot
+    when ``COLUMNAR_ENGINE=1``.
+
+    :param q: The query.
+    :type q: Query
+    :return: One ``{name: value}`` dict per group.
+    :rtype: list[dict]
+    """
+    def compute():
+        if columnar.store.enabled:
+            rows = columnar.store.execute(q)
+        else:
+            with pool.connection() as conn, conn.cursor() as cur:
+                rows = execute(cur, q)
+        names = q.group_by + q.aggregates
+        return [dict(zip(names, row)) for row in rows]
+
+    return query_cache.get_or_compute(("analytics.run", q), compute)
+
+
+def from_args(args) -> Query:
+    """Build a :class:`Query` from request arguments.
+
+    Multi-valued parameters may be repeated or comma-separated:
+    ``?term=Fall 2025&group_by=degree&agg=count,avg_gpa&limit=5``.
+
+    :param args: A ``werkzeug.datastructures.MultiDict`` (``request.args``).
+    :return: The query.
+    :rtype: Query
+    :raises ValueError: On an unknown name or an invalid value.
+    """
+    def many(name):
+        return [v for raw in args.getlist(name) for v in raw.split(",") if v]
+
+    filters = {dim: args.getlist(dim) for dim in DIMENSIONS if dim in args}
+    return query(
+        group_by=many("group_by"),
+        aggregates=many("agg") or ["count"],
+        order_by=args.get("order_by") or None,
+        limit=args.get("limit") or None,
+        term=args.get("term") or None,
+        **filters,
+    )
+
+
+DRILL_AGGREGATES = ("count", "avg_gpa", "stddev_gpa", "avg_gre", "stddev_gre", "accept_rate")
+
+
+def drilldown(q: Query) -> dict:
+    """Run one drill-down level of the cube.
+
+    :param q: Query whose ``group_by`` is the level being expanded and whose
+              filters are the path taken so far.
+    :type q: Query
+    :return: ``{"query", "cells", "next"}`` where ``next`` lists the
+             dimensions neither filtered nor grouped on yet.
+    :rtype: dict
+    """
+    used = {dim for dim, _values in q.filters} | set(q.group_by)
+    return {
+        "query": describe(q),
+        "cells": run(q),
+        "next": [dim for dim in DIMENSIONS if dim not in used],
+    }
+
+
+def describe(q: Query) -> dict:
+    """Return ``q`` as a JSON-serializable dict.
+
+    :rtype: dict
+    """
+    out = asdict(q)
+    out["filters"] = {dim: list(values) for dim, values in q.filters}
+    return out
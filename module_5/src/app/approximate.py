@@ -0,0 +1,289 @@
+"""Approximate ``/analysis`` metrics from a random sample of ``applicants``.
+
+For very large tables the dashboard does not need exact numbers. Here
+every metric is estimated in one statement over a ``TABLESAMPLE`` of
+``applicant_rows`` (decoded like the ``applicants`` view, which cannot be
+sampled itself) and returned with a 95% confidence interval:
+
+* counts are scaled up from the sample (``k / f``, where ``f`` is the
+  sampled fraction);
+* averages are sample means over the valid scores;
+* rates are sample proportions.
+
+Intervals use the normal approximation with the finite-population
+correction ``1 - f``, treating the sample as row-level (Bernoulli). With
+``SYSTEM`` sampling (the default, which reads whole pages and so is cheap)
+rows from the same page are correlated, so the true error can be larger
+when rows are stored in an order related to the metric. ``BERNOULLI``
+samples individual rows: its intervals are honest, but it reads the whole
+table.
+
+Selected per request with ``/analysis?approx=<percent>[&method=bernoulli]``;
+the page shows estimates as ``≈ value ± margin``.
+
+Example
+-------
+
+.. code-block:: python
+
+   from app import approximate
+
+   d = approximate.dashboard(1.0)   # 1% SYSTEM sample
+   d.applicant_count                # Estimate(value=41200.0, margin=790.5)
+"""
+
+from dataclasses import dataclass
+import math
+
+from psycopg import sql
+
+from .cache import query_cache
+from .db import pool
+from .dimensions import APPLICANT_ROWS, decoded
+from .query_data import Dashboard
+from .summary import RANGES
+
+Z_95 = 1.959964
+
+METHODS = {"system": sql.SQL("SYSTEM"), "bernoulli": sql.SQL("BERNOULLI")}
+
+
+@dataclass(frozen=True)
+class Estimate:
+    """A sampled estimate with the half-width of its 95% confidence interval.
+
+    :param value: Point estimate.
+    :param margin: ``value ± margin`` covers the exact value with ~95%
+                   probability.
+    """
+
+    value: float
+    margin: float
+
+    @property
+    def low(self) -> float:
+        """Lower bound of the interval."""
+        return self.value - self.margin
+
+    @property
+    def high(self) -> float:
+        """Upper bound of the interval."""
+        return self.value + self.margin
+
+
+def estimate_count(k: int, f: float) -> Estimate:
+    """Estimate a population count from ``k`` sampled rows at fraction ``f``.
+
+    :rtype: Estimate
+    """
+    return Estimate(k / f, Z_95 * math.sqrt(k * (1 - f)) / f)
+
+
+def estimate_mean(n: int, total: float, squares: float, f: float) -> Estimate:
+    """Estimate a mean from ``n`` sampled values, their sum and sum of squares.
+
+    No values gives ``0.0``, like the exact metrics.
+
+    :rtype: Estimate
+    """
+    if not n:
+        return Estimate(0.0, 0.0)
+    mean = total / n
+    variance = max((squares - total * mean) / (n - 1), 0.0) if n > 1 else 0.0
+    return Estimate(mean, Z_95 * math.sqrt(variance / n * (1 - f)))
+
+
+def estimate_percent(hits: int, n: int, f: float) -> Estimate:
+    """Estimate the percentage of ``hits`` among ``n`` sampled rows.
+
+    :rtype: Estimate
+    """
+    if not n:
+        return Estimate(0.0, 0.0)
+    p = hits / n
+    return Estimate(p * 100, Z_95 * math.sqrt(p * (1 - p) / n * (1 - f)) * 100)
+
+
+@dataclass(frozen=True)
+class ApproxDashboard(Dashboard):  # pylint: disable=too-many-instance-attributes
+    """:class:`query_data.Dashboard` whose numbers are :class:`Estimate` objects.
+
+    :param international_share: Estimated percent of international applicants.
+    :param sample_percent: Percent of the table that was sampled.
+    :param method: ``system`` or ``bernoulli``.
+    """
+
+    # Same fields, in the same order, holding estimates.
+    applicant_count: Estimate
+    citizenship: dict[str, Estimate]
+    avg_scores: dict[str, Estimate]
+    avg_gpa_us: Estimate
+    accept_rate: Estimate
+    avg_gpa_accept: Estimate
+    jhu_ms_cs: Estimate
+    georgetown_phd_cs: Estimate
+    degree_counts: list[tuple[str, Estimate]]
+    top_programs: list[tuple[str, Estimate]]
+    international_share: Estimate
+    sample_percent: float
+    method: str
+
+    @property
+    def percent_international(self) -> Estimate:
+        """Estimated share of international applicants, in percent.
+
+        :rtype: Estimate
+        """
+        return self.international_share
+
+    def as_template_data(self) -> dict:
+        """Return the template mapping plus ``approx`` (sample details).
+
+        :rtype: dict
+        """
+        return dict(
+            super().as_template_data(),
+            approx={"percent": self.sample_percent, "method": self.method},
+        )
+
+
+_FALL25 = "term_year = 2025 AND term_season = 'Fall'"
+_US = "us_or_international = 'American'"
+_ACCEPTED = "decision = 'Accepted'"
+
+
+def _valid(col: str) -> sql.Composed:
+    low, high = RANGES[col]
+    return sql.SQL("{col} BETWEEN {low} AND {high}").format(
+        col=sql.Identifier(col), low=sql.Literal(low), high=sql.Literal(high)
+    )
+
+
+def _moments(col: str, where: str = "TRUE") -> sql.Composed:
+    """``n, sum, sum of squares`` of the valid ``col`` values matching ``where``."""
+    cond = sql.SQL("{valid} AND {where}").format(valid=_valid(col), where=sql.SQL(where))
+    return sql.SQL(
+        "COUNT(*) FILTER (WHERE {cond}), "
+        "COALESCE(SUM({col}) FILTER (WHERE {cond}), 0), "
+        "COALESCE(SUM({col} * {col}) FILTER (WHERE {cond}), 0)"
+    ).format(cond=cond, col=sql.Identifier(col))
+
+
+def _count(where: str) -> sql.Composed:
+    return sql.SQL("COUNT(*) FILTER (WHERE {})").format(sql.SQL(where))
+
+
+# Column order of the first result columns, consumed by :func:`_from_row`.
+_TOTALS = [
+    _count(_FALL25),
+    _count("us_or_international = 'International'"),
+    _count(_US),
+    _count("us_or_international NOT IN ('International', 'American')"),
+    *(_moments(col) for col in ("gpa", "gre", "gre_v", "gre_aw")),
+    _moments("gpa", f"{_FALL25} AND {_US}"),
+    _count(f"{_FALL25} AND {_ACCEPTED}"),
+    _moments("gpa", f"{_FALL25} AND {_ACCEPTED}"),
+    _count("llm_generated_university = 'Johns Hopkins University'"
+           " AND llm_generated_program = 'Computer Science' AND degree = 'Masters'"),
+    _count(f"term_year = 2025 AND {_ACCEPTED}"
+           " AND llm_generated_university = 'Georgetown University'"
+           " AND llm_generated_program = 'Computer Science' AND degree = 'PhD'"),
+]
+
+
+def build(method: str = "system", seed: int | None = None) -> sql.Composed:
+    """Compile the sampled dashboard statement (one ``%s`` for the percent).
+
+    :param method: ``system`` or ``bernoulli``.
+    :type method: str
+    :param seed: ``REPEATABLE`` seed for reproducible samples.
+    :type seed: int | None
+    :rtype: psycopg.sql.Composed
+    :raises ValueError: On an unknown method.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {', '.join(METHODS)}, got {method!r}")
+    repeatable = sql.SQL("")
+    if seed is not None:
+        repeatable = sql.SQL(" REPEATABLE ({})").format(sql.Literal(seed))
+    sample = sql.SQL(" TABLESAMPLE {method} ((%s)::real){repeatable}").format(
+        method=METHODS[method], repeatable=repeatable
+    )
+    return sql.SQL("""
+        WITH s AS ({sample}),
+        degrees AS (
+            SELECT degree, COUNT(*) AS k FROM s WHERE term_year = 2025 GROUP BY degree
+        ),
+        programs AS (
+            SELECT llm_generated_program AS program, COUNT(*) AS k FROM s
+            WHERE term_year = 2025 GROUP BY llm_generated_program ORDER BY k DESC LIMIT 5
+        )
+        SELECT {totals},
+            (SELECT COALESCE(json_agg(json_build_array(degree, k) ORDER BY k DESC), '[]')
+             FROM degrees),
+            (SELECT COALESCE(json_agg(json_build_array(program, k) ORDER BY k DESC), '[]')
+             FROM programs)
+        FROM s
+    """).format(
+        sample=decoded(APPLICANT_ROWS, sample),
+        totals=sql.SQL(",\n            ").join(_TOTALS),
+    )
+
+
+def _from_row(row, percent: float, method: str) -> ApproxDashboard:
+    f = percent / 100
+    it = iter(row)
+
+    def take(n):
+        return [next(it) for _ in range(n)]
+
+    fall25, intl, us, other = take(4)
+    scores = {name: estimate_mean(*take(3), f)
+              for name in ("avg_gpa", "avg_gre", "avg_gre_v", "avg_gre_aw")}
+    gpa_us = estimate_mean(*take(3), f)
+    accepted = next(it)
+    gpa_accept = estimate_mean(*take(3), f)
+    jhu, georgetown, degrees, programs = take(4)
+    return ApproxDashboard(
+        applicant_count=estimate_count(fall25, f),
+        citizenship={
+            "international_count": estimate_count(intl, f),
+            "us_count": estimate_count(us, f),
+            "other_count": estimate_count(other, f),
+        },
+        avg_scores=scores,
+        avg_gpa_us=gpa_us,
+        accept_rate=estimate_percent(accepted, fall25, f),
+        avg_gpa_accept=gpa_accept,
+        jhu_ms_cs=estimate_count(jhu, f),
+        georgetown_phd_cs=estimate_count(georgetown, f),
+        degree_counts=[(d, estimate_count(k, f)) for d, k in degrees],
+        top_programs=[(p, estimate_count(k, f)) for p, k in programs],
+        international_share=estimate_percent(intl, intl + us + other, f),
+        sample_percent=percent,
+        method=method,
+    )
+
+
+@query_cache.cached
+def dashboard(percent: float, method: str = "system", seed: int | None = None) -> ApproxDashboard:
+    """Estimate every ``/analysis`` metric from a ``percent`` sample.
+
+    :param percent: Percent of the table to sample, in ``(0, 100]``.
+    :type percent: float
+    :param method: ``system`` (page sampling, fast) or ``bernoulli`` (row
+                   sampling, reads every page).
+    :type method: str
+    :param seed: Optional seed for a reproducible sample.
+    :type seed: int | None
+    :return: Estimates with 95% confidence intervals.
+    :rtype: ApproxDashboard
+    :raises ValueError: On an out-of-range percent or unknown method.
+    """
+    if not 0 < percent <= 100:
+        raise ValueError("percent must be in (0, 100]")
+    stmt = build(method, seed)
+    with pool.connection() as conn, conn.cursor() as cur:
+        cur.execute(stmt, [percent])
+        row = cur.fetchone()
+    return _from_row(row, percent, method)
@@ -0,0 +1,371 @@
+"""Keyset-paginated browsing of raw applicant rows (``/api/applicants``).
+
+Rows come newest first: ``date_added`` descending, then ``p_id``
+descending, with the rows that have no ``date_added`` last. A page is
+requested with the opaque cursor of the previous one (:mod:`pagination`),
+never with an ``OFFSET``, and the composite indexes of migration
+``v011_browse_indexes`` deliver rows in that order (also under a
+``term_year`` or ``llm_generated_program`` filter), so page *n* costs
+what page 1 costs.
+
+Filters are on the columns stored in ``applicant_rows``:
+
+* equality, repeatable (a row matches any of the values): ``term_year``,
+  ``term_season``, ``decision`` and the dictionary-encoded columns
+  (:data:`dimensions.ENCODED`), which are matched on their ids;
+* inclusive ranges ``<column>_min`` / ``<column>_max`` on the scores,
+  ``date_added`` and ``decision_date`` (ISO dates).
+
+A :class:`Listing` also names the output columns (any of
+:data:`dimensions.APPLICANT_COLUMNS`); only the dimension tables of the
+projected columns are joined, and only for the rows of the page.
+:func:`page` returns one page as dicts; :func:`export` streams every
+matching row as CSV or JSON lines through a server-side cursor, in
+constant memory.
+
+Example
+-------
+
+.. code-block:: python
+
+   from app import browse
+
+   listing = browse.listing(term_year=[2025], degree=["PhD"], gpa_min=3.5,
+                            fields=["url", "gpa", "decision"])
+   first = browse.page(listing, limit=100)
+   browse.page(listing, cursor=first["next"], limit=100)
+"""
+
+import csv
+from dataclasses import dataclass
+from datetime import date
+import io
+import json
+from typing import Iterator
+
+from psycopg import sql
+
+from .records import DECISIONS
+from .db import pool
+from .dimensions import APPLICANT_COLUMNS, APPLICANT_ROWS, ENCODED, table
+from .pagination import decode_cursor, encode_cursor
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+EXPORT_BATCH = 5000
+
+# Equality filters; the ENCODED ones are looked up in their dimension table.
+EQUALS = ("term_year", "term_season", "decision", *ENCODED)
+
+# Range filters: column -> parser of the bound.
+RANGES = {
+    "gpa": float,
+    "gre": float,
+    "gre_v": float,
+    "gre_aw": float,
+    "date_added": date.fromisoformat,
+    "decision_date": date.fromisoformat,
+}
+
+# Streamed export formats -> response media type.
+FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+
+@dataclass(frozen=True)
+class Listing:
+    """A validated, hashable row listing (build it with :func:`listing`).
+
+    :param filters: ``(column, values)`` equality filters.
+    :param ranges: ``(column, operator, bound)`` with ``>=`` or ``<=``.
+    :param fields: Output columns, in order.
+    """
+
+    filters: tuple[tuple[str, tuple], ...] = ()
+    ranges: tuple[tuple[str, str, object], ...] = ()
+    fields: tuple[str, ...] = APPLICANT_COLUMNS
+
+
+def _equal_value(col: str, value):
+    if col == "term_year":
+        try:
+            return int(value)
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"term_year must be an integer, got {value!r}") from exc
+    if col == "decision" and value not in DECISIONS:
+        raise ValueError(f"decision must be one of {', '.join(DECISIONS)}")
+    return value
+
+
+def listing(fields=(), **filters) -> Listing:
+    """Validate arguments and return a :class:`Listing`.
+
+    :param fields: Output columns (default all of ``applicants``).
+    :param filters: ``<column>=[values]`` for :data:`EQUALS` columns and
+                    ``<column>_min`` / ``<column>_max`` for :data:`RANGES`.
+    :return: The listing.
+    :rtype: Listing
+    :raises ValueError: On an unknown column or an invalid value.
+    """
+    unknown = [f for f in fields if f not in APPLICANT_COLUMNS]
+    if unknown:
+        raise ValueError(f"unknown field(s): {', '.join(unknown)}")
+    equal, ranges = [], []
+    for col in EQUALS:
+        values = filters.pop(col, None)
+        if values:
+            equal.append((col, tuple(_equal_value(col, v) for v in values)))
+    for col, parse in RANGES.items():
+        for suffix, op in (("_min", ">="), ("_max", "<=")):
+            bound = filters.pop(col + suffix, None)
+            if bound is None or bound == "":
+                continue
+            try:
+                ranges.append((col, op, parse(bound) if isinstance(bound, str) else bound))
+            except ValueError as exc:
+                raise ValueError(f"{col}{suffix}: invalid value {bound!r}") from exc
+    if filters:
+        raise ValueError(f"unknown filter(s): {', '.join(filters)}")
+    return Listing(tuple(equal), tuple(ranges), tuple(fields) or APPLICANT_COLUMNS)
+
+
+def from_args(args) -> Listing:
+    """Build a :class:`Listing` from request arguments.
+
+    Filters are repeated to match several values
+    (``?degree=PhD&degree=Masters``); ``fields`` may also be
+    comma-separated. Other arguments (``cursor``, ``limit``, ``format``)
+    are left to the caller.
+
+    :param args: A ``werkzeug.datastructures.MultiDict`` (``request.args``).
+    :return: The listing.
+    :rtype: Listing
+    :raises ValueError: On an unknown field or an invalid value.
+    """
+    filters = {col: args.getlist(col) for col in EQUALS if col in args}
+    for col in RANGES:
+        for name in (col + "_min", col + "_max"):
+            if name in args:
+                filters[name] = args[name]
+    fields = [f for raw in args.getlist("fields") for f in raw.split(",") if f]
+    return listing(fields, **filters)
+
+
+def _condition(col: str, values: tuple) -> tuple[sql.Composable, list]:
+    if col in ENCODED:
+        ref = sql.Identifier(f"{col}_id")
+        ids = sql.SQL("SELECT id FROM {dim} WHERE value").format(dim=table(col))
+        if len(values) == 1:
+            # Equal to one id, so the composite indexes still return rows in order.
+            return sql.SQL("r.{ref} = ({ids} = %s)").format(ref=ref, ids=ids), [values[0]]
+        return sql.SQL("r.{ref} = ANY(ARRAY({ids} = ANY(%s)))").format(
+            ref=ref, ids=ids), [list(values)]
+    col_id = sql.Identifier(col)
+    cast = sql.SQL("::decision_kind") if col == "decision" else sql.SQL("")
+    if len(values) == 1:
+        return sql.SQL("r.{col} = %s{cast}").format(col=col_id, cast=cast), [values[0]]
+    return sql.SQL("r.{col} = ANY(%s{cast}[])").format(col=col_id, cast=cast), [list(values)]
+
+
+def where(lst: Listing) -> tuple[list[sql.Composable], list]:
+    """Compile the filters of ``lst`` into conditions on ``applicant_rows AS r``.
+
+    :param lst: The listing.
+    :type lst: Listing
+    :return: ``(conditions, params)``.
+    :rtype: tuple[list, list]
+    """
+    conds, params = [], []
+    for col, values in lst.filters:
+        cond, args = _condition(col, values)
+        conds.append(cond)
+        params += args
+    for col, op, bound in lst.ranges:
+        conds.append(sql.SQL("r.{col} {op} %s").format(col=sql.Identifier(col), op=sql.SQL(op)))
+        params.append(bound)
+    return conds, params
+
+
+def _and(conds) -> sql.Composed:
+    return sql.SQL("").join(sql.SQL(" AND ") + c for c in conds)
+
+
+def projection(fields) -> tuple[sql.Composed, sql.Composed]:
+    """Select list and dimension joins for output columns of ``applicant_rows AS r``.
+
+    :param fields: Column names of the ``applicants`` view.
+    :return: ``(select list, joins)``; each item is named after its column.
+    :rtype: tuple[psycopg.sql.Composed, psycopg.sql.Composed]
+    """
+    cols, joins = [], []
+    for col in fields:
+        alias = sql.Identifier(col)
+        if col in ENCODED:
+            cols.append(sql.SQL("{a}.value AS {a}").format(a=alias))
+            joins.append(sql.SQL(" LEFT JOIN {dim} AS {a} ON {a}.id = r.{ref}").format(
+                dim=table(col), a=alias, ref=sql.Identifier(f"{col}_id")))
+        else:
+            cols.append(sql.SQL("r.{c}").format(c=alias))
+    return sql.SQL(", ").join(cols), sql.SQL("").join(joins)
+
+
+def build(lst: Listing, after: list | None = None, limit: int | None = None):
+    """Compile the listing after a keyset position.
+
+    Dated and undated rows are read by two index-ordered branches, each
+    stopping at ``limit`` rows; only the page is joined to the dimensions.
+
+    :param lst: The listing.
+    :type lst: Listing
+    :param after: ``[date_added, p_id]`` of the last row already seen
+                  (``date_added`` may be ``None``).
+    :type after: list | None
+    :param limit: Maximum number of rows (``None``: all).
+    :type limit: int | None
+    :return: ``(statement, params)``; rows are ``(p_id, date_added,
+             *lst.fields)``.
+    :rtype: tuple[psycopg.sql.Composed, list]
+    """
+    conds, params = where(lst)
+    branch = sql.SQL("""(
+            SELECT r.p_id, r.date_added FROM {rows} AS r
+            WHERE r.date_added IS {dated}{conds}{keyset}
+            ORDER BY r.date_added DESC, r.p_id DESC
+            LIMIT %s
+        )""")
+    dated = sql.SQL("NOT NULL")
+    undated = sql.SQL("NULL")
+    branches, args = [], []
+    if after is None or after[0] is not None:
+        keyset = sql.SQL(" AND (r.date_added, r.p_id) < (%s::date, %s)") if after else sql.SQL("")
+        branches.append(branch.format(rows=APPLICANT_ROWS, dated=dated, conds=_and(conds),
+                                      keyset=keyset))
+        args += params + (list(after) if after else []) + [limit]
+    # After a dated row every undated row is still ahead; only an undated
+    # cursor bounds this branch.
+    past_dated = after is not None and after[0] is None
+    keyset = sql.SQL(" AND r.p_id < %s") if past_dated else sql.SQL("")
+    branches.append(branch.format(rows=APPLICANT_ROWS, dated=undated, conds=_and(conds),
+                                  keyset=keyset))
+    args += params + ([after[1]] if past_dated else []) + [limit]
+
+    select, joins = projection(lst.fields)
+    stmt = sql.SQL("""
+        WITH page AS (
+            SELECT * FROM ({branches}) AS k
+            ORDER BY k.date_added DESC NULLS LAST, k.p_id DESC
+            LIMIT %s
+        )
+        SELECT page.p_id, page.date_added, {select}
+        FROM page
+        JOIN {rows} AS r ON r.p_id = page.p_id{joins}
+        ORDER BY page.date_added DESC NULLS LAST, page.p_id DESC
+    """).format(
+        branches=sql.SQL(" UNION ALL ").join(branches),
+        select=select,
+        rows=APPLICANT_ROWS,
+        joins=joins,
+    )
+    return stmt, args + [limit]
+
+
+def parse_cursor(cursor: str | None) -> list | None:
+    """Decode a ``next`` cursor into ``[date_added, p_id]``.
+
+    :param cursor: Token from a previous page, or ``None``.
+    :type cursor: str | None
+    :rtype: list | None
+    :raises ValueError: If the token is malformed.
+    """
+    if not cursor:
+        return None
+    added, p_id = decode_cursor(cursor, 2)
+    if not isinstance(p_id, int) or not (added is None or isinstance(added, str)):
+        raise ValueError("invalid cursor")
+    try:
+        return [date.fromisoformat(added) if added else None, p_id]
+    except ValueError as exc:
+        raise ValueError("invalid cursor") from exc
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def page(lst: Listing, cursor: str | None = None, limit: int = DEFAULT_LIMIT) -> dict:
+    """Return one page of rows, newest first.
+
+    :param lst: The listing.
+    :type lst: Listing
+    :param cursor: ``next`` of the previous page.
+    :type cursor: str | None
+    :param limit: Rows per page (1 to :data:`MAX_LIMIT`).
+    :type limit: int
+    :return: ``{"rows": [...], "next": cursor or None}``; each row maps
+             ``lst.fields`` to JSON-ready values.
+    :rtype: dict
+    :raises ValueError: On a bad cursor or limit.
+    """
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+    stmt, params = build(lst, parse_cursor(cursor), limit + 1)
+    with pool.connection() as conn, conn.cursor() as cur:
+        cur.execute(stmt, params)
+        rows = cur.fetchall()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "rows": [
+            {f: _json_value(v) for f, v in zip(lst.fields, row[2:])} for row in rows
+        ],
+        "next": encode_cursor([rows[-1][1], rows[-1][0]]) if more else None,
+    }
+
+
+def _encode(fmt: str, fields, rows) -> str:
+    if fmt == "jsonl":
+        return "".join(
+            json.dumps(dict(zip(fields, row)), default=str, separators=(",", ":")) + "\n"
+            for row in rows
+        )
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue()
+
+
+def export(
+    lst: Listing, fmt: str, cursor: str | None = None, batch_size: int = EXPORT_BATCH
+) -> Iterator[str]:
+    """Stream every matching row (after ``cursor``) as CSV or JSON lines.
+
+    Arguments are validated before the first chunk, so a caller can still
+    answer with an error; rows are then fetched ``batch_size`` at a time
+    from a server-side cursor and each batch is yielded as one chunk.
+
+    :param lst: The listing.
+    :type lst: Listing
+    :param fmt: ``csv`` (with a header row) or ``jsonl``.
+    :type fmt: str
+    :param cursor: Resume after this position.
+    :type cursor: str | None
+    :param batch_size: Rows per fetch and per chunk.
+    :type batch_size: int
+    :return: Iterator of text chunks.
+    :rtype: Iterator[str]
+    :raises ValueError: On an unknown format or a bad cursor.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    stmt, params = build(lst, parse_cursor(cursor))
+    return _stream(stmt, params, fmt, lst.fields, batch_size)
+
+
+def _stream(stmt, params, fmt: str, fields, batch_size: int) -> Iterator[str]:
+    if fmt == "csv":
+        yield _encode(fmt, fields, [fields])
+    with pool.connection(statement_timeout_ms=0) as conn:
+        # Named cursor = server-side: rows are streamed, not fetched at once.
+        with conn.cursor(name="applicants_export") as cur:
+            cur.itersize = batch_size
+            cur.execute(stmt, params)
+            while rows := cur.fetchmany(batch_size):
+                yield _encode(fmt, fields, [row[2:] for row in rows])
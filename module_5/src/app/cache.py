@@ -0,0 +1,163 @@
+"""In-process result cache for :mod:`query_data`.
+
+Dashboard numbers only change when rows are written, so query results are
+kept in a small LRU keyed by function and arguments:
+
+* Every entry is stamped with the **data version**. Writers
+  (:func:`db_helper.insert_records_by_url`, the loader,
+  :mod:`restandardize`) call :meth:`QueryCache.bump` after committing,
+  which invalidates all cached results of this process at once.
+* A **TTL** bounds staleness for writes made by other processes, whose
+  bumps this process cannot see.
+* Misses are **single-flight**: concurrent requests for the same key wait
+  for the one computation in progress instead of all querying Postgres.
+
+Configured from the environment:
+
+* ``QUERY_CACHE_TTL``: seconds an entry stays valid (default 60; ``0``
+  disables caching).
+* ``QUERY_CACHE_SIZE``: maximum number of entries (default 128).
+
+:meth:`QueryCache.stats` reports hits, misses, coalesced waits and the hit
+rate; it is served at ``/health/cache``.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Future
+import functools
+import os
+import threading
+import time
+
+CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "60"))
+CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "128"))
+
+
+class QueryCache:  # pylint: disable=too-many-instance-attributes
+    """Thread-safe TTL + LRU cache with version invalidation and single-flight."""
+
+    def __init__(self, ttl: float = CACHE_TTL, maxsize: int = CACHE_SIZE, clock=time.monotonic):
+        self.ttl = ttl
+        self.maxsize = max(maxsize, 1)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()  # key -> (version, expires, value)
+        self._inflight: dict = {}  # key -> Future of the running computation
+        self._version = 0
+        self._counts = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "bumps": 0}
+
+    @property
+    def version(self) -> int:
+        """Current data version (incremented by :meth:`bump`)."""
+        return self._version
+
+    def bump(self) -> int:
+        """Record that the data changed: drop every cached result.
+
+        Computations already running finish for their waiters but are not
+        stored.
+
+        :return: The new data version.
+        :rtype: int
+        """
+        with self._lock:
+            self._version += 1
+            self._counts["bumps"] += 1
+            self._entries.clear()
+            return self._version
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters (data version is kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._counts = dict.fromkeys(self._counts, 0)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key``, computing it at most once.
+
+        :param key: Hashable cache key.
+        :param compute: Zero-argument callable producing the value.
+        :return: The cached or freshly computed value.
+        """
+        if self.ttl <= 0:
+            return compute()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                version, expires, value = entry
+                if version == self._version and self._clock() < expires:
+                    self._entries.move_to_end(key)
+                    self._counts["hits"] += 1
+                    return value
+                del self._entries[key]
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self._counts["misses"] += 1
+                version = self._version
+            else:
+                self._counts["coalesced"] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as exc:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(exc)
+            raise
+
+        with self._lock:
+            del self._inflight[key]
+            if version == self._version:
+                self._entries[key] = (version, self._clock() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self._counts["evictions"] += 1
+        future.set_result(value)
+        return value
+
+    def cached(self, fn):
+        """Decorator: cache ``fn``'s result per positional/keyword arguments.
+
+        The undecorated function stays available as ``fn.__wrapped__``.
+        """
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (name, args, tuple(sorted(kwargs.items())))
+            return self.get_or_compute(key, lambda: fn(*args, **kwargs))
+
+        return wrapper
+
+    def stats(self) -> dict:
+        """Return cache counters.
+
+        :return: ``hits``, ``misses``, ``coalesced`` (requests that waited
+                 for an in-flight computation), ``evictions``, ``bumps``,
+                 ``hit_rate`` (hits + coalesced over all lookups),
+                 ``size``, ``maxsize``, ``ttl`` and ``version``.
+        :rtype: dict
+        """
+        with self._lock:
+            counts = dict(self._counts)
+            size = len(self._entries)
+        served = counts["hits"] + counts["coalesced"]
+        lookups = served + counts["misses"]
+        return dict(
+            counts,
+            hit_rate=served / lookups if lookups else 0.0,
+            size=size,
+            maxsize=self.maxsize,
+            ttl=self.ttl,
+            version=self._version,
+        )
+
+
+query_cache = QueryCache()
@@ -12,7 +12,7 @@ Typical usage
 .. code-block:: python
 
    from app.clean import run_clean
-   n = run_clean(skip_rids=set(), max_records=50)
+   n = run_clean(max_records=50)
    print(f"Cleaned {n} records")
 """
 
@@ -117,10 +117,11 @@ def clean_record(rec: dict):
 # Run to get data if there is any
 # ---------------------------------------------------------------------
 def run_clean(
-    skip_rids: set[str],
+    skip_rids: set[str] | None = None,
     max_records=MAX_RECORDS,
     delay=REQUEST_DELAY,
     out_filename=OUTPUT_JSON,
+    known_rids=None,
 ) -> int:
     """Run the cleaning pipeline.
 
@@ -131,20 +132,26 @@ def run_clean(
     3. Write results to JSON if not empty.
 
     :param skip_rids: Set of result IDs to skip.
-    :type skip_rids: set[str]
+    :type skip_rids: set[str] | None
     :param max_records: Maximum number of records to fetch.
     :type max_records: int
     :param delay: Delay (seconds) between requests.
     :type delay: float
     :param out_filename: Output JSON filename inside TMP_DIR.
     :type out_filename: str
+    :param known_rids: Per-page lookup of result IDs already stored
+                       (see :func:`db_helper.known_rids`).
+    :type known_rids: callable | None
     :return: Number of records cleaned and written.
     :rtype: int
     """
     scraper = GradCafeScraping()
 
     raw = scraper.collect_records(
-        max_records=max_records, delay=delay, skip_rids=skip_rids
+        max_records=max_records,
+        delay=delay,
+        skip_rids=skip_rids,
+        known_rids=known_rids,
     )
     cleaned = [clean_record(r) for r in raw]
 
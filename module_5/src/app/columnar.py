@@ -0,0 +1,291 @@
+"""Optional in-memory columnar snapshot of ``applicants``.
+
+When enabled, the dashboard and :mod:`analytics` queries are answered from
+NumPy arrays in this process instead of Postgres:
+
+* ``gpa``, ``gre``, ``gre_v``, ``gre_aw`` as ``float64`` (``NaN`` = NULL);
+* ``term_year``, ``term_season``, ``degree``, ``citizenship``,
+  ``decision``, ``program`` and ``university`` as dictionary-encoded
+  ``int32`` codes (``-1`` = NULL).
+
+The snapshot is loaded lazily with one ``COPY ... TO STDOUT`` and kept
+current by :func:`db_helper.insert_records_bulk`, which appends the rows
+it inserted. Writes that change existing rows (:mod:`restandardize`) call
+:meth:`ColumnStore.reset`, and the snapshot is reloaded after
+``COLUMNAR_MAX_AGE`` seconds to pick up writes from other processes.
+
+Configured from the environment:
+
+* ``COLUMNAR_ENGINE``: ``1`` to enable (default off).
+* ``COLUMNAR_MAX_AGE``: seconds before a full reload (default 300).
+
+Filters, groups and aggregates follow the SQL in :mod:`analytics`
+exactly, including the score validity ranges of :data:`summary.RANGES`.
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+
+from .db import pool
+from .summary import DIMENSIONS, RANGES
+
+ENABLED = os.getenv("COLUMNAR_ENGINE", "0") == "1"
+MAX_AGE = float(os.getenv("COLUMNAR_MAX_AGE", "300"))
+LOAD_CHUNK = 50_000
+
+_COPY_COLUMNS = ", ".join(
+    [f"{col}::text" if col == "decision" else col for col in DIMENSIONS.values()] + list(RANGES)
+)
+COPY_OUT = f"COPY (SELECT {_COPY_COLUMNS} FROM applicants ORDER BY p_id) TO STDOUT"
+COPY_TYPES = ["int4"] + ["text"] * (len(DIMENSIONS) - 1) + ["float8"] * len(RANGES)
+
+
+class _Dictionary:
+    """Value <-> integer code mapping for one dimension (``None`` is ``-1``)."""
+
+    def __init__(self):
+        self.values: list = []
+        self._codes: dict = {}
+
+    def encode(self, value) -> int:
+        """Code of ``value``, assigning the next one if it is new."""
+        if value is None:
+            return -1
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value) -> int | None:
+        """Code of an existing value, ``-1`` for ``None``, ``None`` if unseen."""
+        return -1 if value is None else self._codes.get(value)
+
+    def decode(self, code: int):
+        """Value of ``code`` (``None`` for ``-1``)."""
+        return None if code < 0 else self.values[code]
+
+
+class ColumnStore:  # pylint: disable=too-many-instance-attributes
+    """Growable column arrays plus the vectorized query evaluator."""
+
+    def __init__(self, enabled: bool = ENABLED, max_age: float = MAX_AGE, clock=time.monotonic):
+        self.enabled = enabled
+        self.max_age = max_age
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._init_columns()
+        self.loaded_at: float | None = None
+
+    def _init_columns(self) -> None:
+        self.size = 0
+        self._dicts = {dim: _Dictionary() for dim in DIMENSIONS}
+        self._codes = {dim: np.empty(0, dtype=np.int32) for dim in DIMENSIONS}
+        self._scores = {col: np.empty(0, dtype=np.float64) for col in RANGES}
+
+    @property
+    def loaded(self) -> bool:
+        """Whether a snapshot is in memory."""
+        return self.loaded_at is not None
+
+    # ---------- building ----------
+
+    def _reserve(self, extra: int) -> None:
+        need = self.size + extra
+        capacity = len(self._scores["gpa"])
+        if need <= capacity:
+            return
+        capacity = max(need, capacity * 2, 1024)
+        for arrays in (self._codes, self._scores):
+            for name, arr in arrays.items():
+                grown = np.empty(capacity, dtype=arr.dtype)
+                grown[:self.size] = arr[:self.size]
+                arrays[name] = grown
+
+    def _append_tuples(self, rows: list[tuple]) -> None:
+        """Append ``(dimensions..., scores...)`` tuples in :data:`COPY_OUT` order."""
+        if not rows:
+            return
+        self._reserve(len(rows))
+        start, end = self.size, self.size + len(rows)
+        columns = list(zip(*rows))
+        for i, dim in enumerate(DIMENSIONS):
+            encode = self._dicts[dim].encode
+            self._codes[dim][start:end] = [encode(v) for v in columns[i]]
+        for j, col in enumerate(RANGES, start=len(DIMENSIONS)):
+            self._scores[col][start:end] = [np.nan if v is None else v for v in columns[j]]
+        self.size = end
+
+    def load(self) -> int:
+        """Replace the snapshot with the current table (one COPY).
+
+        :return: Number of rows loaded.
+        :rtype: int
+        """
+        with self._lock:
+            self._init_columns()
+            with pool.connection() as conn, conn.cursor() as cur:
+                with cur.copy(COPY_OUT) as cp:
+                    cp.set_types(COPY_TYPES)
+                    chunk = []
+                    for row in cp.rows():
+                        chunk.append(row)
+                        if len(chunk) >= LOAD_CHUNK:
+                            self._append_tuples(chunk)
+                            chunk = []
+                    self._append_tuples(chunk)
+            self.loaded_at = self._clock()
+            return self.size
+
+    def load_columns(self, dims: dict, scores: dict) -> int:
+        """Replace the snapshot with columns encoded elsewhere (e.g. read from Parquet).
+
+        :param dims: Dimension -> ``(codes, values)``: ``int`` codes into the
+                     distinct ``values`` (``-1`` = NULL), one per row.
+        :type dims: dict
+        :param scores: Score column -> ``float`` values (``NaN`` = NULL).
+        :type scores: dict
+        :return: Number of rows loaded.
+        :rtype: int
+        """
+        with self._lock:
+            self._init_columns()
+            for dim in DIMENSIONS:
+                codes, values = dims[dim]
+                for value in values:
+                    self._dicts[dim].encode(value)
+                self._codes[dim] = np.asarray(codes, dtype=np.int32)
+            for col in RANGES:
+                self._scores[col] = np.asarray(scores[col], dtype=np.float64)
+            self.size = len(self._scores["gpa"])
+            self.loaded_at = self._clock()
+            return self.size
+
+    def append(self, records: list[dict]) -> None:
+        """Add newly inserted rows (``applicants`` column -> value dicts).
+
+        A no-op until a snapshot has been loaded.
+
+        :param records: Inserted rows, e.g. :func:`records.data_type` output.
+        :type records: list[dict]
+        """
+        with self._lock:
+            if not self.loaded:
+                return
+            self._append_tuples([
+                tuple(r.get(col) for col in DIMENSIONS.values())
+                + tuple(r.get(col) for col in RANGES)
+                for r in records
+            ])
+
+    def reset(self) -> None:
+        """Drop the snapshot; the next query reloads it."""
+        with self._lock:
+            self._init_columns()
+            self.loaded_at = None
+
+    def ensure_loaded(self) -> None:
+        """Load the snapshot if missing or older than ``max_age``."""
+        with self._lock:
+            if not self.loaded or self._clock() - self.loaded_at >= self.max_age:
+                self.load()
+
+    # ---------- querying ----------
+
+    def _mask(self, filters) -> np.ndarray:
+        mask = np.ones(self.size, dtype=bool)
+        for dim, values in filters:
+            lookup = self._dicts[dim].lookup
+            codes = [c for c in (lookup(v) for v in values) if c is not None]
+            mask &= np.isin(self._codes[dim][:self.size], codes)
+        return mask
+
+    def _aggregate(self, name: str, rows: np.ndarray, groups: np.ndarray, k: int) -> list:
+        """One aggregate per group (``groups`` maps each selected row to 0..k-1)."""
+        counts = np.bincount(groups, minlength=k)
+        if name == "count":
+            return [int(c) for c in counts]
+        if name == "accept_rate":
+            accepted_code = self._dicts["decision"].lookup("Accepted")
+            hit = self._codes["decision"][rows] == (-2 if accepted_code is None else accepted_code)
+            accepted = np.bincount(groups, weights=hit, minlength=k)
+            return [float(a * 100 / c) if c else None for a, c in zip(accepted, counts)]
+        kind, col = name.split("_", 1)
+        low, high = RANGES[col]
+        vals = self._scores[col][rows]
+        valid = (vals >= low) & (vals <= high)  # NaN compares False
+        vals = np.where(valid, vals, 0.0)
+        n = np.bincount(groups, weights=valid, minlength=k)
+        total = np.bincount(groups, weights=vals, minlength=k)
+        if kind == "avg":
+            return [float(t / v) if v else None for t, v in zip(total, n)]
+        squares = np.bincount(groups, weights=vals * vals, minlength=k)
+        return [
+            float(np.sqrt(max((sq - t * t / v) / (v - 1), 0.0))) if v > 1 else None
+            for t, sq, v in zip(total, squares, n)
+        ]
+
+    def execute(self, q) -> list[tuple]:
+        """Evaluate an :class:`analytics.Query` like its SQL would.
+
+        :param q: The query.
+        :type q: analytics.Query
+        :return: One tuple per group: dimensions, then aggregates.
+        :rtype: list[tuple]
+        """
+        self.ensure_loaded()
+        with self._lock:
+            rows = np.flatnonzero(self._mask(q.filters))
+            if not q.group_by:
+                groups = np.zeros(len(rows), dtype=np.intp)
+                return [tuple(self._aggregate(a, rows, groups, 1)[0] for a in q.aggregates)]
+
+            keys = np.stack([self._codes[d][rows] for d in q.group_by], axis=1)
+            uniq, groups = np.unique(keys, axis=0, return_inverse=True)
+            groups = groups.reshape(-1)
+            aggs = [self._aggregate(a, rows, groups, len(uniq)) for a in q.aggregates]
+            out = [
+                tuple(self._dicts[d].decode(int(c)) for d, c in zip(q.group_by, key))
+                + tuple(agg[i] for agg in aggs)
+                for i, key in enumerate(uniq)
+            ]
+
+        order_by = q.order_by or q.aggregates[0]
+        pos = (q.group_by + q.aggregates).index(order_by)
+        present = [r for r in out if r[pos] is not None]
+        present.sort(key=lambda r: r[pos], reverse=order_by in q.aggregates)
+        out = present + [r for r in out if r[pos] is None]  # NULLS LAST
+        return out[:q.limit] if q.limit is not None else out
+
+    def values(self, col: str, filters=()) -> np.ndarray:
+        """Raw values of one score column for the rows matching ``filters``.
+
+        :param col: ``gpa``, ``gre``, ``gre_v`` or ``gre_aw``.
+        :type col: str
+        :param filters: :attr:`analytics.Query.filters` pairs.
+        :return: A copy of the values (``NaN`` = NULL).
+        :rtype: numpy.ndarray
+        """
+        self.ensure_loaded()
+        with self._lock:
+            return self._scores[col][:self.size][self._mask(filters)]
+
+    def stats(self) -> dict:
+        """Return snapshot size and memory use.
+
+        :rtype: dict
+        """
+        arrays = list(self._codes.values()) + list(self._scores.values())
+        return {
+            "enabled": self.enabled,
+            "loaded": self.loaded,
+            "rows": self.size,
+            "bytes": int(sum(a.nbytes for a in arrays)),
+            "distinct": {dim: len(d.values) for dim, d in self._dicts.items()},
+        }
+
+
+store = ColumnStore()
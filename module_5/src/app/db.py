@@ -1,68 +1,175 @@
 # pylint: disable=missing-function-docstring
-"""Database helper for ensuring the applicants table exists.
-
-This module provides a global PostgreSQL connection pool and a
-utility to create the ``applicants`` table if it does not already exist.
-
-Schema
-------
-
-.. code-block:: sql
-
-   CREATE TABLE IF NOT EXISTS applicants(
-       p_id SERIAL PRIMARY KEY,
-       program TEXT,
-       comments TEXT,
-       date_added DATE,
-       url TEXT,
-       status TEXT,
-       term TEXT,
-       us_or_international TEXT,
-       gpa FLOAT,
-       gre FLOAT,
-       gre_v FLOAT,
-       gre_aw FLOAT,
-       degree TEXT,
-       llm_generated_program TEXT,
-       llm_generated_university TEXT
-   );
+"""Shared PostgreSQL connection pool.
+
+This module provides the one process-wide connection pool (:data:`pool`)
+used by the queries, helpers, jobs, migrations and loader.
+
+Pool
+----
+
+The pool is opened lazily on first use (and re-created in a forked child),
+so importing the app never connects. It is configured from the
+environment:
+
+* ``PGHOST``, ``PGPORT``, ``PGDATABASE``, ``PGUSER``, ``PGPASSWORD``, or a
+  full ``DATABASE_URL``.
+* ``PG_POOL_MIN_SIZE`` / ``PG_POOL_MAX_SIZE`` (default 1 / 5).
+* ``PG_POOL_TIMEOUT``: seconds to wait for a free connection (default 30).
+* ``PG_STATEMENT_TIMEOUT_MS``: server-side limit per statement
+  (default 30000; ``0`` disables). Long jobs can lift it per checkout with
+  ``pool.connection(statement_timeout_ms=0)``.
+
+Connections are health-checked when handed out, and
+:meth:`SharedPool.stats` reports size, in-use, waiting, misses (requests
+that had to queue) and total wait time.
+
+The ``applicants`` schema itself is owned by :mod:`migrations`
+(``python -m src.run migrate``); nothing here issues DDL.
 """
 
+from contextlib import contextmanager
 import os
+import threading
 
-from psycopg import sql
-from psycopg_pool import ConnectionPool
+import psycopg
+import psycopg_pool
 
 
 PGHOST = os.getenv("PGHOST", "localhost")
 PGDATABASE = os.getenv("PGDATABASE", "gradcafe")
 PGUSER = os.getenv("PGUSER", "postgres")
 PGPASSWORD = os.getenv("PGPASSWORD", "postgres")
+PGPORT = os.getenv("PGPORT", "5432")
 
-DSN = f"postgresql://{PGUSER}:{PGPASSWORD}@{PGHOST}:5432/{PGDATABASE}"
-pool = ConnectionPool(DSN, min_size=1, max_size=5)
-
-CREATE_TABLE = sql.SQL("""
-CREATE TABLE IF NOT EXISTS {tbl}(
-  p_id SERIAL PRIMARY KEY,
-  program TEXT,
-  comments TEXT,
-  date_added DATE,
-  url TEXT UNIQUE,
-  status TEXT,
-  term TEXT,
-  us_or_international TEXT,
-  gpa FLOAT,
-  gre FLOAT,
-  gre_v FLOAT,
-  gre_aw FLOAT,
-  degree TEXT,
-  llm_generated_program TEXT,
-  llm_generated_university TEXT
+DSN = os.getenv("DATABASE_URL") or (
+    f"postgresql://{PGUSER}:{PGPASSWORD}@{PGHOST}:{PGPORT}/{PGDATABASE}"
 )
-""").format(tbl=sql.Identifier("applicants"))
+POOL_MIN_SIZE = int(os.getenv("PG_POOL_MIN_SIZE", "1"))
+POOL_MAX_SIZE = int(os.getenv("PG_POOL_MAX_SIZE", "5"))
+POOL_TIMEOUT = float(os.getenv("PG_POOL_TIMEOUT", "30"))
+STATEMENT_TIMEOUT_MS = int(os.getenv("PG_STATEMENT_TIMEOUT_MS", "30000"))
+
+SET_STATEMENT_TIMEOUT = "SELECT set_config('statement_timeout', %s, false)"
+
+
+class SharedPool:  # pylint: disable=too-many-instance-attributes
+    """Process-wide connection pool, opened on first use.
+
+    Exposes the ``connection()`` context manager of
+    :class:`psycopg_pool.ConnectionPool`, so callers (and tests that
+    substitute a fake) use it the same way.
+    """
+
+    def __init__(
+        self,
+        conninfo: str = DSN,
+        min_size: int = POOL_MIN_SIZE,
+        max_size: int = POOL_MAX_SIZE,
+        timeout: float = POOL_TIMEOUT,
+        statement_timeout_ms: int = STATEMENT_TIMEOUT_MS,
+    ):
+        self.conninfo = conninfo
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size)
+        self.timeout = timeout
+        self.statement_timeout_ms = statement_timeout_ms
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return the underlying pool, opening it if needed.
+
+        A child process after ``fork`` never reuses the parent's
+        connections; it opens its own pool.
+
+        :rtype: psycopg_pool.ConnectionPool
+        """
+        pid = os.getpid()
+        if self._pool is None or self._pid != pid:
+            with self._lock:
+                if self._pool is None or self._pid != pid:
+                    self._pool = psycopg_pool.ConnectionPool(
+                        self.conninfo,
+                        min_size=self.min_size,
+                        max_size=self.max_size,
+                        timeout=self.timeout,
+                        kwargs={"options": f"-c statement_timeout={self.statement_timeout_ms}"},
+                        check=psycopg_pool.ConnectionPool.check_connection,
+                        name="gradcafe",
+                        open=True,
+                    )
+                    self._pid = pid
+        return self._pool
+
+    @contextmanager
+    def connection(self, timeout: float | None = None, statement_timeout_ms: int | None = None):
+        """Check out a connection for the duration of a ``with`` block.
+
+        :param timeout: Seconds to wait for a free connection
+                        (default ``PG_POOL_TIMEOUT``).
+        :type timeout: float | None
+        :param statement_timeout_ms: Statement timeout for this checkout
+                                     only (``0`` = none); restored on return.
+        :type statement_timeout_ms: int | None
+        """
+        with self.get().connection(timeout=timeout) as conn:
+            if statement_timeout_ms is None:
+                yield conn
+                return
+            # Session-level setting, committed so a rollback cannot undo it.
+            conn.execute(SET_STATEMENT_TIMEOUT, (str(statement_timeout_ms),))
+            conn.commit()
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                conn.execute(SET_STATEMENT_TIMEOUT, (str(self.statement_timeout_ms),))
+                conn.commit()
+
+    def stats(self) -> dict:
+        """Return pool usage counters (zeros if the pool is not open yet).
+
+        :return: ``opened``, ``size``, ``available``, ``in_use``,
+                 ``waiting``, ``requests``, ``misses`` (requests that had
+                 to wait for a connection), ``wait_ms``, ``errors``,
+                 ``min_size`` and ``max_size``.
+        :rtype: dict
+        """
+        raw = self._pool.get_stats() if self._pool is not None else {}
+        size, available = raw.get("pool_size", 0), raw.get("pool_available", 0)
+        return {
+            "opened": self._pool is not None,
+            "size": size,
+            "available": available,
+            "in_use": size - available,
+            "waiting": raw.get("requests_waiting", 0),
+            "requests": raw.get("requests_num", 0),
+            "misses": raw.get("requests_queued", 0),
+            "wait_ms": raw.get("requests_wait_ms", 0),
+            "errors": raw.get("requests_errors", 0) + raw.get("connections_errors", 0),
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+        }
+
+    def check(self) -> bool:
+        """Round-trip ``SELECT 1``; ``False`` if the database is unreachable."""
+        try:
+            with self.connection(timeout=5) as conn:
+                conn.execute("SELECT 1")
+            return True
+        except psycopg.Error:
+            return False
+
+    def close(self) -> None:
+        """Close the pool (it is reopened on next use)."""
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.close()
+            self._pool = None
+
 
-def ensure_table() -> None:
-    with pool.connection() as conn, conn.cursor() as cur:
-        cur.execute(CREATE_TABLE)
-        conn.commit()
+pool = SharedPool()
@@ -2,8 +2,11 @@
 
 This module provides helpers for:
 
-* Checking existing result IDs in the database.
-* Inserting new records (with URL uniqueness).
+* Checking which result IDs are already stored (indexed ``rid`` lookup).
+* Inserting new records (with URL uniqueness), set-wise via a COPY-fed
+  staging table or one row at a time. Rows are written to the base table
+  ``applicant_rows``, with the text dimensions replaced by ids from
+  :data:`dimensions.cache`.
 * Reading/writing JSON files for intermediate pipeline steps.
 
 It depends on the global PostgreSQL connection pool defined in :mod:`db`.
@@ -11,111 +14,232 @@ It depends on the global PostgreSQL connection pool defined in :mod:`db`.
 
 from pathlib import Path
 import json
+import os
 from psycopg import sql
-from ..load_data import data_type
-from .db import pool, ensure_table
+from . import columnar, dimensions
+from .records import data_type as normalize
+from .cache import query_cache
+from .db import pool
 
 # Temp directory for intermediate files.
 TMP_DIR = Path(__file__).resolve().parent / "tmp"
 TMP_DIR.mkdir(exist_ok=True)
 
 
-# Return rids already stored (derived from URL).
-def existing_rids() -> set[str]:
-    """Return the set of reference IDs (``rid``) already stored.
+# Return which of the given rids are already stored.
+def known_rids(rids) -> set[str]:
+    """Return the subset of ``rids`` already stored in ``applicants``.
 
-    Extracts IDs from the ``url`` field in the ``applicants`` table.
+    Membership is checked in the database against the indexed ``rid``
+    column (``WHERE rid = ANY(%s)``), so the cost depends on the number of
+    ids asked about, not on the size of the table. The scraper calls this
+    once per listing page.
 
-    :return: Set of unique reference IDs.
+    :param rids: Result IDs (numeric strings) to look up.
+    :type rids: Iterable[str]
+    :return: The ids from ``rids`` that already have a row.
     :rtype: set[str]
     """
-    ensure_table()  # Make sure the table exists before SELECTing.
-    rids = set()
-
-    # Separate the SQL statement from the execution.
-    # Use sql.SQL for the template and sql.Identifier for table/column names.
-    query = sql.SQL("SELECT {column} FROM {table} LIMIT %s")
-    # Convert inputs (table/column names) into formatted identifiers.
-    formatted_query = query.format(
-        column=sql.Identifier('url'),
-        table=sql.Identifier('applicants')
-    )
-    # This prevents accidentally fetching an uncontrollably large dataset.
-    query_limit = 10000
+    ids = sorted({int(r) for r in rids if str(r).isdigit()})
+    if not ids:
+        return set()
 
-    # Use a pooled connection/cursor; context managers ensure cleanup.
+    query = sql.SQL("SELECT {rid} FROM {table} WHERE {rid} = ANY(%s)").format(
+        rid=sql.Identifier("rid"),
+        table=sql.Identifier("applicants"),
+    )
     with pool.connection() as conn, conn.cursor() as cur:
-        cur.execute(formatted_query, (query_limit,))
-        urls = [row[0] for row in cur.fetchall()]
-    for url in urls:
-        if url:
-            try:
-                # Split to get the ID
-                rid = url.rsplit("/", 1)[-1]
-                rids.add(rid)
-            except IndexError:
-                # Handle cases where the URL might not have a '/'
-                print(f"Warning: Could not parse rid from URL: {url}")
-    return rids
+        cur.execute(query, (ids,))
+        return {str(row[0]) for row in cur.fetchall()}
 
-# Insert records using a unique URL, ignoring duplicates.
-def insert_records_by_url(records: list[dict]) -> int:
-    """Insert applicant records into the database.
+# Columns written by the insert helpers, in ``data_type`` order.
+INSERT_COLUMNS = (
+    "program",
+    "comments",
+    "date_added",
+    "url",
+    "status",
+    "term",
+    "us_or_international",
+    "gpa",
+    "gre",
+    "gre_v",
+    "gre_aw",
+    "degree",
+    "llm_generated_program",
+    "llm_generated_university",
+    "term_season",
+    "term_year",
+    "decision",
+    "decision_date",
+    "rid",
+)
+# The same columns as stored in ``applicant_rows`` (dimension ids).
+STORED_COLUMNS = dimensions.stored(INSERT_COLUMNS)
+# Rows per COPY/INSERT round trip; 0 selects the per-row loop.
+INSERT_BATCH_SIZE = int(os.getenv("INSERT_BATCH_SIZE", "5000"))
 
-    Uses ``ON CONFLICT (url) DO NOTHING`` to skip duplicates
-    (uniqueness is enforced by ``url``).
+_COLS = sql.SQL(", ").join(sql.Identifier(c) for c in STORED_COLUMNS)
+_URL = INSERT_COLUMNS.index("url")
+_STAGE = sql.Identifier("applicants_stage")
 
-    :param records: List of record dictionaries to insert.
-    :type records: list[dict]
-    :param data_type: Function that converts a record dict into
-                      a list of values matching the schema.
-    :type data_type: callable
-    :return: Number of rows successfully inserted.
-    :rtype: int
+CREATE_STAGE = sql.SQL("""
+    CREATE TEMP TABLE IF NOT EXISTS {stage} ON COMMIT DROP AS
+    SELECT {cols} FROM {tbl} WITH NO DATA
+""").format(stage=_STAGE, cols=_COLS, tbl=dimensions.APPLICANT_ROWS)
+
+COPY_STAGE = sql.SQL("COPY {stage} ({cols}) FROM STDIN").format(stage=_STAGE, cols=_COLS)
+
+# First occurrence of a URL within the batch wins, in input order.
+INSERT_FROM_STAGE = sql.SQL("""
+    INSERT INTO {tbl} ({cols})
+    SELECT {cols} FROM (
+        SELECT DISTINCT ON ({url}) ctid AS ord, {cols}
+        FROM {stage} ORDER BY {url}, ctid
+    ) AS s
+    ORDER BY ord
+    ON CONFLICT ({url}) DO NOTHING
+    RETURNING {url}
+""").format(tbl=dimensions.APPLICANT_ROWS, cols=_COLS, stage=_STAGE,
+            url=sql.Identifier("url"))
+
+TRUNCATE_STAGE = sql.SQL("TRUNCATE {stage}").format(stage=_STAGE)
+
+
+def _as_row(values) -> list:
+    """Return converted values in ``INSERT_COLUMNS`` order.
+
+    Accepts the mapping produced by :func:`app.records.data_type` or a
+    sequence that is already in column order.
     """
-    if not records:  # pragma: no cover
-        return 0
+    if isinstance(values, dict):
+        return [values[c] for c in INSERT_COLUMNS]
+    return list(values)
 
-    cols = (
-        "program",
-        "comments",
-        "date_added",
-        "url",
-        "status",
-        "term",
-        "us_or_international",
-        "gpa",
-        "gre",
-        "gre_v",
-        "gre_aw",
-        "degree",
-        "llm_generated_program",
-        "llm_generated_university",
-    )
-    col_list = sql.SQL(", ").join(sql.Identifier(c) for c in cols)
-    val_list = sql.SQL(", ").join(sql.Placeholder(c) for c in cols)
 
+def _after_insert(count: int, rows: list[list]) -> None:
+    """Invalidate cached results and extend the columnar snapshot."""
+    if count:
+        query_cache.bump()
+        columnar.store.append([dict(zip(INSERT_COLUMNS, row)) for row in rows])
+
+
+def _insert_records_loop(records: list[dict], data_type) -> int:
+    """Insert one row per statement (the original path; kept for comparison).
+
+    :return: Number of rows successfully inserted.
+    :rtype: int
+    """
     stmt = sql.SQL("""
         INSERT INTO {tbl} ({cols})
         VALUES ({vals})
         ON CONFLICT ({conf}) DO NOTHING
     """).format(
-        tbl=sql.Identifier("applicants"),
-        cols=col_list,
-        vals=val_list,
+        tbl=dimensions.APPLICANT_ROWS,
+        cols=_COLS,
+        vals=sql.SQL(", ").join(sql.Placeholder() for _ in INSERT_COLUMNS),
         conf=sql.Identifier("url"),
     )
 
-    inserted = 0
+    rows = [_as_row(data_type(record)) for record in records]
+    stored = dimensions.cache.encode(rows, INSERT_COLUMNS)
+    inserted = []
     with pool.connection() as conn, conn.cursor() as cur:
-        for record in records:
-            cur.execute(stmt, data_type(record))   # dict mapping matches placeholders
+        for row, values in zip(rows, stored):
+            cur.execute(stmt, values)
             if cur.rowcount == 1:
-                inserted += 1
+                inserted.append(row)
         conn.commit()
+    _after_insert(len(inserted), inserted)
+    return len(inserted)
+
+
+def insert_records_bulk(
+    records: list[dict],
+    data_type=None,
+    batch_size: int = INSERT_BATCH_SIZE,
+) -> list[str]:
+    """Insert records set-wise and return the URLs that were inserted.
+
+    Each batch is COPYed into a temporary staging table and moved with a
+    single ``INSERT ... SELECT ... ON CONFLICT (url) DO NOTHING RETURNING
+    url``, so a batch costs a few round trips instead of one per row.
+    Dimension ids for all records are resolved first, in one round trip
+    per column with new values (:class:`dimensions.DimensionCache`). All
+    batches are committed together, then cached query results are
+    invalidated (:meth:`cache.QueryCache.bump`) and the inserted rows are
+    appended to the columnar snapshot (:mod:`columnar`), if one is loaded.
+
+    :param records: List of record dictionaries to insert.
+    :type records: list[dict]
+    :param data_type: Converts a record into column values
+                      (default :func:`app.records.data_type`).
+    :type data_type: callable | None
+    :param batch_size: Rows per COPY/INSERT round trip.
+    :type batch_size: int
+    :return: URLs of the rows actually inserted (duplicates excluded).
+    :rtype: list[str]
+    """
+    data_type = data_type or normalize
+    batch_size = max(batch_size, 1)
+    inserted: list[str] = []
+    if not records:
+        return inserted
+
+    rows = [_as_row(data_type(record)) for record in records]
+    stored = dimensions.cache.encode(rows, INSERT_COLUMNS)
+    with pool.connection() as conn, conn.cursor() as cur:
+        cur.execute(CREATE_STAGE)
+        for start in range(0, len(stored), batch_size):
+            with cur.copy(COPY_STAGE) as cp:
+                for values in stored[start:start + batch_size]:
+                    cp.write_row(values)
+            cur.execute(INSERT_FROM_STAGE)
+            inserted.extend(row[0] for row in cur.fetchall())
+            cur.execute(TRUNCATE_STAGE)
+        conn.commit()
+    # The columnar snapshot takes the text values of the rows that went in.
+    by_url: dict[str, list] = {}
+    if inserted and columnar.store.loaded:
+        for row in rows:
+            by_url.setdefault(row[_URL], row)
+    _after_insert(len(inserted), [by_url[url] for url in inserted] if by_url else [])
     return inserted
 
 
+# Insert records using a unique URL, ignoring duplicates.
+def insert_records_by_url(
+    records: list[dict],
+    data_type=None,
+    batch_size: int = INSERT_BATCH_SIZE,
+) -> int:
+    """Insert applicant records into the database.
+
+    Uses ``ON CONFLICT (url) DO NOTHING`` to skip duplicates
+    (uniqueness is enforced by ``url``). Goes through
+    :func:`insert_records_bulk` unless ``batch_size`` is ``0``, which
+    selects the original one-statement-per-row loop.
+
+    :param records: List of record dictionaries to insert.
+    :type records: list[dict]
+    :param data_type: Function that converts a record dict into
+                      the values matching the schema
+                      (default :func:`app.records.data_type`).
+    :type data_type: callable | None
+    :param batch_size: Rows per bulk round trip; ``0`` for the per-row loop.
+    :type batch_size: int
+    :return: Number of rows successfully inserted.
+    :rtype: int
+    """
+    if not records:  # pragma: no cover
+        return 0
+
+    data_type = data_type or normalize
+    if batch_size <= 0:
+        return _insert_records_loop(records, data_type)
+    return len(insert_records_bulk(records, data_type, batch_size))
+
+
 # Write a list of dicts to a pretty-printed JSON file.
 def write_json(path: Path, rows: list[dict]) -> None:
     """Write a list of dicts to a pretty-printed JSON file.
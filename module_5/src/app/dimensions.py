@@ -0,0 +1,178 @@
+"""Dictionary-encoded text columns of ``applicants``.
+
+The free-text columns that repeat across rows are stored once each in a
+dimension table ``dim_<column>`` (``id``, ``value``) and referenced from
+the base table ``applicant_rows`` by a small integer ``<column>_id``:
+
+   program, status, term, us_or_international, degree,
+   llm_generated_program, llm_generated_university
+
+``applicants`` is a view over ``applicant_rows`` that joins the values
+back, with the original column names and order, so every reader keeps
+working unchanged. Joins to dimensions a query does not use are removed by
+the planner (``LEFT JOIN`` on a primary key), so e.g. ``rid`` lookups only
+touch the base table. Writers (:mod:`db_helper`, :mod:`restandardize`)
+write ``applicant_rows`` directly and get the ids from :data:`cache`.
+
+The schema is created by migration ``v009_dimension_tables``.
+"""
+
+import threading
+
+from psycopg import sql
+
+from .db import pool
+
+APPLICANT_ROWS = sql.Identifier("applicant_rows")
+
+# Encoded column -> id type; SMALLINT for the short vocabularies.
+ENCODED = {
+    "program": "INTEGER",
+    "status": "INTEGER",
+    "term": "SMALLINT",
+    "us_or_international": "SMALLINT",
+    "degree": "SMALLINT",
+    "llm_generated_program": "INTEGER",
+    "llm_generated_university": "INTEGER",
+}
+
+# Columns of the ``applicants`` view, in the original table order.
+APPLICANT_COLUMNS = (
+    "p_id",
+    "program",
+    "comments",
+    "date_added",
+    "url",
+    "status",
+    "term",
+    "us_or_international",
+    "gpa",
+    "gre",
+    "gre_v",
+    "gre_aw",
+    "degree",
+    "llm_generated_program",
+    "llm_generated_university",
+    "rid",
+    "term_season",
+    "term_year",
+    "decision",
+    "decision_date",
+)
+
+
+def table(col: str) -> sql.Identifier:
+    """Dimension table of an encoded column (``dim_<col>``).
+
+    :rtype: psycopg.sql.Identifier
+    """
+    return sql.Identifier(f"dim_{col}")
+
+
+def stored(columns) -> tuple[str, ...]:
+    """Map ``applicants`` column names to their ``applicant_rows`` names.
+
+    :param columns: Column names; encoded ones become ``<col>_id``.
+    :return: The stored column names, in the same order.
+    :rtype: tuple[str, ...]
+    """
+    return tuple(f"{c}_id" if c in ENCODED else c for c in columns)
+
+
+def decoded(rows: sql.Composable, sample: sql.Composable = sql.SQL("")) -> sql.Composed:
+    """``SELECT`` of ``applicant_rows``-shaped ``rows`` with the ids joined back to text.
+
+    The result has the :data:`APPLICANT_COLUMNS`. Used for the
+    ``applicants`` view, the trigger transition tables and sampling.
+
+    :param rows: Table (or transition table) with the ``applicant_rows`` columns.
+    :param sample: Optional ``TABLESAMPLE`` clause applied to ``rows``.
+    :rtype: psycopg.sql.Composed
+    """
+    cols = [
+        sql.SQL("{c}.value AS {c}" if c in ENCODED else "r.{c}").format(c=sql.Identifier(c))
+        for c in APPLICANT_COLUMNS
+    ]
+    joins = [
+        sql.SQL("LEFT JOIN {dim} AS {c} ON {c}.id = r.{fk}").format(
+            dim=table(c), c=sql.Identifier(c), fk=sql.Identifier(f"{c}_id"))
+        for c in ENCODED
+    ]
+    return sql.SQL("SELECT {cols} FROM {rows} AS r{sample} {joins}").format(
+        cols=sql.SQL(", ").join(cols),
+        rows=rows,
+        sample=sample,
+        joins=sql.SQL(" ").join(joins),
+    )
+
+
+ADD_VALUES = {
+    c: sql.SQL(
+        "INSERT INTO {dim} (value) SELECT unnest(%s::text[]) ON CONFLICT (value) DO NOTHING"
+    ).format(dim=table(c))
+    for c in ENCODED
+}
+SELECT_IDS = {
+    c: sql.SQL("SELECT value, id FROM {dim} WHERE value = ANY(%s)").format(dim=table(c))
+    for c in ENCODED
+}
+
+
+class DimensionCache:
+    """In-process ``value -> id`` maps of the dimension tables.
+
+    Values not seen yet are added (or, if another process added them
+    first, looked up) in one round trip per column, on a connection of
+    their own that is committed before any id is handed out. A cached id
+    therefore always names a committed row, even if the caller's insert
+    later rolls back, and since dimension rows are never deleted the maps
+    never go stale.
+    """
+
+    def __init__(self):
+        self._ids: dict[str, dict[str, int]] = {c: {} for c in ENCODED}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in self._ids.values())
+
+    def _resolve(self, missing: dict[str, list[str]]) -> None:
+        """Fetch (creating if needed) the ids of ``missing`` values per column."""
+        with self._lock, pool.connection() as conn, conn.cursor() as cur:
+            for col, values in missing.items():
+                cur.execute(ADD_VALUES[col], (values,))
+                cur.execute(SELECT_IDS[col], (values,))
+                self._ids[col].update(cur.fetchall())
+            conn.commit()
+
+    def encode(self, rows: list, columns) -> list[list]:
+        """Return copies of ``rows`` with encoded columns replaced by their ids.
+
+        :param rows: Value sequences in ``columns`` order.
+        :type rows: list
+        :param columns: Column name of each position; positions named in
+                        :data:`ENCODED` are encoded, ``None`` stays ``None``.
+        :return: New rows, in :func:`stored` column order.
+        :rtype: list[list]
+        """
+        positions = [(i, c) for i, c in enumerate(columns) if c in ENCODED]
+        missing = {}
+        for i, col in positions:
+            new = {row[i] for row in rows if row[i] is not None} - self._ids[col].keys()
+            if new:
+                # Sorted, so concurrent writers take the unique-index locks in one order.
+                missing[col] = sorted(new)
+        if missing:
+            self._resolve(missing)
+
+        out = []
+        for row in rows:
+            row = list(row)
+            for i, col in positions:
+                if row[i] is not None:
+                    row[i] = self._ids[col][row[i]]
+            out.append(row)
+        return out
+
+
+cache = DimensionCache()
@@ -0,0 +1,351 @@
+"""Percentiles and histograms of the applicant scores.
+
+``applicant_score_bins`` keeps a fixed-bin histogram of ``gpa``, ``gre``,
+``gre_v`` and ``gre_aw`` for every cell of :mod:`summary`'s key columns::
+
+   (term_year, term_season, degree, us_or_international, decision,
+    llm_generated_program, llm_generated_university, score, bin) -> n
+
+Bin ``i`` of a score covers ``[i * width, (i + 1) * width)`` with the
+widths in :data:`BIN_WIDTHS`; only non-empty bins are stored, and only
+values inside the :data:`summary.RANGES` validity ranges are counted.
+Like the summary, the table is maintained by statement-level triggers in
+the writing transaction, so inserts update it without extra work from the
+loader.
+
+Histograms are mergeable by adding counts, so the histogram of any filter
+combination is one ``GROUP BY bin`` over the matching cells, and
+percentiles are interpolated from it. The error of a percentile is at most
+one bin width (0.01 GPA, 1 GRE point, 0.1 AW), whatever the number of
+applicants. Served at ``/api/histogram`` and ``/api/percentiles``.
+
+Example
+-------
+
+.. code-block:: python
+
+   from app import analytics, distributions
+
+   q = analytics.query(term="Fall 2025", degree="PhD")
+   distributions.percentiles("gpa", [50, 90], q)  # {50: 3.81, 90: 3.97}
+"""
+
+from dataclasses import dataclass
+import math
+
+import numpy as np
+from psycopg import sql
+
+from . import columnar
+from .analytics import Query, where
+from .cache import query_cache
+from .db import pool
+from .dimensions import APPLICANT_ROWS
+from .summary import APPLICANTS, DELTAS, KEY_COLUMNS, RANGES
+
+BINS = sql.Identifier("applicant_score_bins")
+
+BIN_WIDTHS = {"gpa": 0.01, "gre": 1.0, "gre_v": 1.0, "gre_aw": 0.1}
+
+# Keeps values that sit on a bin edge (3.5 / 0.01 = 349.999...) in their bin.
+_EDGE_EPSILON = 1e-9
+
+DEFAULT_PERCENTILES = (25, 50, 75, 90)
+
+_KEYS = sql.SQL(", ").join(sql.Identifier(c) for c in KEY_COLUMNS)
+
+CREATE_BINS = sql.SQL("""
+CREATE TABLE IF NOT EXISTS {bins} (
+  term_year SMALLINT,
+  term_season TEXT,
+  degree TEXT,
+  us_or_international TEXT,
+  decision decision_kind,
+  llm_generated_program TEXT,
+  llm_generated_university TEXT,
+  score TEXT NOT NULL,
+  bin SMALLINT NOT NULL,
+  n INTEGER NOT NULL DEFAULT 0,
+  CONSTRAINT applicant_score_bins_key UNIQUE NULLS NOT DISTINCT ({keys}, score, bin)
+)
+""").format(bins=BINS, keys=_KEYS)
+
+
+def _bin_of(col: str) -> sql.Composed:
+    """Bin index of ``col``, ``NULL`` when missing or out of range."""
+    low, high = RANGES[col]
+    return sql.SQL(
+        "CASE WHEN {col} BETWEEN {low} AND {high} "
+        "THEN floor({col} / {width} + {eps})::INTEGER END"
+    ).format(
+        col=sql.Identifier(col),
+        low=sql.Literal(low),
+        high=sql.Literal(high),
+        width=sql.Literal(BIN_WIDTHS[col]),
+        eps=sql.Literal(_EDGE_EPSILON),
+    )
+
+
+def _aggregate(source: sql.Composable, sign: sql.Composable) -> sql.Composed:
+    """``SELECT keys, score, bin, n`` over ``source``, each row weighted by ``sign``."""
+    values = sql.SQL(", ").join(
+        sql.SQL("({name}, {bin})").format(name=sql.Literal(col), bin=_bin_of(col))
+        for col in BIN_WIDTHS
+    )
+    return sql.SQL(
+        "SELECT {keys}, v.score, v.bin, SUM({sign})::INTEGER FROM {source} "
+        "CROSS JOIN LATERAL (VALUES {values}) AS v(score, bin) "
+        "WHERE v.bin IS NOT NULL GROUP BY {keys}, v.score, v.bin"
+    ).format(keys=_KEYS, sign=sign, source=source, values=values)
+
+
+def _upsert(select: sql.Composable) -> sql.Composed:
+    """Add the grouped bin counts of ``select`` into the table."""
+    return sql.SQL("""
+      INSERT INTO {bins} AS s ({keys}, score, bin, n)
+      {select}
+      ON CONFLICT ON CONSTRAINT applicant_score_bins_key DO UPDATE SET n = s.n + EXCLUDED.n
+    """).format(bins=BINS, keys=_KEYS, select=select)
+
+
+def _branch(op: str) -> sql.Composed:
+    select = _aggregate(sql.SQL("({delta}) AS d").format(delta=DELTAS[op]), sql.SQL("d.sign"))
+    body = [_upsert(select)]
+    if op != "INSERT":
+        body.append(sql.SQL("DELETE FROM {bins} WHERE n = 0").format(bins=BINS))
+    return sql.SQL("IF TG_OP = {op} THEN {body}; END IF;").format(
+        op=sql.Literal(op), body=sql.SQL("; ").join(body)
+    )
+
+
+CREATE_TRIGGER_FUNCTION = sql.SQL("""
+CREATE OR REPLACE FUNCTION applicant_score_bins_apply() RETURNS trigger
+LANGUAGE plpgsql AS $fn$
+BEGIN
+  IF TG_OP = 'TRUNCATE' THEN
+    TRUNCATE {bins};
+    RETURN NULL;
+  END IF;
+  {branches}
+  RETURN NULL;
+END
+$fn$
+""").format(bins=BINS, branches=sql.SQL("\n  ").join(_branch(op) for op in DELTAS))
+
+CREATE_TRIGGERS = sql.SQL("""
+CREATE OR REPLACE TRIGGER applicant_score_bins_ins AFTER INSERT ON {tbl}
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION applicant_score_bins_apply();
+CREATE OR REPLACE TRIGGER applicant_score_bins_upd AFTER UPDATE ON {tbl}
+  REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION applicant_score_bins_apply();
+CREATE OR REPLACE TRIGGER applicant_score_bins_del AFTER DELETE ON {tbl}
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION applicant_score_bins_apply();
+CREATE OR REPLACE TRIGGER applicant_score_bins_trunc AFTER TRUNCATE ON {tbl}
+  FOR EACH STATEMENT EXECUTE FUNCTION applicant_score_bins_apply();
+""").format(tbl=APPLICANT_ROWS)
+
+HAS_BINS = sql.SQL("SELECT to_regclass({name}) IS NOT NULL").format(
+    name=sql.Literal("applicant_score_bins")
+)
+
+REBUILD_BINS = sql.SQL("LOCK TABLE {tbl} IN SHARE MODE; TRUNCATE {bins}; ").format(
+    tbl=APPLICANTS, bins=BINS
+) + _upsert(_aggregate(APPLICANTS, sql.SQL("1")))
+
+
+def rebuild_bins(conn) -> None:
+    """Recompute ``applicant_score_bins`` from scratch. The caller commits.
+
+    :param conn: Open connection.
+    """
+    with conn.cursor() as cur:
+        cur.execute(REBUILD_BINS)
+
+
+def ensure_bins(conn) -> None:
+    """Create the bins table and its triggers; fill it if it is new.
+
+    The caller commits.
+
+    :param conn: Open connection.
+    """
+    with conn.cursor() as cur:
+        cur.execute(HAS_BINS)
+        existed = cur.fetchone()[0]
+        cur.execute(CREATE_BINS)
+        cur.execute(CREATE_TRIGGER_FUNCTION)
+        cur.execute(CREATE_TRIGGERS)
+    if not existed:
+        rebuild_bins(conn)
+
+
+@dataclass(frozen=True)
+class Histogram:
+    """Fixed-bin histogram of one score.
+
+    :param score: ``gpa``, ``gre``, ``gre_v`` or ``gre_aw``.
+    :param width: Bin width; bin ``i`` covers ``[i * width, (i + 1) * width)``.
+    :param bins: ``(i, count)`` pairs of the non-empty bins, ascending.
+    """
+
+    score: str
+    width: float
+    bins: tuple[tuple[int, int], ...] = ()
+
+    @classmethod
+    def from_values(cls, score: str, values) -> "Histogram":
+        """Bin raw values exactly like the ``applicant_score_bins`` triggers.
+
+        :param score: Score name.
+        :type score: str
+        :param values: Numbers; ``None``/``NaN`` and out-of-range values are skipped.
+        :return: The histogram.
+        :rtype: Histogram
+        """
+        low, high = RANGES[_check_score(score)]
+        width = BIN_WIDTHS[score]
+        vals = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        vals = vals[(vals >= low) & (vals <= high)]
+        idx, counts = np.unique(np.floor(vals / width + _EDGE_EPSILON), return_counts=True)
+        return cls(score, width, tuple(zip(idx.astype(int).tolist(), counts.tolist())))
+
+    @property
+    def count(self) -> int:
+        """Number of values in the histogram."""
+        return sum(n for _i, n in self.bins)
+
+    def merge(self, other: "Histogram") -> "Histogram":
+        """Add the counts of ``other`` (same score and width).
+
+        :raises ValueError: If the histograms are not compatible.
+        """
+        if (other.score, other.width) != (self.score, self.width):
+            raise ValueError("can only merge histograms of the same score and width")
+        counts = dict(self.bins)
+        for i, n in other.bins:
+            counts[i] = counts.get(i, 0) + n
+        return Histogram(self.score, self.width, tuple(sorted(counts.items())))
+
+    def coarsen(self, width: float) -> "Histogram":
+        """Merge adjacent bins into bins of ``width``.
+
+        :param width: A whole multiple of the current width.
+        :type width: float
+        :return: The coarser histogram.
+        :rtype: Histogram
+        :raises ValueError: If ``width`` is not a multiple of the current width.
+        """
+        factor = round(width / self.width)
+        if factor < 1 or not math.isclose(factor * self.width, width):
+            raise ValueError(f"width must be a multiple of {self.width:g}")
+        counts: dict[int, int] = {}
+        for i, n in self.bins:
+            counts[i // factor] = counts.get(i // factor, 0) + n
+        return Histogram(self.score, self.width * factor, tuple(sorted(counts.items())))
+
+    def percentile(self, p: float) -> float | None:
+        """Interpolated ``p``-th percentile, ``None`` for an empty histogram.
+
+        Values are assumed uniform within a bin, so the result is within
+        one bin width of the exact percentile.
+
+        :param p: Percentile between 0 and 100.
+        :type p: float
+        :rtype: float | None
+        :raises ValueError: If ``p`` is out of range.
+        """
+        if not 0 <= p <= 100:
+            raise ValueError("percentiles must be between 0 and 100")
+        total = self.count
+        if not total:
+            return None
+        low, high = RANGES[self.score]
+        rank = p / 100 * total
+        cumulative = np.cumsum([n for _i, n in self.bins])
+        k = min(int(np.searchsorted(cumulative, rank)), len(self.bins) - 1)
+        i, n = self.bins[k]
+        value = (i + (rank - (cumulative[k] - n)) / n) * self.width
+        return min(max(float(value), low), high)
+
+    def as_dict(self) -> dict:
+        """Return the histogram as a JSON-serializable dict.
+
+        :rtype: dict
+        """
+        return {
+            "score": self.score,
+            "width": self.width,
+            "count": self.count,
+            "bins": [
+                {"low": round(i * self.width, 6), "high": round((i + 1) * self.width, 6),
+                 "count": n}
+                for i, n in self.bins
+            ],
+        }
+
+
+def _check_score(score: str) -> str:
+    if score not in BIN_WIDTHS:
+        raise ValueError(f"score must be one of {', '.join(BIN_WIDTHS)}, got {score!r}")
+    return score
+
+
+def build(score: str, filters=()) -> tuple[sql.Composed, list]:
+    """Compile the merged histogram query for ``score`` over ``filters``.
+
+    :param score: Score name.
+    :type score: str
+    :param filters: :attr:`analytics.Query.filters` pairs.
+    :return: ``(statement, params)`` returning ``(bin, count)`` rows.
+    :rtype: tuple[psycopg.sql.Composed, list]
+    """
+    cond, params = where(filters)
+    stmt = sql.SQL(
+        "SELECT bin, SUM(n)::BIGINT FROM {bins} WHERE score = %s AND {cond} "
+        "GROUP BY bin HAVING SUM(n) > 0 ORDER BY bin"
+    ).format(bins=BINS, cond=cond)
+    return stmt, [_check_score(score)] + params
+
+
+def histogram(score: str, q: Query | None = None) -> Histogram:
+    """Histogram of ``score`` over the rows matching ``q``'s filters (cached).
+
+    Uses the in-memory :mod:`columnar` snapshot when it is enabled.
+
+    :param score: ``gpa``, ``gre``, ``gre_v`` or ``gre_aw``.
+    :type score: str
+    :param q: Query whose filters select the cells; all rows if ``None``.
+    :type q: analytics.Query | None
+    :return: The merged histogram.
+    :rtype: Histogram
+    :raises ValueError: On an unknown score.
+    """
+    filters = q.filters if q is not None else ()
+    stmt, params = build(score, filters)
+
+    def compute():
+        if columnar.store.enabled:
+            return Histogram.from_values(score, columnar.store.values(score, filters))
+        with pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(stmt, params)
+            return Histogram(score, BIN_WIDTHS[score], tuple(map(tuple, cur.fetchall())))
+
+    return query_cache.get_or_compute(("distributions.histogram", score, filters), compute)
+
+
+def percentiles(score: str, ps=DEFAULT_PERCENTILES, q: Query | None = None) -> dict:
+    """Percentiles of ``score`` over the rows matching ``q``'s filters.
+
+    :param score: Score name.
+    :type score: str
+    :param ps: Percentiles between 0 and 100.
+    :param q: Query whose filters select the cells; all rows if ``None``.
+    :type q: analytics.Query | None
+    :return: ``{p: value}``; values are ``None`` when nothing matches.
+    :rtype: dict
+    :raises ValueError: On an unknown score or an out-of-range percentile.
+    """
+    hist = histogram(score, q)
+    return {p: hist.percentile(p) for p in ps}
@@ -0,0 +1,274 @@
+"""Bulk export of applicant rows with ``COPY ... TO STDOUT``.
+
+The rows never pass through Python objects: Postgres formats them and the
+``COPY`` data is streamed block by block into the output, so memory stays
+constant whatever the table size. Formats:
+
+* ``csv``: gzip-compressed CSV with a header row;
+* ``jsonl``: gzip-compressed JSON lines (``row_to_json`` on the server);
+* ``parquet``: a Parquet dataset partitioned by term
+  (``term_year=2025/term_season=Fall/...``), written from the CSV stream
+  with ``pyarrow`` (in ``requirements.txt``, imported only for this
+  format). A dataset is a directory, so this
+  format is only written to disk.
+
+Rows are selected with a :class:`browse.Listing` (the same filters and
+``fields`` as ``/api/applicants``) and are not sorted. Every export fills
+an :class:`ExportStats` with the rows, bytes read and written and the
+throughput. Served as ``python -m src.run export`` and ``/api/export``.
+
+Example
+-------
+
+.. code-block:: python
+
+   from app import browse, export
+
+   lst = browse.listing(term_year=[2025], fields=["url", "gpa", "decision"])
+   stats = export.to_file(lst, "parquet", "exports/fall")
+   print(f"{stats.rows} rows at {stats.mb_per_s:.1f} MB/s")
+"""
+
+from dataclasses import dataclass
+import io
+import logging
+from pathlib import Path
+import time
+from typing import Iterator
+import zlib
+
+from psycopg import sql
+
+from .browse import Listing, projection, where
+from .db import pool
+from .dimensions import APPLICANT_ROWS
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "jsonl", "parquet")
+STREAM_FORMATS = ("csv", "jsonl")
+GZIP_LEVEL = 6
+
+# Parquet partition columns, outermost first (always exported).
+PARTITION_BY = ("term_year", "term_season")
+
+# Arrow type of each non-text column, for parsing the CSV stream.
+ARROW_TYPES = {
+    "p_id": "int32",
+    "rid": "int64",
+    "gpa": "float64",
+    "gre": "float64",
+    "gre_v": "float64",
+    "gre_aw": "float64",
+    "date_added": "date32",
+    "decision_date": "date32",
+    "term_year": "int16",
+}
+
+
+@dataclass
+class ExportStats:
+    """Counters of one export.
+
+    :param rows: Rows copied.
+    :param bytes_in: Bytes of ``COPY`` data read from the server.
+    :param bytes_out: Bytes written (compressed file or dataset size).
+    :param seconds: Wall time.
+    """
+
+    rows: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    seconds: float = 0.0
+
+    @property
+    def mb_per_s(self) -> float:
+        """``COPY`` throughput in MB/s."""
+        return self.bytes_in / 2**20 / max(self.seconds, 1e-9)
+
+
+def copy_statement(lst: Listing, fmt: str) -> tuple[sql.Composed, list]:
+    """Compile the ``COPY ... TO STDOUT`` of a listing.
+
+    :param lst: Rows and columns to export.
+    :type lst: browse.Listing
+    :param fmt: One of :data:`FORMATS`.
+    :type fmt: str
+    :return: ``(statement, params)``.
+    :rtype: tuple[psycopg.sql.Composed, list]
+    :raises ValueError: On an unknown format.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    fields = lst.fields
+    if fmt == "parquet":
+        fields += tuple(col for col in PARTITION_BY if col not in fields)
+    conds, params = where(lst)
+    select, joins = projection(fields)
+    query = sql.SQL("SELECT {select} FROM {rows} AS r{joins}{where}").format(
+        select=select,
+        rows=APPLICANT_ROWS,
+        joins=joins,
+        where=sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conds) if conds else sql.SQL(""),
+    )
+    if fmt == "jsonl":
+        # One JSON text per row; quote and delimiter never occur in JSON, so
+        # CSV mode passes each line through without escaping.
+        return sql.SQL(
+            "COPY (SELECT row_to_json(x)::text FROM ({query}) AS x) TO STDOUT"
+            " WITH (FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02')"
+        ).format(query=query), params
+    return sql.SQL("COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)").format(
+        query=query), params
+
+
+def _copy_blocks(stmt, params, stats: ExportStats) -> Iterator[bytes]:
+    """Yield the ``COPY`` data as the server sends it."""
+    with pool.connection(statement_timeout_ms=0) as conn, conn.cursor() as cur:
+        with cur.copy(stmt, params) as copy:
+            for block in copy:
+                stats.bytes_in += len(block)
+                yield bytes(block)
+        stats.rows = cur.rowcount
+
+
+def _log(fmt: str, stats: ExportStats) -> None:
+    logger.info("export %s: %s rows, %.1f MB in %.2fs (%.1f MB/s)", fmt, stats.rows,
+                stats.bytes_in / 2**20, stats.seconds, stats.mb_per_s)
+
+
+def stream(lst: Listing, fmt: str, stats: ExportStats | None = None) -> Iterator[bytes]:
+    """Export as gzip-compressed CSV or JSON lines, one chunk at a time.
+
+    Arguments are validated before the first chunk, so a caller can still
+    answer with an error.
+
+    :param lst: Rows and columns to export.
+    :type lst: browse.Listing
+    :param fmt: ``csv`` or ``jsonl``.
+    :type fmt: str
+    :param stats: Filled in as the export runs.
+    :type stats: ExportStats | None
+    :return: Iterator of gzip data.
+    :rtype: Iterator[bytes]
+    :raises ValueError: On an unknown or non-streamable format.
+    """
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(STREAM_FORMATS)}")
+    stmt, params = copy_statement(lst, fmt)
+    return _gzip(stmt, params, fmt, stats if stats is not None else ExportStats())
+
+
+def _gzip(stmt, params, fmt: str, stats: ExportStats) -> Iterator[bytes]:
+    started = time.perf_counter()
+    gz = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for block in _copy_blocks(stmt, params, stats):
+        out = gz.compress(block)
+        if out:
+            stats.bytes_out += len(out)
+            yield out
+    out = gz.flush()
+    stats.bytes_out += len(out)
+    stats.seconds = time.perf_counter() - started
+    _log(fmt, stats)
+    yield out
+
+
+class _BlockReader(io.RawIOBase):
+    """Read-only file over an iterator of byte blocks."""
+
+    def __init__(self, blocks: Iterator[bytes]):
+        self._blocks, self._buf = blocks, b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        # COPY sends one block per row: fill the buffer from as many as fit.
+        view, n = memoryview(b).cast("B"), 0
+        while n < len(view):
+            if not self._buf:
+                self._buf = next(self._blocks, b"")
+                if not self._buf:
+                    break
+            k = min(len(view) - n, len(self._buf))
+            view[n:n + k], self._buf = self._buf[:k], self._buf[k:]
+            n += k
+        return n
+
+
+def require_pyarrow():
+    """Import the ``pyarrow`` package (with its csv, dataset and parquet modules).
+
+    :return: The ``pyarrow`` module.
+    :raises RuntimeError: If ``pyarrow`` is not installed.
+    """
+    try:
+        # pylint: disable=import-outside-toplevel
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.csv
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise RuntimeError("Parquet support needs pyarrow (pip install pyarrow)") from exc
+    return pyarrow
+
+
+def _write_parquet(lst: Listing, path: Path, stats: ExportStats) -> None:
+    pa = require_pyarrow()
+    stmt, params = copy_statement(lst, "parquet")
+    types = {col: pa.type_for_alias(ARROW_TYPES.get(col, "string"))
+             for col in lst.fields + PARTITION_BY}
+    blocks = _copy_blocks(stmt, params, stats)
+    try:
+        reader = pa.csv.open_csv(
+            io.BufferedReader(_BlockReader(blocks), 1 << 20),
+            read_options=pa.csv.ReadOptions(block_size=1 << 22),
+            convert_options=pa.csv.ConvertOptions(
+                column_types=types,
+                null_values=[""],
+                strings_can_be_null=True,
+                quoted_strings_can_be_null=False,  # COPY quotes empty strings, not NULLs
+            ),
+        )
+        pa.dataset.write_dataset(
+            reader,
+            path,
+            format="parquet",
+            partitioning=list(PARTITION_BY),
+            partitioning_flavor="hive",
+            existing_data_behavior="delete_matching",
+        )
+    finally:
+        blocks.close()  # returns the connection if the writer stopped early
+    stats.bytes_out = sum(f.stat().st_size for f in path.rglob("*.parquet"))
+
+
+def to_file(lst: Listing, fmt: str, path) -> ExportStats:
+    """Export to a gzip file (``csv``, ``jsonl``) or a Parquet dataset directory.
+
+    :param lst: Rows and columns to export.
+    :type lst: browse.Listing
+    :param fmt: One of :data:`FORMATS`.
+    :type fmt: str
+    :param path: Output file, or dataset directory for ``parquet``
+                 (partitions being written are replaced).
+    :type path: str | pathlib.Path
+    :return: Rows, bytes and throughput.
+    :rtype: ExportStats
+    :raises ValueError: On an unknown format.
+    :raises RuntimeError: For ``parquet`` without ``pyarrow``.
+    """
+    path, stats = Path(path), ExportStats()
+    if fmt != "parquet":
+        chunks = stream(lst, fmt, stats)
+        with path.open("wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        return stats
+    started = time.perf_counter()
+    _write_parquet(lst, path, stats)
+    stats.seconds = time.perf_counter() - started
+    _log(fmt, stats)
+    return stats
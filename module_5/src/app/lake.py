@@ -0,0 +1,255 @@
+"""Parquet data lake of scraped records, for offline analytics.
+
+With ``DATA_LAKE=1`` the pipeline also appends the rows it inserts, after
+:func:`records.data_type` normalization, to a Parquet dataset partitioned
+by term and scrape date (hive layout)::
+
+   <DATA_LAKE_DIR>/term_year=2025/term_season=Fall/scrape_date=2026-10-19/*.parquet
+
+Each append writes new files, so small batches leave many small files;
+:func:`compact` merges the small files of a partition into one, and
+:func:`append` runs it on the partitions it wrote once they hold
+``COMPACT_MIN_FILES`` small files. A partition's ``_compacted.json``
+(:data:`MANIFEST`) names the files each merged file replaces, so the
+merged file and the files it replaces are never read together.
+
+:func:`report` answers the :mod:`query_data` dashboard questions from the
+dataset alone. It reads only the columns the questions use and loads them
+into its own :class:`columnar.ColumnStore`, whose NumPy engine evaluates
+the same :mod:`analytics` queries as the database, so heavy offline
+analysis never touches Postgres (``python -m src.run lake report``).
+
+Configured from the environment:
+
+* ``DATA_LAKE``: ``1`` to append pipeline batches (default off).
+* ``DATA_LAKE_DIR``: dataset root (default ``app/tmp/lake``).
+
+Requires ``pyarrow`` (listed in ``requirements.txt``).
+"""
+
+from datetime import date
+import json
+import os
+from pathlib import Path
+import uuid
+
+from . import columnar, query_data
+from .db_helper import TMP_DIR
+from .export import require_pyarrow
+from .summary import DIMENSIONS, RANGES
+
+ENABLED = os.getenv("DATA_LAKE", "0") == "1"
+LAKE_DIR = Path(os.getenv("DATA_LAKE_DIR", str(TMP_DIR / "lake")))
+
+SMALL_FILE_BYTES = 16 * 2**20
+COMPACT_MIN_FILES = 8
+
+# Per partition: merged file name -> names of the files it replaces.
+MANIFEST = "_compacted.json"
+
+# Partition columns, outermost first, and their types.
+PARTITIONS = (("term_year", "int16"), ("term_season", "string"), ("scrape_date", "date32"))
+
+# Record columns (records.data_type keys) stored in the files, and their types.
+COLUMNS = (
+    ("url", "string"),
+    ("rid", "int64"),
+    ("date_added", "date32"),
+    ("program", "string"),
+    ("comments", "string"),
+    ("status", "string"),
+    ("term", "string"),
+    ("us_or_international", "string"),
+    ("gpa", "float64"),
+    ("gre", "float64"),
+    ("gre_v", "float64"),
+    ("gre_aw", "float64"),
+    ("degree", "string"),
+    ("llm_generated_program", "string"),
+    ("llm_generated_university", "string"),
+    ("decision", "string"),
+    ("decision_date", "date32"),
+)
+
+
+def _schema(pa, columns):
+    return pa.schema([(name, pa.type_for_alias(typ)) for name, typ in columns])
+
+
+def _partitioning(pa):
+    return pa.dataset.partitioning(_schema(pa, PARTITIONS), flavor="hive")
+
+
+def append(records: list[dict], root=None, scraped: date | None = None) -> list[Path]:
+    """Append normalized records as new files, then compact what they touched.
+
+    :param records: Rows as returned by :func:`records.data_type`.
+    :type records: list[dict]
+    :param root: Dataset root (default :data:`LAKE_DIR`).
+    :type root: str | pathlib.Path | None
+    :param scraped: Scrape date partition (default today).
+    :type scraped: datetime.date | None
+    :return: The files written.
+    :rtype: list[pathlib.Path]
+    :raises RuntimeError: If ``pyarrow`` is not installed.
+    """
+    pa = require_pyarrow()
+    root = Path(root or LAKE_DIR)
+    if not records:
+        return []
+    scraped = scraped or date.today()
+    rows = [dict(r, scrape_date=scraped) for r in records]
+    table = pa.Table.from_pylist(rows, schema=_schema(pa, COLUMNS + PARTITIONS))
+    written: list[Path] = []
+    pa.dataset.write_dataset(
+        table,
+        root,
+        format="parquet",
+        partitioning=_partitioning(pa),
+        basename_template=f"batch-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        file_visitor=lambda f: written.append(Path(f.path)),
+    )
+    compact(root, {path.parent for path in written})
+    return written
+
+
+def _manifest(leaf: Path) -> dict[str, list[str]]:
+    try:
+        return json.loads((leaf / MANIFEST).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+
+
+def _write_manifest(leaf: Path, entries: dict[str, list[str]]) -> None:
+    """Replace the manifest of ``leaf`` atomically."""
+    staged = leaf / f".{MANIFEST}-{uuid.uuid4().hex}"
+    staged.write_text(json.dumps(entries), encoding="utf-8")
+    staged.replace(leaf / MANIFEST)
+
+
+def _live_files(leaf: Path) -> list[Path]:
+    """Data files of ``leaf``, without hidden files and replaced ones.
+
+    The directory is listed before the manifest is read: a merged file in
+    the listing was renamed into place after its manifest entry was
+    written, and that entry stays until the files it replaces are gone.
+    """
+    files = {f.name: f for f in leaf.glob("*.parquet") if not f.name.startswith(".")}
+    for merged, replaced in _manifest(leaf).items():
+        if merged in files:
+            for name in replaced:
+                files.pop(name, None)
+    return sorted(files.values())
+
+
+def _settle(leaf: Path) -> int:
+    """Finish or roll back compactions of ``leaf`` that were interrupted.
+
+    :return: Number of files removed.
+    """
+    entries = _manifest(leaf)
+    removed = 0
+    for merged, replaced in entries.items():
+        if (leaf / merged).exists():
+            for name in replaced:
+                if (leaf / name).exists():
+                    (leaf / name).unlink()
+                    removed += 1
+        else:
+            (leaf / f".{merged}").unlink(missing_ok=True)
+    if entries:
+        (leaf / MANIFEST).unlink()
+    return removed
+
+
+def compact(root=None, partitions=None, min_files: int | None = None) -> int:
+    """Merge the small files of each partition into one file.
+
+    A partition is compacted once it holds ``min_files`` files smaller
+    than :data:`SMALL_FILE_BYTES`. The merged file is written under a
+    hidden name (ignored by readers), recorded in the :data:`MANIFEST` as
+    replacing the small files, and then renamed into place: readers see
+    either the small files or the merged one, never both. The small files
+    and the manifest entry are removed last; a compaction interrupted
+    before that is finished (or rolled back) by the next one. Compactions
+    of one partition must not overlap.
+
+    :param root: Dataset root (default :data:`LAKE_DIR`).
+    :type root: str | pathlib.Path | None
+    :param partitions: Partition directories to check (default all).
+    :type partitions: set[pathlib.Path] | None
+    :param min_files: Small files needed to compact a partition
+                      (default :data:`COMPACT_MIN_FILES`).
+    :type min_files: int | None
+    :return: Number of files removed.
+    :rtype: int
+    :raises RuntimeError: If ``pyarrow`` is not installed.
+    """
+    pa = require_pyarrow()
+    root = Path(root or LAKE_DIR)
+    if partitions is None:
+        partitions = {path.parent for path in root.rglob("*.parquet")}
+    min_files = max(COMPACT_MIN_FILES if min_files is None else min_files, 2)
+    schema = _schema(pa, COLUMNS)
+    removed = 0
+    for leaf in sorted(partitions):
+        removed += _settle(leaf)
+        small = [f for f in _live_files(leaf) if f.stat().st_size < SMALL_FILE_BYTES]
+        if len(small) < min_files:
+            continue
+        table = pa.concat_tables(pa.parquet.read_table(f, schema=schema) for f in small)
+        name = f"compact-{uuid.uuid4().hex}.parquet"
+        pa.parquet.write_table(table, leaf / f".{name}")
+        _write_manifest(leaf, {name: [f.name for f in small]})
+        (leaf / f".{name}").rename(leaf / name)
+        removed += _settle(leaf)
+    return removed
+
+
+def load(root=None) -> columnar.ColumnStore:
+    """Read the columns of the dashboard questions into a column store.
+
+    :param root: Dataset root (default :data:`LAKE_DIR`).
+    :type root: str | pathlib.Path | None
+    :return: A loaded store (never reloads from the database).
+    :rtype: columnar.ColumnStore
+    :raises RuntimeError: If ``pyarrow`` is not installed.
+    """
+    pa = require_pyarrow()
+    root = Path(root or LAKE_DIR)
+    names = list(DIMENSIONS.values()) + list(RANGES)
+    schema = _schema(pa, COLUMNS + PARTITIONS)
+    leaves = {path.parent for path in root.rglob("*.parquet")} if root.exists() else set()
+    files = [str(f) for leaf in sorted(leaves) for f in _live_files(leaf)]
+    if files:
+        dataset = pa.dataset.dataset(files, format="parquet", schema=schema,
+                                     partitioning=_partitioning(pa),
+                                     partition_base_dir=str(root))
+        table = dataset.to_table(columns=names)
+    else:
+        table = schema.empty_table().select(names)
+    dims = {}
+    for dim, col in DIMENSIONS.items():
+        encoded = table[col].combine_chunks().dictionary_encode()
+        codes = pa.compute.fill_null(encoded.indices, -1).to_numpy(zero_copy_only=False)
+        dims[dim] = (codes, encoded.dictionary.to_pylist())
+    scores = {col: table[col].to_numpy() for col in RANGES}  # NULL -> NaN
+    store = columnar.ColumnStore(enabled=True, max_age=float("inf"))
+    store.load_columns(dims, scores)
+    return store
+
+
+def report(root=None) -> query_data.Dashboard:
+    """Answer the dashboard questions from the dataset.
+
+    The questions run against a store of their own; the engine and cache
+    :mod:`query_data` use for the app are left alone.
+
+    :param root: Dataset root (default :data:`LAKE_DIR`).
+    :type root: str | pathlib.Path | None
+    :return: The ten dashboard metrics.
+    :rtype: query_data.Dashboard
+    :raises RuntimeError: If ``pyarrow`` is not installed.
+    """
+    return query_data.dashboard_from(load(root).execute)
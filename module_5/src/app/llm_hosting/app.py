@@ -1,18 +1,35 @@
 # -*- coding: utf-8 -*-
-"""Flask + tiny local LLM standardizer with incremental JSONL CLI output."""
+"""Flask + tiny local LLM standardizer with incremental JSONL CLI output.
+
+The standardizer is pluggable: ``llama`` (llama.cpp), ``rules`` (no model),
+``stub`` (deterministic, fixed per-row latency) or ``vector`` (nearest-neighbour
+match against the canonical lists, see ``resolver.py``), selected with
+``LLM_BACKEND`` or ``--backend``.
+"""
 
 from __future__ import annotations
 
+import abc
+import argparse
+import hashlib
 import json
 import os
 import re
 import sys
+import time
 import difflib
-from typing import Any, Dict, List, Tuple
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Tuple
 
 from flask import Flask, jsonify, request
-from huggingface_hub import hf_hub_download
-from llama_cpp import Llama  # CPU-only by default if N_GPU_LAYERS=0
+
+import lexicon
+
+# Model, NumPy and resolver imports are deferred to the code paths that
+# need them, so startup and the other backends do not pay for them.
+# pylint: disable=import-outside-toplevel
+
+if TYPE_CHECKING:  # heavy imports are deferred to _load_llm()
+    from llama_cpp import Llama  # pylint: disable=import-error
 
 app = Flask(__name__)
 
@@ -30,26 +47,32 @@ N_THREADS = int(os.getenv("N_THREADS", str(os.cpu_count() or 2)))
 N_CTX = int(os.getenv("N_CTX", "2048"))
 N_GPU_LAYERS = int(os.getenv("N_GPU_LAYERS", "0"))  # 0 → CPU-only
 
-CANON_UNIS_PATH = os.getenv("CANON_UNIS_PATH", "canon_universities.txt")
-CANON_PROGS_PATH = os.getenv("CANON_PROGS_PATH", "canon_programs.txt")
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Local model registry: verified model files live in MODEL_DIR and their
+# checksums in MODEL_DIR/registry.json. With LLM_OFFLINE=1 (or
+# HF_HUB_OFFLINE=1) a missing model is an error instead of a download.
+# The default sits next to this file, whatever the working directory.
+MODEL_DIR = os.getenv("MODEL_DIR", os.path.join(HERE, "models"))
+MODEL_SHA256 = os.getenv("MODEL_SHA256", "")
+MODEL_REGISTRY = os.path.join(MODEL_DIR, "registry.json")
+OFFLINE = os.getenv("LLM_OFFLINE", os.getenv("HF_HUB_OFFLINE", "0")) == "1"
+
+CANON_UNIS_PATH = os.getenv("CANON_UNIS_PATH", os.path.join(HERE, "canon_universities.txt"))
+CANON_PROGS_PATH = os.getenv("CANON_PROGS_PATH", os.path.join(HERE, "canon_programs.txt"))
+# Compiled lists/tables/indexes (see lexicon.py); rebuilt when sources change.
+# A generated file, so it defaults to the user cache, not the source tree.
+CACHE_DIR = os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "gradcafe-llm",
+)
+LEXICON_PATH = os.getenv("LEXICON_PATH", os.path.join(CACHE_DIR, "canon_lexicon.bin"))
 
 # Precompiled, non-greedy JSON object matcher to tolerate chatter around JSON
 JSON_OBJ_RE = re.compile(r"\{.*?\}", re.DOTALL)
 
 
 # ---------------- Canonical lists + abbrev maps ----------------
-def _read_lines(path: str) -> List[str]:
-    """Read non-empty, stripped lines from a file (UTF-8)."""
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return [ln.strip() for ln in f if ln.strip()]
-    except FileNotFoundError:
-        return []
-
-
-CANON_UNIS = _read_lines(CANON_UNIS_PATH)
-CANON_PROGS = _read_lines(CANON_PROGS_PATH)
-
 ABBREV_UNI: Dict[str, str] = {
     r"(?i)^mcg(\.|ill)?$": "McGill University",
     r"(?i)^(ubc|u\.?b\.?c\.?)$": "University of British Columbia",
@@ -68,6 +91,26 @@ COMMON_PROG_FIXES: Dict[str, str] = {
     "Info Studies": "Information Studies",
 }
 
+_LEXICON = lexicon.LexiconStore(
+    LEXICON_PATH,
+    sources={"programs": CANON_PROGS_PATH, "universities": CANON_UNIS_PATH},
+    tables={
+        "abbrev": [list(item) for item in ABBREV_UNI.items()],
+        "uni_fixes": COMMON_UNI_FIXES,
+        "prog_fixes": COMMON_PROG_FIXES,
+    },
+    check_interval=float(os.getenv("LEXICON_CHECK_S", "2")),
+)
+
+
+def _lexicon(vectors: bool = False) -> lexicon.Lexicon:
+    """Return the lexicon, built or hot-reloaded as needed.
+
+    Only the ``vector`` backend asks for ``vectors``; the other backends
+    use the name lookups and never load NumPy or the embedded arrays.
+    """
+    return _LEXICON.get(vectors)
+
 # ---------------- Few-shot prompt ----------------
 SYSTEM_PROMPT = (
     "You are a data cleaning assistant. Standardize degree program and university "
@@ -112,21 +155,107 @@ FEW_SHOTS: List[Tuple[Dict[str, str], Dict[str, str]]] = [
 ]
 
 _LLM: Llama | None = None
+MODEL_STATS: Dict[str, Any] = {"path": None, "resolve_s": None, "load_s": None}
 
 
-def _load_llm() -> Llama:
-    """Download (or reuse) the GGUF file and initialize llama.cpp."""
-    global _LLM
-    if _LLM is not None:
-        return _LLM
+def _sha256(path: str) -> str:
+    """Return the hex SHA-256 of a file, read in 1 MiB blocks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _read_registry() -> Dict[str, Dict[str, Any]]:
+    """Load the local model registry (empty if missing or unreadable)."""
+    try:
+        with open(MODEL_REGISTRY, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _register(path: str, digest: str) -> None:
+    """Record a verified model file with its checksum and file stamp."""
+    st = os.stat(path)
+    registry = _read_registry()
+    registry[os.path.basename(path)] = {
+        "sha256": digest,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "repo": MODEL_REPO,
+    }
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    tmp = MODEL_REGISTRY + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(registry, f, indent=2)
+    os.replace(tmp, MODEL_REGISTRY)
+
+
+def _verify(path: str) -> str:
+    """Check a local model file against the registry and return its path.
+
+    The checksum is only recomputed when the file's size or mtime differs
+    from the registered stamp, so a verified model resolves without reading
+    the whole file. Unregistered files are hashed once and registered
+    (checked against ``MODEL_SHA256`` when that is set).
+    """
+    st = os.stat(path)
+    entry = _read_registry().get(os.path.basename(path), {})
+    expected = MODEL_SHA256 or entry.get("sha256", "")
+    if (
+        entry
+        and entry.get("sha256") == expected
+        and entry.get("size") == st.st_size
+        and entry.get("mtime_ns") == st.st_mtime_ns
+    ):
+        return path
+
+    digest = _sha256(path)
+    if expected and digest != expected:
+        raise RuntimeError(
+            f"Checksum mismatch for {path}: expected {expected}, got {digest}"
+        )
+    _register(path, digest)
+    return path
+
+
+def _resolve_model_path() -> str:
+    """Return a verified local path for ``MODEL_FILE``.
+
+    Never contacts the hub when the file is already in ``MODEL_DIR``. A
+    missing file is downloaded once, unless running offline.
+    """
+    path = os.path.join(MODEL_DIR, MODEL_FILE)
+    if os.path.isfile(path):
+        return _verify(path)
+    if OFFLINE:
+        raise FileNotFoundError(
+            f"Model {MODEL_FILE} not found in {MODEL_DIR} and offline mode is on"
+        )
 
-    model_path = hf_hub_download(
+    from huggingface_hub import hf_hub_download  # pylint: disable=import-error
+
+    downloaded = hf_hub_download(
         repo_id=MODEL_REPO,
         filename=MODEL_FILE,
-        local_dir="models",
-        local_dir_use_symlinks=False,
-        force_filename=MODEL_FILE,
+        local_dir=MODEL_DIR,
     )
+    return _verify(downloaded)
+
+
+def _load_llm() -> Llama:
+    """Resolve the local GGUF file and initialize llama.cpp (timed)."""
+    global _LLM  # pylint: disable=global-statement
+    if _LLM is not None:
+        return _LLM
+
+    t0 = time.perf_counter()
+    model_path = _resolve_model_path()
+    t1 = time.perf_counter()
+
+    from llama_cpp import Llama  # pylint: disable=import-error
 
     _LLM = Llama(
         model_path=model_path,
@@ -135,6 +264,14 @@ def _load_llm() -> Llama:
         n_gpu_layers=N_GPU_LAYERS,
         verbose=False,
     )
+    t2 = time.perf_counter()
+
+    MODEL_STATS.update(path=model_path, resolve_s=t1 - t0, load_s=t2 - t1)
+    print(
+        f"Loaded {model_path} in {t2 - t0:.2f}s "
+        f"(resolve {t1 - t0:.2f}s, init {t2 - t1:.2f}s)",
+        file=sys.stderr,
+    )
     return _LLM
 
 
@@ -173,36 +310,35 @@ def _best_match(name: str, candidates: List[str], cutoff: float = 0.86) -> str |
 
 def _post_normalize_program(prog: str) -> str:
     """Apply common fixes, title case, then canonical/fuzzy mapping."""
+    lex = _lexicon()
     p = (prog or "").strip()
-    p = COMMON_PROG_FIXES.get(p, p)
+    p = lex.prog_fixes.get(p, p)
     p = p.title()
-    if p in CANON_PROGS:
+    if p in lex.program_set:
         return p
-    match = _best_match(p, CANON_PROGS, cutoff=0.84)
+    match = _best_match(p, lex.programs, cutoff=0.84)
     return match or p
 
 
 def _post_normalize_university(uni: str) -> str:
     """Expand abbreviations, apply common fixes, capitalization, and canonical map."""
+    lex = _lexicon()
     u = (uni or "").strip()
 
-    # Abbreviations
-    for pat, full in ABBREV_UNI.items():
-        if re.fullmatch(pat, u):
-            u = full
-            break
+    # Abbreviations (one precompiled alternation)
+    u = lex.expand_abbrev(u) or u
 
     # Common spelling fixes
-    u = COMMON_UNI_FIXES.get(u, u)
+    u = lex.uni_fixes.get(u, u)
 
     # Normalize 'Of' → 'of'
     if u:
         u = re.sub(r"\bOf\b", "of", u.title())
 
     # Canonical or fuzzy map
-    if u in CANON_UNIS:
+    if u in lex.university_set:
         return u
-    match = _best_match(u, CANON_UNIS, cutoff=0.86)
+    match = _best_match(u, lex.universities, cutoff=0.86)
     return match or u or "Unknown"
 
 
@@ -241,7 +377,7 @@ def _call_llm(program_text: str) -> Dict[str, str]:
         obj = json.loads(match.group(0) if match else text)
         std_prog = str(obj.get("standardized_program", "")).strip()
         std_uni = str(obj.get("standardized_university", "")).strip()
-    except Exception:
+    except (ValueError, AttributeError):  # not JSON, or not an object
         std_prog, std_uni = _split_fallback(program_text)
 
     std_prog = _post_normalize_program(std_prog)
@@ -252,6 +388,176 @@ def _call_llm(program_text: str) -> Dict[str, str]:
     }
 
 
+# ---------------- Standardizer backends ----------------
+class Backend(abc.ABC):
+    """Interface for turning raw ``program`` text into standardized fields."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def standardize(self, program_text: str) -> Dict[str, str]:
+        """Return ``standardized_program`` and ``standardized_university``."""
+
+    def standardize_many(self, texts: List[str]) -> List[Dict[str, str]]:
+        """Standardize a batch; backends with a vectorized path override this."""
+        return [self.standardize(t) for t in texts]
+
+
+class LlamaBackend(Backend):
+    """Tiny local LLM via llama.cpp, with rules-based post-normalization."""
+
+    name = "llama"
+
+    def standardize(self, program_text: str) -> Dict[str, str]:
+        return _call_llm(program_text)
+
+
+class RulesBackend(Backend):
+    """Model-free: rules-first split plus canonical/fuzzy matching."""
+
+    name = "rules"
+
+    def standardize(self, program_text: str) -> Dict[str, str]:
+        prog, uni = _split_fallback(program_text)
+        return {
+            "standardized_program": _post_normalize_program(prog),
+            "standardized_university": _post_normalize_university(uni),
+        }
+
+
+class StubBackend(Backend):
+    """Deterministic offline stub that sleeps ``latency_ms`` per row.
+
+    Output depends only on the input text (the rules-first split, without
+    canonical matching), so benchmarks can charge a fixed, configurable
+    cost per row in place of the model.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency_ms: float | None = None) -> None:
+        if latency_ms is None:
+            latency_ms = float(os.getenv("STUB_LATENCY_MS", "0"))
+        self.latency_s = max(latency_ms, 0.0) / 1000.0
+
+    def standardize(self, program_text: str) -> Dict[str, str]:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        prog, uni = _split_fallback(program_text)
+        return {"standardized_program": prog, "standardized_university": uni}
+
+
+class VectorBackend(Backend):
+    """Nearest-neighbour match of n-gram TF-IDF vectors (see ``resolver.py``).
+
+    Below the program/university threshold the university resolves to
+    ``"Unknown"`` and the program keeps its cleaned input. The thresholds
+    are the ones calibrated into the lexicon (``--calibrate``), unless
+    ``VECTOR_PROG_THRESHOLD`` / ``VECTOR_UNI_THRESHOLD`` override them.
+    """
+
+    name = "vector"
+
+    def __init__(self) -> None:
+        self._lex: lexicon.Lexicon | None = None
+        self._resolver: Any = None
+        self._current()
+
+    def _current(self) -> Any:
+        """The resolver over the current lexicon, rebuilt after a hot reload."""
+        import resolver  # numpy is only needed when this backend is used
+
+        lex = _lexicon(vectors=True)
+        if lex is not self._lex:
+            calibrated = lex.thresholds
+            self._resolver = resolver.VectorResolver(
+                lex.canon_index("programs"),
+                lex.canon_index("universities"),
+                prog_threshold=float(os.getenv(
+                    "VECTOR_PROG_THRESHOLD", calibrated.get("programs", resolver.PROG_THRESHOLD)
+                )),
+                uni_threshold=float(os.getenv(
+                    "VECTOR_UNI_THRESHOLD", calibrated.get("universities", resolver.UNI_THRESHOLD)
+                )),
+            )
+            self._lex = lex
+        return self._resolver
+
+    def standardize(self, program_text: str) -> Dict[str, str]:
+        return self.standardize_many([program_text])[0]
+
+    def standardize_many(self, texts: List[str]) -> List[Dict[str, str]]:
+        pairs = self._current().resolve([_split_fallback(t) for t in texts])
+        return [
+            {"standardized_program": p, "standardized_university": u}
+            for p, u in pairs
+        ]
+
+
+BACKENDS: Dict[str, type[Backend]] = {
+    LlamaBackend.name: LlamaBackend,
+    RulesBackend.name: RulesBackend,
+    StubBackend.name: StubBackend,
+    VectorBackend.name: VectorBackend,
+}
+BACKEND_NAME = os.getenv("LLM_BACKEND", LlamaBackend.name)
+_BACKEND: Backend | None = None
+
+
+def get_backend() -> Backend:
+    """Return the active backend (``LLM_BACKEND`` or ``--backend``)."""
+    global _BACKEND  # pylint: disable=global-statement
+    if _BACKEND is None:
+        try:
+            _BACKEND = BACKENDS[BACKEND_NAME]()
+        except KeyError:
+            raise ValueError(
+                f"Unknown backend {BACKEND_NAME!r}; choose from {sorted(BACKENDS)}"
+            ) from None
+    return _BACKEND
+
+
+def set_backend(backend: Backend | str) -> Backend:
+    """Select the backend by name or instance and return it."""
+    global _BACKEND, BACKEND_NAME  # pylint: disable=global-statement
+    if isinstance(backend, str):
+        BACKEND_NAME, _BACKEND = backend, None
+        return get_backend()
+    BACKEND_NAME, _BACKEND = backend.name, backend
+    return backend
+
+
+def calibrate_vector(path: str, holdout: float | None = None, seed: int = 0) -> Dict[str, Any]:
+    """Calibrate the vector thresholds on stored LLM output and save them.
+
+    Rows of ``path`` that carry both ``llm-generated-*`` fields are the
+    reference; other rows are skipped. The thresholds are fitted on a reproducible share of them,
+    scored on the held-out rest, and written into the lexicon artifact,
+    where :class:`VectorBackend` picks them up.
+
+    :return: The report of ``resolver.calibrate_resolver``.
+    """
+    import resolver
+
+    rows = [
+        r for r in _iter_input_rows(path)
+        if r.get("llm-generated-program") and r.get("llm-generated-university")
+    ]
+    lex = _lexicon(vectors=True)
+    vectors = resolver.VectorResolver(lex.canon_index("programs"),
+                                      lex.canon_index("universities"))
+    report = resolver.calibrate_resolver(
+        vectors,
+        [_split_fallback(r.get("program", "")) for r in rows],
+        [r.get("llm-generated-program") for r in rows],
+        [r.get("llm-generated-university") for r in rows],
+        holdout=resolver.HOLDOUT if holdout is None else holdout,
+        seed=seed,
+    )
+    _LEXICON.set_thresholds(report["thresholds"])
+    return report
+
+
 def _normalize_input(payload: Any) -> List[Dict[str, Any]]:
     """Accept either a list of rows or {'rows': [...]}."""
     if isinstance(payload, list):
@@ -261,10 +567,26 @@ def _normalize_input(payload: Any) -> List[Dict[str, Any]]:
     return []
 
 
+def _standardize_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Add the ``llm-generated-*`` fields to a batch of rows in place."""
+    texts = [(row or {}).get("program") or "" for row in rows]
+    for row, result in zip(rows, get_backend().standardize_many(texts)):
+        row["llm-generated-program"] = result["standardized_program"]
+        row["llm-generated-university"] = result["standardized_university"]
+    return rows
+
+
 @app.get("/")
 def health() -> Any:
-    """Simple liveness check."""
-    return jsonify({"ok": True})
+    """Liveness check; also reports model load timing once loaded."""
+    return jsonify(
+        {
+            "ok": True,
+            "backend": BACKEND_NAME,
+            "model_loaded": _LLM is not None,
+            "model": MODEL_STATS,
+        }
+    )
 
 
 @app.post("/standardize")
@@ -273,15 +595,143 @@ def standardize() -> Any:
     payload = request.get_json(force=True, silent=True)
     rows = _normalize_input(payload)
 
-    out: List[Dict[str, Any]] = []
-    for row in rows:
-        program_text = (row or {}).get("program") or ""
-        result = _call_llm(program_text)
-        row["llm-generated-program"] = result["standardized_program"]
-        row["llm-generated-university"] = result["standardized_university"]
-        out.append(row)
-
-    return jsonify({"rows": out})
+    return jsonify({"rows": _standardize_rows(rows)})
+
+
+# ---------------- Streaming input + resume ----------------
+_DECODER = json.JSONDecoder()
+# Rows standardized (and flushed) together; 1 keeps per-row durability for
+# slow backends, larger values let the vector backend batch its matmul.
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", "1"))
+_CHUNK_SIZE = 1 << 16  # 64 KiB reads keep memory flat for any input size
+
+
+def _iter_json_values(f, array: bool) -> Iterator[Any]:
+    """Incrementally decode JSON values from an open text file.
+
+    Reads fixed-size chunks and decodes one value at a time with
+    ``raw_decode``, so only the current value (plus one chunk) is held in
+    memory. With ``array=True`` the stream is the body of a JSON array
+    (values separated by commas, terminated by ``]``); otherwise it is a
+    sequence of whitespace-separated values (JSON Lines).
+    """
+    buf = ""
+    pos = 0
+    eof = False
+    while True:
+        # Skip separators between values.
+        while True:
+            while pos < len(buf) and (buf[pos].isspace() or (array and buf[pos] == ",")):
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            buf, pos = f.read(_CHUNK_SIZE), 0
+            eof = not buf
+
+        if pos >= len(buf):
+            if array:
+                raise ValueError("Unterminated JSON array in input")
+            return
+        if array and buf[pos] == "]":
+            return
+
+        try:
+            value, end = _DECODER.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            # Most likely the value straddles a chunk boundary: read more.
+            if eof:
+                raise
+            chunk = f.read(max(_CHUNK_SIZE, len(buf) - pos))
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+
+        # A bare number can be cut at a chunk boundary and still parse.
+        if end == len(buf) and not eof and not isinstance(value, (dict, list, str)):
+            chunk = f.read(_CHUNK_SIZE)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+
+        yield value
+        pos = end
+
+
+class _Prefixed:
+    """File-like wrapper that re-emits characters consumed while sniffing."""
+
+    def __init__(self, prefix: str, f) -> None:
+        self._prefix = prefix
+        self._f = f
+
+    def read(self, size: int = -1) -> str:
+        """Return the pending prefix first, then delegate to the file."""
+        if self._prefix:
+            out, self._prefix = self._prefix, ""
+            return out + self._f.read(max(size - len(out), 0) if size > 0 else size)
+        return self._f.read(size)
+
+
+def _iter_input_rows(in_path: str) -> Iterator[Dict[str, Any]]:
+    """Yield rows from a JSON array, a JSONL file, or ``{'rows': [...]}``.
+
+    Arrays and JSON Lines are parsed incrementally; the legacy
+    ``{'rows': [...]}`` wrapper is a single value and is decoded whole.
+    """
+    with open(in_path, "r", encoding="utf-8") as f:
+        head = f.read(1)
+        while head and head.isspace():
+            head = f.read(1)
+        if not head:
+            return
+        if head == "[":
+            yield from _iter_json_values(f, array=True)
+            return
+
+        values = _iter_json_values(_Prefixed(head, f), array=False)
+        for value in values:
+            if isinstance(value, dict) and isinstance(value.get("rows"), list):
+                yield from value["rows"]
+            else:
+                yield value
+
+
+def _prepare_resume(out_path: str) -> Tuple[set[str], int]:
+    """Return what ``out_path`` already holds and drop a torn last line.
+
+    Rows are identified by ``url``; rows without one cannot be, so they
+    are counted instead: output is written in input order, so the first
+    ``n`` url-less input rows are the ``n`` already written.
+
+    A crash can leave a partially written final line; it is truncated so
+    that appended rows start on a fresh line and the row is redone.
+
+    :return: ``(urls written, number of url-less rows written)``.
+    """
+    done: set[str] = set()
+    no_url = 0
+    if not os.path.exists(out_path):
+        return done, no_url
+
+    keep = 0  # byte offset just past the last complete line
+    with open(out_path, "rb") as f:
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            keep += len(raw)
+            try:
+                url = json.loads(raw).get("url")
+            except (ValueError, AttributeError):
+                continue
+            if url:
+                done.add(url)
+            else:
+                no_url += 1
+
+    if keep != os.path.getsize(out_path):
+        with open(out_path, "r+b") as f:
+            f.truncate(keep)
+    return done, no_url
 
 
 def _cli_process_file(
@@ -289,43 +739,64 @@ def _cli_process_file(
     out_path: str | None,
     append: bool,
     to_stdout: bool,
+    resume: bool = False,
 ) -> None:
-    """Process a JSON file and write JSONL incrementally."""
-    with open(in_path, "r", encoding="utf-8") as f:
-        rows = _normalize_input(json.load(f))
-
+    """Stream rows from a JSON/JSONL file and write JSONL incrementally.
+
+    Input is parsed incrementally, so memory stays flat regardless of file
+    size. With ``resume=True`` rows whose ``url`` already appears in the
+    output file (and as many url-less rows as it holds) are skipped and
+    new rows are appended.
+    """
+    done: set[str] = set()
+    no_url = 0
     sink = sys.stdout if to_stdout else None
     if not to_stdout:
         out_path = out_path or (in_path + ".jsonl")
-        mode = "a" if append else "w"
-        sink = open(out_path, mode, encoding="utf-8")
+        if resume:
+            done, no_url = _prepare_resume(out_path)
+        mode = "a" if (append or resume) else "w"
+        sink = open(out_path, mode, encoding="utf-8")  # pylint: disable=consider-using-with
 
     assert sink is not None  # for type-checkers
 
-    try:
-        for row in rows:
-            program_text = (row or {}).get("program") or ""
-            result = _call_llm(program_text)
-            row["llm-generated-program"] = result["standardized_program"]
-            row["llm-generated-university"] = result["standardized_university"]
-
+    def flush(batch: List[Dict[str, Any]]) -> None:
+        for row in _standardize_rows(batch):
             json.dump(row, sink, ensure_ascii=False)
             sink.write("\n")
-            sink.flush()
+        sink.flush()
+
+    try:
+        batch: List[Dict[str, Any]] = []
+        for row in _iter_input_rows(in_path):
+            url = (row or {}).get("url")
+            if url and url in done:
+                continue
+            if not url and no_url:
+                no_url -= 1  # written before the restart
+                continue
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
     finally:
         if sink is not sys.stdout:
             sink.close()
 
 
-if __name__ == "__main__":
-    import argparse
+def main(argv: List[str] | None = None) -> None:
+    """Command-line entry point: serve, build the lexicon, or process a file."""
+    global BATCH_SIZE  # pylint: disable=global-statement
 
     parser = argparse.ArgumentParser(
         description="Standardize program/university with a tiny local LLM.",
     )
     parser.add_argument(
         "--file",
-        help="Path to JSON input (list of rows or {'rows': [...]})",
+        help="Path to JSON or JSONL input (list of rows, one row per line, "
+        "or {'rows': [...]})",
         default=None,
     )
     parser.add_argument(
@@ -344,14 +815,83 @@ if __name__ == "__main__":
         action="store_true",
         help="Append to the output file instead of overwriting.",
     )
+    parser.add_argument(
+        "--backend",
+        choices=sorted(BACKENDS),
+        default=None,
+        help="Standardizer backend (default: $LLM_BACKEND or 'llama').",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Rows standardized per batch (default: $BATCH_SIZE or 1).",
+    )
+    parser.add_argument(
+        "--stub-latency-ms",
+        type=float,
+        default=None,
+        help="Per-row latency of the stub backend (default: $STUB_LATENCY_MS or 0); "
+        "only valid with --backend stub.",
+    )
+    parser.add_argument(
+        "--build-lexicon",
+        action="store_true",
+        help="Compile the canonical lists and tables into LEXICON_PATH and exit.",
+    )
+    parser.add_argument(
+        "--calibrate",
+        metavar="FILE",
+        default=None,
+        help="Fit the vector thresholds on rows of FILE that carry llm-generated-* "
+        "fields, store them in the lexicon, and print held-out agreement.",
+    )
+    parser.add_argument(
+        "--holdout",
+        type=float,
+        default=None,
+        help="Share of --calibrate rows scored instead of fitted (default 0.3).",
+    )
+    parser.add_argument(
+        "--check-model",
+        action="store_true",
+        help="Resolve and verify the local model file, print its path, and exit.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip rows whose url is already in the output file and append "
+        "the rest (restart an interrupted run).",
+    )
     parser.add_argument(
         "--stdout",
         action="store_true",
         help="Write JSON Lines to stdout instead of a file.",
     )
-    args = parser.parse_args()
-
-    if args.serve or args.file is None:
+    args = parser.parse_args(argv)
+    if args.resume and args.stdout:
+        parser.error("--resume needs an output file; it cannot be used with --stdout")
+    backend = args.backend or BACKEND_NAME
+    if args.stub_latency_ms is not None and backend != StubBackend.name:
+        parser.error(f"--stub-latency-ms only applies to the stub backend, not {backend!r}")
+
+    if args.batch_size:
+        BATCH_SIZE = max(args.batch_size, 1)
+    if backend == StubBackend.name:
+        set_backend(StubBackend(args.stub_latency_ms))
+    elif args.backend:
+        set_backend(args.backend)
+
+    if args.build_lexicon:
+        lexicon.build(LEXICON_PATH, _LEXICON.sources, _LEXICON.tables,
+                      _lexicon().thresholds, vectors=True)
+        print(LEXICON_PATH)
+    elif args.calibrate:
+        json.dump(calibrate_vector(args.calibrate, args.holdout), sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    elif args.check_model:
+        print(_resolve_model_path())
+    elif args.serve or args.file is None:
         port = int(os.getenv("PORT", "8000"))
         app.run(host="0.0.0.0", port=port, debug=False)
     else:
@@ -360,4 +900,9 @@ if __name__ == "__main__":
             out_path=args.out,
             append=bool(args.append),
             to_stdout=bool(args.stdout),
+            resume=bool(args.resume),
         )
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
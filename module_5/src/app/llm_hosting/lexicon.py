@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""Precompiled canonical lexicon: one versioned artifact file.
+
+The canonical program/university lists, the abbreviation and spelling-fix
+tables and, when the ``vector`` backend needs them, the vector indexes used
+by ``resolver.py`` are compiled once into a single file::
+
+   MAGIC (6 bytes) | header length (u32) | JSON header | aligned float32 arrays
+
+The JSON header holds the lists and tables as plain JSON. Opening the file
+parses it and rebuilds the lookup sets and the combined abbreviation
+regex in memory; for a few thousand names that costs milliseconds, and
+the ``rules`` and ``llama`` backends need nothing else (no NumPy). Only
+the array section is memory-mapped: it is built for the ``vector``
+backend, mapped on first use and exposed as zero-copy NumPy views, so the
+lists are never re-embedded at startup.
+
+The header records the version, a digest of the tables, the checksum of
+each source list and the vector thresholds last calibrated on LLM output
+(kept across rebuilds); :class:`LexiconStore` rebuilds and swaps the
+artifact when a source list changes on disk (hot reload), closing the
+artifact it replaces.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Tuple
+
+# NumPy and resolver are imported only where the vector arrays are used.
+# pylint: disable=import-outside-toplevel
+
+MAGIC = b"GCLEX\x00"
+FORMAT_VERSION = 1
+_ALIGN = 64
+_HEADER_LEN = struct.Struct("<I")
+
+
+def _read_lines(path: str) -> List[str]:
+    """Read non-empty, stripped lines from a file (UTF-8)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return [ln.strip() for ln in f if ln.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def _file_sig(path: str) -> Dict[str, Any]:
+    """Return size, mtime and SHA-256 of a source file (empty if missing)."""
+    try:
+        st = os.stat(path)
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return {"size": -1, "mtime_ns": -1, "sha256": ""}
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+
+
+def _tables_digest(tables: Mapping[str, Any]) -> str:
+    """Stable digest of the abbreviation/fix tables baked into the artifact."""
+    blob = json.dumps(tables, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()
+
+
+def _combine_abbrevs(abbrev: List[Tuple[str, str]]) -> re.Pattern[str] | None:
+    """Fold ``(pattern, full)`` pairs into one alternation, first match wins.
+
+    Each ``(?i)^...$`` pattern becomes a named, scoped alternative so one
+    ``fullmatch`` replaces a loop of per-pattern calls.
+    """
+    parts = []
+    for i, (pat, _full) in enumerate(abbrev):
+        body, flags = pat, ""
+        if body.startswith("(?i)"):
+            body, flags = body[4:], "i"
+        body = body.removeprefix("^").removesuffix("$")
+        parts.append(f"(?P<a{i}>(?{flags}:{body}))" if flags else f"(?P<a{i}>{body})")
+    return re.compile("|".join(parts)) if parts else None
+
+
+def _embed(lists: Mapping[str, List[str]], header: Dict[str, Any]) -> List[bytes]:
+    """Embed each list with ``resolver``; record the arrays in ``header``."""
+    import numpy as np
+    import resolver
+
+    header["resolver"] = {"dim": resolver.DIM, "ngrams": list(resolver.NGRAMS)}
+    blobs: List[bytes] = []
+    offset = 0
+    for name, entries in lists.items():
+        index = resolver.CanonIndex(entries)
+        for suffix, arr in (("idf", index.idf), ("matrix", index.matrix)):
+            arr = np.ascontiguousarray(arr, dtype=np.float32)
+            header["arrays"][f"{name}.{suffix}"] = {
+                "offset": offset, "shape": list(arr.shape), "dtype": "float32",
+            }
+            data = arr.tobytes()
+            pad = -len(data) % _ALIGN
+            blobs.append(data + b"\0" * pad)
+            offset += len(data) + pad
+    return blobs
+
+
+def build(
+    out_path: str,
+    sources: Mapping[str, str],
+    tables: Mapping[str, Any],
+    thresholds: Mapping[str, float] | None = None,
+    vectors: bool = False,
+) -> None:
+    """Compile the canonical lists and tables into ``out_path`` atomically.
+
+    :param sources: ``{"programs": path, "universities": path}``.
+    :param tables: ``{"abbrev": [[pattern, full], ...], "uni_fixes": {...},
+        "prog_fixes": {...}}``.
+    :param thresholds: Calibrated vector thresholds, ``{"programs": float,
+        "universities": float}`` (see ``resolver.calibrate_resolver``).
+    :param vectors: Also embed the lists for the ``vector`` backend (needs
+        NumPy); without it only the name-lookup header is written.
+    """
+    lists = {name: _read_lines(path) for name, path in sources.items()}
+    header: Dict[str, Any] = {
+        "version": FORMAT_VERSION,
+        "built_at": time.time(),
+        "sources": {name: dict(_file_sig(path), path=path) for name, path in sources.items()},
+        "tables_sha256": _tables_digest(tables),
+        "tables": dict(tables),
+        "lists": lists,
+        "thresholds": dict(thresholds or {}),
+        "arrays": {},
+    }
+    blobs = _embed(lists, header) if vectors else []
+
+    head = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    prefix = len(MAGIC) + _HEADER_LEN.size + len(head)
+    head += b" " * (-prefix % _ALIGN)  # array section starts aligned
+
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    tmp = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LEN.pack(len(head)))
+        f.write(head)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp, out_path)
+
+
+class Lexicon:  # pylint: disable=too-many-instance-attributes
+    """Read-only view over a lexicon artifact.
+
+    The JSON header is parsed when opened and the lookup sets and regex
+    are built from it; the array section is memory-mapped on the first
+    :meth:`array` call. The file stays open until :meth:`close`,
+    so a rebuild that replaces ``path`` does not change what this view
+    reads.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "rb")  # pylint: disable=consider-using-with
+        self._mm: mmap.mmap | None = None
+        self._indexes: Dict[str, Any] = {}
+        self.path = path
+        try:
+            if self._file.read(len(MAGIC)) != MAGIC:
+                raise ValueError("bad magic")
+            (hlen,) = _HEADER_LEN.unpack(self._file.read(_HEADER_LEN.size))
+            self.header: Dict[str, Any] = json.loads(self._file.read(hlen))
+            self._data_offset = len(MAGIC) + _HEADER_LEN.size + hlen
+            lists = self.header["lists"]
+            tables = self.header["tables"]
+            self.programs: List[str] = lists["programs"]
+            self.universities: List[str] = lists["universities"]
+            self.prog_fixes: Dict[str, str] = tables["prog_fixes"]
+            self.uni_fixes: Dict[str, str] = tables["uni_fixes"]
+            abbrev = [tuple(x) for x in tables["abbrev"]]
+        except (ValueError, KeyError, TypeError, struct.error):
+            self._file.close()
+            raise ValueError(f"{path} is not a lexicon artifact") from None
+        self.program_set = frozenset(self.programs)
+        self.university_set = frozenset(self.universities)
+        self._abbrev_targets = [full for _pat, full in abbrev]
+        self._abbrev_re = _combine_abbrevs(abbrev)
+
+    @property
+    def version(self) -> int:
+        """Artifact format version."""
+        return int(self.header.get("version", 0))
+
+    @property
+    def has_vectors(self) -> bool:
+        """Whether the artifact carries the ``vector`` backend's arrays."""
+        return bool(self.header.get("arrays"))
+
+    @property
+    def thresholds(self) -> Dict[str, float]:
+        """Calibrated vector thresholds by list name (empty if never calibrated)."""
+        return dict(self.header.get("thresholds") or {})
+
+    def expand_abbrev(self, text: str) -> str | None:
+        """Return the full name for a known abbreviation, else ``None``."""
+        if self._abbrev_re is None:
+            return None
+        m = self._abbrev_re.fullmatch(text)
+        if not m:
+            return None
+        for name, val in m.groupdict().items():
+            if val is not None:
+                return self._abbrev_targets[int(name[1:])]
+        return None  # pragma: no cover - a match always sets one group
+
+    def array(self, name: str):
+        """Return a zero-copy NumPy view of a stored array."""
+        import numpy as np
+
+        meta = self.header["arrays"][name]
+        count = 1
+        for dim in meta["shape"]:
+            count *= dim
+        if self._mm is None:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return np.frombuffer(
+            self._mm, dtype=meta["dtype"], count=count,
+            offset=self._data_offset + meta["offset"],
+        ).reshape(meta["shape"])
+
+    def canon_index(self, name: str):
+        """Return the :class:`resolver.CanonIndex` for ``name``.
+
+        Uses the stored arrays unless they are missing or were built with
+        different resolver parameters, in which case the index is re-embedded.
+        """
+        if name not in self._indexes:
+            import resolver
+
+            entries = self.header["lists"][name]
+            params = {"dim": resolver.DIM, "ngrams": list(resolver.NGRAMS)}
+            if self.has_vectors and self.header.get("resolver") == params:
+                index = resolver.CanonIndex(
+                    entries,
+                    idf=self.array(f"{name}.idf"),
+                    matrix=self.array(f"{name}.matrix"),
+                )
+            else:
+                index = resolver.CanonIndex(entries)
+            self._indexes[name] = index
+        return self._indexes[name]
+
+    def close(self) -> None:
+        """Release the file and the array mapping.
+
+        Indexes handed out earlier keep their NumPy views valid: if any is
+        still in use, the mapping is released with the last such view.
+        """
+        self._indexes.clear()
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                pass  # views still alive; unmapped once they are collected
+            self._mm = None
+        self._file.close()
+
+    def is_current(self, sources: Mapping[str, str], tables: Mapping[str, Any]) -> bool:
+        """True if built by this format version from these sources and tables."""
+        if self.version != FORMAT_VERSION:
+            return False
+        if self.header.get("tables_sha256") != _tables_digest(tables):
+            return False
+        recorded = self.header.get("sources", {})
+        for name, path in sources.items():
+            rec = recorded.get(name, {})
+            try:
+                st = os.stat(path)
+                stamp = (st.st_size, st.st_mtime_ns)
+            except FileNotFoundError:
+                stamp = (-1, -1)
+            if rec.get("path") == path and stamp == (rec.get("size"), rec.get("mtime_ns")):
+                continue  # unchanged stamp: skip hashing
+            if _file_sig(path)["sha256"] != rec.get("sha256"):
+                return False
+        return True
+
+
+class LexiconStore:
+    """Loads the artifact, rebuilding it when stale, and hot-reloads it.
+
+    Source stamps are re-checked at most every ``check_interval`` seconds;
+    a changed list triggers a rebuild and an atomic swap of the artifact.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sources: Mapping[str, str],
+        tables: Mapping[str, Any],
+        check_interval: float = 2.0,
+    ) -> None:
+        self.path = path
+        self.sources = dict(sources)
+        self.tables = dict(tables)
+        self.check_interval = check_interval
+        self._lex: Lexicon | None = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh(self, vectors: bool) -> Lexicon:
+        """Load the artifact, building it first if missing, out of date or
+        without the arrays ``vectors`` asks for.
+
+        A rebuild keeps the previous artifact's calibrated thresholds, and
+        its arrays if it had them.
+        """
+        thresholds: Dict[str, float] = {}
+        try:
+            lex = Lexicon(self.path)
+        except (FileNotFoundError, ValueError):
+            pass
+        else:
+            if lex.is_current(self.sources, self.tables) and (lex.has_vectors or not vectors):
+                return lex
+            thresholds, vectors = lex.thresholds, vectors or lex.has_vectors
+            lex.close()
+        build(self.path, self.sources, self.tables, thresholds, vectors)
+        return Lexicon(self.path)
+
+    def _swap(self, lex: Lexicon) -> Lexicon:
+        """Make ``lex`` current and close the artifact it replaces."""
+        if self._lex is not None and self._lex is not lex:
+            self._lex.close()
+        self._lex = lex
+        self._checked = time.monotonic()
+        return lex
+
+    def get(self, vectors: bool = False) -> Lexicon:
+        """Return the current lexicon, reloading it if the sources changed.
+
+        :param vectors: The caller needs the vector arrays (``vector``
+            backend); they are built into the artifact if missing.
+        """
+        now = time.monotonic()
+        lex = self._lex
+        if (lex is not None and now - self._checked < self.check_interval
+                and (lex.has_vectors or not vectors)):
+            return lex
+        with self._lock:
+            lex = self._lex
+            if (lex is None or (vectors and not lex.has_vectors)
+                    or not lex.is_current(self.sources, self.tables)):
+                lex = self._refresh(vectors)
+            return self._swap(lex)
+
+    def set_thresholds(self, thresholds: Mapping[str, float]) -> Lexicon:
+        """Rebuild the artifact with calibrated vector thresholds and swap it in."""
+        with self._lock:
+            vectors = self._lex is not None and self._lex.has_vectors
+            build(self.path, self.sources, self.tables, thresholds, vectors)
+            return self._swap(Lexicon(self.path))
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""Vector nearest-neighbour resolver for canonical program/university names.
+
+An alternative to the LLM for the common case: noisy names are mapped onto
+``canon_programs.txt`` / ``canon_universities.txt`` entries by cosine
+similarity of hashed character n-gram TF-IDF vectors.
+
+The canonical entries are embedded once into a dense ``float32`` matrix;
+a batch of inputs is resolved with one matrix multiply plus a top-k
+partial sort. Best matches below a threshold resolve to ``"Unknown"``
+(universities) or keep the cleaned input (programs).
+
+The thresholds are calibrated against LLM output already on disk with
+:func:`calibrate_resolver` and stored in the lexicon artifact::
+
+   python app.py --calibrate ../tmp/llm_cleaned.json
+"""
+
+from __future__ import annotations
+
+import random
+import re
+import time
+import zlib
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+DIM = 1 << 12  # hashed feature space; 4096 keeps the 1k-entry matrix ~17 MB
+NGRAMS = (2, 3, 4)
+UNI_THRESHOLD = 0.55  # uncalibrated fallbacks; see calibrate_resolver
+PROG_THRESHOLD = 0.55
+HOLDOUT = 0.3  # share of reference rows kept out of calibration
+
+_NON_WORD_RE = re.compile(r"[^\w&]+")
+
+
+def _normalize(text: str) -> str:
+    """Lowercase and collapse punctuation/whitespace, padded for n-grams."""
+    return " " + _NON_WORD_RE.sub(" ", (text or "").lower()).strip() + " "
+
+
+def _ngram_ids(text: str) -> List[int]:
+    """Return stable hashed ids of the character n-grams of ``text``."""
+    s = _normalize(text)
+    ids = []
+    for n in NGRAMS:
+        for i in range(len(s) - n + 1):
+            ids.append(zlib.crc32(s[i:i + n].encode("utf-8")) % DIM)
+    return ids
+
+
+def _term_counts(texts: Sequence[str]) -> np.ndarray:
+    """Hashed n-gram count matrix of shape ``(len(texts), DIM)``."""
+    counts = np.zeros((len(texts), DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        ids = _ngram_ids(text)
+        if ids:
+            np.add.at(counts[row], ids, 1.0)
+    return counts
+
+
+def _l2_normalize(mat: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length (zero rows stay zero)."""
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return mat / norms
+
+
+class CanonIndex:
+    """Embedded canonical list supporting batched top-k cosine lookup."""
+
+    def __init__(self, entries: Sequence[str], idf: np.ndarray | None = None,
+                 matrix: np.ndarray | None = None) -> None:
+        self.entries = list(entries)
+        if idf is None or matrix is None:
+            counts = _term_counts(self.entries)
+            df = np.count_nonzero(counts, axis=0).astype(np.float32)
+            idf = np.log((1.0 + len(self.entries)) / (1.0 + df)) + 1.0
+            matrix = _l2_normalize(np.log1p(counts) * idf)
+        self.idf = idf.astype(np.float32, copy=False)
+        self.matrix = matrix
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed query strings into the same TF-IDF space."""
+        return _l2_normalize(np.log1p(_term_counts(texts)) * self.idf)
+
+    def topk(self, texts: Sequence[str], k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(indices, scores)`` of the ``k`` best entries per text."""
+        if not texts or not self.entries:
+            shape = (len(texts), 0)
+            return np.zeros(shape, dtype=np.int64), np.zeros(shape, dtype=np.float32)
+        sims = self.embed(texts) @ self.matrix.T
+        k = min(k, sims.shape[1])
+        idx = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        part = np.take_along_axis(sims, idx, axis=1)
+        order = np.argsort(-part, axis=1)
+        return np.take_along_axis(idx, order, axis=1), np.take_along_axis(part, order, axis=1)
+
+    def resolve(self, texts: Sequence[str], threshold: float,
+                default: str | None = None) -> List[str]:
+        """Map each text to its best entry, or ``default``/itself below ``threshold``.
+
+        With ``default=None`` an unmatched text is returned title-cased.
+        """
+        idx, scores = self.topk(texts, k=1)
+        out = []
+        for i, text in enumerate(texts):
+            if idx.shape[1] and scores[i, 0] >= threshold:
+                out.append(self.entries[idx[i, 0]])
+            elif default is not None:
+                out.append(default)
+            else:
+                out.append((text or "").strip().title())
+        return out
+
+
+class VectorResolver:
+    """Resolve ``(program, university)`` pairs against both canonical lists."""
+
+    def __init__(self, programs: CanonIndex, universities: CanonIndex,
+                 prog_threshold: float = PROG_THRESHOLD,
+                 uni_threshold: float = UNI_THRESHOLD) -> None:
+        self.programs = programs
+        self.universities = universities
+        self.prog_threshold = prog_threshold
+        self.uni_threshold = uni_threshold
+
+    @classmethod
+    def from_lists(cls, programs: Sequence[str], universities: Sequence[str],
+                   **kwargs: float) -> "VectorResolver":
+        """Build both indexes from plain canonical lists."""
+        return cls(CanonIndex(programs), CanonIndex(universities), **kwargs)
+
+    def resolve(self, pairs: Sequence[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """Resolve a batch of already-split ``(program, university)`` pairs."""
+        progs = self.programs.resolve([p for p, _ in pairs], self.prog_threshold)
+        unis = self.universities.resolve(
+            [u for _, u in pairs], self.uni_threshold, default="Unknown"
+        )
+        return list(zip(progs, unis))
+
+
+def calibrate(index: CanonIndex, texts: Sequence[str], labels: Sequence[str],
+              unknown: str | None = "Unknown") -> Tuple[float, float]:
+    """Pick the threshold that maximizes agreement with reference ``labels``.
+
+    ``labels`` are reference answers (e.g. LLM output). Below the threshold
+    a text resolves to ``unknown`` (or to itself, title-cased, when
+    ``unknown`` is None), exactly as :meth:`CanonIndex.resolve` does.
+    Returns ``(threshold, accuracy)``.
+    """
+    if not texts:
+        return 0.0, 0.0
+    idx, scores = index.topk(texts, k=1)
+    want = [_normalize(x) for x in labels]
+    hit = np.array([_normalize(index.entries[i]) == w for i, w in zip(idx[:, 0], want)])
+    fallback = [unknown if unknown is not None else (t or "").strip().title() for t in texts]
+    miss_ok = np.array([_normalize(f) == w for f, w in zip(fallback, want)])
+
+    # Threshold at sorted position i accepts rows i..n-1 and rejects 0..i-1.
+    order = np.argsort(scores[:, 0], kind="stable")
+    s, hit, miss_ok = scores[order, 0], hit[order], miss_ok[order]
+    accepted = np.concatenate([np.cumsum(hit[::-1])[::-1], [0]])
+    rejected = np.concatenate([[0], np.cumsum(miss_ok)])
+    acc = (accepted + rejected) / len(s)
+    # Only cut between distinct scores; the last slot rejects everything.
+    valid = np.concatenate([[True], s[1:] != s[:-1], [True]])
+    best = int(np.argmax(np.where(valid, acc, -1.0)))
+    threshold = float(s[best]) if best < len(s) else float(s[-1]) + 1e-6
+    return threshold, float(acc[best])
+
+
+def _agreement(got: Sequence[str], want: Sequence[str]) -> float:
+    """Fraction of positions where normalized strings are equal."""
+    if not want:
+        return 0.0
+    return sum(_normalize(g) == _normalize(w) for g, w in zip(got, want)) / len(want)
+
+
+def holdout_split(n: int, fraction: float = HOLDOUT, seed: int = 0) -> Tuple[List[int], List[int]]:
+    """Shuffle ``range(n)`` reproducibly into ``(calibration, held_out)`` indices.
+
+    Both parts get at least one row.
+    """
+    if n < 2:
+        raise ValueError("need at least 2 reference rows to hold some out")
+    order = list(range(n))
+    random.Random(seed).shuffle(order)
+    cut = min(max(round(n * fraction), 1), n - 1)
+    return sorted(order[cut:]), sorted(order[:cut])
+
+
+def score(resolver: "VectorResolver", pairs: Sequence[Tuple[str, str]],
+          programs: Sequence[str], universities: Sequence[str]) -> Dict[str, float]:
+    """Agreement of ``resolver`` with reference answers.
+
+    ``agreement`` counts rows where both fields match; the per-field
+    figures and the university agreement restricted to rows whose
+    reference is a canonical entry are reported alongside.
+    """
+    t0 = time.perf_counter()
+    resolved = resolver.resolve(pairs)
+    elapsed = time.perf_counter() - t0
+    got_p = [_normalize(p) for p, _ in resolved]
+    got_u = [_normalize(u) for _, u in resolved]
+    want_p = [_normalize(p) for p in programs]
+    want_u = [_normalize(u) for u in universities]
+    canon = {_normalize(e) for e in resolver.universities.entries}
+    on_canon = [i for i, u in enumerate(want_u) if u in canon]
+    n = len(pairs)
+    return {
+        "rows": n,
+        "agreement": sum(a == b and c == d for a, b, c, d in
+                         zip(got_p, want_p, got_u, want_u)) / n if n else 0.0,
+        "program_agreement": _agreement(got_p, want_p),
+        "university_agreement": _agreement(got_u, want_u),
+        "university_agreement_on_canonical": _agreement(
+            [got_u[i] for i in on_canon], [want_u[i] for i in on_canon]
+        ),
+        "rows_per_sec": n / elapsed if elapsed else float("inf"),
+    }
+
+
+def calibrate_resolver(  # pylint: disable=too-many-arguments
+    resolver: "VectorResolver",
+    pairs: Sequence[Tuple[str, str]],
+    programs: Sequence[str],
+    universities: Sequence[str],
+    *,
+    holdout: float = HOLDOUT,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Calibrate both thresholds on part of the reference rows, score on the rest.
+
+    ``programs``/``universities`` are the reference answers (e.g. the
+    ``llm-generated-*`` fields) for the split ``pairs``. The thresholds are
+    set on ``resolver``; the returned report holds them with the
+    calibration accuracy and the :func:`score` of the held-out rows.
+    """
+    fit, held = holdout_split(len(pairs), holdout, seed)
+    resolver.prog_threshold, prog_acc = calibrate(
+        resolver.programs, [pairs[i][0] for i in fit], [programs[i] for i in fit], unknown=None
+    )
+    resolver.uni_threshold, uni_acc = calibrate(
+        resolver.universities, [pairs[i][1] for i in fit], [universities[i] for i in fit]
+    )
+    return {
+        "thresholds": {"programs": resolver.prog_threshold,
+                       "universities": resolver.uni_threshold},
+        "calibration": {"rows": len(fit), "program_agreement": prog_acc,
+                        "university_agreement": uni_acc},
+        "held_out": score(resolver, [pairs[i] for i in held], [programs[i] for i in held],
+                          [universities[i] for i in held]),
+    }
@@ -0,0 +1,208 @@
+"""Versioned schema migrations for the ``applicants`` database.
+
+The schema is defined only here, as ordered migration modules named
+``vNNN_<name>.py`` in this package. Each module provides:
+
+* ``up(conn)``: apply the change on an autocommit connection.
+* ``TRANSACTIONAL`` (default ``True``): run ``up`` and its bookkeeping in
+  one transaction. Migrations that build indexes ``CONCURRENTLY`` or
+  backfill in committed batches set it to ``False`` and must be safe to
+  re-run if interrupted.
+
+Applied versions are recorded in ``schema_version``; a session advisory
+lock keeps two migrators from running at once. Migrations are applied
+explicitly, never from request or pipeline code:
+
+.. code-block:: bash
+
+   python -m src.run migrate            # apply everything pending
+   python -m src.run migrate --status   # list applied/pending versions
+"""
+
+import importlib
+import logging
+import pkgutil
+import re
+
+from psycopg import sql
+
+from ..db import pool
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = 5_031_000  # pg_advisory_lock id reserved for migrations
+MIGRATION_RE = re.compile(r"^v(\d{3})_(\w+)$")
+
+CREATE_SCHEMA_VERSION = sql.SQL("""
+CREATE TABLE IF NOT EXISTS {tbl} (
+  version INTEGER PRIMARY KEY,
+  name TEXT NOT NULL,
+  applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+)
+""").format(tbl=sql.Identifier("schema_version"))
+
+HAS_SCHEMA_VERSION = sql.SQL("SELECT to_regclass({tbl}) IS NOT NULL").format(
+    tbl=sql.Literal("schema_version")
+)
+
+SELECT_APPLIED = sql.SQL("SELECT version, applied_at FROM {tbl} ORDER BY version").format(
+    tbl=sql.Identifier("schema_version")
+)
+
+RECORD_VERSION = sql.SQL("INSERT INTO {tbl} (version, name) VALUES (%s, %s)").format(
+    tbl=sql.Identifier("schema_version")
+)
+
+HAS_INVALID_INDEX = sql.SQL("""
+SELECT EXISTS (
+  SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+  WHERE c.relname = %s AND NOT i.indisvalid
+)
+""")
+
+# A valid, non-partial unique index on exactly one column (by name).
+HAS_UNIQUE_INDEX = sql.SQL("""
+SELECT EXISTS (
+  SELECT 1 FROM pg_index i
+  JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+  WHERE i.indrelid = to_regclass(%s) AND i.indisunique AND i.indisvalid
+    AND i.indnkeyatts = 1 AND i.indpred IS NULL AND a.attname = %s
+)
+""")
+
+
+def discover() -> list[tuple[int, str, str]]:
+    """Return ``(version, name, module)`` for every migration, in order.
+
+    :rtype: list[tuple[int, str, str]]
+    """
+    found = []
+    for info in pkgutil.iter_modules(__path__):
+        m = MIGRATION_RE.match(info.name)
+        if m:
+            found.append((int(m.group(1)), m.group(2), info.name))
+    return sorted(found)
+
+
+def create_index_concurrently(  # pylint: disable=too-many-arguments
+    conn,
+    name: str,
+    table: str,
+    columns: tuple[str, ...],
+    *,
+    using: str | None = None,
+    unique: bool = False,
+) -> None:
+    """Build an index without blocking writes (autocommit connection).
+
+    A previous interrupted ``CONCURRENTLY`` build leaves an invalid index
+    behind, which ``IF NOT EXISTS`` would silently keep; it is dropped first.
+
+    :param conn: Autocommit connection.
+    :param name: Index name.
+    :type name: str
+    :param table: Table name.
+    :type table: str
+    :param columns: Indexed columns, in order.
+    :type columns: tuple[str, ...]
+    :param using: Index access method (e.g. ``gin``); default B-tree.
+    :type using: str | None
+    :param unique: Build a ``UNIQUE`` index.
+    :type unique: bool
+    """
+    if conn.execute(HAS_INVALID_INDEX, (name,)).fetchone()[0]:
+        conn.execute(sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {idx}").format(
+            idx=sql.Identifier(name)))
+    stmt = sql.SQL(
+        "CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {idx} ON {tbl}{using} ({cols})"
+    )
+    conn.execute(stmt.format(
+        unique=sql.SQL("UNIQUE " if unique else ""),
+        idx=sql.Identifier(name),
+        tbl=sql.Identifier(table),
+        using=sql.SQL(" USING {}").format(sql.SQL(using)) if using else sql.SQL(""),
+        cols=sql.SQL(", ").join(sql.Identifier(c) for c in columns),
+    ))
+
+
+def add_unique_constraint(conn, table: str, column: str, keep: str = "p_id") -> None:
+    """Make ``column`` unique on a table that may hold duplicates (autocommit connection).
+
+    Tables created before the constraint was part of the schema can hold
+    repeated values. Those rows are deleted, keeping the lowest ``keep``
+    per value; the index is then built ``CONCURRENTLY`` and attached as
+    constraint ``<table>_<column>_key``, which only takes a brief lock.
+    Does nothing if a unique index on ``column`` already exists; if a
+    writer adds a duplicate meanwhile the build fails and a re-run
+    deletes it and retries.
+
+    :param conn: Autocommit connection.
+    :param table: Table name.
+    :type table: str
+    :param column: Column to make unique.
+    :type column: str
+    :param keep: Column whose lowest value survives among duplicates.
+    :type keep: str
+    """
+    if conn.execute(HAS_UNIQUE_INDEX, (table, column)).fetchone()[0]:
+        return
+    name = f"{table}_{column}_key"
+    conn.execute(sql.SQL("""
+DELETE FROM {tbl} AS a USING {tbl} AS b
+WHERE a.{col} = b.{col} AND a.{keep} > b.{keep}
+""").format(tbl=sql.Identifier(table), col=sql.Identifier(column), keep=sql.Identifier(keep)))
+    create_index_concurrently(conn, name, table, (column,), unique=True)
+    conn.execute(sql.SQL("ALTER TABLE {tbl} ADD CONSTRAINT {key} UNIQUE USING INDEX {key}").format(
+        tbl=sql.Identifier(table), key=sql.Identifier(name)))
+
+
+def _applied(conn) -> dict[int, object]:
+    """Map applied version -> ``applied_at``."""
+    return dict(conn.execute(SELECT_APPLIED).fetchall())
+
+
+def status() -> list[tuple[int, str, object]]:
+    """Return ``(version, name, applied_at)`` per migration (``None`` if pending).
+
+    :rtype: list[tuple[int, str, object]]
+    """
+    with pool.connection() as conn:
+        exists = conn.execute(HAS_SCHEMA_VERSION).fetchone()[0]
+        applied = _applied(conn) if exists else {}
+    return [(v, name, applied.get(v)) for v, name, _mod in discover()]
+
+
+def migrate(target: int | None = None) -> list[str]:
+    """Apply pending migrations in version order, up to ``target``.
+
+    :param target: Highest version to apply (default: all).
+    :type target: int | None
+    :return: ``"NNN_name"`` of each migration applied by this call.
+    :rtype: list[str]
+    """
+    done: list[str] = []
+    with pool.connection(statement_timeout_ms=0) as conn:
+        conn.autocommit = True
+        try:
+            conn.execute("SELECT pg_advisory_lock(%s)", (LOCK_KEY,))
+            try:
+                conn.execute(CREATE_SCHEMA_VERSION)
+                applied = _applied(conn)
+                for version, name, modname in discover():
+                    if version in applied or (target is not None and version > target):
+                        continue
+                    module = importlib.import_module(f"{__name__}.{modname}")
+                    logger.info("migrate: applying %03d_%s", version, name)
+                    if getattr(module, "TRANSACTIONAL", True):
+                        with conn.transaction():
+                            module.up(conn)
+                            conn.execute(RECORD_VERSION, (version, name))
+                    else:
+                        module.up(conn)
+                        conn.execute(RECORD_VERSION, (version, name))
+                    done.append(f"{version:03d}_{name}")
+            finally:
+                conn.execute("SELECT pg_advisory_unlock(%s)", (LOCK_KEY,))
+        finally:
+            conn.autocommit = False
+    return done
@@ -0,0 +1,41 @@
+"""Create the ``applicants`` table (original columns, ``url`` unique).
+
+Databases created by the old ``db.ensure_table`` already have the table,
+but with a plain ``url TEXT`` column, so ``CREATE TABLE IF NOT EXISTS``
+leaves them without the key every ``ON CONFLICT (url)`` relies on. Their
+duplicate urls are deleted (the first loaded row is kept) and the unique
+constraint is added without blocking writes; see
+:func:`add_unique_constraint`.
+"""
+
+from psycopg import sql
+
+from . import add_unique_constraint
+
+TRANSACTIONAL = False
+
+CREATE_TABLE = sql.SQL("""
+CREATE TABLE IF NOT EXISTS {tbl}(
+  p_id SERIAL PRIMARY KEY,
+  program TEXT,
+  comments TEXT,
+  date_added DATE,
+  url TEXT UNIQUE,
+  status TEXT,
+  term TEXT,
+  us_or_international TEXT,
+  gpa FLOAT,
+  gre FLOAT,
+  gre_v FLOAT,
+  gre_aw FLOAT,
+  degree TEXT,
+  llm_generated_program TEXT,
+  llm_generated_university TEXT
+)
+""").format(tbl=sql.Identifier("applicants"))
+
+
+def up(conn) -> None:
+    """Create ``applicants`` if it does not exist and make sure ``url`` is unique."""
+    conn.execute(CREATE_TABLE)
+    add_unique_constraint(conn, "applicants", "url")
@@ -0,0 +1,37 @@
+"""Add ``rid``, the numeric result id from ``url``, and backfill it.
+
+``rid`` is a plain column filled at insert time (:func:`records.to_rid`).
+Adding a nullable column without a default is a catalog-only change; the
+backfill then runs in short committed batches by ``p_id`` range, so writers
+are never blocked for long. Databases that got ``rid`` as a stored
+generated column from the old ``ensure_table`` have its expression dropped
+(also catalog-only) so inserts can supply it.
+"""
+
+from psycopg import sql
+
+TRANSACTIONAL = False
+BATCH_SIZE = 10_000
+
+ADD_COLUMN = sql.SQL("ALTER TABLE {tbl} ADD COLUMN IF NOT EXISTS rid BIGINT").format(
+    tbl=sql.Identifier("applicants")
+)
+DROP_EXPRESSION = sql.SQL("ALTER TABLE {tbl} ALTER COLUMN rid DROP EXPRESSION IF EXISTS").format(
+    tbl=sql.Identifier("applicants")
+)
+ID_RANGE = sql.SQL("SELECT COALESCE(MIN(p_id), 0), COALESCE(MAX(p_id), 0) FROM {tbl}").format(
+    tbl=sql.Identifier("applicants")
+)
+BACKFILL = sql.SQL("""
+UPDATE {tbl} SET rid = substring(url FROM '/result/([0-9]+)')::BIGINT
+WHERE p_id BETWEEN %s AND %s AND rid IS NULL AND url ~ '/result/[0-9]+'
+""").format(tbl=sql.Identifier("applicants"))
+
+
+def up(conn) -> None:
+    """Add and backfill ``rid`` (autocommit: one transaction per batch)."""
+    conn.execute(ADD_COLUMN)
+    conn.execute(DROP_EXPRESSION)
+    low, high = conn.execute(ID_RANGE).fetchone()
+    for start in range(low, high + 1, BATCH_SIZE):
+        conn.execute(BACKFILL, (start, start + BATCH_SIZE - 1))
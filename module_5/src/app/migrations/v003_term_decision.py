@@ -0,0 +1,156 @@
+"""Add ``term_season``, ``term_year``, ``decision`` and ``decision_date``.
+
+The columns are derived from ``term``/``status`` at insert time
+(:func:`records.data_type`) so dashboard filters can use an index instead
+of ``LIKE`` scans. Adding them is catalog-only (nullable, no default);
+existing rows are backfilled with the parsing of the time (a frozen copy
+of :func:`records.term_parts` and :func:`records.decision_parts`), one
+committed keyset batch at a time through a COPY-fed staging table.
+Rows already backfilled are skipped, so an interrupted run can resume.
+"""
+
+from datetime import date, datetime
+import re
+
+from psycopg import sql
+
+TRANSACTIONAL = False
+BATCH_SIZE = 5000
+_STAGE = sql.Identifier("applicants_filter_stage")
+
+CREATE_DECISION_TYPE = sql.SQL("""
+DO $$ BEGIN
+  CREATE TYPE decision_kind AS ENUM ('Accepted', 'Rejected', 'Waitlisted', 'Interview');
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$
+""")
+
+ADD_COLUMNS = sql.SQL("""
+ALTER TABLE {tbl}
+  ADD COLUMN IF NOT EXISTS term_season TEXT,
+  ADD COLUMN IF NOT EXISTS term_year SMALLINT,
+  ADD COLUMN IF NOT EXISTS decision {typ},
+  ADD COLUMN IF NOT EXISTS decision_date DATE
+""").format(tbl=sql.Identifier("applicants"), typ=sql.Identifier("decision_kind"))
+
+# Rows with a term or status but no derived values yet.
+SELECT_SOURCE = sql.SQL("""
+SELECT p_id, term, status, date_added FROM {tbl}
+WHERE p_id > %s
+  AND term_season IS NULL AND term_year IS NULL AND decision IS NULL
+  AND (COALESCE(term, '') <> '' OR COALESCE(status, '') <> '')
+ORDER BY p_id LIMIT %s
+""").format(tbl=sql.Identifier("applicants"))
+
+CREATE_STAGE = sql.SQL("""
+CREATE TEMP TABLE IF NOT EXISTS {stage} (
+  p_id INTEGER PRIMARY KEY,
+  term_season TEXT,
+  term_year SMALLINT,
+  decision {typ},
+  decision_date DATE
+) ON COMMIT DROP
+""").format(stage=_STAGE, typ=sql.Identifier("decision_kind"))
+
+COPY_STAGE = sql.SQL(
+    "COPY {stage} (p_id, term_season, term_year, decision, decision_date) FROM STDIN"
+).format(stage=_STAGE)
+
+APPLY_STAGE = sql.SQL("""
+UPDATE {tbl} AS a
+SET term_season = s.term_season, term_year = s.term_year,
+    decision = s.decision, decision_date = s.decision_date
+FROM {stage} AS s
+WHERE a.p_id = s.p_id
+""").format(tbl=sql.Identifier("applicants"), stage=_STAGE)
+
+_TERM_SEASON_RE = re.compile(r"(?i)\b(Fall|Spring|Summer|Winter)\b")
+_TERM_YEAR_RE = re.compile(r"\b(20\d{2})\b")
+_DECISION_RE = re.compile(
+    r"""(?ix)
+    \b(Accepted|Rejected|Wait\s*listed|Interview(?:ed)?)
+    (?:\s*on\s*
+        (?:(\d{1,2})\s+([A-Za-z]{3})
+          |(\d{1,2})/(\d{1,2})(?:/(\d{4}))?)
+    )?
+    """
+)
+
+
+def _term_parts(term):
+    """``("Fall", 2025)`` for ``"Fall 2025"``; either part may be ``None``."""
+    term_s = "" if term is None else str(term).strip()
+    m = _TERM_SEASON_RE.search(term_s)
+    year = _TERM_YEAR_RE.search(term_s)
+    return m.group(1).title() if m else None, int(year.group(1)) if year else None
+
+
+def _safe_date(year, month, day):
+    """``date(year, month, day)``, or ``None`` if it does not exist."""
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _decision_parts(status, added=None):
+    """``(decision, decision_date)`` of a status; a missing year comes from ``added``."""
+    m = _DECISION_RE.search("" if status is None else str(status).strip())
+    if not m:
+        return None, None
+
+    word = m.group(1).lower().replace(" ", "")
+    decision = "Waitlisted" if word.startswith("wait") else word[:9].title()
+
+    if m.group(2):
+        try:
+            month = datetime.strptime(m.group(3).title(), "%b").month
+        except ValueError:
+            return decision, None
+        day, year = int(m.group(2)), None
+    elif m.group(4):
+        day, month = int(m.group(4)), int(m.group(5))
+        year = int(m.group(6)) if m.group(6) else None
+    else:
+        return decision, None
+
+    if year is None:
+        if not isinstance(added, date):
+            return decision, None
+        year = added.year
+        when = _safe_date(year, month, day)
+        if when and when > added:
+            year -= 1
+    return decision, _safe_date(year, month, day)
+
+
+def backfill(conn, batch_size: int = BATCH_SIZE) -> int:
+    """Derive the columns for existing rows, committing each batch.
+
+    :param conn: Autocommit connection.
+    :param batch_size: Rows read and updated per batch.
+    :type batch_size: int
+    :return: Number of rows updated.
+    :rtype: int
+    """
+    updated, last = 0, 0
+    while True:
+        with conn.transaction(), conn.cursor() as cur:
+            cur.execute(SELECT_SOURCE, (last, batch_size))
+            rows = cur.fetchall()
+            if not rows:
+                return updated
+            cur.execute(CREATE_STAGE)
+            with cur.copy(COPY_STAGE) as cp:
+                for p_id, term, status, added in rows:
+                    cp.write_row((p_id, *_term_parts(term), *_decision_parts(status, added)))
+            cur.execute(APPLY_STAGE)
+            updated += cur.rowcount
+        last = rows[-1][0]
+
+
+def up(conn) -> None:
+    """Create ``decision_kind``, add the columns and backfill them."""
+    conn.execute(CREATE_DECISION_TYPE)
+    conn.execute(ADD_COLUMNS)
+    backfill(conn)
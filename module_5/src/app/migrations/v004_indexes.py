@@ -0,0 +1,16 @@
+"""Index ``rid`` and the term/decision filter columns without blocking writes."""
+
+from . import create_index_concurrently
+
+TRANSACTIONAL = False
+
+INDEXES = (
+    ("applicants_rid_idx", "applicants", ("rid",)),
+    ("applicants_term_decision_idx", "applicants", ("term_year", "term_season", "decision")),
+)
+
+
+def up(conn) -> None:
+    """Build each index ``CONCURRENTLY`` (autocommit connection)."""
+    for name, table, columns in INDEXES:
+        create_index_concurrently(conn, name, table, columns)
@@ -0,0 +1,133 @@
+"""Create the trigger-maintained ``applicant_summary`` table (see :mod:`summary`).
+
+The SQL is the summary of the time, frozen here: counts and sums per cell
+(the sums of squares come with ``v006_summary_squares``), and triggers on
+``applicants`` as it was then, a table with the text columns
+(``v009_dimension_tables`` moves them to ``applicant_rows``).
+"""
+
+from psycopg import sql
+
+HAS_SUMMARY = sql.SQL("SELECT to_regclass('applicant_summary') IS NOT NULL")
+
+CREATE_SUMMARY = sql.SQL("""
+CREATE TABLE IF NOT EXISTS applicant_summary (
+  term_year SMALLINT,
+  term_season TEXT,
+  degree TEXT,
+  us_or_international TEXT,
+  decision decision_kind,
+  llm_generated_program TEXT,
+  llm_generated_university TEXT,
+  n INTEGER NOT NULL DEFAULT 0,
+  gpa_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+  gpa_n INTEGER NOT NULL DEFAULT 0,
+  gre_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+  gre_n INTEGER NOT NULL DEFAULT 0,
+  gre_v_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+  gre_v_n INTEGER NOT NULL DEFAULT 0,
+  gre_aw_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+  gre_aw_n INTEGER NOT NULL DEFAULT 0,
+  CONSTRAINT applicant_summary_key UNIQUE NULLS NOT DISTINCT (
+    term_year, term_season, degree, us_or_international, decision,
+    llm_generated_program, llm_generated_university
+  )
+)
+""")
+
+# Adds the rows of {source} into the summary, grouped by cell and weighted by {sign}.
+_FOLD = """
+INSERT INTO applicant_summary AS s (
+  term_year, term_season, degree, us_or_international, decision,
+  llm_generated_program, llm_generated_university,
+  n, gpa_n, gpa_sum, gre_n, gre_sum, gre_v_n, gre_v_sum, gre_aw_n, gre_aw_sum
+)
+SELECT
+  term_year, term_season, degree, us_or_international, decision,
+  llm_generated_program, llm_generated_university,
+  SUM({sign})::INTEGER,
+  COALESCE(SUM({sign}) FILTER (WHERE gpa BETWEEN 0.01 AND 4.3), 0)::INTEGER,
+  COALESCE(SUM({sign} * gpa) FILTER (WHERE gpa BETWEEN 0.01 AND 4.3), 0),
+  COALESCE(SUM({sign}) FILTER (WHERE gre BETWEEN 130 AND 170), 0)::INTEGER,
+  COALESCE(SUM({sign} * gre) FILTER (WHERE gre BETWEEN 130 AND 170), 0),
+  COALESCE(SUM({sign}) FILTER (WHERE gre_v BETWEEN 130 AND 170), 0)::INTEGER,
+  COALESCE(SUM({sign} * gre_v) FILTER (WHERE gre_v BETWEEN 130 AND 170), 0),
+  COALESCE(SUM({sign}) FILTER (WHERE gre_aw BETWEEN 0.01 AND 6.0), 0)::INTEGER,
+  COALESCE(SUM({sign} * gre_aw) FILTER (WHERE gre_aw BETWEEN 0.01 AND 6.0), 0)
+FROM {source}
+GROUP BY
+  term_year, term_season, degree, us_or_international, decision,
+  llm_generated_program, llm_generated_university
+ON CONFLICT ON CONSTRAINT applicant_summary_key DO UPDATE SET
+  n = s.n + EXCLUDED.n,
+  gpa_n = s.gpa_n + EXCLUDED.gpa_n, gpa_sum = s.gpa_sum + EXCLUDED.gpa_sum,
+  gre_n = s.gre_n + EXCLUDED.gre_n, gre_sum = s.gre_sum + EXCLUDED.gre_sum,
+  gre_v_n = s.gre_v_n + EXCLUDED.gre_v_n, gre_v_sum = s.gre_v_sum + EXCLUDED.gre_v_sum,
+  gre_aw_n = s.gre_aw_n + EXCLUDED.gre_aw_n, gre_aw_sum = s.gre_aw_sum + EXCLUDED.gre_aw_sum
+"""
+
+
+def _fold(source: str, sign: str = "sign") -> sql.Composed:
+    """:data:`_FOLD` over ``source`` (SQL text)."""
+    return sql.SQL(_FOLD).format(source=sql.SQL(source), sign=sql.SQL(sign))
+
+
+# Insert: +1 per new row. Delete: -1 per old row. Update: both. Transition
+# tables are only visible to the branch of the matching event; PL/pgSQL
+# plans each statement on first use, so the others never resolve.
+CREATE_TRIGGER_FUNCTION = sql.SQL("""
+CREATE OR REPLACE FUNCTION applicant_summary_apply() RETURNS trigger
+LANGUAGE plpgsql AS $fn$
+BEGIN
+  IF TG_OP = 'TRUNCATE' THEN
+    TRUNCATE applicant_summary;
+    RETURN NULL;
+  END IF;
+  IF TG_OP = 'INSERT' THEN {insert};
+  END IF;
+  IF TG_OP = 'DELETE' THEN {delete};
+    DELETE FROM applicant_summary WHERE n = 0;
+  END IF;
+  IF TG_OP = 'UPDATE' THEN {update};
+    DELETE FROM applicant_summary WHERE n = 0;
+  END IF;
+  RETURN NULL;
+END
+$fn$
+""").format(
+    insert=_fold("(SELECT 1 AS sign, * FROM new_rows) AS d"),
+    delete=_fold("(SELECT -1 AS sign, * FROM old_rows) AS d"),
+    update=_fold(
+        "(SELECT 1 AS sign, * FROM new_rows UNION ALL SELECT -1 AS sign, * FROM old_rows) AS d"
+    ),
+)
+
+# A trigger with transition tables may only fire on one event.
+CREATE_TRIGGERS = sql.SQL("""
+CREATE OR REPLACE TRIGGER applicant_summary_ins AFTER INSERT ON applicants
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION applicant_summary_apply();
+CREATE OR REPLACE TRIGGER applicant_summary_upd AFTER UPDATE ON applicants
+  REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION applicant_summary_apply();
+CREATE OR REPLACE TRIGGER applicant_summary_del AFTER DELETE ON applicants
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION applicant_summary_apply();
+CREATE OR REPLACE TRIGGER applicant_summary_trunc AFTER TRUNCATE ON applicants
+  FOR EACH STATEMENT EXECUTE FUNCTION applicant_summary_apply();
+""")
+
+# Full fill; SHARE mode blocks writers so no delta is missed meanwhile.
+FILL_SUMMARY = sql.SQL(
+    "LOCK TABLE applicants IN SHARE MODE; TRUNCATE applicant_summary; "
+) + _fold("applicants", sign="1")
+
+
+def up(conn) -> None:
+    """Create the summary table and triggers, filling it on first creation."""
+    existed = conn.execute(HAS_SUMMARY).fetchone()[0]
+    conn.execute(CREATE_SUMMARY)
+    conn.execute(CREATE_TRIGGER_FUNCTION)
+    conn.execute(CREATE_TRIGGERS)
+    if not existed:
+        conn.execute(FILL_SUMMARY)
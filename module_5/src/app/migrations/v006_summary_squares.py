@@ -0,0 +1,105 @@
+"""Add per-score sums of squares to ``applicant_summary`` (see :mod:`summary`).
+
+With ``x_sq`` next to ``x_n``/``x_sum`` every summary cell yields a
+variance, so standard deviations over any slice come from the cube
+instead of a scan. The columns are added with a constant default
+(catalog-only), the trigger function is replaced so new deltas maintain
+them, and the table is refilled once for existing rows. The function still
+reads the text columns of the ``applicants`` table of the time.
+"""
+
+from psycopg import sql
+
+ADD_COLUMNS = sql.SQL("""
+ALTER TABLE applicant_summary
+  ADD COLUMN IF NOT EXISTS gpa_sq DOUBLE PRECISION NOT NULL DEFAULT 0,
+  ADD COLUMN IF NOT EXISTS gre_sq DOUBLE PRECISION NOT NULL DEFAULT 0,
+  ADD COLUMN IF NOT EXISTS gre_v_sq DOUBLE PRECISION NOT NULL DEFAULT 0,
+  ADD COLUMN IF NOT EXISTS gre_aw_sq DOUBLE PRECISION NOT NULL DEFAULT 0
+""")
+
+# Adds the rows of {source} into the summary, grouped by cell and weighted by {sign}.
+_FOLD = """
+INSERT INTO applicant_summary AS s (
+  term_year, term_season, degree, us_or_international, decision,
+  llm_generated_program, llm_generated_university, n,
+  gpa_n, gpa_sum, gpa_sq, gre_n, gre_sum, gre_sq,
+  gre_v_n, gre_v_sum, gre_v_sq, gre_aw_n, gre_aw_sum, gre_aw_sq
+)
+SELECT
+  term_year, term_season, degree, us_or_international, decision,
+  llm_generated_program, llm_generated_university,
+  SUM({sign})::INTEGER,
+  COALESCE(SUM({sign}) FILTER (WHERE gpa BETWEEN 0.01 AND 4.3), 0)::INTEGER,
+  COALESCE(SUM({sign} * gpa) FILTER (WHERE gpa BETWEEN 0.01 AND 4.3), 0),
+  COALESCE(SUM({sign} * gpa * gpa) FILTER (WHERE gpa BETWEEN 0.01 AND 4.3), 0),
+  COALESCE(SUM({sign}) FILTER (WHERE gre BETWEEN 130 AND 170), 0)::INTEGER,
+  COALESCE(SUM({sign} * gre) FILTER (WHERE gre BETWEEN 130 AND 170), 0),
+  COALESCE(SUM({sign} * gre * gre) FILTER (WHERE gre BETWEEN 130 AND 170), 0),
+  COALESCE(SUM({sign}) FILTER (WHERE gre_v BETWEEN 130 AND 170), 0)::INTEGER,
+  COALESCE(SUM({sign} * gre_v) FILTER (WHERE gre_v BETWEEN 130 AND 170), 0),
+  COALESCE(SUM({sign} * gre_v * gre_v) FILTER (WHERE gre_v BETWEEN 130 AND 170), 0),
+  COALESCE(SUM({sign}) FILTER (WHERE gre_aw BETWEEN 0.01 AND 6.0), 0)::INTEGER,
+  COALESCE(SUM({sign} * gre_aw) FILTER (WHERE gre_aw BETWEEN 0.01 AND 6.0), 0),
+  COALESCE(SUM({sign} * gre_aw * gre_aw) FILTER (WHERE gre_aw BETWEEN 0.01 AND 6.0), 0)
+FROM {source}
+GROUP BY
+  term_year, term_season, degree, us_or_international, decision,
+  llm_generated_program, llm_generated_university
+ON CONFLICT ON CONSTRAINT applicant_summary_key DO UPDATE SET
+  n = s.n + EXCLUDED.n,
+  gpa_n = s.gpa_n + EXCLUDED.gpa_n, gpa_sum = s.gpa_sum + EXCLUDED.gpa_sum,
+  gpa_sq = s.gpa_sq + EXCLUDED.gpa_sq,
+  gre_n = s.gre_n + EXCLUDED.gre_n, gre_sum = s.gre_sum + EXCLUDED.gre_sum,
+  gre_sq = s.gre_sq + EXCLUDED.gre_sq,
+  gre_v_n = s.gre_v_n + EXCLUDED.gre_v_n, gre_v_sum = s.gre_v_sum + EXCLUDED.gre_v_sum,
+  gre_v_sq = s.gre_v_sq + EXCLUDED.gre_v_sq,
+  gre_aw_n = s.gre_aw_n + EXCLUDED.gre_aw_n, gre_aw_sum = s.gre_aw_sum + EXCLUDED.gre_aw_sum,
+  gre_aw_sq = s.gre_aw_sq + EXCLUDED.gre_aw_sq
+"""
+
+
+def _fold(source: str, sign: str = "sign") -> sql.Composed:
+    """:data:`_FOLD` over ``source`` (SQL text)."""
+    return sql.SQL(_FOLD).format(source=sql.SQL(source), sign=sql.SQL(sign))
+
+
+# Insert: +1 per new row. Delete: -1 per old row. Update: both.
+CREATE_TRIGGER_FUNCTION = sql.SQL("""
+CREATE OR REPLACE FUNCTION applicant_summary_apply() RETURNS trigger
+LANGUAGE plpgsql AS $fn$
+BEGIN
+  IF TG_OP = 'TRUNCATE' THEN
+    TRUNCATE applicant_summary;
+    RETURN NULL;
+  END IF;
+  IF TG_OP = 'INSERT' THEN {insert};
+  END IF;
+  IF TG_OP = 'DELETE' THEN {delete};
+    DELETE FROM applicant_summary WHERE n = 0;
+  END IF;
+  IF TG_OP = 'UPDATE' THEN {update};
+    DELETE FROM applicant_summary WHERE n = 0;
+  END IF;
+  RETURN NULL;
+END
+$fn$
+""").format(
+    insert=_fold("(SELECT 1 AS sign, * FROM new_rows) AS d"),
+    delete=_fold("(SELECT -1 AS sign, * FROM old_rows) AS d"),
+    update=_fold(
+        "(SELECT 1 AS sign, * FROM new_rows UNION ALL SELECT -1 AS sign, * FROM old_rows) AS d"
+    ),
+)
+
+# Full refill; SHARE mode blocks writers so no delta is missed meanwhile.
+FILL_SUMMARY = sql.SQL(
+    "LOCK TABLE applicants IN SHARE MODE; TRUNCATE applicant_summary; "
+) + _fold("applicants", sign="1")
+
+
+def up(conn) -> None:
+    """Add the columns, replace the trigger function and refill the summary."""
+    conn.execute(ADD_COLUMNS)
+    conn.execute(CREATE_TRIGGER_FUNCTION)
+    conn.execute(FILL_SUMMARY)
@@ -0,0 +1,117 @@
+"""Create the trigger-maintained ``applicant_score_bins`` histograms (see :mod:`distributions`).
+
+The SQL is frozen as it was written: bins of 0.01 GPA, 1 GRE point and
+0.1 AW over the valid score ranges, with ``1e-09`` keeping values that
+sit on a bin edge in their bin. Like ``v005``, the triggers go on the
+``applicants`` table of the time; ``v009_dimension_tables`` moves them to
+``applicant_rows``.
+"""
+
+from psycopg import sql
+
+HAS_BINS = sql.SQL("SELECT to_regclass('applicant_score_bins') IS NOT NULL")
+
+CREATE_BINS = sql.SQL("""
+CREATE TABLE IF NOT EXISTS applicant_score_bins (
+  term_year SMALLINT,
+  term_season TEXT,
+  degree TEXT,
+  us_or_international TEXT,
+  decision decision_kind,
+  llm_generated_program TEXT,
+  llm_generated_university TEXT,
+  score TEXT NOT NULL,
+  bin SMALLINT NOT NULL,
+  n INTEGER NOT NULL DEFAULT 0,
+  CONSTRAINT applicant_score_bins_key UNIQUE NULLS NOT DISTINCT (
+    term_year, term_season, degree, us_or_international, decision,
+    llm_generated_program, llm_generated_university, score, bin
+  )
+)
+""")
+
+# Adds the bin counts of {source} into the table, each row weighted by {sign}.
+_FOLD = """
+INSERT INTO applicant_score_bins AS s (
+  term_year, term_season, degree, us_or_international, decision,
+  llm_generated_program, llm_generated_university, score, bin, n
+)
+SELECT
+  term_year, term_season, degree, us_or_international, decision,
+  llm_generated_program, llm_generated_university, v.score, v.bin, SUM({sign})::INTEGER
+FROM {source}
+CROSS JOIN LATERAL (VALUES
+  ('gpa', CASE WHEN gpa BETWEEN 0.01 AND 4.3 THEN floor(gpa / 0.01 + 1e-09)::INTEGER END),
+  ('gre', CASE WHEN gre BETWEEN 130 AND 170 THEN floor(gre / 1.0 + 1e-09)::INTEGER END),
+  ('gre_v', CASE WHEN gre_v BETWEEN 130 AND 170 THEN floor(gre_v / 1.0 + 1e-09)::INTEGER END),
+  ('gre_aw', CASE WHEN gre_aw BETWEEN 0.01 AND 6.0 THEN floor(gre_aw / 0.1 + 1e-09)::INTEGER END)
+) AS v(score, bin)
+WHERE v.bin IS NOT NULL
+GROUP BY
+  term_year, term_season, degree, us_or_international, decision,
+  llm_generated_program, llm_generated_university, v.score, v.bin
+ON CONFLICT ON CONSTRAINT applicant_score_bins_key DO UPDATE SET n = s.n + EXCLUDED.n
+"""
+
+
+def _fold(source: str, sign: str = "d.sign") -> sql.Composed:
+    """:data:`_FOLD` over ``source`` (SQL text)."""
+    return sql.SQL(_FOLD).format(source=sql.SQL(source), sign=sql.SQL(sign))
+
+
+# Insert: +1 per new row. Delete: -1 per old row. Update: both.
+CREATE_TRIGGER_FUNCTION = sql.SQL("""
+CREATE OR REPLACE FUNCTION applicant_score_bins_apply() RETURNS trigger
+LANGUAGE plpgsql AS $fn$
+BEGIN
+  IF TG_OP = 'TRUNCATE' THEN
+    TRUNCATE applicant_score_bins;
+    RETURN NULL;
+  END IF;
+  IF TG_OP = 'INSERT' THEN {insert};
+  END IF;
+  IF TG_OP = 'DELETE' THEN {delete};
+    DELETE FROM applicant_score_bins WHERE n = 0;
+  END IF;
+  IF TG_OP = 'UPDATE' THEN {update};
+    DELETE FROM applicant_score_bins WHERE n = 0;
+  END IF;
+  RETURN NULL;
+END
+$fn$
+""").format(
+    insert=_fold("(SELECT 1 AS sign, * FROM new_rows) AS d"),
+    delete=_fold("(SELECT -1 AS sign, * FROM old_rows) AS d"),
+    update=_fold(
+        "(SELECT 1 AS sign, * FROM new_rows UNION ALL SELECT -1 AS sign, * FROM old_rows) AS d"
+    ),
+)
+
+CREATE_TRIGGERS = sql.SQL("""
+CREATE OR REPLACE TRIGGER applicant_score_bins_ins AFTER INSERT ON applicants
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION applicant_score_bins_apply();
+CREATE OR REPLACE TRIGGER applicant_score_bins_upd AFTER UPDATE ON applicants
+  REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION applicant_score_bins_apply();
+CREATE OR REPLACE TRIGGER applicant_score_bins_del AFTER DELETE ON applicants
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION applicant_score_bins_apply();
+CREATE OR REPLACE TRIGGER applicant_score_bins_trunc AFTER TRUNCATE ON applicants
+  FOR EACH STATEMENT EXECUTE FUNCTION applicant_score_bins_apply();
+""")
+
+# Full fill; SHARE mode blocks writers so no delta is missed meanwhile.
+FILL_BINS = sql.SQL(
+    "LOCK TABLE applicants IN SHARE MODE; TRUNCATE applicant_score_bins; "
+) + _fold("applicants", sign="1")
+
+
+def up(conn) -> None:
+    """Create the bins table and triggers, filling it on first creation."""
+    existed = conn.execute(HAS_BINS).fetchone()[0]
+    conn.execute(CREATE_BINS)
+    conn.execute(CREATE_TRIGGER_FUNCTION)
+    conn.execute(CREATE_TRIGGERS)
+    if not existed:
+        conn.execute(FILL_BINS)
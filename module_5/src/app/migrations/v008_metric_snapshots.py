@@ -0,0 +1,31 @@
+"""Create ``metric_snapshots``, one row of dashboard metrics per day (see :mod:`snapshots`)."""
+
+from psycopg import sql
+
+CREATE_TABLE = sql.SQL("""
+CREATE TABLE IF NOT EXISTS {tbl} (
+  day DATE PRIMARY KEY,
+  taken_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  applicant_count INTEGER NOT NULL,
+  international_count INTEGER NOT NULL,
+  us_count INTEGER NOT NULL,
+  other_count INTEGER NOT NULL,
+  percent_international DOUBLE PRECISION NOT NULL,
+  avg_gpa DOUBLE PRECISION NOT NULL,
+  avg_gre DOUBLE PRECISION NOT NULL,
+  avg_gre_v DOUBLE PRECISION NOT NULL,
+  avg_gre_aw DOUBLE PRECISION NOT NULL,
+  avg_gpa_us DOUBLE PRECISION NOT NULL,
+  accept_rate DOUBLE PRECISION NOT NULL,
+  avg_gpa_accept DOUBLE PRECISION NOT NULL,
+  jhu_ms_cs INTEGER NOT NULL,
+  georgetown_phd_cs INTEGER NOT NULL,
+  degree_counts JSONB NOT NULL,
+  top_programs JSONB NOT NULL
+)
+""").format(tbl=sql.Identifier("metric_snapshots"))
+
+
+def up(conn) -> None:
+    """Create ``metric_snapshots`` if it does not exist."""
+    conn.execute(CREATE_TABLE)
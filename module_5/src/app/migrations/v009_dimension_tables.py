@@ -0,0 +1,435 @@
+"""Dictionary-encode the repeated text columns of ``applicants`` (see :mod:`dimensions`).
+
+Creates one ``dim_<column>`` table per encoded column and the new base
+table ``applicant_rows``, which stores integer ids in place of the text,
+then replaces the old table with the ``applicants`` view. ``p_id`` values
+are kept, so the summary and histogram tables stay valid; their triggers
+are recreated on ``applicant_rows`` and now decode the transition rows.
+
+Writers are not blocked while the rows are copied. Duplicate urls left by
+the old ``ensure_table`` are deleted first (``applicant_rows.url`` is
+unique), a trigger then records the ``p_id`` of every row written to
+``applicants`` in ``applicants_changes``, and the rows are copied in
+committed ``p_id`` batches. Recorded rows are copied again until the log
+is nearly empty; only the last catch-up and the swap to the view run
+under a table lock. An interrupted run resumes where it stopped. The
+column lists and the trigger functions are frozen here as of this
+version, not read from :mod:`dimensions`, :mod:`summary` or
+:mod:`distributions`.
+"""
+
+from psycopg import sql
+
+from . import add_unique_constraint
+
+TRANSACTIONAL = False
+BATCH_SIZE = 10_000
+
+APPLICANTS = sql.Identifier("applicants")
+APPLICANT_ROWS = sql.Identifier("applicant_rows")
+CHANGES = sql.Identifier("applicants_changes")
+
+# Encoded column -> id type; SMALLINT for the short vocabularies.
+_ENCODED = {
+    "program": "INTEGER",
+    "status": "INTEGER",
+    "term": "SMALLINT",
+    "us_or_international": "SMALLINT",
+    "degree": "SMALLINT",
+    "llm_generated_program": "INTEGER",
+    "llm_generated_university": "INTEGER",
+}
+
+# Columns of the ``applicants`` table, kept in this order by the view.
+_COLUMNS = (
+    "p_id", "program", "comments", "date_added", "url", "status", "term",
+    "us_or_international", "gpa", "gre", "gre_v", "gre_aw", "degree",
+    "llm_generated_program", "llm_generated_university", "rid",
+    "term_season", "term_year", "decision", "decision_date",
+)
+
+
+def _dim(col: str) -> sql.Identifier:
+    """Dimension table of an encoded column."""
+    return sql.Identifier(f"dim_{col}")
+
+
+def _decoded(rows: sql.Composable) -> sql.Composed:
+    """``SELECT`` of ``applicant_rows``-shaped ``rows`` with the ids joined back to text."""
+    return sql.SQL("SELECT {cols} FROM {rows} AS r {joins}").format(
+        cols=sql.SQL(", ").join(
+            sql.SQL("{c}.value AS {c}" if c in _ENCODED else "r.{c}").format(c=sql.Identifier(c))
+            for c in _COLUMNS
+        ),
+        rows=rows,
+        joins=sql.SQL(" ").join(
+            sql.SQL("LEFT JOIN {dim} AS {c} ON {c}.id = r.{fk}").format(
+                dim=_dim(c), c=sql.Identifier(c), fk=sql.Identifier(f"{c}_id"))
+            for c in _ENCODED
+        ),
+    )
+
+
+# Set once the view is in place, so a re-run after the swap does nothing.
+SWAPPED = sql.SQL(
+    "SELECT EXISTS (SELECT 1 FROM pg_class WHERE relname = {name} AND relkind = 'v')"
+).format(name=sql.Literal("applicants"))
+
+# Blocks writers (not readers) for the last catch-up and the swap.
+LOCK = sql.SQL("LOCK TABLE {tbl} IN EXCLUSIVE MODE").format(tbl=APPLICANTS)
+
+CREATE_DIMENSIONS = [
+    sql.SQL("""
+CREATE TABLE IF NOT EXISTS {dim} (
+  id {typ} GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+  value TEXT NOT NULL UNIQUE
+)
+""").format(dim=_dim(col), typ=sql.SQL(typ))
+    for col, typ in _ENCODED.items()
+]
+
+
+def _fill_dimensions(where: sql.SQL) -> list[sql.Composed]:
+    """Add the values of the ``applicants`` rows matching ``where`` to each dimension."""
+    return [
+        sql.SQL("""
+INSERT INTO {dim} (value)
+SELECT DISTINCT {col} FROM {tbl} WHERE {where} AND {col} IS NOT NULL ORDER BY 1
+ON CONFLICT (value) DO NOTHING
+""").format(dim=_dim(col), col=sql.Identifier(col), tbl=APPLICANTS, where=where)
+        for col in _ENCODED
+    ]
+
+
+_IN_BATCH = sql.SQL("p_id BETWEEN %s AND %s")
+_IN_CHANGED = sql.SQL("p_id = ANY(%s)")
+
+FILL_BATCH = _fill_dimensions(_IN_BATCH)
+FILL_CHANGED = _fill_dimensions(_IN_CHANGED)
+
+# Fixed-width columns first, so rows carry less alignment padding.
+CREATE_ROWS = sql.SQL("""
+CREATE TABLE IF NOT EXISTS {rows} (
+  p_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+  rid BIGINT,
+  gpa FLOAT,
+  gre FLOAT,
+  gre_v FLOAT,
+  gre_aw FLOAT,
+  date_added DATE,
+  decision_date DATE,
+  program_id INTEGER REFERENCES dim_program (id),
+  status_id INTEGER REFERENCES dim_status (id),
+  llm_generated_program_id INTEGER REFERENCES dim_llm_generated_program (id),
+  llm_generated_university_id INTEGER REFERENCES dim_llm_generated_university (id),
+  term_id SMALLINT REFERENCES dim_term (id),
+  us_or_international_id SMALLINT REFERENCES dim_us_or_international (id),
+  degree_id SMALLINT REFERENCES dim_degree (id),
+  term_year SMALLINT,
+  decision decision_kind,
+  term_season TEXT,
+  url TEXT UNIQUE,
+  comments TEXT
+)
+""").format(rows=APPLICANT_ROWS)
+
+
+
+def _copy_rows(where: sql.SQL, conflict: sql.SQL) -> sql.Composed:
+    """Encode the ``applicants`` rows matching ``where`` into ``applicant_rows``."""
+    return sql.SQL(
+        "INSERT INTO {rows} ({cols}) SELECT {values} FROM {tbl} AS a {joins} WHERE a.{where}"
+        "{conflict}"
+    ).format(
+        rows=APPLICANT_ROWS,
+        cols=sql.SQL(", ").join(
+            sql.Identifier(f"{c}_id" if c in _ENCODED else c) for c in _COLUMNS
+        ),
+        values=sql.SQL(", ").join(
+            sql.SQL("{c}.id" if c in _ENCODED else "a.{c}").format(c=sql.Identifier(c))
+            for c in _COLUMNS
+        ),
+        tbl=APPLICANTS,
+        joins=sql.SQL(" ").join(
+            sql.SQL("LEFT JOIN {dim} AS {c} ON {c}.value = a.{c}").format(
+                dim=_dim(c), c=sql.Identifier(c))
+            for c in _ENCODED
+        ),
+        where=where,
+        conflict=conflict,
+    )
+
+
+# Rows already copied by an interrupted run, or whose url still belongs to
+# a stale copy, are skipped here; they were written since capture started
+# and are copied again from the change log.
+COPY_BATCH = _copy_rows(_IN_BATCH, sql.SQL(" ON CONFLICT DO NOTHING"))
+COPY_CHANGED = _copy_rows(_IN_CHANGED, sql.SQL(""))
+
+ID_RANGE = sql.SQL("SELECT COALESCE(MIN(p_id), 0), COALESCE(MAX(p_id), 0) FROM {tbl}").format(
+    tbl=APPLICANTS
+)
+
+CREATE_CHANGES = sql.SQL("""
+CREATE TABLE IF NOT EXISTS {log} (
+  id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+  p_id INTEGER NOT NULL
+)
+""").format(log=CHANGES)
+
+CREATE_CAPTURE = [
+    sql.SQL("""
+CREATE OR REPLACE FUNCTION applicants_capture() RETURNS trigger
+LANGUAGE plpgsql AS $fn$
+BEGIN
+  IF TG_OP <> 'INSERT' THEN INSERT INTO {log} (p_id) VALUES (OLD.p_id);
+  END IF;
+  IF TG_OP <> 'DELETE' THEN INSERT INTO {log} (p_id) VALUES (NEW.p_id);
+  END IF;
+  RETURN NULL;
+END
+$fn$
+""").format(log=CHANGES),
+    sql.SQL("""
+CREATE OR REPLACE TRIGGER applicants_capture AFTER INSERT OR UPDATE OR DELETE ON {tbl}
+  FOR EACH ROW EXECUTE FUNCTION applicants_capture()
+""").format(tbl=APPLICANTS),
+]
+
+# Oldest entries first; a write committed later keeps its own entry.
+CLAIM_CHANGES = sql.SQL("""
+DELETE FROM {log} WHERE id IN (SELECT id FROM {log} ORDER BY id LIMIT %s)
+RETURNING p_id
+""").format(log=CHANGES)
+
+# The old copies of the changed rows, and any copy still holding their urls.
+DROP_CHANGED = sql.SQL("""
+DELETE FROM {rows}
+WHERE p_id = ANY(%s) OR url IN (SELECT url FROM {tbl} WHERE p_id = ANY(%s))
+""").format(rows=APPLICANT_ROWS, tbl=APPLICANTS)
+
+# New rows continue after the copied p_ids.
+RESTART_P_ID = sql.SQL("""
+SELECT setval(pg_get_serial_sequence({name}, 'p_id'), COALESCE(MAX(p_id), 0) + 1, false)
+FROM {rows}
+""").format(name=sql.Literal("applicant_rows"), rows=APPLICANT_ROWS)
+
+DROP_TABLE = sql.SQL("DROP TABLE {tbl}").format(tbl=APPLICANTS)
+
+# The capture trigger went with the table.
+DROP_CAPTURE = [
+    sql.SQL("DROP FUNCTION applicants_capture()"),
+    sql.SQL("DROP TABLE {log}").format(log=CHANGES),
+]
+
+CREATE_VIEW = sql.SQL("CREATE VIEW {tbl} AS {select}").format(
+    tbl=APPLICANTS, select=_decoded(APPLICANT_ROWS)
+)
+
+CREATE_INDEXES = sql.SQL("""
+CREATE INDEX IF NOT EXISTS applicant_rows_rid_idx ON {rows} (rid);
+CREATE INDEX IF NOT EXISTS applicant_rows_term_decision_idx
+  ON {rows} (term_year, term_season, decision)
+""").format(rows=APPLICANT_ROWS)
+
+ANALYZE = sql.SQL("ANALYZE {rows}").format(rows=APPLICANT_ROWS)
+
+
+def _transition(name: str) -> sql.Composed:
+    """Transition table ``name`` of ``applicant_rows``, decoded under the same name."""
+    return sql.SQL("({rows}) AS {name}").format(
+        rows=_decoded(sql.Identifier(name)), name=sql.Identifier(name))
+
+
+_NEW, _OLD = _transition("new_rows"), _transition("old_rows")
+
+# Insert: +1 per new row. Delete: -1 per old row. Update: both.
+_DELTAS = {
+    "INSERT": sql.SQL("(SELECT 1 AS sign, * FROM {}) AS d").format(_NEW),
+    "DELETE": sql.SQL("(SELECT -1 AS sign, * FROM {}) AS d").format(_OLD),
+    "UPDATE": sql.SQL(
+        "(SELECT 1 AS sign, * FROM {} UNION ALL SELECT -1 AS sign, * FROM {}) AS d"
+    ).format(_NEW, _OLD),
+}
+
+# Adds the rows of {source} into the summary, grouped by cell.
+_SUMMARY_FOLD = sql.SQL("""
+INSERT INTO applicant_summary AS s (
+  term_year, term_season, degree, us_or_international, decision,
+  llm_generated_program, llm_generated_university, n,
+  gpa_n, gpa_sum, gpa_sq, gre_n, gre_sum, gre_sq,
+  gre_v_n, gre_v_sum, gre_v_sq, gre_aw_n, gre_aw_sum, gre_aw_sq
+)
+SELECT
+  term_year, term_season, degree, us_or_international, decision,
+  llm_generated_program, llm_generated_university,
+  SUM(sign)::INTEGER,
+  COALESCE(SUM(sign) FILTER (WHERE gpa BETWEEN 0.01 AND 4.3), 0)::INTEGER,
+  COALESCE(SUM(sign * gpa) FILTER (WHERE gpa BETWEEN 0.01 AND 4.3), 0),
+  COALESCE(SUM(sign * gpa * gpa) FILTER (WHERE gpa BETWEEN 0.01 AND 4.3), 0),
+  COALESCE(SUM(sign) FILTER (WHERE gre BETWEEN 130 AND 170), 0)::INTEGER,
+  COALESCE(SUM(sign * gre) FILTER (WHERE gre BETWEEN 130 AND 170), 0),
+  COALESCE(SUM(sign * gre * gre) FILTER (WHERE gre BETWEEN 130 AND 170), 0),
+  COALESCE(SUM(sign) FILTER (WHERE gre_v BETWEEN 130 AND 170), 0)::INTEGER,
+  COALESCE(SUM(sign * gre_v) FILTER (WHERE gre_v BETWEEN 130 AND 170), 0),
+  COALESCE(SUM(sign * gre_v * gre_v) FILTER (WHERE gre_v BETWEEN 130 AND 170), 0),
+  COALESCE(SUM(sign) FILTER (WHERE gre_aw BETWEEN 0.01 AND 6.0), 0)::INTEGER,
+  COALESCE(SUM(sign * gre_aw) FILTER (WHERE gre_aw BETWEEN 0.01 AND 6.0), 0),
+  COALESCE(SUM(sign * gre_aw * gre_aw) FILTER (WHERE gre_aw BETWEEN 0.01 AND 6.0), 0)
+FROM {source}
+GROUP BY
+  term_year, term_season, degree, us_or_international, decision,
+  llm_generated_program, llm_generated_university
+ON CONFLICT ON CONSTRAINT applicant_summary_key DO UPDATE SET
+  n = s.n + EXCLUDED.n,
+  gpa_n = s.gpa_n + EXCLUDED.gpa_n, gpa_sum = s.gpa_sum + EXCLUDED.gpa_sum,
+  gpa_sq = s.gpa_sq + EXCLUDED.gpa_sq,
+  gre_n = s.gre_n + EXCLUDED.gre_n, gre_sum = s.gre_sum + EXCLUDED.gre_sum,
+  gre_sq = s.gre_sq + EXCLUDED.gre_sq,
+  gre_v_n = s.gre_v_n + EXCLUDED.gre_v_n, gre_v_sum = s.gre_v_sum + EXCLUDED.gre_v_sum,
+  gre_v_sq = s.gre_v_sq + EXCLUDED.gre_v_sq,
+  gre_aw_n = s.gre_aw_n + EXCLUDED.gre_aw_n, gre_aw_sum = s.gre_aw_sum + EXCLUDED.gre_aw_sum,
+  gre_aw_sq = s.gre_aw_sq + EXCLUDED.gre_aw_sq
+""")
+
+# Adds the bin counts of {source} into the histograms.
+_BINS_FOLD = sql.SQL("""
+INSERT INTO applicant_score_bins AS s (
+  term_year, term_season, degree, us_or_international, decision,
+  llm_generated_program, llm_generated_university, score, bin, n
+)
+SELECT
+  term_year, term_season, degree, us_or_international, decision,
+  llm_generated_program, llm_generated_university, v.score, v.bin, SUM(d.sign)::INTEGER
+FROM {source}
+CROSS JOIN LATERAL (VALUES
+  ('gpa', CASE WHEN gpa BETWEEN 0.01 AND 4.3 THEN floor(gpa / 0.01 + 1e-09)::INTEGER END),
+  ('gre', CASE WHEN gre BETWEEN 130 AND 170 THEN floor(gre / 1.0 + 1e-09)::INTEGER END),
+  ('gre_v', CASE WHEN gre_v BETWEEN 130 AND 170 THEN floor(gre_v / 1.0 + 1e-09)::INTEGER END),
+  ('gre_aw', CASE WHEN gre_aw BETWEEN 0.01 AND 6.0 THEN floor(gre_aw / 0.1 + 1e-09)::INTEGER END)
+) AS v(score, bin)
+WHERE v.bin IS NOT NULL
+GROUP BY
+  term_year, term_season, degree, us_or_international, decision,
+  llm_generated_program, llm_generated_university, v.score, v.bin
+ON CONFLICT ON CONSTRAINT applicant_score_bins_key DO UPDATE SET n = s.n + EXCLUDED.n
+""")
+
+# Same bodies as v006/v007, over the decoded transition rows.
+_TRIGGER_FUNCTION = sql.SQL("""
+CREATE OR REPLACE FUNCTION {fn}() RETURNS trigger
+LANGUAGE plpgsql AS $fn$
+BEGIN
+  IF TG_OP = 'TRUNCATE' THEN
+    TRUNCATE {tbl};
+    RETURN NULL;
+  END IF;
+  IF TG_OP = 'INSERT' THEN {insert};
+  END IF;
+  IF TG_OP = 'DELETE' THEN {delete};
+    DELETE FROM {tbl} WHERE n = 0;
+  END IF;
+  IF TG_OP = 'UPDATE' THEN {update};
+    DELETE FROM {tbl} WHERE n = 0;
+  END IF;
+  RETURN NULL;
+END
+$fn$
+""")
+
+# A trigger with transition tables may only fire on one event.
+_TRIGGERS = sql.SQL("""
+CREATE OR REPLACE TRIGGER {name}_ins AFTER INSERT ON applicant_rows
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION {fn}();
+CREATE OR REPLACE TRIGGER {name}_upd AFTER UPDATE ON applicant_rows
+  REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION {fn}();
+CREATE OR REPLACE TRIGGER {name}_del AFTER DELETE ON applicant_rows
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION {fn}();
+CREATE OR REPLACE TRIGGER {name}_trunc AFTER TRUNCATE ON applicant_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION {fn}();
+""")
+
+
+def _trigger_function(name: str, fold: sql.SQL) -> sql.Composed:
+    """``<name>_apply()`` folding the decoded deltas into table ``name``."""
+    return _TRIGGER_FUNCTION.format(
+        fn=sql.SQL(f"{name}_apply"),
+        tbl=sql.SQL(name),
+        **{op.lower(): fold.format(source=delta) for op, delta in _DELTAS.items()},
+    )
+
+
+def _triggers(name: str) -> sql.Composed:
+    """``CREATE TRIGGER`` statements calling ``<name>_apply()`` on ``applicant_rows``."""
+    return _TRIGGERS.format(name=sql.SQL(name), fn=sql.SQL(f"{name}_apply"))
+
+
+CREATE_SUMMARY_TRIGGERS = [
+    _trigger_function("applicant_summary", _SUMMARY_FOLD), _triggers("applicant_summary"),
+]
+CREATE_BINS_TRIGGERS = [
+    _trigger_function("applicant_score_bins", _BINS_FOLD), _triggers("applicant_score_bins"),
+]
+
+
+def copy_rows(conn, batch_size: int = BATCH_SIZE) -> None:
+    """Copy ``applicants`` into ``applicant_rows``, committing each ``p_id`` batch.
+
+    :param conn: Autocommit connection.
+    :param batch_size: ``p_id`` values per batch.
+    :type batch_size: int
+    """
+    low, high = conn.execute(ID_RANGE).fetchone()
+    for start in range(low, high + 1, batch_size):
+        bounds = (start, start + batch_size - 1)
+        with conn.transaction():
+            for stmt in FILL_BATCH:
+                conn.execute(stmt, bounds)
+            conn.execute(COPY_BATCH, bounds)
+
+
+def catch_up(conn, batch_size: int = BATCH_SIZE) -> None:
+    """Copy the rows recorded in ``applicants_changes`` again, one batch at a time.
+
+    Stops after the first batch shorter than ``batch_size``; under the
+    table lock that means the log is empty.
+
+    :param conn: Autocommit connection, or one inside the swap transaction.
+    :param batch_size: Log entries claimed per batch.
+    :type batch_size: int
+    """
+    while True:
+        with conn.transaction():
+            claimed = conn.execute(CLAIM_CHANGES, (batch_size,)).fetchall()
+            p_ids = sorted({p_id for (p_id,) in claimed})
+            if p_ids:
+                for stmt in FILL_CHANGED:
+                    conn.execute(stmt, (p_ids,))
+                conn.execute(DROP_CHANGED, (p_ids, p_ids))
+                conn.execute(COPY_CHANGED, (p_ids,))
+        if len(claimed) < batch_size:
+            return
+
+
+def up(conn) -> None:
+    """Build the dimensions and ``applicant_rows``, then swap in the view."""
+    if conn.execute(SWAPPED).fetchone()[0]:
+        return
+    add_unique_constraint(conn, "applicants", "url")
+    for stmt in CREATE_DIMENSIONS + [CREATE_ROWS, CREATE_CHANGES] + CREATE_CAPTURE:
+        conn.execute(stmt)
+    copy_rows(conn, BATCH_SIZE)
+    catch_up(conn, BATCH_SIZE)
+    conn.execute(CREATE_INDEXES)
+    catch_up(conn, BATCH_SIZE)
+    with conn.transaction():
+        conn.execute(LOCK)
+        catch_up(conn, BATCH_SIZE)
+        for stmt in [RESTART_P_ID, DROP_TABLE] + DROP_CAPTURE + [CREATE_VIEW]:
+            conn.execute(stmt)
+        for stmt in CREATE_SUMMARY_TRIGGERS + CREATE_BINS_TRIGGERS:
+            conn.execute(stmt)
+    conn.execute(ANALYZE)
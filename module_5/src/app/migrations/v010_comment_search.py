@@ -0,0 +1,28 @@
+"""Add a full-text index over ``comments`` (see :mod:`search`).
+
+``comments_tsv`` is a stored generated column, so every insert or update
+keeps it current without application code. Adding it rewrites
+``applicant_rows`` once under an exclusive lock; the GIN index is then
+built ``CONCURRENTLY``, so the two steps run outside a transaction and
+are safe to re-run.
+"""
+
+from psycopg import sql
+
+from . import create_index_concurrently
+
+TRANSACTIONAL = False
+
+# The text search configuration is part of the column; :data:`search.CONFIG` must match.
+ADD_COLUMN = sql.SQL("""
+ALTER TABLE applicant_rows ADD COLUMN IF NOT EXISTS comments_tsv tsvector
+  GENERATED ALWAYS AS (to_tsvector('english'::regconfig, COALESCE(comments, ''))) STORED
+""")
+
+INDEX = ("applicant_rows_comments_tsv_idx", "applicant_rows", ("comments_tsv",))
+
+
+def up(conn) -> None:
+    """Add ``comments_tsv`` and build its GIN index (autocommit connection)."""
+    conn.execute(ADD_COLUMN)
+    create_index_concurrently(conn, *INDEX, using="gin")
@@ -0,0 +1,27 @@
+"""Index the ``/api/applicants`` order without blocking writes (see :mod:`browse`).
+
+``(date_added, p_id)`` serves the unfiltered listing newest first, also
+for the rows without ``date_added``; the other two lead with the most
+common equality filters, so a filtered page is still read in index order
+and stops after ``limit`` rows.
+"""
+
+from . import create_index_concurrently
+
+TRANSACTIONAL = False
+
+INDEXES = (
+    ("applicant_rows_added_idx", "applicant_rows", ("date_added", "p_id")),
+    ("applicant_rows_year_added_idx", "applicant_rows", ("term_year", "date_added", "p_id")),
+    (
+        "applicant_rows_program_added_idx",
+        "applicant_rows",
+        ("llm_generated_program_id", "date_added", "p_id"),
+    ),
+)
+
+
+def up(conn) -> None:
+    """Build each index ``CONCURRENTLY`` (autocommit connection)."""
+    for name, table, columns in INDEXES:
+        create_index_concurrently(conn, name, table, columns)
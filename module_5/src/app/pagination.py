@@ -0,0 +1,43 @@
+"""Opaque cursors for keyset pagination.
+
+A page is requested with the sort key of the last row already seen, never
+with an ``OFFSET``, so page *n* costs the same as page 1. The key travels
+as an opaque token: JSON, base64url-encoded, without padding. Dates and
+other non-JSON values are encoded as strings; the queries cast them back.
+"""
+
+import base64
+import binascii
+import json
+
+
+def encode_cursor(values) -> str:
+    """Encode a sort key as a URL-safe token.
+
+    :param values: The sort-key values of the last row on a page.
+    :return: The token.
+    :rtype: str
+    """
+    raw = json.dumps(list(values), default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(token: str, size: int) -> list:
+    """Decode a token produced by :func:`encode_cursor`.
+
+    :param token: The token from the request.
+    :type token: str
+    :param size: Number of values the sort key must have.
+    :type size: int
+    :return: The sort-key values.
+    :rtype: list
+    :raises ValueError: If the token is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("invalid cursor")
+    return values
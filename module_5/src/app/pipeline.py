@@ -2,10 +2,13 @@
 
 This module coordinates the following steps:
 
-1. Determine which records are already in the database.
-2. Scrape new survey results and write them to a temporary JSON file.
-3. Run an external LLM-hosting script to normalize the data.
-4. Insert normalized records into PostgreSQL.
+1. Scrape new survey results, asking the database per listing page which
+   result IDs are already stored, and write them to a temporary JSON file.
+2. Run an external LLM-hosting script to normalize the data.
+3. Insert normalized records into PostgreSQL.
+4. If rows were inserted, store today's metric snapshot (see :mod:`snapshots`).
+5. With ``DATA_LAKE=1``, append the inserted rows to the Parquet data
+   lake (see :mod:`lake`).
 
 Usage
 -----
@@ -23,9 +26,13 @@ from pathlib import Path
 import subprocess
 import sys
 
-from ..load_data import data_type
-from .db_helper import existing_rids, read_json, insert_records_by_url, TMP_DIR
+import psycopg
+
+from .records import data_type
+from .db_helper import known_rids, read_json, insert_records_bulk, TMP_DIR
 from .clean import run_clean
+from . import lake
+from .snapshots import take_snapshot
 
 
 
@@ -73,10 +80,14 @@ def run_pipeline(max_records: int = 5, delay: float = 0.5) -> dict:
 
     Steps
     -----
-    1. Skip already-existing records.
-    2. Scrape new rows and save to ``CLEAN_JSON``.
-    3. Run LLM-hosting to produce ``FINAL_JSON``.
-    4. Insert normalized rows into the database.
+    1. Scrape new rows (skipping stored result IDs page by page) and save
+       to ``CLEAN_JSON``.
+    2. Run LLM-hosting to produce ``FINAL_JSON``.
+    3. Insert normalized rows into the database.
+    4. Store today's metric snapshot if anything was inserted (a failure
+       is logged, not raised).
+    5. Append the normalized rows that were inserted to the data lake if
+       enabled (a failure is logged, not raised).
 
     :param max_records: Maximum number of new records to scrape.
     :type max_records: int
@@ -85,12 +96,9 @@ def run_pipeline(max_records: int = 5, delay: float = 0.5) -> dict:
     :return: Summary dictionary with counts and status message.
     :rtype: dict
     """
-    # 1. Skip what we already 'have'
-    have = existing_rids()
-
-    # 2. Scrape only NEW and write CLEAN_JSON (inside run_clean)
+    # 1. Scrape only NEW (stored rids checked per page) and write CLEAN_JSON
     n_clean = run_clean(
-        skip_rids=have,
+        known_rids=known_rids,
         max_records=max_records,
         delay=delay,
         out_filename=CLEAN_JSON.name,  # saved into TMP_DIR
@@ -99,13 +107,33 @@ def run_pipeline(max_records: int = 5, delay: float = 0.5) -> dict:
     if n_clean == 0:
         return {"cleaned": 0, "llm": 0, "inserted": 0, "message": "No new rows"}
 
-    # 3. LLM hosting to produce FINAL_JSON
+    # 2. LLM hosting to produce FINAL_JSON
     run_llm_hosting(CLEAN_JSON, FINAL_JSON)
     llm_rows = read_json(FINAL_JSON)
     n_llm = len(llm_rows)
 
-    # 4. Insert into DB
-    inserted = insert_records_by_url(llm_rows, data_type)
+    # 3. Insert into DB
+    urls = set(insert_records_bulk(llm_rows, data_type))
+    inserted = len(urls)
+
+    # 4. Refresh today's trend point; the inserted rows are already committed
+    if inserted:
+        try:
+            take_snapshot()
+        except psycopg.Error:
+            logger.exception("Pipeline: metric snapshot failed")
+
+    # 5. Keep a columnar copy of the new rows for offline analytics; the
+    # first row of a URL is the one that went in, as in the database
+    if lake.ENABLED and urls:
+        try:
+            new = {}
+            for row in map(data_type, llm_rows):
+                if row["url"] in urls:
+                    new.setdefault(row["url"], row)
+            lake.append(list(new.values()))
+        except (OSError, RuntimeError, ValueError):
+            logger.exception("Pipeline: data lake append failed")
 
     msg = f"Cleaned {n_clean}, LLM rows {n_llm}, inserted {inserted}"
 
@@ -1,184 +1,364 @@
 """Predefined database queries for applicant statistics.
 
-This module provides query functions for the ``applicants`` table
-in PostgreSQL. Each function opens a pooled connection, executes
-a SELECT, and returns a Python value or structure.
+This module provides the fixed dashboard metrics for the ``applicants``
+data. Each per-metric function is a thin wrapper over an
+:mod:`analytics` query: it borrows a connection from the shared pool
+(:data:`db.pool`), executes the compiled SELECT, and returns a Python
+value or structure.
+
+All metrics read from ``applicant_summary`` (see :mod:`summary`), the
+trigger-maintained aggregate of ``applicants`` keyed by term, degree,
+citizenship, decision, program and university, so their cost depends on
+the number of groups rather than the number of applicants. Counts are
+``SUM(n)``; averages are ``SUM(x_sum) / SUM(x_n)`` over valid scores.
+
+The ``/analysis`` page uses :func:`dashboard`, which computes all ten
+metrics in one statement on one pooled connection; the per-metric
+functions remain for callers that need a single value.
+:func:`dashboard_from` computes the metrics over any :mod:`analytics`
+engine, e.g. a column store of the data lake (:mod:`lake`).
+
+Every query function is wrapped by :data:`cache.query_cache`, so repeated
+page views are served from memory until the data version changes (after
+an insert) or the TTL expires. With ``COLUMNAR_ENGINE=1`` the metrics are
+answered from the in-memory snapshot of :mod:`columnar` instead.
 """
 
-import psycopg_pool
-import os
+from dataclasses import dataclass
+from decimal import Decimal
+
 from psycopg import sql
 
-PGHOST = os.getenv("PGHOST", "localhost")
-PGDATABASE = os.getenv("PGDATABASE", "gradcafe")
-PGUSER = os.getenv("PGUSER", "postgres")
-PGPASSWORD = os.getenv("PGPASSWORD", "postgres")
-DSN = f"postgresql://{PGUSER}:{PGPASSWORD}@{PGHOST}:5432/{PGDATABASE}"
-pool = psycopg_pool.ConnectionPool(DSN, min_size=1, max_size=5)
+from . import analytics, columnar
+from .cache import query_cache
+from .db import pool
+
+TERM = "Fall 2025"
+
+
+def _rows(q: analytics.Query) -> list[tuple]:
+    """Run an :mod:`analytics` query (in memory if the columnar engine is on)."""
+    if columnar.store.enabled:
+        return columnar.store.execute(q)
+    with pool.connection() as conn, conn.cursor() as cur:
+        return analytics.execute(cur, q)
+
+
+def _scalars(run, q: analytics.Query) -> tuple:
+    """Single-row aggregate query; ``None`` (no valid rows) becomes ``0.0``."""
+    return tuple(0.0 if v is None else v for v in run(q)[0])
+
+
+# Each metric once, over ``run`` (an analytics query -> its rows); the
+# public functions below run them through :func:`_rows` and the cache.
+def _count_fall_2025(run) -> int:
+    return _scalars(run, analytics.query(term=TERM))[0]
+
+
+def _percent_international(run) -> dict[str, int]:
+    counts = dict(run(analytics.query(group_by=["citizenship"])))
+    international = counts.pop("International", 0)
+    us = counts.pop("American", 0)
+    counts.pop(None, None)  # unknown citizenship is in no bucket
+    return {"international_count": international, "us_count": us,
+            "other_count": sum(counts.values())}
+
+
+def _avg_scores(run) -> dict[str, float]:
+    names = ("avg_gpa", "avg_gre", "avg_gre_v", "avg_gre_aw")
+    return dict(zip(names, _scalars(run, analytics.query(aggregates=names))))
+
+
+def _avg_gpa_american_fall2025(run) -> float:
+    q = analytics.query(term=TERM, citizenship="American", aggregates=["avg_gpa"])
+    return _scalars(run, q)[0]
 
 
+def _acceptance_rate_fall2025(run) -> float:
+    return _scalars(run, analytics.query(term=TERM, aggregates=["accept_rate"]))[0]
+
+
+def _avg_gpa_fall2025_acceptances(run) -> float:
+    q = analytics.query(term=TERM, decision="Accepted", aggregates=["avg_gpa"])
+    return _scalars(run, q)[0]
+
+
+def _count_jhu_masters_cs(run) -> int:
+    q = analytics.query(
+        university="Johns Hopkins University", program="Computer Science", degree="Masters"
+    )
+    return _scalars(run, q)[0]
+
+
+def _count_gt_phd_accept(run) -> int:
+    q = analytics.query(
+        term_year=2025, decision="Accepted", university="Georgetown University",
+        program="Computer Science", degree="PhD",
+    )
+    return _scalars(run, q)[0]
+
+
+def _degree_counts_2025(run) -> list[tuple[str, int]]:
+    return run(analytics.query(term_year=2025, group_by=["degree"]))
+
+
+def _top_5_programs(run) -> list[tuple[str, int]]:
+    return run(analytics.query(term_year=2025, group_by=["program"], limit=5))
+
+
+@query_cache.cached
 def count_fall_2025() -> int:
     """Count the number of applicants for Fall 2025.
 
     :return: Number of Fall 2025 applicants.
     :rtype: int
     """
-    stmt = sql.SQL("SELECT COUNT(*) FROM {tbl} WHERE term = {term}").format(
-        tbl=sql.Identifier("applicants"), term=sql.Literal("Fall 2025")
-    )
-    with pool.connection() as conn, conn.cursor() as cur:
-        cur.execute(stmt)
-        return cur.fetchone()[0]
+    return _count_fall_2025(_rows)
 
 
+@query_cache.cached
 def percent_international() -> dict[str, int]:
     """Count applicants by citizenship type.
 
     :return: A dictionary with counts for international, US, and other.
     :rtype: dict[str, int]
     """
-    stmt = sql.SQL("""
-        SELECT
-            COUNT(*) FILTER (WHERE us_or_international = 'International') AS int_c,
-            COUNT(*) FILTER (WHERE us_or_international = 'American') AS us_c,
-            COUNT(*) FILTER (WHERE us_or_international NOT IN ('International', 'American')) AS other_c
-        FROM {tbl}
-    """).format(tbl=sql.Identifier("applicants"))
-    with pool.connection() as conn, conn.cursor() as cur:
-        cur.execute(stmt)
-        row = cur.fetchone()
-    return {"international_count": row[0], "us_count": row[1], "other_count": row[2]}
+    return _percent_international(_rows)
 
 
+@query_cache.cached
 def avg_scores() -> dict[str, float]:
     """Compute average GPA and GRE scores, handling NULLs.
 
     :return: Dictionary of averages.
     :rtype: dict[str, float]
     """
-    stmt = sql.SQL("""
-        SELECT
-            COALESCE(AVG(gpa)    FILTER (WHERE gpa    BETWEEN 0.01 AND 4.3), 0.0),
-            COALESCE(AVG(gre)    FILTER (WHERE gre    BETWEEN 130  AND 170), 0.0),
-            COALESCE(AVG(gre_v)  FILTER (WHERE gre_v  BETWEEN 130  AND 170), 0.0),
-            COALESCE(AVG(gre_aw) FILTER (WHERE gre_aw BETWEEN 0.01 AND 6.0), 0.0)
-        FROM {tbl}
-    """).format(tbl=sql.Identifier("applicants"))
-    with pool.connection() as conn, conn.cursor() as cur:
-        cur.execute(stmt)
-        scores = cur.fetchone()
-    return {"avg_gpa": scores[0], "avg_gre": scores[1], "avg_gre_v": scores[2], "avg_gre_aw": scores[3]}
+    return _avg_scores(_rows)
 
 
+@query_cache.cached
 def avg_gpa_american_fall2025() -> float:
     """Calculate average GPA for American applicants in Fall 2025.
 
     :return: Average GPA. Returns 0.0 if no valid records.
     :rtype: float
     """
-    stmt = sql.SQL("""
-        SELECT COALESCE(AVG(gpa), 0.0) FROM {tbl}
-        WHERE us_or_international = 'American' AND term = 'Fall 2025'
-        AND gpa BETWEEN 0.01 AND 4.3
-    """).format(tbl=sql.Identifier("applicants"))
-    with pool.connection() as conn, conn.cursor() as cur:
-        cur.execute(stmt)
-        return cur.fetchone()[0]
+    return _avg_gpa_american_fall2025(_rows)
 
 
+@query_cache.cached
 def acceptance_rate_fall2025() -> float:
     """Compute acceptance rate for Fall 2025.
 
     :return: Acceptance rate as a percentage. Returns 0.0 if no records.
     :rtype: float
     """
-    stmt = sql.SQL("""
-        SELECT COALESCE(
-            (COUNT(*) FILTER (WHERE status LIKE '%Accepted%')::numeric * 100)
-            / NULLIF(COUNT(*)::numeric, 0),
-        0.0)
-        FROM {tbl} WHERE term = 'Fall 2025'
-    """).format(tbl=sql.Identifier("applicants"))
-    with pool.connection() as conn, conn.cursor() as cur:
-        cur.execute(stmt)
-        return cur.fetchone()[0]
+    return _acceptance_rate_fall2025(_rows)
 
 
+@query_cache.cached
 def avg_gpa_fall2025_acceptances() -> float:
     """Compute average GPA of accepted Fall 2025 applicants.
 
     :return: Average GPA. Returns 0.0 if no valid records.
     :rtype: float
     """
-    stmt = sql.SQL("""
-        SELECT COALESCE(AVG(gpa), 0.0) FROM {tbl}
-        WHERE term = 'Fall 2025' AND status LIKE '%Accepted%'
-        AND gpa BETWEEN 0.01 AND 4.3
-    """).format(tbl=sql.Identifier("applicants"))
-    with pool.connection() as conn, conn.cursor() as cur:
-        cur.execute(stmt)
-        return cur.fetchone()[0]
+    return _avg_gpa_fall2025_acceptances(_rows)
 
 
+@query_cache.cached
 def count_jhu_masters_cs() -> int:
     """Count JHU Masters in Computer Science applicants.
 
     :return: Count of applicants.
     :rtype: int
     """
-    stmt = sql.SQL("""
-        SELECT COUNT(*) FROM {tbl}
-        WHERE llm_generated_university = 'Johns Hopkins University'
-        AND llm_generated_program = 'Computer Science' AND degree = 'Masters'
-    """).format(tbl=sql.Identifier("applicants"))
-    with pool.connection() as conn, conn.cursor() as cur:
-        cur.execute(stmt)
-        return cur.fetchone()[0]
+    return _count_jhu_masters_cs(_rows)
 
 
+@query_cache.cached
 def count_gt_phd_accept() -> int:
     """Count Georgetown PhD Computer Science acceptances in 2025.
 
     :return: Count of accepted applicants.
     :rtype: int
     """
-    stmt = sql.SQL("""
-        SELECT COUNT(*) FROM {tbl}
-        WHERE term LIKE '%2025%' AND status LIKE '%Accepted%'
-        AND llm_generated_university = 'Georgetown University'
-        AND llm_generated_program = 'Computer Science' AND degree = 'PhD'
-    """).format(tbl=sql.Identifier("applicants"))
-    with pool.connection() as conn, conn.cursor() as cur:
-        cur.execute(stmt)
-        return cur.fetchone()[0]
+    return _count_gt_phd_accept(_rows)
 
 
+@query_cache.cached
 def degree_counts_2025() -> list[tuple[str, int]]:
     """Return counts of applicants by degree for 2025.
 
     :return: List of (degree, count) tuples.
     :rtype: list[tuple[str, int]]
     """
-    stmt = sql.SQL("""
-        SELECT degree, COUNT(*) AS num_entries FROM {tbl}
-        WHERE term LIKE '%2025%' GROUP BY degree ORDER BY num_entries DESC
-    """).format(tbl=sql.Identifier("applicants"))
-    with pool.connection() as conn, conn.cursor() as cur:
-        cur.execute(stmt)
-        return cur.fetchall()
+    return _degree_counts_2025(_rows)
 
 
+@query_cache.cached
 def top_5_programs() -> list[tuple[str, int]]:
     """Return top 5 programs by number of 2025 applicants.
 
     :return: List of (program, count) tuples.
     :rtype: list[tuple[str, int]]
     """
-    stmt = sql.SQL("""
-        SELECT llm_generated_program AS program, COUNT(*) AS num_entries
-        FROM {tbl} WHERE term LIKE '%2025%' GROUP BY llm_generated_program
-        ORDER BY num_entries DESC LIMIT 5
-    """).format(tbl=sql.Identifier("applicants"))
+    return _top_5_programs(_rows)
+
+
+@dataclass(frozen=True)
+class Dashboard:  # pylint: disable=too-many-instance-attributes
+    """All ``/analysis`` metrics, as returned by :func:`dashboard`.
+
+    Field values match the per-metric functions of this module.
+    """
+
+    applicant_count: int
+    citizenship: dict[str, int]
+    avg_scores: dict[str, float]
+    avg_gpa_us: float
+    accept_rate: float | Decimal
+    avg_gpa_accept: float
+    jhu_ms_cs: int
+    georgetown_phd_cs: int
+    degree_counts: list[tuple[str, int]]
+    top_programs: list[tuple[str, int]]
+
+    @property
+    def percent_international(self) -> float:
+        """Share of international applicants among all applicants, in percent.
+
+        :rtype: float
+        """
+        total = sum(self.citizenship.values())
+        return self.citizenship["international_count"] / total * 100 if total else 0.0
+
+    def as_template_data(self) -> dict:
+        """Return the ``data`` mapping rendered by ``analysis.html``.
+
+        :rtype: dict
+        """
+        return {
+            "q1_applicant_count": self.applicant_count,
+            "q2_counts": self.citizenship,
+            "q2_percent_international": self.percent_international,
+            "q3_avgs": self.avg_scores,
+            "q4_avg_gpa_us": self.avg_gpa_us,
+            "q5_accept_rate": self.accept_rate,
+            "q6_avg_gpa_accept": self.avg_gpa_accept,
+            "q7_jhu_ms_cs": self.jhu_ms_cs,
+            "q8_georgetown_phd_cs": self.georgetown_phd_cs,
+            "q9_degree_counts": self.degree_counts,
+            "q10_top_programs": self.top_programs,
+        }
+
+
+# One scan of the summary: scalar metrics as FILTER aggregates, the two
+# rankings as JSON arrays from CTEs over the same rows.
+DASHBOARD = sql.SQL("""
+    WITH s AS (
+        SELECT *, COALESCE(term_year = 2025 AND term_season = 'Fall', FALSE) AS fall25
+        FROM {tbl}
+    ),
+    totals AS (
+        SELECT
+            COALESCE(SUM(n) FILTER (WHERE fall25), 0) AS fall25_n,
+            COALESCE(SUM(n) FILTER (WHERE us_or_international = 'International'), 0) AS int_c,
+            COALESCE(SUM(n) FILTER (WHERE us_or_international = 'American'), 0) AS us_c,
+            COALESCE(SUM(n) FILTER (
+                WHERE us_or_international NOT IN ('International', 'American')), 0) AS other_c,
+            COALESCE(SUM(gpa_sum)    / NULLIF(SUM(gpa_n), 0),    0.0) AS avg_gpa,
+            COALESCE(SUM(gre_sum)    / NULLIF(SUM(gre_n), 0),    0.0) AS avg_gre,
+            COALESCE(SUM(gre_v_sum)  / NULLIF(SUM(gre_v_n), 0),  0.0) AS avg_gre_v,
+            COALESCE(SUM(gre_aw_sum) / NULLIF(SUM(gre_aw_n), 0), 0.0) AS avg_gre_aw,
+            COALESCE(SUM(gpa_sum) FILTER (WHERE fall25 AND us_or_international = 'American')
+                     / NULLIF(SUM(gpa_n) FILTER (
+                         WHERE fall25 AND us_or_international = 'American'), 0), 0.0)
+                AS avg_gpa_us,
+            COALESCE(
+                (COALESCE(SUM(n) FILTER (WHERE fall25 AND decision = 'Accepted'), 0)::numeric
+                 * 100) / NULLIF(SUM(n) FILTER (WHERE fall25), 0)::numeric,
+            0.0) AS accept_rate,
+            COALESCE(SUM(gpa_sum) FILTER (WHERE fall25 AND decision = 'Accepted')
+                     / NULLIF(SUM(gpa_n) FILTER (
+                         WHERE fall25 AND decision = 'Accepted'), 0), 0.0) AS avg_gpa_accept,
+            COALESCE(SUM(n) FILTER (
+                WHERE llm_generated_university = 'Johns Hopkins University'
+                AND llm_generated_program = 'Computer Science' AND degree = 'Masters'), 0)
+                AS jhu_ms_cs,
+            COALESCE(SUM(n) FILTER (
+                WHERE term_year = 2025 AND decision = 'Accepted'
+                AND llm_generated_university = 'Georgetown University'
+                AND llm_generated_program = 'Computer Science' AND degree = 'PhD'), 0) AS gt_phd_cs
+        FROM s
+    ),
+    degrees AS (
+        SELECT degree, SUM(n) AS num_entries FROM s
+        WHERE term_year = 2025 GROUP BY degree HAVING SUM(n) > 0
+    ),
+    programs AS (
+        SELECT llm_generated_program AS program, SUM(n) AS num_entries FROM s
+        WHERE term_year = 2025 GROUP BY llm_generated_program
+        HAVING SUM(n) > 0 ORDER BY num_entries DESC LIMIT 5
+    )
+    SELECT totals.*,
+        (SELECT COALESCE(json_agg(json_build_array(degree, num_entries)
+                                  ORDER BY num_entries DESC), '[]') FROM degrees),
+        (SELECT COALESCE(json_agg(json_build_array(program, num_entries)
+                                  ORDER BY num_entries DESC), '[]') FROM programs)
+    FROM totals
+""").format(tbl=sql.Identifier("applicant_summary"))
+
+
+def dashboard_from(run) -> Dashboard:
+    """Compute every ``/analysis`` metric with one query per metric.
+
+    Uncached and independent of the configured engine, e.g. over a
+    :class:`columnar.ColumnStore` of another data set.
+
+    :param run: Runs an :mod:`analytics` query and returns its rows,
+                e.g. :meth:`columnar.ColumnStore.execute`.
+    :type run: Callable[[analytics.Query], list[tuple]]
+    :return: The ten dashboard metrics.
+    :rtype: Dashboard
+    """
+    return Dashboard(
+        applicant_count=_count_fall_2025(run),
+        citizenship=_percent_international(run),
+        avg_scores=_avg_scores(run),
+        avg_gpa_us=_avg_gpa_american_fall2025(run),
+        accept_rate=_acceptance_rate_fall2025(run),
+        avg_gpa_accept=_avg_gpa_fall2025_acceptances(run),
+        jhu_ms_cs=_count_jhu_masters_cs(run),
+        georgetown_phd_cs=_count_gt_phd_accept(run),
+        degree_counts=_degree_counts_2025(run),
+        top_programs=_top_5_programs(run),
+    )
+
+
+@query_cache.cached
+def dashboard() -> Dashboard:
+    """Compute every ``/analysis`` metric in a single round trip.
+
+    :return: The ten dashboard metrics.
+    :rtype: Dashboard
+    """
+    if columnar.store.enabled:
+        return dashboard_from(columnar.store.execute)
     with pool.connection() as conn, conn.cursor() as cur:
-        cur.execute(stmt)
-        return cur.fetchall()
\ No newline at end of file
+        cur.execute(DASHBOARD)
+        row = cur.fetchone()
+    return Dashboard(
+        applicant_count=row[0],
+        citizenship={"international_count": row[1], "us_count": row[2], "other_count": row[3]},
+        avg_scores={
+            "avg_gpa": row[4], "avg_gre": row[5], "avg_gre_v": row[6], "avg_gre_aw": row[7],
+        },
+        avg_gpa_us=row[8],
+        accept_rate=row[9],
+        avg_gpa_accept=row[10],
+        jhu_ms_cs=row[11],
+        georgetown_phd_cs=row[12],
+        degree_counts=[tuple(pair) for pair in row[13]],
+        top_programs=[tuple(pair) for pair in row[14]],
+    )
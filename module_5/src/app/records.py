@@ -0,0 +1,180 @@
+"""Normalize scraped applicant records into ``applicants`` rows.
+
+Shared by the JSON loader (:mod:`load_data`), the insert helpers
+(:mod:`app.db_helper`) and the pipeline, so every writer derives the same
+columns from the same raw fields.
+"""
+
+from datetime import date, datetime
+import math
+import re
+
+
+# ---------------------------------------------------------------------
+# Data Type: TEXT
+# Normalize string format
+# ---------------------------------------------------------------------
+def norm_str(value):
+    """Normalize a value into a clean string.
+
+    - Converts None → ``""``
+    - Strips leading/trailing whitespace
+    """
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+# ---------------------------------------------------------------------
+# Data Type: DATE
+# Date format
+# ---------------------------------------------------------------------
+def to_date(added_date):
+    """Convert a date string to a ``datetime.date``.
+
+    Expects format like ``"January 1, 2025"``.
+    Returns ``""`` if invalid to preserve current behavior.
+    """
+    if not added_date:
+        return ""
+
+    added_date_s = added_date.strip()
+    try:
+        return datetime.strptime(added_date_s, "%B %d, %Y").date()
+    except ValueError:
+        return ""
+
+
+# ---------------------------------------------------------------------
+# Data Type: FLOAT
+# Float format for scores
+# ---------------------------------------------------------------------
+def to_float(score):
+    """Convert a score to float.
+
+    Handles numeric strings, removes "GPA" prefix, ignores empty/invalid values.
+    """
+    if score is None or score == "":
+        return None
+
+    score_s = str(score).replace("GPA", "").strip()
+    try:
+        score_f = float(score_s)
+        return score_f if math.isfinite(score_f) else None
+    except (TypeError, ValueError):  # narrow exception (fixes W0718)
+        return None
+
+
+# ---------------------------------------------------------------------
+# Derived columns: rid, term_season/term_year, decision/decision_date
+# ---------------------------------------------------------------------
+RID_RE = re.compile(r"/result/(\d+)")
+TERM_SEASON_RE = re.compile(r"(?i)\b(Fall|Spring|Summer|Winter)\b")
+TERM_YEAR_RE = re.compile(r"\b(20\d{2})\b")
+
+# Same decisions as ``clean.status``; the date is either the cleaned
+# "D Mon" form ("Accepted on 1 Mar") or the raw "dd/mm[/yyyy]" form.
+DECISION_RE = re.compile(
+    r"""(?ix)
+    \b(Accepted|Rejected|Wait\s*listed|Interview(?:ed)?)
+    (?:\s*on\s*
+        (?:(\d{1,2})\s+([A-Za-z]{3})
+          |(\d{1,2})/(\d{1,2})(?:/(\d{4}))?)
+    )?
+    """
+)
+DECISIONS = ("Accepted", "Rejected", "Waitlisted", "Interview")
+
+
+def to_rid(url):
+    """Return the numeric GradCafe result id in ``url`` (``None`` if absent)."""
+    m = RID_RE.search(norm_str(url))
+    return int(m.group(1)) if m else None
+
+
+def term_parts(term):
+    """Split a term like ``"Fall 2025"`` into ``("Fall", 2025)``.
+
+    Either part is ``None`` when it cannot be found.
+    """
+    term_s = norm_str(term)
+    m = TERM_SEASON_RE.search(term_s)
+    season = m.group(1).title() if m else None
+    year = TERM_YEAR_RE.search(term_s)
+    return season, int(year.group(1)) if year else None
+
+
+def _safe_date(year, month, day):
+    """Return ``date(year, month, day)`` or ``None`` if it does not exist."""
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def decision_parts(status, added=None):
+    """Return ``(decision, decision_date)`` for a status string.
+
+    ``decision`` is one of :data:`DECISIONS` (``None`` if absent). Statuses
+    stored by ``clean.status`` carry no year ("Accepted on 1 Mar"); it is
+    taken from ``added`` (the ``date_added`` date), stepping back one year
+    when the decision would otherwise fall after the post was added.
+    """
+    m = DECISION_RE.search(norm_str(status))
+    if not m:
+        return None, None
+
+    word = m.group(1).lower().replace(" ", "")
+    decision = "Waitlisted" if word.startswith("wait") else word[:9].title()
+
+    if m.group(2):
+        try:
+            month = datetime.strptime(m.group(3).title(), "%b").month
+        except ValueError:
+            return decision, None
+        day, year = int(m.group(2)), None
+    elif m.group(4):
+        day, month = int(m.group(4)), int(m.group(5))
+        year = int(m.group(6)) if m.group(6) else None
+    else:
+        return decision, None
+
+    if year is None:
+        if not isinstance(added, date):
+            return decision, None
+        year = added.year
+        when = _safe_date(year, month, day)
+        if when and when > added:
+            year -= 1
+    return decision, _safe_date(year, month, day)
+
+
+# ---------------------------------------------------------------------
+# Data Type SETUP
+# ---------------------------------------------------------------------
+def data_type(data: dict):
+    """Normalize and convert a single applicant record into a dictionary."""
+    added = to_date(data.get("date_added"))
+    season, year = term_parts(data.get("term"))
+    decision, decided = decision_parts(data.get("status"), added)
+    return {
+        "program": norm_str(data.get("program")),
+        "comments": norm_str(data.get("comments")),
+        "date_added": added,
+        "url": norm_str(data.get("url")),
+        "status": norm_str(data.get("status")),
+        "term": norm_str(data.get("term")),
+        "us_or_international": norm_str(data.get("US/International")),
+        "gpa": to_float(data.get("GPA")),
+        "gre": to_float(data.get("GRE")),
+        "gre_v": to_float(data.get("GRE_V")),
+        "gre_aw": to_float(data.get("GRE_AW")),
+        "degree": norm_str(data.get("Degree")),
+        "llm_generated_program": norm_str(data.get("llm-generated-program")),
+        "llm_generated_university": norm_str(data.get("llm-generated-university")),
+        "term_season": season,
+        "term_year": year,
+        "decision": decision,
+        "decision_date": decided,
+        "rid": to_rid(data.get("url")),
+    }
@@ -0,0 +1,245 @@
+"""Bulk re-standardization of the ``llm_generated_*`` columns.
+
+When the model, prompt or canonical lists change, every stored row can be
+re-standardized in place without exporting JSON:
+
+1. Stream ``(p_id, program)`` from ``applicants`` through a server-side
+   cursor, in ``p_id`` order, starting after the last checkpoint.
+2. Standardize only the distinct ``program`` values not seen before, on a
+   process pool running the ``llm_hosting`` backends.
+3. Encode the results as dimension ids (:mod:`dimensions`), COPY them
+   into a temp table and apply them to ``applicant_rows`` with one
+   ``UPDATE ... FROM`` per batch.
+4. Commit and record the batch's last ``p_id`` so an interrupted run
+   resumes where it stopped.
+
+Usage
+-----
+
+.. code-block:: bash
+
+   python -m src.run restandardize --backend vector --workers 0
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import importlib.util
+import json
+import logging
+from pathlib import Path
+import sys
+import time
+
+from psycopg import sql
+
+from . import columnar, dimensions
+from .cache import query_cache
+from .db import pool
+from .db_helper import TMP_DIR
+
+CHECKPOINT = TMP_DIR / "restandardize.ckpt.json"
+LLM_HOSTING_DIR = Path(__file__).resolve().parent / "llm_hosting"
+BATCH_SIZE = 5000
+
+logger = logging.getLogger(__name__)
+
+# Per-process standardizer module (llm_hosting/app.py), see _load_standardizer.
+_STANDARDIZER = None
+
+SELECT_ROWS = sql.SQL(
+    "SELECT {pid}, {prog} FROM {tbl} WHERE {pid} > %s ORDER BY {pid}"
+).format(
+    pid=sql.Identifier("p_id"),
+    prog=sql.Identifier("program"),
+    tbl=sql.Identifier("applicants"),
+)
+
+CREATE_STAGE = sql.SQL("""
+    CREATE TEMP TABLE IF NOT EXISTS {stage} (
+        p_id INTEGER PRIMARY KEY,
+        llm_generated_program_id INTEGER,
+        llm_generated_university_id INTEGER
+    ) ON COMMIT DELETE ROWS
+""").format(stage=sql.Identifier("restandardize_stage"))
+
+COPY_STAGE = sql.SQL(
+    "COPY {stage} (p_id, llm_generated_program_id, llm_generated_university_id) FROM STDIN"
+).format(stage=sql.Identifier("restandardize_stage"))
+
+APPLY_STAGE = sql.SQL("""
+    UPDATE {tbl} AS a
+    SET llm_generated_program_id = s.llm_generated_program_id,
+        llm_generated_university_id = s.llm_generated_university_id
+    FROM {stage} AS s
+    WHERE a.p_id = s.p_id
+      AND (a.llm_generated_program_id IS DISTINCT FROM s.llm_generated_program_id
+           OR a.llm_generated_university_id IS DISTINCT FROM s.llm_generated_university_id)
+""").format(tbl=dimensions.APPLICANT_ROWS, stage=sql.Identifier("restandardize_stage"))
+
+# Positions of an update tuple, for :meth:`dimensions.DimensionCache.encode`.
+_UPDATE_COLUMNS = ("p_id", "llm_generated_program", "llm_generated_university")
+
+
+def _load_standardizer(backend: str | None = None):
+    """Import ``llm_hosting/app.py`` in this process and select ``backend``.
+
+    :param backend: Backend name (``llama``, ``rules``, ``stub``, ``vector``);
+                    ``None`` keeps the module's ``LLM_BACKEND`` default.
+    :type backend: str | None
+    :return: The loaded module.
+    """
+    global _STANDARDIZER  # pylint: disable=global-statement
+    if _STANDARDIZER is None:
+        if str(LLM_HOSTING_DIR) not in sys.path:
+            sys.path.insert(0, str(LLM_HOSTING_DIR))  # for its sibling imports
+        spec = importlib.util.spec_from_file_location(
+            "llm_hosting_app", LLM_HOSTING_DIR / "app.py"
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _STANDARDIZER = module
+    if backend:
+        _STANDARDIZER.set_backend(backend)
+    return _STANDARDIZER
+
+
+def _standardize_chunk(texts: list[str]) -> list[tuple[str, str]]:
+    """Standardize a chunk of program strings in the current process.
+
+    :param texts: Raw ``program`` values.
+    :type texts: list[str]
+    :return: ``(program, university)`` per input, in order.
+    :rtype: list[tuple[str, str]]
+    """
+    results = _load_standardizer().get_backend().standardize_many(texts)
+    return [(r["standardized_program"], r["standardized_university"]) for r in results]
+
+
+def _chunks(items: list, size: int):
+    """Yield consecutive slices of ``items`` with at most ``size`` elements."""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def read_checkpoint() -> dict:
+    """Return the saved progress, or a fresh start if there is none.
+
+    :return: ``{"last_p_id": int, "scanned": int, "updated": int}``.
+    :rtype: dict
+    """
+    try:
+        with CHECKPOINT.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {"last_p_id": 0, "scanned": 0, "updated": 0}
+
+
+def write_checkpoint(state: dict) -> None:
+    """Persist progress atomically (write-then-rename).
+
+    :param state: Progress dictionary as returned by :func:`read_checkpoint`.
+    :type state: dict
+    """
+    tmp = CHECKPOINT.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(state, f)
+    tmp.replace(CHECKPOINT)
+
+
+def apply_batch(conn, rows: list[tuple[int, str, str]]) -> int:
+    """Write standardized values for one batch and commit.
+
+    :param conn: Open connection used for writes.
+    :param rows: ``(p_id, program, university)`` tuples.
+    :type rows: list[tuple[int, str, str]]
+    :return: Number of rows whose values actually changed.
+    :rtype: int
+    """
+    rows = dimensions.cache.encode(rows, _UPDATE_COLUMNS)
+    with conn.cursor() as cur:
+        cur.execute(CREATE_STAGE)
+        with cur.copy(COPY_STAGE) as cp:
+            for row in rows:
+                cp.write_row(row)
+        cur.execute(APPLY_STAGE)
+        changed = cur.rowcount
+    conn.commit()
+    if changed:
+        query_cache.bump()
+        columnar.store.reset()
+    return changed
+
+
+def restandardize(
+    batch_size: int = BATCH_SIZE,
+    workers: int = 2,
+    backend: str | None = None,
+    restart: bool = False,
+) -> dict:
+    """Re-standardize every row of ``applicants`` after the last checkpoint.
+
+    :param batch_size: Rows fetched, standardized and written per batch.
+    :type batch_size: int
+    :param workers: Worker processes; ``0`` standardizes in this process.
+    :type workers: int
+    :param backend: ``llm_hosting`` backend name (default ``LLM_BACKEND``).
+    :type backend: str | None
+    :param restart: Ignore (and overwrite) an existing checkpoint.
+    :type restart: bool
+    :return: Final progress: ``last_p_id``, ``scanned``, ``updated``,
+             ``distinct_programs`` and ``rows_per_sec``.
+    :rtype: dict
+    """
+    state = {"last_p_id": 0, "scanned": 0, "updated": 0} if restart else read_checkpoint()
+    memo: dict[str, tuple[str, str]] = {}
+    chunk = max(batch_size // max(workers, 1) // 4, 1)
+    started = time.perf_counter()
+    scanned_here = 0
+
+    executor = None
+    if workers > 0:
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_load_standardizer, initargs=(backend,)
+        )
+    else:
+        _load_standardizer(backend)
+
+    try:
+        with pool.connection() as read_conn, pool.connection() as write_conn:
+            # Named cursor = server-side: rows are streamed, not fetched at once.
+            with read_conn.cursor(name="restandardize_scan") as cur:
+                cur.itersize = batch_size
+                cur.execute(SELECT_ROWS, (state["last_p_id"],))
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+
+                    todo = sorted({prog or "" for _pid, prog in rows} - memo.keys())
+                    parts = list(_chunks(todo, chunk))
+                    mapper = executor.map if executor else map
+                    for texts, results in zip(parts, mapper(_standardize_chunk, parts)):
+                        memo.update(zip(texts, results))
+
+                    updates = [(pid, *memo[prog or ""]) for pid, prog in rows]
+                    state["updated"] += apply_batch(write_conn, updates)
+                    state["scanned"] += len(rows)
+                    state["last_p_id"] = rows[-1][0]
+                    write_checkpoint(state)
+
+                    scanned_here += len(rows)
+                    rate = scanned_here / max(time.perf_counter() - started, 1e-9)
+                    logger.info(
+                        "restandardize: p_id<=%s scanned=%s updated=%s (%.0f rows/s)",
+                        state["last_p_id"], state["scanned"], state["updated"], rate,
+                    )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    CHECKPOINT.unlink(missing_ok=True)  # finished: next run starts over
+    return dict(
+        state,
+        distinct_programs=len(memo),
+        rows_per_sec=scanned_here / elapsed,
+    )
@@ -6,9 +6,22 @@ from flask import (
     flash,
     jsonify,
     current_app,
+    request,
+    Response,
 )
 import threading
-from . import query_data
+from . import (
+    analytics,
+    approximate,
+    browse,
+    distributions,
+    export,
+    query_data,
+    search,
+    snapshots,
+)
+from .cache import query_cache
+from .db import pool
 from .pipeline import run_pipeline
 
 bp = Blueprint("main", __name__)
@@ -29,35 +42,238 @@ def index():
 def analysis():
     """Render the analysis dashboard with precomputed metrics.
 
-    Queries multiple metrics from the database via :mod:`query_data` and
-    computes percentages for display.
+    All metrics come from one :func:`query_data.dashboard` statement, so a
+    page view costs a single pool checkout and database round trip.
+
+    ``?approx=<percent>`` (and optionally ``&method=bernoulli``) estimates
+    the metrics from a sample instead (see :mod:`approximate`); they are
+    shown as ``≈ value ± margin``. Invalid values fall back to the exact
+    metrics with a warning.
 
     :return: Rendered HTML page with data injected.
     :rtype: str
     """
-    data = {
-        "q1_applicant_count": query_data.count_fall_2025(),
-        "q2_counts": query_data.percent_international(),
-        "q2_percent_international": None,
-        "q3_avgs": query_data.avg_scores(),
-        "q4_avg_gpa_us": query_data.avg_gpa_american_fall2025(),
-        "q5_accept_rate": query_data.acceptance_rate_fall2025(),
-        "q6_avg_gpa_accept": query_data.avg_gpa_fall2025_acceptances(),
-        "q7_jhu_ms_cs": query_data.count_jhu_masters_cs(),
-        "q8_georgetown_phd_cs": query_data.count_gt_phd_accept(),
-        "q9_degree_counts": query_data.degree_counts_2025(),
-        "q10_top_programs": query_data.top_5_programs(),
-    }
-
-    c = data["q2_counts"]
-    total = c["international_count"] + c["us_count"] + c["other_count"]
-    data["q2_percent_international"] = (
-        (c["international_count"] / total * 100) if total else 0.0
-    )
-
+    percent = request.args.get("approx", type=float)
+    dash = None
+    if percent is not None:
+        try:
+            dash = approximate.dashboard(percent, request.args.get("method", "system"))
+        except ValueError as exc:
+            flash(f"Approximate mode unavailable: {exc}", "warning")
+    data = (dash or query_data.dashboard()).as_template_data()
     return render_template("analysis.html", data=data, term_label="Fall 2025")
 
 
+@bp.route("/api/analytics")
+def api_analytics():
+    """Run a parameterized aggregate query (see :mod:`analytics`).
+
+    Query parameters: any dimension as a filter (repeatable), ``term``,
+    ``group_by``, ``agg``, ``order_by`` and ``limit``, e.g.
+    ``/api/analytics?term=Fall 2025&group_by=degree&agg=count,avg_gpa``.
+
+    :return: JSON ``{"query": ..., "rows": [...]}``, or ``{"error": ...}``
+             with status 400 for an invalid query.
+    :rtype: tuple[flask.Response, int]
+    """
+    try:
+        q = analytics.from_args(request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify({"query": analytics.describe(q), "rows": analytics.run(q)}), 200
+
+
+@bp.route("/api/cube")
+def api_cube():
+    """Drill down one level of the summary cube (see :func:`analytics.drilldown`).
+
+    Takes the same parameters as ``/api/analytics``; ``group_by`` is the
+    level to expand and defaults to ``term_year``, and the aggregates
+    default to counts, means and standard deviations, e.g.
+    ``/api/cube?degree=PhD&group_by=university&limit=10``.
+
+    :return: JSON ``{"query", "cells", "next"}``, or ``{"error": ...}``
+             with status 400 for an invalid query.
+    :rtype: tuple[flask.Response, int]
+    """
+    args = request.args.copy()
+    args.setdefault("group_by", "term_year")
+    args.setdefault("agg", ",".join(analytics.DRILL_AGGREGATES))
+    try:
+        q = analytics.from_args(args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify(analytics.drilldown(q)), 200
+
+
+@bp.route("/api/histogram")
+def api_histogram():
+    """Histogram of one score over any filter combination.
+
+    Query parameters: ``score`` (``gpa``, ``gre``, ``gre_v``, ``gre_aw``;
+    default ``gpa``), ``width`` (a multiple of the stored bin width) and
+    the ``/api/analytics`` filters, e.g.
+    ``/api/histogram?score=gpa&width=0.1&term=Fall 2025&degree=PhD``.
+
+    :return: JSON from :meth:`distributions.Histogram.as_dict` plus the
+             filters, or ``{"error": ...}`` with status 400.
+    :rtype: tuple[flask.Response, int]
+    """
+    try:
+        q = analytics.from_args(request.args)
+        hist = distributions.histogram(request.args.get("score", "gpa"), q)
+        if request.args.get("width"):
+            hist = hist.coarsen(float(request.args["width"]))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify(dict(hist.as_dict(), filters=analytics.describe(q)["filters"])), 200
+
+
+@bp.route("/api/percentiles")
+def api_percentiles():
+    """Percentiles of one score over any filter combination.
+
+    Query parameters: ``score`` (default ``gpa``), ``p`` (repeatable or
+    comma-separated; default 25, 50, 75, 90) and the ``/api/analytics``
+    filters, e.g. ``/api/percentiles?score=gre&p=50,90&program=Computer Science``.
+
+    :return: JSON ``{"score", "filters", "count", "percentiles": {p: value}}``,
+             or ``{"error": ...}`` with status 400.
+    :rtype: tuple[flask.Response, int]
+    """
+    score = request.args.get("score", "gpa")
+    try:
+        q = analytics.from_args(request.args)
+        ps = [float(p) for raw in request.args.getlist("p") for p in raw.split(",") if p]
+        hist = distributions.histogram(score, q)
+        values = {f"{p:g}": hist.percentile(p) for p in ps or distributions.DEFAULT_PERCENTILES}
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify({
+        "score": score,
+        "filters": analytics.describe(q)["filters"],
+        "count": hist.count,
+        "percentiles": values,
+    }), 200
+
+
+@bp.route("/api/trends")
+def api_trends():
+    """History of dashboard metrics from the daily snapshots.
+
+    Reads only ``metric_snapshots`` (one row per day). Query parameters:
+    ``series`` (repeatable or comma-separated; default all, see
+    :data:`snapshots.SERIES`) and ``days`` (window length; default all),
+    e.g. ``/api/trends?series=accept_rate,percent_international&days=90``.
+
+    :return: JSON ``{"series": [...], "points": [{"day", ...}, ...]}``, or
+             ``{"error": ...}`` with status 400.
+    :rtype: tuple[flask.Response, int]
+    """
+    series = [s for raw in request.args.getlist("series") for s in raw.split(",") if s]
+    series = series or list(snapshots.SERIES)
+    try:
+        days = request.args.get("days", type=int)
+        if "days" in request.args and days is None:
+            raise ValueError("days must be an integer")
+        points = snapshots.trend(series, days)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify({"series": series, "points": points}), 200
+
+
+@bp.route("/api/applicants")
+def api_applicants():
+    """Browse applicant rows, newest first (see :mod:`browse`).
+
+    Query parameters: equality filters on the stored columns (repeatable,
+    e.g. ``degree=PhD&degree=Masters``), ``<column>_min``/``<column>_max``
+    ranges, ``fields`` (comma-separated output columns), ``limit`` and
+    the ``cursor`` of the previous page. ``format=csv`` or ``format=jsonl``
+    streams every matching row instead of one page, e.g.
+    ``/api/applicants?term_year=2025&gpa_min=3.8&fields=url,gpa&format=csv``.
+
+    :return: JSON ``{"fields", "rows", "next"}``, a streamed CSV/JSONL
+             download, or ``{"error": ...}`` with status 400.
+    :rtype: flask.Response | tuple[flask.Response, int]
+    """
+    fmt = request.args.get("format", "json")
+    cursor = request.args.get("cursor") or None
+    try:
+        listing = browse.from_args(request.args)
+        if fmt != "json":
+            chunks = browse.export(listing, fmt, cursor)
+            return Response(chunks, mimetype=browse.FORMATS[fmt], headers={
+                "Content-Disposition": f"attachment; filename=applicants.{fmt}",
+            })
+        limit = request.args.get("limit", type=int)
+        if "limit" in request.args and limit is None:
+            raise ValueError("limit must be an integer")
+        page = browse.page(listing, cursor, limit or browse.DEFAULT_LIMIT)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify({"fields": list(listing.fields), **page}), 200
+
+
+@bp.route("/api/export")
+def api_export():
+    """Bulk-export applicant rows as a gzip download (see :mod:`export`).
+
+    Streams ``COPY ... TO STDOUT`` straight into the response. Query
+    parameters: ``format`` (``csv``, default, or ``jsonl``) and the
+    ``/api/applicants`` filters and ``fields``, e.g.
+    ``/api/export?format=jsonl&term_year=2025&fields=url,gpa,decision``.
+    Parquet datasets are written by the ``export`` command instead.
+
+    :return: A streamed ``applicants.<format>.gz`` download, or
+             ``{"error": ...}`` with status 400.
+    :rtype: flask.Response | tuple[flask.Response, int]
+    """
+    fmt = request.args.get("format", "csv")
+    try:
+        chunks = export.stream(browse.from_args(request.args), fmt)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return Response(chunks, mimetype="application/gzip", headers={
+        "Content-Disposition": f"attachment; filename=applicants.{fmt}.gz",
+    })
+
+
+@bp.route("/search")
+def search_comments():
+    """Full-text search over applicant comments (see :mod:`search`).
+
+    Query parameters: ``q`` (web-search syntax), optional ``term``,
+    ``program`` and ``decision`` filters, ``limit`` and the ``cursor`` of
+    the previous page, e.g. ``/search?q=funding interview&term=Fall 2025``.
+    Without ``q`` only the search form is shown.
+
+    :return: Rendered HTML page, with status 400 for an invalid search.
+    :rtype: str | tuple[str, int]
+    """
+    args = {k: request.args.get(k, "").strip() for k in ("q", "term", "program", "decision")}
+    context = {"args": args, "decisions": search.DECISIONS, "page": None, "error": None}
+    if not args["q"]:
+        return render_template("search.html", **context)
+    try:
+        limit = request.args.get("limit", search.DEFAULT_LIMIT, type=int)
+        context["page"] = search.search(
+            args["q"],
+            search.Filters(
+                term=args["term"] or None,
+                program=args["program"] or None,
+                decision=args["decision"] or None,
+            ),
+            cursor=request.args.get("cursor") or None,
+            limit=limit,
+        )
+    except ValueError as exc:
+        context["error"] = str(exc)
+        return render_template("search.html", **context), 400
+    context["limit"] = limit
+    return render_template("search.html", **context)
+
+
 @bp.route("/pull-data", methods=["POST"])
 def pull_data():
     """Start a background pipeline run to fetch and insert new data.
@@ -110,4 +326,26 @@ def update_analysis():
         return jsonify({"busy": True}), 409
     else:
         flash("Analysis refreshed with the latest database results.", "success")
-        return redirect(url_for("main.analysis"))
\ No newline at end of file
+        return redirect(url_for("main.analysis"))
+
+
+@bp.route("/health/db")
+def health_db():
+    """Report database reachability and connection-pool statistics.
+
+    :return: JSON with ``ok`` and the counters from
+             :meth:`db.SharedPool.stats`; status 503 if the check fails.
+    :rtype: tuple[flask.Response, int]
+    """
+    ok = pool.check()
+    return jsonify({"ok": ok, "pool": pool.stats()}), 200 if ok else 503
+
+
+@bp.route("/health/cache")
+def health_cache():
+    """Report query-cache hit rate and counters.
+
+    :return: JSON from :meth:`cache.QueryCache.stats`.
+    :rtype: flask.Response
+    """
+    return jsonify(query_cache.stats())
@@ -1,7 +1,7 @@
 # pylint: disable=missing-function-docstring
 """Scraping utilities for pulling and parsing external pages safely."""
 
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, Optional, Tuple
 import re
 import time
 
@@ -65,8 +65,15 @@ class GradCafeScraping:
         max_records: int = 150,
         delay: float = 0.5,
         skip_rids: Optional[set[str]] = None,
+        known_rids: Optional[Callable[[list[str]], set[str]]] = None,
     ) -> list[dict]:
-        """Collect records by walking the survey listing pages."""
+        """Collect records by walking the survey listing pages.
+
+        :param skip_rids: Result IDs to skip outright.
+        :param known_rids: Called once per listing page with that page's
+                           result IDs; returns those already stored, which
+                           are skipped too (e.g. :func:`db_helper.known_rids`).
+        """
         skip = set(skip_rids or ())
         seen: set[str] = set()
         records: list[dict] = []
@@ -76,14 +83,18 @@ class GradCafeScraping:
             path = "/survey/" if page == 1 else f"/survey/?page={page}"
             soup = self.scrape_data(path)
 
-            found_any = False
+            links = []
             for a in soup.find_all("a", href=True):
                 m = RESULT_RE.match(a["href"])
-                if not m:
-                    continue
+                if m and m.group(1) not in seen and m.group(1) not in skip:
+                    links.append((m.group(1), a))
+            if known_rids and links:
+                known = known_rids(list(dict.fromkeys(rid for rid, _a in links)))
+                links = [(rid, a) for rid, a in links if rid not in known]
 
-                rid = m.group(1)
-                if rid in seen or rid in skip:
+            found_any = False
+            for rid, a in links:
+                if rid in seen:
                     continue
 
                 found_any = True
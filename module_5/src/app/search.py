@@ -0,0 +1,223 @@
+"""Ranked full-text search over applicant ``comments``.
+
+``applicant_rows.comments_tsv`` is a stored generated ``tsvector`` of the
+comments with a GIN index (migration ``v010_comment_search``), so a search
+reads only the matching rows instead of ``LIKE``-scanning the table.
+
+:func:`search` parses the text with ``websearch_to_tsquery`` (quoted
+phrases, ``or`` and ``-word`` work as on web search engines, and no input
+is a syntax error), ranks matches with ``ts_rank_cd`` and returns one page
+at a time:
+
+* pages are keyset-paginated on ``(rank, p_id)``, most relevant first,
+  with opaque cursors (:mod:`pagination`);
+* snippets come from ``ts_headline``, computed only for the rows of the
+  page, with the matched words in ``<mark>``.
+
+Results can be narrowed by a :class:`Filters` of ``term`` (e.g.
+``Fall 2025``), ``program`` (LLM-standardized name) and ``decision``.
+Served at ``/search``.
+
+Example
+-------
+
+.. code-block:: python
+
+   from app import search
+
+   fall = search.Filters(term="Fall 2025")
+   page = search.search("funding interview", fall, limit=10)
+   page["results"][0]["snippet"]  # Markup('... <mark>funding</mark> ...')
+   search.search("funding interview", fall, cursor=page["next"])
+"""
+
+from dataclasses import dataclass
+
+from markupsafe import Markup, escape
+from psycopg import sql
+
+from .records import DECISIONS, term_parts
+from .db import pool
+from .dimensions import APPLICANT_ROWS, table
+from .pagination import decode_cursor, encode_cursor
+
+# Text search configuration; the generated column (migration v010) uses the same.
+CONFIG = "english"
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=25, MinWords=10"
+
+# Result keys, in the column order of the statement built by :func:`build`.
+FIELDS = (
+    "p_id",
+    "rank",
+    "date_added",
+    "url",
+    "term_season",
+    "term_year",
+    "decision",
+    "program",
+    "university",
+    "degree",
+    "snippet",
+)
+
+
+@dataclass(frozen=True)
+class Filters:
+    """Optional filters of a search; empty values filter nothing.
+
+    :param term: Term, e.g. ``"Fall 2025"``.
+    :param program: Standardized program.
+    :param decision: One of :data:`records.DECISIONS`.
+    """
+
+    term: str | None = None
+    program: str | None = None
+    decision: str | None = None
+
+
+def _filters(filters: Filters):
+    """``(conditions, params)`` on ``applicant_rows AS r``."""
+    conds, params = [], []
+    term, program, decision = filters.term, filters.program, filters.decision
+    if term:
+        season, year = term_parts(term)
+        if season is None and year is None:
+            raise ValueError(f"unrecognized term {term!r}")
+        if season is not None:
+            conds.append(sql.SQL("r.term_season = %s"))
+            params.append(season)
+        if year is not None:
+            conds.append(sql.SQL("r.term_year = %s"))
+            params.append(year)
+    if program:
+        conds.append(sql.SQL(
+            "r.llm_generated_program_id = (SELECT id FROM {dim} WHERE value = %s)"
+        ).format(dim=table("llm_generated_program")))
+        params.append(program)
+    if decision:
+        if decision not in DECISIONS:
+            raise ValueError(f"decision must be one of {', '.join(DECISIONS)}")
+        conds.append(sql.SQL("r.decision = %s::decision_kind"))
+        params.append(decision)
+    return conds, params
+
+
+def build(
+    text: str,
+    filters: Filters = Filters(),
+    after: list | None = None,
+    limit: int = DEFAULT_LIMIT,
+) -> tuple[sql.Composed, list]:
+    """Compile one page of a search.
+
+    Up to ``limit`` rows are returned, so callers can ask for one more than
+    they show to learn whether another page exists.
+
+    :param text: Search text (web-search syntax).
+    :type text: str
+    :param filters: Result filters.
+    :type filters: Filters
+    :param after: ``[rank, p_id]`` of the last row already seen.
+    :param limit: Maximum number of rows.
+    :type limit: int
+    :return: ``(statement, params)``; rows follow :data:`FIELDS`.
+    :rtype: tuple[psycopg.sql.Composed, list]
+    :raises ValueError: On an unrecognized term or decision.
+    """
+    conds, params = _filters(filters)
+    if after is not None:
+        conds.append(sql.SQL("(ts_rank_cd(r.comments_tsv, query.q), r.p_id) < (%s::real, %s)"))
+        params += after
+    stmt = sql.SQL("""
+        WITH query AS (SELECT websearch_to_tsquery({config}, %s) AS q),
+        page AS (
+            SELECT r.p_id, ts_rank_cd(r.comments_tsv, query.q) AS rank
+            FROM {rows} AS r, query
+            WHERE r.comments_tsv @@ query.q{conds}
+            ORDER BY rank DESC, r.p_id DESC
+            LIMIT %s
+        )
+        SELECT page.p_id, page.rank, r.date_added, r.url, r.term_season, r.term_year,
+            r.decision, program.value, university.value, degree.value,
+            ts_headline({config}, COALESCE(r.comments, ''), query.q, {options})
+        FROM page
+        JOIN {rows} AS r ON r.p_id = page.p_id
+        CROSS JOIN query
+        LEFT JOIN {programs} AS program ON program.id = r.llm_generated_program_id
+        LEFT JOIN {universities} AS university ON university.id = r.llm_generated_university_id
+        LEFT JOIN {degrees} AS degree ON degree.id = r.degree_id
+        ORDER BY page.rank DESC, page.p_id DESC
+    """).format(
+        config=sql.Literal(CONFIG),
+        rows=APPLICANT_ROWS,
+        conds=sql.SQL("").join(sql.SQL(" AND ") + c for c in conds),
+        options=sql.Literal(HEADLINE_OPTIONS),
+        programs=table("llm_generated_program"),
+        universities=table("llm_generated_university"),
+        degrees=table("degree"),
+    )
+    return stmt, [text] + params + [limit]
+
+
+def highlight(snippet: str | None) -> Markup:
+    """Escape a ``ts_headline`` snippet, keeping only its ``<mark>`` tags.
+
+    :param snippet: Headline text with matches wrapped in ``<mark>``.
+    :type snippet: str | None
+    :rtype: markupsafe.Markup
+    """
+    text = str(escape(snippet or ""))
+    return Markup(text.replace("&lt;mark&gt;", "<mark>").replace("&lt;/mark&gt;", "</mark>"))
+
+
+def _result(row) -> dict:
+    out = dict(zip(FIELDS, row))
+    if out["date_added"] is not None:
+        out["date_added"] = out["date_added"].isoformat()
+    out["snippet"] = highlight(out["snippet"])
+    return out
+
+
+def search(
+    text: str,
+    filters: Filters = Filters(),
+    cursor: str | None = None,
+    limit: int = DEFAULT_LIMIT,
+) -> dict:
+    """Search the comments and return one page, most relevant first.
+
+    :param text: Search text (web-search syntax).
+    :type text: str
+    :param filters: Result filters.
+    :type filters: Filters
+    :param cursor: ``next`` of the previous page.
+    :type cursor: str | None
+    :param limit: Results per page (1 to :data:`MAX_LIMIT`).
+    :type limit: int
+    :return: ``{"results": [...], "next": cursor or None}``; each result
+             has the :data:`FIELDS`, ``snippet`` as safe HTML.
+    :rtype: dict
+    :raises ValueError: On an empty text, a bad filter, cursor or limit.
+    """
+    if not text or not text.strip():
+        raise ValueError("search text is required")
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+    after = decode_cursor(cursor, 2) if cursor else None
+    if after is not None and not (
+        isinstance(after[0], (int, float)) and isinstance(after[1], int)
+    ):
+        raise ValueError("invalid cursor")
+    stmt, params = build(text, filters, after, limit + 1)
+    with pool.connection() as conn, conn.cursor() as cur:
+        cur.execute(stmt, params)
+        rows = cur.fetchall()
+    results = [_result(row) for row in rows[:limit]]
+    more = len(rows) > limit
+    return {
+        "results": results,
+        "next": encode_cursor([results[-1]["rank"], results[-1]["p_id"]]) if more else None,
+    }
@@ -0,0 +1,143 @@
+"""Daily snapshots of the ``/analysis`` metrics for trend charts.
+
+``metric_snapshots`` holds one row per day with every dashboard metric:
+scalars as typed columns, the two rankings as JSON. A snapshot is taken
+after each pipeline run that inserted rows and by the ``snapshot``
+command (for a daily cron); a later snapshot on the same day replaces the
+earlier one. Trends read only this table, so a chart costs one row per
+day however large ``applicants`` grows. Served at ``/api/trends``.
+
+.. code-block:: bash
+
+   python -m src.run snapshot   # e.g. from cron, once a day
+"""
+
+from datetime import date
+
+from psycopg import sql
+from psycopg.types.json import Jsonb
+
+from . import query_data
+from .db import pool
+
+SNAPSHOTS = sql.Identifier("metric_snapshots")
+
+# Scalar series that can be charted, in column order.
+SERIES = (
+    "applicant_count",
+    "international_count",
+    "us_count",
+    "other_count",
+    "percent_international",
+    "avg_gpa",
+    "avg_gre",
+    "avg_gre_v",
+    "avg_gre_aw",
+    "avg_gpa_us",
+    "accept_rate",
+    "avg_gpa_accept",
+    "jhu_ms_cs",
+    "georgetown_phd_cs",
+)
+COLUMNS = SERIES + ("degree_counts", "top_programs")
+
+UPSERT_SNAPSHOT = sql.SQL("""
+    INSERT INTO {tbl} (day, {cols})
+    VALUES (COALESCE(%s::date, CURRENT_DATE), {values})
+    ON CONFLICT (day) DO UPDATE SET taken_at = now(), {update}
+    RETURNING day
+""").format(
+    tbl=SNAPSHOTS,
+    cols=sql.SQL(", ").join(map(sql.Identifier, COLUMNS)),
+    values=sql.SQL(", ").join(sql.Placeholder() * len(COLUMNS)),
+    update=sql.SQL(", ").join(
+        sql.SQL("{c} = EXCLUDED.{c}").format(c=sql.Identifier(c)) for c in COLUMNS
+    ),
+)
+
+
+def snapshot_values(d: query_data.Dashboard) -> dict:
+    """Flatten a dashboard into the ``metric_snapshots`` columns.
+
+    :param d: Exact dashboard metrics.
+    :type d: query_data.Dashboard
+    :return: Column name -> value, in :data:`COLUMNS` order.
+    :rtype: dict
+    """
+    return {
+        "applicant_count": d.applicant_count,
+        **d.citizenship,
+        "percent_international": float(d.percent_international),
+        **{name: float(value) for name, value in d.avg_scores.items()},
+        "avg_gpa_us": float(d.avg_gpa_us),
+        "accept_rate": float(d.accept_rate),
+        "avg_gpa_accept": float(d.avg_gpa_accept),
+        "jhu_ms_cs": d.jhu_ms_cs,
+        "georgetown_phd_cs": d.georgetown_phd_cs,
+        "degree_counts": [list(pair) for pair in d.degree_counts],
+        "top_programs": [list(pair) for pair in d.top_programs],
+    }
+
+
+def take_snapshot(day: date | None = None) -> date:
+    """Store the current metrics as the snapshot of ``day``.
+
+    Metrics are computed fresh, bypassing the query cache.
+
+    :param day: Snapshot date; the database's ``CURRENT_DATE`` if ``None``.
+    :type day: datetime.date | None
+    :return: The date the snapshot was stored under.
+    :rtype: datetime.date
+    """
+    values = snapshot_values(query_data.dashboard.__wrapped__())
+    params = [values[c] for c in SERIES] + [Jsonb(values[c]) for c in COLUMNS[len(SERIES):]]
+    with pool.connection() as conn, conn.cursor() as cur:
+        cur.execute(UPSERT_SNAPSHOT, [day] + params)
+        stored = cur.fetchone()[0]
+        conn.commit()
+    return stored
+
+
+def build_trend(series, days: int | None = None) -> tuple[sql.Composed, list]:
+    """Compile the trend query for ``series`` over the last ``days`` days.
+
+    :param series: Names from :data:`SERIES`.
+    :param days: Window length, or ``None`` for every snapshot.
+    :type days: int | None
+    :return: ``(statement, params)``.
+    :rtype: tuple[psycopg.sql.Composed, list]
+    :raises ValueError: On an unknown series or a non-positive window.
+    """
+    unknown = set(series) - set(SERIES)
+    if unknown or not series:
+        raise ValueError(f"series must be among {', '.join(SERIES)}")
+    stmt = sql.SQL("SELECT day, {cols} FROM {tbl}").format(
+        cols=sql.SQL(", ").join(map(sql.Identifier, series)), tbl=SNAPSHOTS
+    )
+    params = []
+    if days is not None:
+        if days < 1:
+            raise ValueError("days must be positive")
+        stmt += sql.SQL(" WHERE day > CURRENT_DATE - %s")
+        params.append(days)
+    return stmt + sql.SQL(" ORDER BY day"), params
+
+
+def trend(series=SERIES, days: int | None = None) -> list[dict]:
+    """Read snapshot history, oldest first.
+
+    :param series: Names from :data:`SERIES` (default all).
+    :param days: Only the last ``days`` days, or ``None`` for all.
+    :type days: int | None
+    :return: One ``{"day": "YYYY-MM-DD", series: value, ...}`` per snapshot.
+    :rtype: list[dict]
+    :raises ValueError: On an unknown series or a non-positive window.
+    """
+    series = tuple(dict.fromkeys(series))
+    stmt, params = build_trend(series, days)
+    with pool.connection() as conn, conn.cursor() as cur:
+        cur.execute(stmt, params)
+        rows = cur.fetchall()
+    return [
+        {"day": day.isoformat(), **dict(zip(series, values))} for day, *values in rows
+    ]
@@ -0,0 +1,229 @@
+"""Trigger-maintained aggregate of ``applicants`` for the dashboard.
+
+``applicant_summary`` holds one row per combination of the dimensions the
+``/analysis`` queries filter or group on, with row counts and the sums
+needed for the score averages::
+
+   (term_year, term_season, degree, us_or_international, decision,
+    llm_generated_program, llm_generated_university)
+   -> n, and per score (gpa, gre, gre_v, gre_aw): x_n, x_sum, x_sq
+
+Statement-level triggers with transition tables fold each INSERT/COPY,
+UPDATE and DELETE on ``applicants`` into the summary in the same
+transaction (one grouped upsert per statement, not per row), and TRUNCATE
+empties it. The triggers sit on the base table ``applicant_rows``; their
+transition rows are decoded back to text through the dimension tables
+(:mod:`dimensions`). :mod:`query_data` reads only from this table, so
+dashboard latency depends on the number of groups, not on the number of
+applicants.
+
+The score sums use the same validity ranges as the original queries
+(``gpa`` 0.01-4.3, GRE 130-170, AW 0.01-6.0). With the sums of squares
+(``x_sq``) each cell also yields a variance, so the table is a small cube:
+any slice, top-K, mean or standard deviation over the key columns is a
+sum over cells (see :mod:`analytics`).
+"""
+
+from psycopg import sql
+
+from .dimensions import APPLICANT_ROWS, decoded
+
+SUMMARY = sql.Identifier("applicant_summary")
+APPLICANTS = sql.Identifier("applicants")
+
+KEY_COLUMNS = (
+    "term_year",
+    "term_season",
+    "degree",
+    "us_or_international",
+    "decision",
+    "llm_generated_program",
+    "llm_generated_university",
+)
+
+# Query-facing names of the key columns (see :mod:`analytics`).
+DIMENSIONS = {
+    "term_year": "term_year",
+    "term_season": "term_season",
+    "university": "llm_generated_university",
+    "program": "llm_generated_program",
+    "degree": "degree",
+    "citizenship": "us_or_international",
+    "decision": "decision",
+}
+
+# (count column, sum column, source column, low, high)
+SCORES = (
+    ("gpa_n", "gpa_sum", "gpa", 0.01, 4.3),
+    ("gre_n", "gre_sum", "gre", 130, 170),
+    ("gre_v_n", "gre_v_sum", "gre_v", 130, 170),
+    ("gre_aw_n", "gre_aw_sum", "gre_aw", 0.01, 6.0),
+)
+
+# score column -> (low, high) validity range
+RANGES = {col: (low, high) for _n, _s, col, low, high in SCORES}
+
+MEASURES = ("n",) + tuple(
+    c for n, total, col, _low, _high in SCORES for c in (n, total, f"{col}_sq")
+)
+
+_KEYS = sql.SQL(", ").join(sql.Identifier(c) for c in KEY_COLUMNS)
+_MEASURES = sql.SQL(", ").join(sql.Identifier(c) for c in MEASURES)
+
+CREATE_SUMMARY = sql.SQL("""
+CREATE TABLE IF NOT EXISTS {summary} (
+  term_year SMALLINT,
+  term_season TEXT,
+  degree TEXT,
+  us_or_international TEXT,
+  decision decision_kind,
+  llm_generated_program TEXT,
+  llm_generated_university TEXT,
+  n INTEGER NOT NULL DEFAULT 0,
+  gpa_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+  gpa_n INTEGER NOT NULL DEFAULT 0,
+  gpa_sq DOUBLE PRECISION NOT NULL DEFAULT 0,
+  gre_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+  gre_n INTEGER NOT NULL DEFAULT 0,
+  gre_sq DOUBLE PRECISION NOT NULL DEFAULT 0,
+  gre_v_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+  gre_v_n INTEGER NOT NULL DEFAULT 0,
+  gre_v_sq DOUBLE PRECISION NOT NULL DEFAULT 0,
+  gre_aw_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+  gre_aw_n INTEGER NOT NULL DEFAULT 0,
+  gre_aw_sq DOUBLE PRECISION NOT NULL DEFAULT 0,
+  CONSTRAINT applicant_summary_key UNIQUE NULLS NOT DISTINCT ({keys})
+)
+""").format(summary=SUMMARY, keys=_KEYS)
+
+
+def _aggregate(source: sql.Composable, sign: sql.Composable) -> sql.Composed:
+    """``SELECT keys, measures`` grouped over ``source``, each row weighted by ``sign``."""
+    sums = [sql.SQL("SUM({sign})::INTEGER").format(sign=sign)]
+    for _n, _s, col, low, high in SCORES:
+        valid = sql.SQL("{col} BETWEEN {low} AND {high}").format(
+            col=sql.Identifier(col), low=sql.Literal(low), high=sql.Literal(high)
+        )
+        sums.append(sql.SQL("COALESCE(SUM({sign}) FILTER (WHERE {valid}), 0)::INTEGER").format(
+            sign=sign, valid=valid))
+        sums.append(sql.SQL("COALESCE(SUM({sign} * {col}) FILTER (WHERE {valid}), 0)").format(
+            sign=sign, col=sql.Identifier(col), valid=valid))
+        sums.append(sql.SQL(
+            "COALESCE(SUM({sign} * {col} * {col}) FILTER (WHERE {valid}), 0)"
+        ).format(sign=sign, col=sql.Identifier(col), valid=valid))
+    return sql.SQL("SELECT {keys}, {sums} FROM {source} GROUP BY {keys}").format(
+        keys=_KEYS, sums=sql.SQL(", ").join(sums), source=source
+    )
+
+
+def _upsert(select: sql.Composable) -> sql.Composed:
+    """Add the grouped rows of ``select`` into the summary."""
+    return sql.SQL("""
+      INSERT INTO {summary} AS s ({keys}, {measures})
+      {select}
+      ON CONFLICT ON CONSTRAINT applicant_summary_key DO UPDATE SET {add}
+    """).format(
+        summary=SUMMARY,
+        keys=_KEYS,
+        measures=_MEASURES,
+        select=select,
+        add=sql.SQL(", ").join(
+            sql.SQL("{c} = s.{c} + EXCLUDED.{c}").format(c=sql.Identifier(c)) for c in MEASURES
+        ),
+    )
+
+
+def _decoded(name: str) -> sql.Composed:
+    """Transition table ``name`` with its ids joined back to text."""
+    return sql.SQL("({rows}) AS {name}").format(
+        rows=decoded(sql.Identifier(name)), name=sql.Identifier(name))
+
+
+# Insert: +1 per new row. Delete: -1 per old row. Update: both.
+DELTAS = {
+    "INSERT": sql.SQL("SELECT 1 AS sign, * FROM {}").format(_decoded("new_rows")),
+    "DELETE": sql.SQL("SELECT -1 AS sign, * FROM {}").format(_decoded("old_rows")),
+    "UPDATE": sql.SQL(
+        "SELECT 1 AS sign, * FROM {} UNION ALL SELECT -1 AS sign, * FROM {}"
+    ).format(_decoded("new_rows"), _decoded("old_rows")),
+}
+
+
+def _branch(op: str) -> sql.Composed:
+    select = _aggregate(
+        sql.SQL("({delta}) AS d").format(delta=DELTAS[op]), sql.Identifier("sign")
+    )
+    body = [_upsert(select)]
+    if op != "INSERT":
+        body.append(sql.SQL("DELETE FROM {summary} WHERE n = 0").format(summary=SUMMARY))
+    return sql.SQL("IF TG_OP = {op} THEN {body}; END IF;").format(
+        op=sql.Literal(op), body=sql.SQL("; ").join(body)
+    )
+
+
+# Transition tables are only visible to the branch of the matching event;
+# PL/pgSQL plans each statement on first use, so the others never resolve.
+CREATE_TRIGGER_FUNCTION = sql.SQL("""
+CREATE OR REPLACE FUNCTION applicant_summary_apply() RETURNS trigger
+LANGUAGE plpgsql AS $fn$
+BEGIN
+  IF TG_OP = 'TRUNCATE' THEN
+    TRUNCATE {summary};
+    RETURN NULL;
+  END IF;
+  {branches}
+  RETURN NULL;
+END
+$fn$
+""").format(summary=SUMMARY, branches=sql.SQL("\n  ").join(_branch(op) for op in DELTAS))
+
+# A trigger with transition tables may only fire on one event.
+CREATE_TRIGGERS = sql.SQL("""
+CREATE OR REPLACE TRIGGER applicant_summary_ins AFTER INSERT ON {tbl}
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION applicant_summary_apply();
+CREATE OR REPLACE TRIGGER applicant_summary_upd AFTER UPDATE ON {tbl}
+  REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION applicant_summary_apply();
+CREATE OR REPLACE TRIGGER applicant_summary_del AFTER DELETE ON {tbl}
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION applicant_summary_apply();
+CREATE OR REPLACE TRIGGER applicant_summary_trunc AFTER TRUNCATE ON {tbl}
+  FOR EACH STATEMENT EXECUTE FUNCTION applicant_summary_apply();
+""").format(tbl=APPLICANT_ROWS)
+
+HAS_SUMMARY = sql.SQL("SELECT to_regclass({name}) IS NOT NULL").format(
+    name=sql.Literal("applicant_summary")
+)
+
+# Full rebuild; SHARE mode blocks writers so no delta is missed meanwhile.
+REBUILD_SUMMARY = sql.SQL("LOCK TABLE {tbl} IN SHARE MODE; TRUNCATE {summary}; ").format(
+    tbl=APPLICANTS, summary=SUMMARY
+) + _upsert(_aggregate(APPLICANTS, sql.SQL("1")))
+
+
+def rebuild_summary(conn) -> None:
+    """Recompute ``applicant_summary`` from scratch. The caller commits.
+
+    :param conn: Open connection.
+    """
+    with conn.cursor() as cur:
+        cur.execute(REBUILD_SUMMARY)
+
+
+def ensure_summary(conn) -> None:
+    """Create the summary table and its triggers; fill it if it is new.
+
+    Requires the ``applicant_rows`` table and the dimensions to exist.
+    The caller commits.
+
+    :param conn: Open connection.
+    """
+    with conn.cursor() as cur:
+        cur.execute(HAS_SUMMARY)
+        existed = cur.fetchone()[0]
+        cur.execute(CREATE_SUMMARY)
+        cur.execute(CREATE_TRIGGER_FUNCTION)
+        cur.execute(CREATE_TRIGGERS)
+    if not existed:
+        rebuild_summary(conn)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 import argparse
+import dataclasses
+import logging
 import sys
 from pathlib import Path
 
@@ -10,6 +12,12 @@ if str(HERE) not in sys.path:
 
 from .app import create_app
 from .app.pipeline import run_pipeline
+from .app.restandardize import restandardize
+from .app import migrations
+from .app.snapshots import take_snapshot
+from .app import browse, export, lake
+from .app.db_helper import read_json
+from .app.records import data_type
 
 
 def cmd_web(host: str, port: int, debug: bool) -> None:
@@ -44,6 +52,130 @@ def cmd_pipeline(max_records: int, delay: float) -> None:
     print(summary["message"])
 
 
+def cmd_restandardize(batch_size: int, workers: int, backend: str | None,
+                      restart: bool) -> None:
+    """Re-standardize ``llm_generated_*`` for all stored rows.
+
+    Resumes from the last checkpoint unless ``restart`` is set.
+
+    :param batch_size: Rows per fetch/standardize/update batch.
+    :type batch_size: int
+    :param workers: Standardizer worker processes (``0`` = in-process).
+    :type workers: int
+    :param backend: ``llm_hosting`` backend name, or ``None`` for the default.
+    :type backend: str | None
+    :param restart: Ignore an existing checkpoint.
+    :type restart: bool
+    :return: None
+    :rtype: NoneType
+    """
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    summary = restandardize(
+        batch_size=batch_size, workers=workers, backend=backend, restart=restart
+    )
+    print(
+        f"Scanned {summary['scanned']}, updated {summary['updated']}, "
+        f"{summary['distinct_programs']} distinct programs, "
+        f"{summary['rows_per_sec']:.0f} rows/s"
+    )
+
+
+def cmd_migrate(show_status: bool, target: int | None) -> None:
+    """Apply pending schema migrations, or list their status.
+
+    :param show_status: Only print applied/pending versions.
+    :type show_status: bool
+    :param target: Highest version to apply, or ``None`` for all.
+    :type target: int | None
+    :return: None
+    :rtype: NoneType
+    """
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if show_status:
+        for version, name, applied_at in migrations.status():
+            state = f"applied {applied_at:%Y-%m-%d %H:%M}" if applied_at else "pending"
+            print(f"{version:03d}_{name}: {state}")
+        return
+    done = migrations.migrate(target=target)
+    print(f"Applied {len(done)} migration(s)" + (f": {', '.join(done)}" if done else ""))
+
+
+def cmd_snapshot() -> None:
+    """Store today's dashboard metrics in ``metric_snapshots``.
+
+    Meant to run once a day (e.g. from cron); re-running replaces the
+    day's snapshot.
+
+    :return: None
+    :rtype: NoneType
+    """
+    print(f"Stored metric snapshot for {take_snapshot():%Y-%m-%d}")
+
+
+def cmd_export(fmt: str, out: str, filters: list[str], fields: str | None) -> None:
+    """Export applicant rows with ``COPY ... TO STDOUT`` (see :mod:`app.export`).
+
+    :param fmt: ``csv`` or ``jsonl`` (gzip file) or ``parquet`` (dataset
+                directory partitioned by term).
+    :type fmt: str
+    :param out: Output file or directory.
+    :type out: str
+    :param filters: ``column=value`` filters as accepted by ``/api/applicants``.
+    :type filters: list[str]
+    :param fields: Comma-separated output columns, or ``None`` for all.
+    :type fields: str | None
+    :return: None
+    :rtype: NoneType
+    """
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    given: dict = {}
+    for item in filters:
+        col, _, value = item.partition("=")
+        if col in browse.EQUALS:
+            given.setdefault(col, []).append(value)
+        else:
+            given[col] = value
+    try:
+        lst = browse.listing(fields.split(",") if fields else (), **given)
+        stats = export.to_file(lst, fmt, out)
+    except (ValueError, RuntimeError) as exc:
+        sys.exit(f"export failed: {exc}")
+    print(
+        f"Exported {stats.rows} rows to {out}: {stats.bytes_in / 2**20:.1f} MB read, "
+        f"{stats.bytes_out / 2**20:.1f} MB written in {stats.seconds:.1f}s "
+        f"({stats.mb_per_s:.1f} MB/s)"
+    )
+
+
+def cmd_lake(action: str, root: str | None, files: list[str]) -> None:
+    """Work with the Parquet data lake (see :mod:`app.lake`); no database access.
+
+    :param action: ``report`` (dashboard questions over the lake),
+                   ``compact`` (merge small files) or ``add`` (append
+                   scraped JSON/JSONL files as today's batch).
+    :type action: str
+    :param root: Dataset root, or ``None`` for ``DATA_LAKE_DIR``.
+    :type root: str | None
+    :param files: Input files for ``add``.
+    :type files: list[str]
+    :return: None
+    :rtype: NoneType
+    """
+    try:
+        if action == "add":
+            for name in files:
+                written = lake.append([data_type(r) for r in read_json(Path(name))], root)
+                print(f"{name}: wrote {len(written)} file(s)")
+        elif action == "compact":
+            print(f"Compacted {lake.compact(root)} small file(s)")
+        else:
+            dash = lake.report(root)
+            for name, value in dataclasses.asdict(dash).items():
+                print(f"{name}: {value}")
+    except RuntimeError as exc:
+        sys.exit(f"lake {action} failed: {exc}")
+
+
 def main() -> None:
     """Parse CLI arguments and dispatch to the chosen command.
 
@@ -56,6 +188,22 @@ def main() -> None:
     - ``pipeline``:
         - ``--max-records`` (int, default ``100``)
         - ``--delay`` (float, default ``0.5``)
+    - ``restandardize``:
+        - ``--batch-size`` (int, default ``5000``)
+        - ``--workers`` (int, default ``2``)
+        - ``--backend`` (str, default ``$LLM_BACKEND``)
+        - ``--restart`` (flag)
+    - ``migrate``:
+        - ``--status`` (flag)
+        - ``--target`` (int, default: latest)
+    - ``snapshot``: store today's metric snapshot (no options)
+    - ``export``:
+        - ``--format`` (``csv``, ``jsonl`` or ``parquet``; default ``csv``)
+        - ``--out`` (str, required)
+        - ``--filter`` (``column=value``, repeatable)
+        - ``--fields`` (comma-separated columns, default all)
+    - ``lake``: ``report``, ``compact`` or ``add FILE...``
+        - ``--dir`` (str, default ``$DATA_LAKE_DIR``)
 
     If no subcommand is provided, the function defaults to starting the web app.
 
@@ -74,10 +222,45 @@ def main() -> None:
     p_pipe.add_argument("--max-records", type=int, default=100)
     p_pipe.add_argument("--delay", type=float, default=0.5)
 
+    p_restd = sub.add_parser(
+        "restandardize", help="Re-run LLM standardization over all stored rows"
+    )
+    p_restd.add_argument("--batch-size", type=int, default=5000)
+    p_restd.add_argument("--workers", type=int, default=2)
+    p_restd.add_argument("--backend", default=None)
+    p_restd.add_argument("--restart", action="store_true")
+
+    p_mig = sub.add_parser("migrate", help="Apply pending database schema migrations")
+    p_mig.add_argument("--status", action="store_true", help="List versions and exit")
+    p_mig.add_argument("--target", type=int, default=None)
+
+    sub.add_parser("snapshot", help="Store today's dashboard metrics for trend charts")
+
+    p_exp = sub.add_parser("export", help="Export applicant rows to gzip CSV/JSONL or Parquet")
+    p_exp.add_argument("--format", choices=export.FORMATS, default="csv")
+    p_exp.add_argument("--out", required=True, help="file, or directory for parquet")
+    p_exp.add_argument("--filter", action="append", default=[], metavar="COLUMN=VALUE")
+    p_exp.add_argument("--fields", default=None, help="comma-separated output columns")
+
+    p_lake = sub.add_parser("lake", help="Analyze or maintain the Parquet data lake offline")
+    p_lake.add_argument("action", choices=["report", "compact", "add"])
+    p_lake.add_argument("files", nargs="*", help="scraped JSON/JSONL files for 'add'")
+    p_lake.add_argument("--dir", default=None, help="dataset root")
+
     args = parser.parse_args()
 
     if args.cmd == "pipeline":
         cmd_pipeline(args.max_records, args.delay)
+    elif args.cmd == "restandardize":
+        cmd_restandardize(args.batch_size, args.workers, args.backend, args.restart)
+    elif args.cmd == "migrate":
+        cmd_migrate(args.status, args.target)
+    elif args.cmd == "snapshot":
+        cmd_snapshot()
+    elif args.cmd == "export":
+        cmd_export(args.format, args.out, args.filter, args.fields)
+    elif args.cmd == "lake":
+        cmd_lake(args.action, args.dir, args.files)
     else:
         ns = (
             args
@@ -21,17 +21,23 @@ import pytest
 def _setup_db_for_session():
     """Configure the database connection for the entire test session.
 
-    - In CI ("CI" == "true"), reload db modules so they pick up CI env vars.
+    - In CI ("CI" == "true"), bring the schema up to date with the
+      migrations. ``app.db`` is not reloaded: modules that imported its
+      ``pool`` must keep sharing the one pool object, which reads the CI
+      env vars at import.
     - Locally, replace psycopg_pool.ConnectionPool with a NoopPool that
       prevents DB access, keeping tests fast and isolated.
     """
     mp = pytest.MonkeyPatch()
 
     if os.getenv("CI") == "true":
-        if "app.db" in importlib.sys.modules:
-            importlib.reload(importlib.sys.modules["app.db"])
         if "app.query_data" in importlib.sys.modules:
             importlib.reload(importlib.sys.modules["app.query_data"])
+        if "app.migrations" in importlib.sys.modules:
+            importlib.reload(importlib.sys.modules["app.migrations"])
+        from app import migrations
+
+        migrations.migrate()
         yield
     else:
         # Import psycopg_pool if available; otherwise create a stub namespace
@@ -48,13 +54,17 @@ def _setup_db_for_session():
             def __init__(self, *_args, **_kwargs):
                 """Initialize (no-op)."""
 
-            def connection(self):
+            def connection(self, *_args, **_kwargs):
                 """Always fail: DB disabled in local tests."""
                 raise RuntimeError("ConnectionPool disabled in local tests.")
 
             def close(self):
                 """Close (no-op)."""
 
+            @staticmethod
+            def check_connection(_conn):
+                """Connection check (no-op)."""
+
         mp.setattr(psycopg_pool, "ConnectionPool", NoopPool)
         yield
         mp.undo()
@@ -107,6 +117,30 @@ def stub_queries(monkeypatch):
     patch("count_gt_phd_accept", lambda: 2)
     patch("degree_counts_2025", lambda: [("Masters", 10)])
     patch("top_5_programs", lambda: [("CS", 8)])
+    patch(
+        "dashboard",
+        lambda: routes.query_data.Dashboard(
+            applicant_count=1,
+            citizenship={"international_count": 1, "us_count": 1, "other_count": 0},
+            avg_scores={"avg_gpa": 3.4, "avg_gre": 165, "avg_gre_v": 158, "avg_gre_aw": 4.5},
+            avg_gpa_us=3.2,
+            accept_rate=37.12,
+            avg_gpa_accept=3.6,
+            jhu_ms_cs=7,
+            georgetown_phd_cs=2,
+            degree_counts=[("Masters", 10)],
+            top_programs=[("CS", 8)],
+        ),
+    )
+
+
+@pytest.fixture(autouse=True)
+def _fresh_query_cache():
+    """Start every test with an empty query cache (tables are truncated between tests)."""
+    from app.cache import query_cache
+
+    query_cache.clear()
+    query_cache.bump()
 
 
 # -------------------------------------------------------------------
@@ -120,13 +154,12 @@ def clean_db():
 
     import app.db as db
 
-    db.ensure_table()
     with db.pool.connection() as conn, conn.cursor() as cur:
-        cur.execute("TRUNCATE TABLE applicants;")
+        cur.execute("TRUNCATE TABLE applicant_rows;")
         conn.commit()
     yield
     with db.pool.connection() as conn, conn.cursor() as cur:
-        cur.execute("TRUNCATE TABLE applicants;")
+        cur.execute("TRUNCATE TABLE applicant_rows;")
         conn.commit()
 
 
@@ -173,3 +206,27 @@ def install_sync_pipeline(monkeypatch):
         routes._pull_running.clear()  # pylint: disable=protected-access
 
     return _install
+
+
+# -------------------------------------------------------------------
+# 6) The llm_hosting standardizer (a script directory, not a package).
+# -------------------------------------------------------------------
+@pytest.fixture(scope="session")
+def llm_hosting():
+    """Load ``app/llm_hosting/app.py`` with its sibling modules importable.
+
+    The directory is run as scripts (``python app.py``), so its modules
+    import each other by bare name (``import lexicon``); ``app`` itself is
+    loaded under another name because ``app`` is the Flask package here.
+    """
+    import sys
+    from importlib import util
+    from pathlib import Path
+
+    here = Path(__file__).resolve().parents[1] / "src" / "app" / "llm_hosting"
+    if str(here) not in sys.path:
+        sys.path.insert(0, str(here))
+    spec = util.spec_from_file_location("llm_hosting_app", here / "app.py")
+    module = util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
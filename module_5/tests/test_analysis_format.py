@@ -36,6 +36,21 @@ def _stub_queries(monkeypatch):
     patch("count_gt_phd_accept", lambda: 2)
     patch("degree_counts_2025", lambda: [("Masters", 10)])
     patch("top_5_programs", lambda: [("CS", 8)])
+    patch(
+        "dashboard",
+        lambda: routes.query_data.Dashboard(
+            applicant_count=1,
+            citizenship={"international_count": 1, "us_count": 1, "other_count": 0},
+            avg_scores={"avg_gpa": 3.4, "avg_gre": 165, "avg_gre_v": 158, "avg_gre_aw": 4.5},
+            avg_gpa_us=3.2,
+            accept_rate=37.12,
+            avg_gpa_accept=3.6,
+            jhu_ms_cs=7,
+            georgetown_phd_cs=2,
+            degree_counts=[("Masters", 10)],
+            top_programs=[("CS", 8)],
+        ),
+    )
 
 
 @pytest.mark.analysis
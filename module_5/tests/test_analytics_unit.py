@@ -0,0 +1,147 @@
+# pylint: disable=missing-function-docstring
+"""Unit tests for app.analytics (validation, SQL generation, caching)."""
+
+from contextlib import contextmanager
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+import app.analytics as an
+
+
+def _sql(q):
+    stmt, params = an.build(q)
+    return " ".join(stmt.as_string(None).split()), params
+
+
+@pytest.mark.db
+def test_build_plain_aggregate_with_term_filter():
+    text, params = _sql(an.query(term="Fall 2025", aggregates=["count", "avg_gpa"]))
+    assert text == (
+        'SELECT COALESCE(SUM(n), 0) AS "count", '
+        'SUM("gpa_sum") / NULLIF(SUM("gpa_n"), 0) AS "avg_gpa" FROM "applicant_summary" '
+        'WHERE ("term_season"::text = %s) AND ("term_year" = %s)'
+    )
+    assert params == ["Fall", 2025]
+
+
+@pytest.mark.db
+def test_build_grouped_with_lists_nulls_order_and_limit():
+    q = an.query(
+        group_by=["program", "degree"], aggregates=["count"],
+        decision=["Accepted", "Rejected"], degree=[None, "PhD"], limit=5,
+    )
+    text, params = _sql(q)
+    assert text == (
+        'SELECT "llm_generated_program" AS "program", "degree" AS "degree", '
+        'COALESCE(SUM(n), 0) AS "count" FROM "applicant_summary" '
+        'WHERE ("decision"::text = ANY(%s)) AND ("degree"::text = %s OR "degree" IS NULL) '
+        'GROUP BY "llm_generated_program", "degree" HAVING SUM(n) > 0 '
+        'ORDER BY "count" DESC NULLS LAST LIMIT %s'
+    )
+    assert params == [["Accepted", "Rejected"], "PhD", 5]
+
+
+@pytest.mark.db
+def test_build_orders_dimensions_ascending_and_empty_filter_matches_nothing():
+    text, _params = _sql(an.query(group_by=["term_year"], order_by="term_year", degree=[]))
+    assert "WHERE FALSE" in text
+    assert text.endswith('ORDER BY "term_year" ASC NULLS LAST')
+
+
+@pytest.mark.db
+def test_query_is_normalized_and_hashable():
+    a = an.query(degree="PhD", term_year="2025", aggregates=["count", "count"])
+    b = an.query(term_year=2025, degree=["PhD"])
+    assert a == b and hash(a) == hash(b)
+    assert an.query(term="2025").filters == (("term_year", (2025,)),)
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("kwargs, message", [
+    ({"group_by": ["p_id"]}, "unknown"),
+    ({"aggregates": ["max(gpa)"]}, "unknown"),
+    ({"aggregates": []}, "at least one"),
+    ({"order_by": "avg_gpa"}, "order_by"),
+    ({"limit": 0}, "limit"),
+    ({"term": "sometime"}, "term"),
+    ({"term_year": "twenty"}, "integer"),
+])
+def test_query_rejects_invalid_input(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        an.query(**kwargs)
+
+
+@pytest.mark.db
+def test_from_args_reads_repeated_and_comma_separated_params():
+    args = MultiDict([
+        ("term", "Fall 2025"), ("group_by", "degree"), ("agg", "count,avg_gpa"),
+        ("decision", "Accepted"), ("decision", "Waitlisted"), ("limit", "3"),
+    ])
+    q = an.from_args(args)
+    assert q == an.query(
+        term="Fall 2025", group_by=["degree"], aggregates=["count", "avg_gpa"],
+        decision=["Accepted", "Waitlisted"], limit=3,
+    )
+    assert an.describe(q)["filters"] == {
+        "decision": ["Accepted", "Waitlisted"], "term_season": ["Fall"], "term_year": [2025],
+    }
+    assert an.from_args(MultiDict()).aggregates == ("count",)
+
+
+class _Cursor:
+    def __init__(self, rows, log):
+        self._rows, self._log = rows, log
+
+    def execute(self, stmt, params):
+        self._log.append((stmt, params))
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+class _Pool:
+    def __init__(self, rows):
+        self.rows, self.log = rows, []
+
+    @contextmanager
+    def connection(self):
+        yield self
+
+    @contextmanager
+    def cursor(self):
+        yield _Cursor(self.rows, self.log)
+
+
+@pytest.mark.db
+def test_run_returns_dicts_and_caches_per_query(monkeypatch):
+    fake = _Pool([("Masters", 10), ("PhD", 3)])
+    monkeypatch.setattr(an, "pool", fake)
+    q = an.query(group_by=["degree"])
+
+    assert an.run(q) == [{"degree": "Masters", "count": 10}, {"degree": "PhD", "count": 3}]
+    assert an.run(an.query(group_by=["degree"])) == an.run(q)
+    assert len(fake.log) == 1
+
+    an.query_cache.bump()
+    an.run(q)
+    assert len(fake.log) == 2
+
+
+@pytest.mark.db
+def test_stddev_is_computed_from_cell_sums():
+    text, _params = _sql(an.query(aggregates=["stddev_gpa"]))
+    assert text == (
+        'SELECT CASE WHEN SUM("gpa_n") > 1 THEN sqrt(GREATEST((SUM("gpa_sq") - SUM("gpa_sum") '
+        '* SUM("gpa_sum") / SUM("gpa_n")) / (SUM("gpa_n") - 1), 0)) END AS "stddev_gpa" '
+        'FROM "applicant_summary"'
+    )
+
+
+@pytest.mark.db
+def test_drilldown_lists_remaining_dimensions(monkeypatch):
+    monkeypatch.setattr(an, "run", lambda q: [{"university": "GU", "count": 2}])
+    out = an.drilldown(an.query(term="Fall 2025", degree="PhD", group_by=["university"]))
+    assert out["cells"] == [{"university": "GU", "count": 2}]
+    assert out["next"] == ["program", "citizenship", "decision"]
+    assert out["query"]["group_by"] == ("university",)
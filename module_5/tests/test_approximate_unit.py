@@ -0,0 +1,95 @@
+# pylint: disable=missing-function-docstring
+"""Unit tests for app.approximate (sampled dashboard with confidence intervals)."""
+
+from contextlib import contextmanager
+import math
+
+import pytest
+
+import app.approximate as ap
+
+
+class _Cursor:
+    def __init__(self, row, log):
+        self._row, self._log = row, log
+
+    def execute(self, stmt, params):
+        self._log.append((stmt, params))
+
+    def fetchone(self):
+        return self._row
+
+
+class _Pool:
+    def __init__(self, row):
+        self.row, self.log = row, []
+
+    @contextmanager
+    def connection(self):
+        yield self
+
+    @contextmanager
+    def cursor(self):
+        yield _Cursor(self.row, self.log)
+
+
+@pytest.mark.db
+def test_estimators_scale_and_bound():
+    count = ap.estimate_count(100, 0.01)
+    assert count.value == pytest.approx(10_000)
+    assert count.margin == pytest.approx(ap.Z_95 * math.sqrt(100 * 0.99) / 0.01)
+    assert ap.estimate_count(100, 1.0).margin == 0  # a full "sample" is exact
+
+    mean = ap.estimate_mean(4, 14.0, 54.0, 0.5)  # values 2, 3, 4, 5
+    assert mean.value == 3.5
+    assert mean.margin == pytest.approx(ap.Z_95 * math.sqrt(5 / 3 / 4 * 0.5))
+    assert (mean.low, mean.high) == (mean.value - mean.margin, mean.value + mean.margin)
+    assert ap.estimate_mean(1, 3.0, 9.0, 0.1) == ap.Estimate(3.0, 0.0)
+
+    pct = ap.estimate_percent(25, 100, 0.1)
+    assert pct.value == 25
+    assert pct.margin == pytest.approx(ap.Z_95 * math.sqrt(0.25 * 0.75 / 100 * 0.9) * 100)
+    assert ap.estimate_mean(0, 0, 0, 0.1) == ap.estimate_percent(0, 0, 0.1) == ap.Estimate(0, 0)
+
+
+@pytest.mark.db
+def test_build_samples_once_with_method_and_seed():
+    text = ap.build("bernoulli", seed=7).as_string(None)
+    assert 'FROM "applicant_rows" AS r TABLESAMPLE BERNOULLI ((%s)::real) REPEATABLE (7)' in text
+    assert 'LEFT JOIN "dim_degree" AS "degree" ON "degree".id = r."degree_id"' in text
+    assert text.count("TABLESAMPLE") == 1
+    assert "REPEATABLE" not in ap.build().as_string(None)
+    with pytest.raises(ValueError):
+        ap.build("reservoir")
+
+
+@pytest.mark.db
+def test_dashboard_turns_sample_counts_into_estimates(monkeypatch):
+    row = (
+        [50, 20, 25, 5]            # fall25, international, american, other
+        + [40, 140.0, 494.0] * 4   # gpa, gre, gre_v, gre_aw moments
+        + [10, 35.0, 123.0]        # gpa of American fall25
+        + [20]                     # fall25 acceptances
+        + [8, 29.0, 106.0]         # gpa of accepted fall25
+        + [3, 1, [["Masters", 30], ["PhD", 10]], [["CS", 12]]]
+    )
+    fake = _Pool(row)
+    monkeypatch.setattr(ap, "pool", fake)
+
+    d = ap.dashboard(10.0, seed=1)
+    assert fake.log[0][1] == [10.0]
+    assert d.applicant_count.value == pytest.approx(500)
+    assert d.citizenship["us_count"].value == pytest.approx(250)
+    assert d.avg_scores["avg_gre_aw"].value == pytest.approx(3.5)
+    assert d.avg_gpa_us.value == pytest.approx(3.5)
+    assert d.accept_rate.value == pytest.approx(40)
+    assert d.jhu_ms_cs.value == pytest.approx(30)
+    assert d.degree_counts[0][0] == "Masters"
+    assert d.top_programs[0][1].value == pytest.approx(120)
+
+    data = d.as_template_data()
+    assert data["q2_percent_international"].value == pytest.approx(40)
+    assert data["approx"] == {"percent": 10.0, "method": "system"}
+
+    with pytest.raises(ValueError):
+        ap.dashboard(0)
@@ -0,0 +1,175 @@
+# pylint: disable=missing-function-docstring
+"""Unit tests for app.browse (keyset-paginated applicant rows)."""
+
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+import app.browse as browse
+from app.pagination import decode_cursor, encode_cursor
+
+
+class _Pool:
+    """Returns canned rows and records statements, cursors and timeouts."""
+
+    def __init__(self, rows):
+        self.rows, self.executed, self.names, self.timeouts = rows, [], [], []
+
+    @contextmanager
+    def connection(self, statement_timeout_ms=None):
+        self.timeouts.append(statement_timeout_ms)
+        yield self
+
+    @contextmanager
+    def cursor(self, name=None):
+        self.names.append(name)
+        yield self
+
+    def execute(self, stmt, params):
+        self.executed.append((stmt, params))
+
+    def fetchall(self):
+        return list(self.rows)
+
+    def fetchmany(self, size):
+        out, self.rows = self.rows[:size], self.rows[size:]
+        return out
+
+
+@pytest.mark.db
+def test_from_args_validates_filters_and_fields():
+    lst = browse.from_args(MultiDict([
+        ("degree", "PhD"), ("degree", "Masters"), ("term_year", "2025"),
+        ("gpa_min", "3.5"), ("date_added_max", "2025-09-01"), ("fields", "url,gpa"),
+        ("limit", "10"), ("cursor", "x"),
+    ]))
+    assert lst.filters == (("term_year", (2025,)), ("degree", ("PhD", "Masters")))
+    assert lst.ranges == (("gpa", ">=", 3.5), ("date_added", "<=", date(2025, 9, 1)))
+    assert lst.fields == ("url", "gpa")
+    assert browse.listing().fields == browse.APPLICANT_COLUMNS
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("kwargs", [
+    {"fields": ["password"]},
+    {"term_year": ["soon"]},
+    {"decision": ["Maybe"]},
+    {"gpa_min": "high"},
+    {"date_added_min": "yesterday"},
+    {"comments": ["x"]},
+])
+def test_listing_rejects_bad_arguments(kwargs):
+    with pytest.raises(ValueError):
+        browse.listing(**kwargs)
+
+
+@pytest.mark.db
+def test_build_filters_and_keyset_branches():
+    lst = browse.listing(["url", "degree"], llm_generated_program=["CS"], degree=["PhD", "MS"],
+                         decision=["Accepted"], gpa_min=3.5)
+    stmt, params = browse.build(lst, [date(2025, 1, 2), 9], 11)
+    text = stmt.as_string(None)
+    assert 'r."llm_generated_program_id" = (SELECT id FROM "dim_llm_generated_program"' in text
+    assert 'r."degree_id" = ANY(ARRAY(SELECT id FROM "dim_degree" WHERE value = ANY(%s)))' in text
+    assert 'r."decision" = %s::decision_kind' in text
+    assert "(r.date_added, r.p_id) < (%s::date, %s)" in text
+    assert text.count("LEFT JOIN") == 1  # only the projected dimension
+    filters = ["Accepted", ["PhD", "MS"], "CS", 3.5]
+    # A dated cursor leaves every undated row ahead, whatever its p_id.
+    assert "r.p_id < %s" not in text
+    assert params == filters + [date(2025, 1, 2), 9, 11] + filters + [11, 11]
+
+    # Past the dated rows only the undated branch is read.
+    stmt, params = browse.build(lst, [None, 9], 11)
+    text = stmt.as_string(None)
+    assert "IS NOT NULL" not in text and "r.p_id < %s" in text
+    assert params == filters + [9, 11, 11]
+
+    text = browse.build(browse.listing())[0].as_string(None)
+    assert " AND " not in text and "UNION ALL" in text
+    text = browse.build(browse.listing(decision=["Accepted", "Rejected"]))[0].as_string(None)
+    assert 'r."decision" = ANY(%s::decision_kind[])' in text
+
+
+@pytest.mark.db
+def test_page_returns_rows_and_next_cursor(monkeypatch):
+    rows = [(9, date(2025, 1, 3), "u9", 3.9), (8, date(2025, 1, 2), "u8", None),
+            (2, None, "u2", 3.0)]
+    fake = _Pool(rows)
+    monkeypatch.setattr(browse, "pool", fake)
+    lst = browse.listing(["url", "gpa"])
+
+    out = browse.page(lst, limit=2)
+
+    assert out["rows"] == [{"url": "u9", "gpa": 3.9}, {"url": "u8", "gpa": None}]
+    assert decode_cursor(out["next"], 2) == ["2025-01-02", 8]
+    assert fake.executed[0][1][-1] == 3
+
+    fake.rows = rows[2:]
+    out = browse.page(lst, cursor=out["next"], limit=2)
+    assert out["next"] is None
+    assert fake.executed[1][1][:2] == [date(2025, 1, 2), 8]
+
+
+@pytest.mark.db
+def test_page_crosses_from_dated_to_undated_rows(monkeypatch):
+    fake = _Pool([(8, date(2025, 1, 2), "u8"), (30, None, "u30"), (12, None, "u12")])
+    monkeypatch.setattr(browse, "pool", fake)
+    lst = browse.listing(["url"])
+    cursor = encode_cursor(["2025-01-03", 9])
+
+    out = browse.page(lst, cursor=cursor, limit=2)
+
+    # Undated p_id 30 sorts after dated p_id 9 and must not be cut off.
+    assert out["rows"] == [{"url": "u8"}, {"url": "u30"}]
+    assert fake.executed[0][1] == [date(2025, 1, 3), 9, 3, 3, 3]
+    assert decode_cursor(out["next"], 2) == [None, 30]
+
+    fake.rows = [(12, None, "u12")]
+    out = browse.page(lst, cursor=out["next"], limit=2)
+    assert out == {"rows": [{"url": "u12"}], "next": None}
+    assert fake.executed[1][1] == [30, 3, 3]
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("cursor", [
+    "garbage", encode_cursor(["2025-01-02", "x"]), encode_cursor(["soon", 1]),
+    encode_cursor([3, 1]),
+])
+def test_page_rejects_bad_cursor_and_limit(monkeypatch, cursor):
+    monkeypatch.setattr(browse, "pool", _Pool([]))
+    with pytest.raises(ValueError):
+        browse.page(browse.listing(), cursor=cursor)
+    with pytest.raises(ValueError):
+        browse.page(browse.listing(), limit=browse.MAX_LIMIT + 1)
+
+
+@pytest.mark.db
+def test_export_streams_batches_from_a_server_side_cursor(monkeypatch):
+    rows = [(3, date(2025, 1, 3), "u3", 'say "hi", ok'), (2, None, "u2", None),
+            (1, None, "u1", "x")]
+    fake = _Pool(list(rows))
+    monkeypatch.setattr(browse, "pool", fake)
+    lst = browse.listing(["url", "comments"])
+
+    chunks = list(browse.export(lst, "csv", batch_size=2))
+
+    assert chunks == ["url,comments\r\n", 'u3,"say ""hi"", ok"\r\nu2,\r\n', "u1,x\r\n"]
+    assert fake.names == ["applicants_export"] and fake.timeouts == [0]
+    assert fake.executed[0][1][-1] is None  # no LIMIT
+
+    fake.rows = rows[:1]
+    assert list(browse.export(lst, "jsonl")) == ['{"url":"u3","comments":"say \\"hi\\", ok"}\n']
+
+
+@pytest.mark.db
+def test_export_validates_before_streaming(monkeypatch):
+    fake = _Pool([])
+    monkeypatch.setattr(browse, "pool", fake)
+    with pytest.raises(ValueError):
+        browse.export(browse.listing(), "xml")
+    with pytest.raises(ValueError):
+        browse.export(browse.listing(), "csv", cursor="garbage")
+    assert not fake.executed
@@ -4,7 +4,7 @@ import pytest
 from app import routes  # fixes R0402: consider-using-from-import
 import app.db as db
 from app.db_helper import insert_records_by_url
-from load_data import data_type
+from app.records import data_type
 
 
 def _fake_rows():
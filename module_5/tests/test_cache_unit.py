@@ -0,0 +1,151 @@
+# pylint: disable=missing-function-docstring
+"""Unit tests for app.cache (TTL, LRU, version invalidation, single-flight)."""
+
+import threading
+import time
+
+import pytest
+
+from app.cache import QueryCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(name="clock")
+def _clock():
+    return _Clock()
+
+
+@pytest.mark.db
+def test_hit_until_ttl_expires(clock):
+    cache = QueryCache(ttl=10, maxsize=8, clock=clock)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_compute("k", compute) == 1
+    clock.now = 9.9
+    assert cache.get_or_compute("k", compute) == 1
+    clock.now = 10.0
+    assert cache.get_or_compute("k", compute) == 2
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert stats["hit_rate"] == pytest.approx(1 / 3)
+
+
+@pytest.mark.db
+def test_bump_invalidates_immediately(clock):
+    cache = QueryCache(ttl=60, clock=clock)
+    values = iter([1, 2])
+    assert cache.get_or_compute("k", lambda: next(values)) == 1
+    assert cache.bump() == 1
+    assert cache.get_or_compute("k", lambda: next(values)) == 2
+    assert cache.stats()["bumps"] == 1
+
+
+@pytest.mark.db
+def test_lru_evicts_least_recently_used(clock):
+    cache = QueryCache(ttl=60, maxsize=2, clock=clock)
+    cache.get_or_compute("a", lambda: "a")
+    cache.get_or_compute("b", lambda: "b")
+    cache.get_or_compute("a", lambda: "stale")  # touch a
+    cache.get_or_compute("c", lambda: "c")      # evicts b
+
+    assert cache.get_or_compute("a", lambda: "new") == "a"
+    assert cache.get_or_compute("b", lambda: "new") == "new"
+    assert cache.stats()["evictions"] == 2
+
+
+@pytest.mark.db
+def test_zero_ttl_disables_caching():
+    cache = QueryCache(ttl=0)
+    values = iter([1, 2])
+    assert cache.get_or_compute("k", lambda: next(values)) == 1
+    assert cache.get_or_compute("k", lambda: next(values)) == 2
+    assert cache.stats()["size"] == 0
+
+
+@pytest.mark.db
+def test_single_flight_coalesces_concurrent_misses():
+    cache = QueryCache(ttl=60)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.get_or_compute("k", slow)))
+    leader.start()
+    started.wait(5)
+    followers = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("k", slow)))
+        for _ in range(4)
+    ]
+    for t in followers:
+        t.start()
+    while cache.stats()["coalesced"] < 4:
+        time.sleep(0.001)
+    release.set()
+    for t in [leader, *followers]:
+        t.join(5)
+
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+    assert cache.stats()["hit_rate"] == pytest.approx(4 / 5)
+
+
+@pytest.mark.db
+def test_failure_propagates_to_waiters_and_is_not_cached():
+    cache = QueryCache(ttl=60)
+
+    def boom():
+        raise RuntimeError("db down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("k", boom)
+    assert cache.get_or_compute("k", lambda: "ok") == "ok"
+
+
+@pytest.mark.db
+def test_result_computed_across_a_bump_is_not_stored():
+    cache = QueryCache(ttl=60)
+
+    def racing():
+        cache.bump()  # a write lands while the query runs
+        return "old"
+
+    assert cache.get_or_compute("k", racing) == "old"
+    assert cache.get_or_compute("k", lambda: "new") == "new"
+
+
+@pytest.mark.db
+def test_cached_decorator_keys_on_arguments():
+    cache = QueryCache(ttl=60)
+    calls = []
+
+    @cache.cached
+    def double(x, scale=2):
+        calls.append(x)
+        return x * scale
+
+    assert double(3) == 6
+    assert double(3) == 6
+    assert double(3, scale=3) == 9
+    assert double.__wrapped__(4) == 8
+    assert calls == [3, 3, 4]
+
+    cache.clear()
+    assert cache.stats()["hits"] == 0 and cache.stats()["size"] == 0
@@ -0,0 +1,210 @@
+# pylint: disable=missing-function-docstring
+"""Unit tests for app.columnar (COPY load, appends, vectorized queries)."""
+
+from contextlib import contextmanager
+import importlib
+
+import pytest
+
+import app.analytics as an
+import app.columnar as col
+
+# term_year, term_season, university, program, degree, citizenship, decision,
+# gpa, gre, gre_v, gre_aw
+ROWS = [
+    (2025, "Fall", "JHU", "CS", "Masters", "American", "Accepted", 3.9, 165.0, 160.0, 4.5),
+    (2025, "Fall", "JHU", "CS", "Masters", "International", "Rejected", 3.1, None, None, None),
+    (2025, "Fall", "GU", "CS", "PhD", "American", "Accepted", 9.9, 120.0, None, 5.0),
+    (2025, "Spring", "GU", "Math", "PhD", None, "Accepted", 3.5, None, None, None),
+    (2024, "Fall", "JHU", "CS", "Masters", "American", None, None, None, None, None),
+]
+
+
+class _Copy:
+    def __init__(self, log):
+        self._log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):  # pylint: disable=unused-argument
+        return False
+
+    def set_types(self, types):
+        self._log.append(types)
+
+    def rows(self):
+        return iter(ROWS)
+
+
+class _Pool:
+    def __init__(self):
+        self.log = []
+
+    @contextmanager
+    def connection(self):
+        yield self
+
+    @contextmanager
+    def cursor(self):
+        yield self
+
+    def copy(self, stmt):
+        self.log.append(stmt)
+        return _Copy(self.log)
+
+
+class _Clock:
+    now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(name="store")
+def _store(monkeypatch):
+    fake = _Pool()
+    monkeypatch.setattr(col, "pool", fake)
+    monkeypatch.setattr(col, "LOAD_CHUNK", 2)
+    store = col.ColumnStore(enabled=True, max_age=60, clock=_Clock())
+    store.pool_log = fake.log
+    return store
+
+
+@pytest.mark.db
+def test_load_reads_one_copy_and_encodes_columns(store):
+    assert store.load() == 5
+    assert store.pool_log == [col.COPY_OUT, col.COPY_TYPES]
+    stats = store.stats()
+    assert stats["rows"] == 5 and stats["loaded"]
+    assert stats["distinct"]["citizenship"] == 2  # NULL is not a dictionary entry
+    assert stats["bytes"] > 0
+
+
+@pytest.mark.db
+def test_plain_aggregates_match_sql_semantics(store):
+    q = an.query(term="Fall 2025",
+                 aggregates=["count", "avg_gpa", "avg_gre", "avg_gre_v", "accept_rate"])
+    count, gpa, gre, gre_v, rate = store.execute(q)[0]
+    assert count == 3
+    assert gpa == pytest.approx((3.9 + 3.1) / 2)  # 9.9 is out of range
+    assert gre == 165.0  # 120 is out of range
+    assert gre_v == 160.0
+    assert rate == pytest.approx(200 / 3)
+
+    empty = store.execute(an.query(degree="Nope", aggregates=["count", "avg_gpa",
+                                                               "accept_rate"]))
+    assert empty == [(0, None, None)]
+
+
+@pytest.mark.db
+def test_grouped_query_orders_limits_and_decodes_nulls(store):
+    q = an.query(group_by=["citizenship"], aggregates=["count"])
+    rows = store.execute(q)
+    assert rows[0] == ("American", 3)
+    assert sorted(rows[1:], key=str) == [("International", 1), (None, 1)]
+
+    q = an.query(term_year=2025, group_by=["program", "degree"], limit=2)
+    assert store.execute(q) == [("CS", "Masters", 2), ("CS", "PhD", 1)]
+
+    q = an.query(group_by=["degree"], aggregates=["avg_gre_aw"], order_by="degree")
+    assert store.execute(q) == [("Masters", 4.5), ("PhD", 5.0)]
+
+
+@pytest.mark.db
+def test_filters_with_lists_nulls_and_unseen_values(store):
+    q = an.query(decision=["Accepted", None], citizenship=[None, "Martian"])
+    assert store.execute(q) == [(1,)]
+
+
+@pytest.mark.db
+def test_append_extends_loaded_snapshot_only(store):
+    record = {
+        "term_year": 2025, "term_season": "Fall", "llm_generated_university": "GU",
+        "llm_generated_program": "CS", "degree": "PhD", "us_or_international": "American",
+        "decision": "Accepted", "gpa": 4.0, "gre": None, "gre_v": None, "gre_aw": None,
+    }
+    store.append([record])
+    assert store.size == 0  # not loaded: nothing to keep current
+
+    store.load()
+    store.append([])
+    store.append([record] * 2000)  # grows past the initial capacity
+    q = an.query(university="GU", degree="PhD", term_year=2025, decision="Accepted")
+    assert store.execute(q) == [(2002,)]
+
+
+@pytest.mark.db
+def test_reset_and_max_age_trigger_reload(store):
+    store.execute(an.query())
+    assert store.pool_log.count(col.COPY_OUT) == 1
+    store.execute(an.query())
+    assert store.pool_log.count(col.COPY_OUT) == 1
+
+    store.reset()
+    assert not store.loaded
+    store.execute(an.query())
+    assert store.pool_log.count(col.COPY_OUT) == 2
+
+    store._clock.now = 60  # pylint: disable=protected-access
+    store.execute(an.query())
+    assert store.pool_log.count(col.COPY_OUT) == 3
+
+
+@pytest.mark.db
+def test_query_data_and_analytics_use_enabled_store(store, monkeypatch):
+    import app.query_data as qd  # pylint: disable=import-outside-toplevel
+
+    importlib.reload(qd)  # undo the conftest stubs
+    monkeypatch.setattr(col, "store", store)
+    qd.query_cache.bump()
+    assert qd.count_fall_2025() == 3
+    assert qd.percent_international() == {
+        "international_count": 1, "us_count": 3, "other_count": 0,
+    }
+    dash = qd.dashboard()
+    assert dash.applicant_count == 3 and dash.jhu_ms_cs == 0
+    assert sorted(dash.degree_counts) == [("Masters", 2), ("PhD", 2)]
+    assert dash.top_programs == [("CS", 3), ("Math", 1)]
+    assert an.run(an.query(group_by=["decision"], limit=1)) == [
+        {"decision": "Accepted", "count": 3},
+    ]
+
+
+@pytest.mark.db
+def test_stddev_matches_sample_standard_deviation(store):
+    import statistics  # pylint: disable=import-outside-toplevel
+
+    q = an.query(group_by=["degree"], aggregates=["stddev_gpa", "stddev_gre"],
+                 order_by="degree")
+    masters, phd = store.execute(q)
+    assert masters[1] == pytest.approx(statistics.stdev([3.9, 3.1]))
+    assert masters[2] is None  # a single valid GRE
+    assert phd == ("PhD", None, None)
+
+
+@pytest.mark.db
+def test_values_returns_filtered_score_column(store):
+    vals = store.values("gpa", an.query(term="Fall 2025").filters)
+    assert vals.tolist() == [3.9, 3.1, 9.9]
+    assert store.values("gre").size == len(ROWS)
+
+
+@pytest.mark.db
+def test_load_columns_matches_copy_load(store):
+    store.load()
+    q = an.query(term_year=2025, group_by=["degree"], aggregates=["count", "avg_gpa"])
+    expected = store.execute(q)
+
+    columns = list(zip(*ROWS))
+    dims = {}
+    for i, dim in enumerate(col.DIMENSIONS):
+        values = sorted({v for v in columns[i] if v is not None}, key=str)
+        dims[dim] = ([-1 if v is None else values.index(v) for v in columns[i]], values)
+    scores = {c: [float("nan") if v is None else v for v in columns[j]]
+              for j, c in enumerate(col.RANGES, start=len(col.DIMENSIONS))}
+
+    other = col.ColumnStore(enabled=True, max_age=60, clock=_Clock())
+    assert other.load_columns(dims, scores) == 5
+    assert other.execute(q) == expected
+    assert store.pool_log.count(col.COPY_OUT) == 1  # no reload from the database
@@ -1,7 +1,8 @@
 # pylint: disable=missing-function-docstring
-"""Unit tests for app.db_helper (JSON I/O, RID discovery, inserts)."""
+"""Unit tests for app.db_helper (JSON I/O, RID lookup, inserts)."""
 
 import json
+from types import SimpleNamespace
 import pytest
 
 import app.db_helper as dh
@@ -19,6 +20,9 @@ class _FakeCursor:
         self._seen_urls = set()
         self.rowcount = 0
         self._fetched = []
+        self._stage = []
+        self._known = set()
+        self.statements = []
 
     # allow: with conn.cursor() as cur:
     def __enter__(self):
@@ -27,12 +31,30 @@ class _FakeCursor:
     def __exit__(self, exc_type, exc, tb):  # pylint: disable=unused-argument
         return False
 
-    # SELECT url FROM applicants -> preload what existing_rids() will fetch
-    def preload_urls(self, urls):
-        self._fetched = [(u,) for u in urls]
+    # SELECT rid FROM applicants -> preload the rids known_rids() can find
+    def preload_rids(self, rids):
+        self._known = set(rids)
+
+    def copy(self, _sql):
+        """Simulate COPY ... FROM STDIN into the staging table."""
+        return _FakeCopy(self._stage)
 
     def execute(self, _sql, params=None):
         """Simulate executing INSERT ... ON CONFLICT (url) DO NOTHING."""
+        self.statements.append(_sql)
+        if _sql is dh.INSERT_FROM_STAGE:
+            self._fetched = []
+            for row in self._stage:
+                url = row[3]
+                if url not in self._seen_urls:
+                    self._seen_urls.add(url)
+                    self._fetched.append((url,))
+            self._stage.clear()
+            return
+        if params is not None and len(params) == 1:
+            # SELECT rid ... WHERE rid = ANY(%s)
+            self._fetched = [(r,) for r in params[0] if r in self._known]
+            return
         if params is not None:
             url = params[3]  # url is the 4th value per db_helper column order
             if url not in self._seen_urls:
@@ -53,6 +75,22 @@ class _FakeCursor:
         return set(self._seen_urls)
 
 
+class _FakeCopy:
+    """Collects rows written through ``cur.copy(...)``."""
+
+    def __init__(self, sink):
+        self._sink = sink
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):  # pylint: disable=unused-argument
+        return False
+
+    def write_row(self, row):
+        self._sink.append(list(row))
+
+
 class _FakeConn:
     """A fake database connection that uses a _FakeCursor."""
 
@@ -86,17 +124,18 @@ class _FakePool:
         return self.last_conn
 
 
-def _patch_pool_and_table(monkeypatch, preload_urls=None):
-    """Patch db_helper's pool & ensure_table so nothing touches a real DB.
+def _patch_pool_and_table(monkeypatch, preload_rids=None):
+    """Patch db_helper's pool so nothing touches a real DB.
 
-    Optionally preload URLs for existing_rids(). Returns (cursor, fake_pool).
+    Optionally preload stored rids for known_rids(). Returns (cursor, fake_pool).
     """
     cur = _FakeCursor()
-    if preload_urls is not None:
-        cur.preload_urls(preload_urls)
+    if preload_rids is not None:
+        cur.preload_rids(preload_rids)
     fake_pool = _FakePool(cur)
     monkeypatch.setattr(dh, "pool", fake_pool)
-    monkeypatch.setattr(dh, "ensure_table", lambda: None)
+    # Rows keep their text values; dimension ids are covered in test_dimensions_unit.
+    monkeypatch.setattr(dh.dimensions, "cache", SimpleNamespace(encode=lambda rows, _cols: rows))
     return cur, fake_pool
 
 
@@ -134,21 +173,21 @@ def test_write_json_writes_valid_json_array(tmp_path):
 
 
 @pytest.mark.db
-def test_existing_rids_parses_ids_from_urls_and_ignores_empty(monkeypatch):
-    """existing_rids() drops empty/None and extracts numeric IDs from URLs."""
-    preload = [
-        None,  # ignored by 'if url:'
-        "",    # ignored by 'if url:'
-        "https://www.thegradcafe.com/result/123",
-        "https://www.thegradcafe.com/result/42?utm=x",
-        "https://www.thegradcafe.com/result/9999",
-    ]
-    _cur, _pool = _patch_pool_and_table(monkeypatch, preload_urls=preload)
+def test_known_rids_asks_db_for_page_ids_only(monkeypatch):
+    """known_rids() sends the page's numeric ids and returns the stored ones."""
+    cur, _pool = _patch_pool_and_table(monkeypatch, preload_rids={123, 9999, 5})
+
+    known = dh.known_rids(["123", "42", "9999", "123", "", "abc"])
+
+    assert known == {"123", "9999"}
+    assert cur.statements[-1].as_string(None).endswith("= ANY(%s)")
 
-    rids = dh.existing_rids()
-    assert "123" in rids
-    assert "9999" in rids
-    assert any(s.startswith("42") for s in rids)  # handle querystring suffix
+
+@pytest.mark.db
+def test_known_rids_skips_query_for_empty_page(monkeypatch):
+    cur, _pool = _patch_pool_and_table(monkeypatch)
+    assert dh.known_rids([]) == set()
+    assert not cur.statements
 
 
 @pytest.mark.db
@@ -173,6 +212,11 @@ def test_insert_records_by_url_counts_only_unique_and_commits(monkeypatch):
             None,
             rec.get("llm_generated_program"),
             rec.get("llm_generated_university"),
+            None,
+            None,
+            None,
+            None,  # term_season, term_year, decision, decision_date
+            None,  # rid
         ]
 
     rows = [
@@ -196,3 +240,68 @@ def test_insert_records_by_url_counts_only_unique_and_commits(monkeypatch):
     assert inserted == 1
     assert cur.seen_urls == {"https://www.thegradcafe.com/result/123"}
     assert pool.last_conn is not None and pool.last_conn.commits == 1
+
+
+def _record(n):
+    return {
+        "program": "Computer Science, JHU",
+        "url": f"https://www.thegradcafe.com/result/{n}",
+        "date_added": "September 05, 2025",
+        "term": "Fall 2025",
+    }
+
+
+@pytest.mark.db
+def test_insert_records_bulk_returns_inserted_urls_across_batches(monkeypatch):
+    """Bulk path stages each batch, skips duplicates, and commits once."""
+    cur, pool = _patch_pool_and_table(monkeypatch)
+    rows = [_record(1), _record(2), _record(1), _record(3), _record(2)]
+    version = dh.query_cache.version
+
+    urls = dh.insert_records_bulk(rows, batch_size=2)
+
+    assert urls == [f"https://www.thegradcafe.com/result/{n}" for n in (1, 2, 3)]
+    assert cur.statements.count(dh.INSERT_FROM_STAGE) == 3  # ceil(5 / 2)
+    assert cur.statements[0] is dh.CREATE_STAGE
+    assert pool.last_conn.commits == 1
+    assert dh.query_cache.version == version + 1  # cached dashboard invalidated
+
+
+@pytest.mark.db
+def test_insert_records_bulk_empty_is_noop(monkeypatch):
+    cur, _pool = _patch_pool_and_table(monkeypatch)
+    version = dh.query_cache.version
+    assert not dh.insert_records_bulk([])
+    assert not cur.statements
+    assert dh.query_cache.version == version
+
+
+@pytest.mark.db
+def test_insert_records_by_url_loop_path_when_batch_size_zero(monkeypatch):
+    """batch_size=0 keeps the one-statement-per-row loop."""
+    cur, pool = _patch_pool_and_table(monkeypatch)
+    rows = [_record(7), _record(7), _record(8)]
+    version = dh.query_cache.version
+
+    inserted = dh.insert_records_by_url(rows, batch_size=0)
+
+    assert inserted == 2
+    assert dh.query_cache.version == version + 1
+    assert dh.INSERT_FROM_STAGE not in cur.statements
+    assert len(cur.statements) == 3
+    assert pool.last_conn.commits == 1
+
+
+@pytest.mark.db
+def test_insert_records_bulk_appends_inserted_rows_to_loaded_snapshot(monkeypatch):
+    """A loaded columnar snapshot receives exactly the rows that were inserted."""
+    _cur, _pool = _patch_pool_and_table(monkeypatch)
+    appended = []
+    monkeypatch.setattr(dh.columnar, "store", SimpleNamespace(loaded=True, append=appended.extend))
+
+    dh.insert_records_bulk([_record(1), _record(1), _record(2)], batch_size=10)
+
+    assert [r["url"] for r in appended] == [
+        "https://www.thegradcafe.com/result/1", "https://www.thegradcafe.com/result/2",
+    ]
+    assert appended[0]["term_year"] == 2025
@@ -6,7 +6,7 @@ from app import routes  # fixes R0402
 import app.db as db
 import app.query_data as qd  # keep top-level to avoid C0415
 from app.db_helper import insert_records_by_url
-from src.load_data import data_type  # avoids E0401 in some setups
+from src.app.records import data_type  # avoids E0401 in some setups
 
 
 def _fake_llm_rows():
@@ -73,14 +73,13 @@ def _install_sync_worker(monkeypatch, rows):
 
 @pytest.fixture(autouse=True)
 def _truncate_table():
-    """Ensure the `applicants` table is empty before and after each test."""
-    db.ensure_table()
+    """Ensure `applicant_rows` (behind the `applicants` view) is empty around each test."""
     with db.pool.connection() as conn, conn.cursor() as cur:
-        cur.execute("TRUNCATE TABLE applicants;")
+        cur.execute("TRUNCATE TABLE applicant_rows;")
         conn.commit()
     yield
     with db.pool.connection() as conn, conn.cursor() as cur:
-        cur.execute("TRUNCATE TABLE applicants;")
+        cur.execute("TRUNCATE TABLE applicant_rows;")
         conn.commit()
 
 
@@ -0,0 +1,126 @@
+# pylint: disable=missing-function-docstring
+"""Unit tests for app.db (the shared, lazily opened connection pool)."""
+
+import pytest
+
+import app.db as db
+
+
+# ---------- tiny fake psycopg_pool ----------
+
+class _RecordingConn:
+    def __init__(self, log):
+        self.log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):  # pylint: disable=unused-argument
+        return False
+
+    def execute(self, stmt, params=None):
+        self.log.append(("execute", stmt, params))
+
+    def commit(self):
+        self.log.append(("commit",))
+
+    def rollback(self):
+        self.log.append(("rollback",))
+
+
+class _RecordingPool:
+    """Stands in for psycopg_pool.ConnectionPool and records how it was built."""
+
+    created = []
+    check_connection = staticmethod(lambda conn: None)
+
+    def __init__(self, conninfo, **kwargs):
+        self.conninfo = conninfo
+        self.kwargs = kwargs
+        self.log = []
+        self.closed = False
+        self.stats = {"pool_size": 3, "pool_available": 1, "requests_num": 10,
+                      "requests_queued": 2, "requests_wait_ms": 40}
+        _RecordingPool.created.append(self)
+
+    def connection(self, timeout=None):
+        self.log.append(("checkout", timeout))
+        return _RecordingConn(self.log)
+
+    def get_stats(self):
+        return dict(self.stats)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(name="shared")
+def _shared(monkeypatch):
+    _RecordingPool.created = []
+    monkeypatch.setattr(db.psycopg_pool, "ConnectionPool", _RecordingPool)
+    return db.SharedPool("postgresql://x/y", min_size=1, max_size=4, timeout=2,
+                         statement_timeout_ms=1500)
+
+
+@pytest.mark.db
+def test_shared_pool_opens_lazily_with_configured_limits(shared):
+    assert not _RecordingPool.created
+    assert shared.stats()["opened"] is False
+
+    with shared.connection() as conn:
+        conn.execute("SELECT 1")
+    shared.get()
+
+    assert len(_RecordingPool.created) == 1
+    real = _RecordingPool.created[0]
+    assert real.kwargs["max_size"] == 4 and real.kwargs["timeout"] == 2
+    assert real.kwargs["kwargs"] == {"options": "-c statement_timeout=1500"}
+    assert real.kwargs["check"] is _RecordingPool.check_connection
+
+
+@pytest.mark.db
+def test_shared_pool_reopens_after_fork(shared, monkeypatch):
+    first = shared.get()
+    monkeypatch.setattr(db.os, "getpid", lambda: -1)
+    assert shared.get() is not first
+    assert not first.closed  # the parent's connections are left alone
+
+
+@pytest.mark.db
+def test_shared_pool_stats(shared):
+    shared.get()
+    stats = shared.stats()
+    assert stats["opened"] is True
+    assert (stats["size"], stats["in_use"], stats["misses"], stats["wait_ms"]) == (3, 2, 2, 40)
+    assert stats["errors"] == 0
+
+
+@pytest.mark.db
+def test_shared_pool_statement_timeout_override_is_restored(shared):
+    with shared.connection(statement_timeout_ms=0) as conn:
+        conn.execute("SELECT 1")
+    log = shared.get().log
+    sets = [e[2] for e in log if e[0] == "execute" and e[1] is db.SET_STATEMENT_TIMEOUT]
+    assert sets == [("0",), ("1500",)]
+
+    with pytest.raises(ValueError):
+        with shared.connection(statement_timeout_ms=0):
+            raise ValueError("boom")
+    assert ("rollback",) in log
+    assert log[-2][2] == ("1500",)
+
+
+@pytest.mark.db
+def test_shared_pool_check_and_close(shared, monkeypatch):
+    assert shared.check() is True
+
+    def broken(timeout=None):
+        raise db.psycopg_pool.PoolTimeout("no connection")
+
+    monkeypatch.setattr(shared.get(), "connection", broken)
+    assert shared.check() is False
+
+    real = shared.get()
+    shared.close()
+    assert real.closed
+    assert shared.stats()["opened"] is False
@@ -0,0 +1,97 @@
+# pylint: disable=missing-function-docstring
+"""Unit tests for app.dimensions (dictionary-encoded text columns)."""
+
+from contextlib import contextmanager
+
+import pytest
+
+import app.dimensions as dims
+
+
+class _Cursor:
+    """Fake dimension tables: ids are handed out in insertion order."""
+
+    def __init__(self, tables, log):
+        self._tables, self._log = tables, log
+        self._fetched = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):  # pylint: disable=unused-argument
+        return False
+
+    def execute(self, stmt, params):
+        col = next(c for c in dims.ENCODED if stmt in (dims.ADD_VALUES[c], dims.SELECT_IDS[c]))
+        ids = self._tables.setdefault(col, {})
+        self._log.append((stmt, list(params[0])))
+        if stmt is dims.ADD_VALUES[col]:
+            for value in params[0]:
+                ids.setdefault(value, len(ids) + 1)
+        else:
+            self._fetched = [(v, ids[v]) for v in params[0] if v in ids]
+
+    def fetchall(self):
+        return list(self._fetched)
+
+
+class _Pool:
+    def __init__(self):
+        self.tables, self.log, self.commits = {}, [], 0
+
+    @contextmanager
+    def connection(self):
+        yield self
+
+    def cursor(self):
+        return _Cursor(self.tables, self.log)
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture(name="fake")
+def _fake(monkeypatch):
+    fake = _Pool()
+    monkeypatch.setattr(dims, "pool", fake)
+    return fake
+
+
+@pytest.mark.db
+def test_encode_replaces_dimension_values_and_resolves_each_once(fake):
+    cache = dims.DimensionCache()
+    cols = ("url", "degree", "gpa", "llm_generated_university")
+    rows = [["u1", "PhD", 3.9, "MIT"], ["u2", "Masters", None, None], ["u3", "PhD", 3.1, "MIT"]]
+
+    out = cache.encode(rows, cols)
+
+    assert out == [["u1", 2, 3.9, 1], ["u2", 1, None, None], ["u3", 2, 3.1, 1]]
+    assert rows[0] == ["u1", "PhD", 3.9, "MIT"]  # input left untouched
+    assert [values for _stmt, values in fake.log] == [
+        ["Masters", "PhD"], ["Masters", "PhD"], ["MIT"], ["MIT"],
+    ]
+    assert fake.commits == 1 and len(cache) == 3
+
+    # Known values are served from memory; only the new one reaches the database.
+    assert cache.encode([("u4", "PhD", 3.0, "Yale")], cols) == [["u4", 2, 3.0, 2]]
+    assert [values for _stmt, values in fake.log[4:]] == [["Yale"], ["Yale"]]
+    assert cache.encode([("u5", "Masters", None, "MIT")], cols) == [["u5", 1, None, 1]]
+    assert fake.commits == 2
+
+
+@pytest.mark.db
+def test_encode_picks_up_ids_added_by_another_process(fake):
+    fake.tables["term"] = {"Fall 2025": 7}
+    assert dims.DimensionCache().encode([("Fall 2025",)], ("term",)) == [[7]]
+
+
+@pytest.mark.db
+def test_stored_and_decoded_columns():
+    assert dims.stored(("url", "program", "term_year")) == ("url", "program_id", "term_year")
+
+    text = dims.decoded(dims.APPLICANT_ROWS).as_string(None)
+    assert text.startswith('SELECT r."p_id", "program".value AS "program", r."comments"')
+    assert 'FROM "applicant_rows" AS r LEFT JOIN "dim_program" AS "program"' in text
+    assert text.count("LEFT JOIN") == len(dims.ENCODED)
+    for col in dims.APPLICANT_COLUMNS:
+        assert f'AS "{col}"' in text or f'r."{col}"' in text
@@ -0,0 +1,165 @@
+# pylint: disable=missing-function-docstring
+"""Unit tests for app.distributions (score histograms and percentiles)."""
+
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import app.analytics as an
+import app.distributions as dist
+
+
+class _Cursor:
+    def __init__(self, rows, log):
+        self._rows, self._log = rows, log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):  # pylint: disable=unused-argument
+        return False
+
+    def execute(self, stmt, params=None):
+        self._log.append((stmt, params))
+
+    def fetchone(self):
+        return self._rows[0]
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+class _Pool:
+    def __init__(self, rows):
+        self.rows, self.log = rows, []
+
+    @contextmanager
+    def connection(self):
+        yield self
+
+    def cursor(self):
+        return _Cursor(self.rows, self.log)
+
+
+# ---------- accuracy against exact percentiles ----------
+
+def _samples(rng):
+    return {
+        "gpa": np.round(rng.normal(3.6, 0.3, 5000).clip(2.0, 4.3), 2),
+        "gre": rng.integers(140, 171, 5000).astype(float),
+        "gre_v": rng.integers(130, 171, 5000).astype(float),
+        "gre_aw": rng.integers(4, 13, 5000) / 2,
+    }
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("score", ["gpa", "gre", "gre_v", "gre_aw"])
+def test_percentiles_are_within_one_bin_of_exact(score):
+    values = _samples(np.random.default_rng(7))[score]
+    hist = dist.Histogram.from_values(score, values)
+
+    assert hist.count == len(values)
+    for p in (1, 10, 25, 50, 75, 90, 99):
+        assert abs(hist.percentile(p) - np.percentile(values, p)) <= hist.width + 1e-9
+
+
+@pytest.mark.db
+def test_merged_cells_equal_the_histogram_of_all_values():
+    values = _samples(np.random.default_rng(11))["gpa"]
+    parts = [dist.Histogram.from_values("gpa", chunk) for chunk in np.array_split(values, 7)]
+    merged = parts[0]
+    for part in parts[1:]:
+        merged = merged.merge(part)
+
+    assert merged == dist.Histogram.from_values("gpa", values)
+    with pytest.raises(ValueError):
+        merged.merge(dist.Histogram("gre", 1.0))
+
+
+@pytest.mark.db
+def test_binning_skips_missing_and_out_of_range_and_keeps_edges():
+    hist = dist.Histogram.from_values("gpa", [3.5, 3.5, None, float("nan"), 9.9, 0.0, 4.3])
+    assert hist.bins == ((350, 2), (430, 1))
+    assert hist.percentile(0) == 3.5
+    assert hist.percentile(100) == 4.3  # clamped to the validity range
+    assert dist.Histogram("gpa", 0.01).percentile(50) is None
+    with pytest.raises(ValueError):
+        hist.percentile(101)
+    with pytest.raises(ValueError):
+        dist.Histogram.from_values("toefl", [100])
+
+
+@pytest.mark.db
+def test_coarsen_and_as_dict():
+    hist = dist.Histogram.from_values("gpa", [3.41, 3.45, 3.52, 3.99])
+    coarse = hist.coarsen(0.1)
+    assert coarse.width == pytest.approx(0.1)
+    assert coarse.bins == ((34, 2), (35, 1), (39, 1))
+    assert coarse.as_dict()["bins"][0] == {"low": 3.4, "high": 3.5, "count": 2}
+    with pytest.raises(ValueError):
+        hist.coarsen(0.015)
+
+
+# ---------- SQL ----------
+
+@pytest.mark.db
+def test_build_merges_the_filtered_cells():
+    stmt, params = dist.build("gre", an.query(term="Fall 2025", degree="PhD").filters)
+    assert " ".join(stmt.as_string(None).split()) == (
+        'SELECT bin, SUM(n)::BIGINT FROM "applicant_score_bins" WHERE score = %s AND '
+        '("degree"::text = %s) AND ("term_season"::text = %s) AND ("term_year" = %s) '
+        "GROUP BY bin HAVING SUM(n) > 0 ORDER BY bin"
+    )
+    assert params == ["gre", "PhD", "Fall", 2025]
+    assert "WHERE score = %s AND TRUE" in dist.build("gpa")[0].as_string(None)
+
+
+@pytest.mark.db
+def test_trigger_and_rebuild_bin_every_score():
+    body = dist.CREATE_TRIGGER_FUNCTION.as_string(None)
+    for op in ("INSERT", "UPDATE", "DELETE", "TRUNCATE"):
+        assert f"TG_OP = '{op}'" in body
+    assert body.count('DELETE FROM "applicant_score_bins" WHERE n = 0') == 2
+
+    text = dist.REBUILD_BINS.as_string(None)
+    assert text.startswith('LOCK TABLE "applicants" IN SHARE MODE')
+    for score, width in dist.BIN_WIDTHS.items():
+        assert f"floor(\"{score}\" / {width} + 1e-09)::INTEGER" in text
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("exists, rebuilt", [(False, True), (True, False)])
+def test_ensure_bins_fills_only_a_new_table(exists, rebuilt):
+    conn = _Pool([(exists,)])
+    dist.ensure_bins(conn)
+    statements = [stmt for stmt, _params in conn.log]
+    assert statements[:4] == [
+        dist.HAS_BINS, dist.CREATE_BINS, dist.CREATE_TRIGGER_FUNCTION, dist.CREATE_TRIGGERS,
+    ]
+    assert (dist.REBUILD_BINS in statements) is rebuilt
+
+
+# ---------- queries ----------
+
+@pytest.mark.db
+def test_histogram_reads_merged_bins_once_and_caches(monkeypatch):
+    fake = _Pool([(350, 3), (380, 1)])
+    monkeypatch.setattr(dist, "pool", fake)
+    q = an.query(degree="PhD")
+
+    hist = dist.histogram("gpa", q)
+    assert hist == dist.Histogram("gpa", 0.01, ((350, 3), (380, 1)))
+    assert dist.percentiles("gpa", [50], q) == {50: pytest.approx(3.5 + 2 / 3 * 0.01)}
+    assert len(fake.log) == 1
+
+
+@pytest.mark.db
+def test_histogram_uses_enabled_columnar_store(monkeypatch):
+    seen = []
+    monkeypatch.setattr(dist.columnar, "store", SimpleNamespace(
+        enabled=True, values=lambda col, filters: seen.append((col, filters)) or [160.0, 161.0],
+    ))
+    assert dist.histogram("gre").bins == ((160, 1), (161, 1))
+    assert seen == [("gre", ())]
@@ -0,0 +1,132 @@
+# pylint: disable=missing-function-docstring
+"""Unit tests for app.export (COPY TO STDOUT bulk export)."""
+
+from contextlib import contextmanager
+import gzip
+import sys
+
+import pytest
+
+import app.browse as browse
+import app.export as export
+
+
+class _Copy:
+    def __init__(self, blocks):
+        self._blocks = blocks
+
+    def __iter__(self):
+        return iter(self._blocks)
+
+
+class _Pool:
+    """Answers every COPY with canned blocks (one per row, as the server does)."""
+
+    def __init__(self, blocks):
+        self.blocks, self.copied, self.timeouts = blocks, [], []
+        self.rowcount = -1
+
+    @contextmanager
+    def connection(self, statement_timeout_ms=None):
+        self.timeouts.append(statement_timeout_ms)
+        yield self
+
+    @contextmanager
+    def cursor(self):
+        yield self
+
+    @contextmanager
+    def copy(self, stmt, params):
+        self.copied.append((stmt, params))
+        yield _Copy(self.blocks)
+        self.rowcount = len(self.blocks) - 1
+
+
+@pytest.mark.db
+def test_copy_statement_formats_and_filters():
+    lst = browse.listing(["url", "degree"], degree=["PhD"], gpa_min=3.5)
+
+    stmt, params = export.copy_statement(lst, "csv")
+    text = stmt.as_string(None)
+    assert text.startswith('COPY (SELECT r."url", "degree".value AS "degree" FROM "applicant_rows"')
+    assert 'WHERE r."degree_id" = (SELECT id' in text and 'AND r."gpa" >= %s' in text
+    assert text.endswith("TO STDOUT WITH (FORMAT csv, HEADER)")
+    assert params == ["PhD", 3.5]
+
+    text = export.copy_statement(lst, "jsonl")[0].as_string(None)
+    assert "SELECT row_to_json(x)::text FROM (SELECT" in text and "QUOTE E'\\x01'" in text
+
+    # Parquet partitions need the term columns even when not projected.
+    text = export.copy_statement(browse.listing(["url"]), "parquet")[0].as_string(None)
+    assert 'SELECT r."url", r."term_year", r."term_season" FROM "applicant_rows" AS r)' in text
+
+    with pytest.raises(ValueError):
+        export.copy_statement(lst, "xml")
+
+
+@pytest.mark.db
+def test_stream_gzips_copy_blocks_and_counts(monkeypatch):
+    blocks = [b"url,gpa\n", b"u1,3.5\n", b"u2,\n"]
+    fake = _Pool(blocks)
+    monkeypatch.setattr(export, "pool", fake)
+    stats = export.ExportStats()
+
+    data = b"".join(export.stream(browse.listing(["url", "gpa"]), "csv", stats))
+
+    assert gzip.decompress(data) == b"url,gpa\nu1,3.5\nu2,\n"
+    assert (stats.rows, stats.bytes_in, stats.bytes_out) == (2, 19, len(data))
+    assert stats.seconds > 0 and stats.mb_per_s > 0
+    assert fake.timeouts == [0]
+
+
+@pytest.mark.db
+def test_stream_validates_before_copying(monkeypatch):
+    fake = _Pool([])
+    monkeypatch.setattr(export, "pool", fake)
+    for fmt in ("parquet", "xml"):
+        with pytest.raises(ValueError):
+            export.stream(browse.listing(), fmt)
+    assert not fake.copied
+
+
+@pytest.mark.db
+def test_to_file_writes_gzip(monkeypatch, tmp_path):
+    monkeypatch.setattr(export, "pool", _Pool([b'{"url":"u1"}\n', b'{"url":"u2"}\n']))
+    out = tmp_path / "a.jsonl.gz"
+
+    stats = export.to_file(browse.listing(["url"]), "jsonl", out)
+
+    assert gzip.decompress(out.read_bytes()).splitlines() == [b'{"url":"u1"}', b'{"url":"u2"}']
+    assert stats.bytes_out == out.stat().st_size
+
+
+@pytest.mark.db
+def test_block_reader_fills_reads_across_blocks():
+    reader = export._BlockReader(iter([b"ab", b"c", b"defg"]))  # pylint: disable=W0212
+    buf = bytearray(5)
+    assert reader.readinto(buf) == 5 and bytes(buf) == b"abcde"
+    assert reader.readinto(buf) == 2 and bytes(buf[:2]) == b"fg"
+    assert reader.readinto(buf) == 0
+
+
+@pytest.mark.db
+def test_parquet_without_pyarrow_is_a_clear_error(monkeypatch, tmp_path):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    with pytest.raises(RuntimeError, match="pyarrow"):
+        export.to_file(browse.listing(), "parquet", tmp_path / "lake")
+
+
+@pytest.mark.db
+def test_parquet_partitions_by_term(monkeypatch, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    blocks = [b"url,gpa,term_year,term_season\n", b"u1,3.5,2025,Fall\n",
+              b'u2,,2026,Spring\n', b'"",3.0,2025,Fall\n']
+    monkeypatch.setattr(export, "pool", _Pool(blocks))
+
+    stats = export.to_file(browse.listing(["url", "gpa"]), "parquet", tmp_path / "lake")
+
+    assert stats.rows == 3 and stats.bytes_out > 0
+    fall = pq.read_table(tmp_path / "lake" / "term_year=2025" / "term_season=Fall")
+    assert fall.column("url").to_pylist() == ["u1", ""]
+    spring = pq.read_table(tmp_path / "lake" / "term_year=2026")
+    assert spring.column("gpa").to_pylist() == [None]
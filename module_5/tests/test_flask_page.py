@@ -47,6 +47,21 @@ def _stub_queries(monkeypatch):
     patch("count_gt_phd_accept", lambda: 2)
     patch("degree_counts_2025", lambda: [("Masters", 10)])
     patch("top_5_programs", lambda: [("CS", 8)])
+    patch(
+        "dashboard",
+        lambda: routes.query_data.Dashboard(
+            applicant_count=1,
+            citizenship={"international_count": 1, "us_count": 1, "other_count": 0},
+            avg_scores={"avg_gpa": 3.4, "avg_gre": 165, "avg_gre_v": 158, "avg_gre_aw": 4.5},
+            avg_gpa_us=3.2,
+            accept_rate=37.12,
+            avg_gpa_accept=3.6,
+            jhu_ms_cs=7,
+            georgetown_phd_cs=2,
+            degree_counts=[("Masters", 10)],
+            top_programs=[("CS", 8)],
+        ),
+    )
 
 
 # Test App factory - checking expected endpoints
@@ -88,4 +103,234 @@ def test_analysis_page(client):
 
     # Includeds "Analysis" and at least one "Answer:" (case-insensitive)
     assert soup.find(string=re.compile(r"Analysis", re.I))
-    assert soup.find(string=re.compile(r"\bAnswer:", re.I))
\ No newline at end of file
+    assert soup.find(string=re.compile(r"\bAnswer:", re.I))
+
+@pytest.mark.web
+@pytest.mark.parametrize("ok, status", [(True, 200), (False, 503)])
+def test_health_db_reports_pool_stats(client, monkeypatch, ok, status):
+    """GET /health/db returns the pool check result and its counters."""
+    monkeypatch.setattr(routes.pool, "check", lambda: ok)
+    monkeypatch.setattr(routes.pool, "stats", lambda: {"in_use": 1, "misses": 0})
+
+    r = client.get("/health/db")
+    assert r.status_code == status
+    assert r.get_json() == {"ok": ok, "pool": {"in_use": 1, "misses": 0}}
+
+
+@pytest.mark.web
+def test_health_cache_reports_hit_rate(client):
+    """GET /health/cache returns the query-cache counters."""
+    r = client.get("/health/cache")
+    assert r.status_code == 200
+    body = r.get_json()
+    assert {"hits", "misses", "coalesced", "hit_rate", "version"} <= body.keys()
+
+
+@pytest.mark.web
+def test_api_analytics_runs_query(client, monkeypatch):
+    """GET /api/analytics parses the parameters and returns the rows."""
+    seen = []
+
+    def fake_run(q):
+        seen.append(q)
+        return [{"degree": "PhD", "count": 2}]
+
+    monkeypatch.setattr(routes.analytics, "run", fake_run)
+    r = client.get("/api/analytics?term=Fall%202025&group_by=degree")
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["rows"] == [{"degree": "PhD", "count": 2}]
+    assert body["query"]["group_by"] == ["degree"]
+    assert seen[0].filters == (("term_season", ("Fall",)), ("term_year", (2025,)))
+
+
+@pytest.mark.web
+def test_api_analytics_rejects_unknown_dimension(client):
+    """Unknown names never reach SQL; the endpoint answers 400."""
+    r = client.get("/api/analytics?group_by=password")
+    assert r.status_code == 400
+    assert "password" in r.get_json()["error"]
+
+
+@pytest.mark.web
+def test_api_cube_defaults_to_term_level_with_spread(client, monkeypatch):
+    """GET /api/cube drills into term_year with counts, means and stddevs."""
+    seen = []
+    monkeypatch.setattr(routes.analytics, "run", lambda q: seen.append(q) or [])
+    r = client.get("/api/cube?degree=PhD")
+    assert r.status_code == 200
+    assert seen[0].group_by == ("term_year",)
+    assert seen[0].aggregates == routes.analytics.DRILL_AGGREGATES
+    assert "term_year" not in r.get_json()["next"]
+
+    assert client.get("/api/cube?group_by=nope").status_code == 400
+
+
+@pytest.mark.web
+def test_api_histogram_and_percentiles(client, monkeypatch):
+    """Score distributions are served for any filter combination."""
+    hist = routes.distributions.Histogram("gpa", 0.01, ((341, 1), (345, 1), (352, 2)))
+    seen = []
+    monkeypatch.setattr(routes.distributions, "histogram",
+                        lambda score, q: seen.append((score, q)) or hist)
+
+    r = client.get("/api/histogram?width=0.1&degree=PhD")
+    assert r.status_code == 200
+    body = r.get_json()
+    assert [b["count"] for b in body["bins"]] == [2, 2]
+    assert body["filters"] == {"degree": ["PhD"]}
+    assert seen[0][0] == "gpa"
+
+    r = client.get("/api/percentiles?score=gpa&p=50,100")
+    assert r.status_code == 200
+    assert r.get_json()["percentiles"] == pytest.approx({"50": 3.46, "100": 3.53})
+    assert r.get_json()["count"] == 4
+
+    assert client.get("/api/percentiles?p=150").status_code == 400
+    assert client.get("/api/histogram?width=0.015").status_code == 400
+
+
+@pytest.mark.web
+def test_analysis_approx_mode_shows_estimates(client, monkeypatch):
+    """?approx=<percent> renders sampled estimates as "≈ value ± margin"."""
+    est = routes.approximate.Estimate
+    dash = routes.approximate.ApproxDashboard(
+        applicant_count=est(1200.0, 40.0),
+        citizenship={k: est(600.0, 20.0) for k in ("international_count", "us_count")}
+        | {"other_count": est(0.0, 0.0)},
+        avg_scores={k: est(3.5, 0.05) for k in ("avg_gpa", "avg_gre", "avg_gre_v", "avg_gre_aw")},
+        avg_gpa_us=est(3.4, 0.1),
+        accept_rate=est(37.12, 1.5),
+        avg_gpa_accept=est(3.7, 0.1),
+        jhu_ms_cs=est(70.0, 9.0),
+        georgetown_phd_cs=est(10.0, 4.0),
+        degree_counts=[("Masters", est(900.0, 30.0))],
+        top_programs=[("CS", est(500.0, 25.0))],
+        international_share=est(50.0, 2.0),
+        sample_percent=1.0,
+        method="system",
+    )
+    seen = []
+    monkeypatch.setattr(routes.approximate, "dashboard",
+                        lambda pct, method: seen.append((pct, method)) or dash)
+
+    html = client.get("/analysis?approx=1").get_data(as_text=True)
+    assert seen == [(1.0, "system")]
+    assert "≈ 1200" in html and "± 40" in html
+    assert "≈ 37.12%" in html
+    assert re.search(r"1\.00%\s+SYSTEM sample", html)
+
+
+@pytest.mark.web
+def test_analysis_invalid_approx_falls_back_to_exact(client):
+    """An out-of-range sample percent shows exact values and a warning."""
+    html = client.get("/analysis?approx=0").get_data(as_text=True)
+    assert "Approximate mode unavailable" in html
+    assert "≈" not in html
+
+
+@pytest.mark.web
+def test_api_trends_reads_snapshots(client, monkeypatch):
+    """GET /api/trends returns the snapshot series, defaulting to all of them."""
+    seen = []
+    monkeypatch.setattr(routes.snapshots, "trend",
+                        lambda series, days: seen.append((series, days)) or [])
+    r = client.get("/api/trends?series=accept_rate&days=30")
+    assert r.status_code == 200
+    assert r.get_json() == {"series": ["accept_rate"], "points": []}
+    client.get("/api/trends")
+    assert seen == [(["accept_rate"], 30), (list(routes.snapshots.SERIES), None)]
+
+    assert client.get("/api/trends?days=soon").status_code == 400
+    monkeypatch.undo()
+    assert client.get("/api/trends?series=password").status_code == 400
+
+
+@pytest.mark.web
+def test_search_page_lists_highlighted_results_and_next_link(client, monkeypatch):
+    """GET /search renders snippets with marks and a link to the next page."""
+    seen = []
+
+    def fake_search(text, filters, **kwargs):
+        seen.append((text, filters, kwargs))
+        return {
+            "results": [{
+                "p_id": 3, "rank": 0.5, "date_added": "2025-01-02", "url": "https://x/3",
+                "term_season": "Fall", "term_year": 2025, "decision": "Accepted",
+                "program": "Computer Science", "university": "MIT", "degree": "PhD",
+                "snippet": routes.search.highlight("got <mark>funding</mark> <b>!</b>"),
+            }],
+            "next": "abc",
+        }
+
+    monkeypatch.setattr(routes.search, "search", fake_search)
+    r = client.get("/search?q=funding&term=Fall 2025&decision=Accepted")
+    assert r.status_code == 200
+    soup = BeautifulSoup(r.data, "html.parser")
+    snippet = soup.select_one(".snippet")
+    assert snippet.mark.get_text() == "funding" and snippet.b is None
+    assert "cursor=abc" in soup.select_one("a.search-next")["href"]
+    assert seen == [(
+        "funding",
+        routes.search.Filters(term="Fall 2025", decision="Accepted"),
+        {"cursor": None, "limit": routes.search.DEFAULT_LIMIT},
+    )]
+
+
+@pytest.mark.web
+def test_search_page_form_only_and_errors(client, monkeypatch):
+    """Without q only the form renders; an invalid search is a 400 with a message."""
+    html = client.get("/search").get_data(as_text=True)
+    assert 'name="q"' in html and "search-results" not in html
+
+    def reject(_text, _filters, **_kwargs):
+        raise ValueError("invalid cursor")
+
+    monkeypatch.setattr(routes.search, "search", reject)
+    r = client.get("/search?q=funding&cursor=bad")
+    assert r.status_code == 400
+    assert "invalid cursor" in r.get_data(as_text=True)
+
+
+@pytest.mark.web
+def test_api_applicants_pages_and_streams(client, monkeypatch):
+    """GET /api/applicants returns a JSON page, or streams CSV with format=csv."""
+    pages = []
+    monkeypatch.setattr(routes.browse, "page",
+                        lambda lst, cursor, limit: pages.append((lst, cursor, limit))
+                        or {"rows": [{"url": "u1"}], "next": "abc"})
+    r = client.get("/api/applicants?degree=PhD&fields=url&limit=5&cursor=xyz")
+    assert r.status_code == 200
+    assert r.get_json() == {"fields": ["url"], "rows": [{"url": "u1"}], "next": "abc"}
+    assert pages[0][0].filters == (("degree", ("PhD",)),) and pages[0][1:] == ("xyz", 5)
+
+    monkeypatch.setattr(routes.browse, "export",
+                        lambda lst, fmt, cursor: iter(["url\r\n", "u1\r\n"]))
+    r = client.get("/api/applicants?fields=url&format=csv")
+    assert r.status_code == 200 and r.mimetype == "text/csv"
+    assert "applicants.csv" in r.headers["Content-Disposition"]
+    assert r.get_data(as_text=True) == "url\r\nu1\r\n"
+
+
+@pytest.mark.web
+def test_api_applicants_rejects_bad_requests(client):
+    """Unknown fields, formats and non-integer limits are 400s."""
+    for query in ("fields=password", "format=xml", "limit=ten", "term_year=soon"):
+        r = client.get(f"/api/applicants?{query}")
+        assert r.status_code == 400 and "error" in r.get_json()
+
+
+@pytest.mark.web
+def test_api_export_streams_gzip(client, monkeypatch):
+    """GET /api/export streams the export module's gzip chunks as a download."""
+    seen = []
+    monkeypatch.setattr(routes.export, "stream",
+                        lambda lst, fmt: seen.append((lst.fields, fmt)) or iter([b"a", b"b"]))
+    r = client.get("/api/export?format=jsonl&fields=url")
+    assert r.status_code == 200 and r.mimetype == "application/gzip"
+    assert "applicants.jsonl.gz" in r.headers["Content-Disposition"]
+    assert r.data == b"ab" and seen == [(("url",), "jsonl")]
+
+    monkeypatch.undo()
+    for query in ("format=parquet", "fields=password"):
+        assert client.get(f"/api/export?{query}").status_code == 400
@@ -11,7 +11,7 @@ import re
 import pytest
 from app import routes, db  # prefer from-import to satisfy R0402
 from app.db_helper import insert_records_by_url
-from load_data import data_type
+from app.records import data_type
 
 
 def _fake_rows():
@@ -81,13 +81,12 @@ def _install_sync_pipeline(monkeypatch, rows):
 @pytest.fixture(autouse=True)
 def _clean_table():
     """Ensure the `applicants` table is empty before and after each test."""
-    db.ensure_table()
     with db.pool.connection() as conn, conn.cursor() as cur:
-        cur.execute("TRUNCATE TABLE applicants;")
+        cur.execute("TRUNCATE TABLE applicant_rows;")
         conn.commit()
     yield
     with db.pool.connection() as conn, conn.cursor() as cur:
-        cur.execute("TRUNCATE TABLE applicants;")
+        cur.execute("TRUNCATE TABLE applicant_rows;")
         conn.commit()
 
 
@@ -0,0 +1,126 @@
+# pylint: disable=missing-function-docstring
+"""Unit tests for app.lake (Parquet data lake and offline dashboard)."""
+
+from datetime import date
+import importlib
+import sys
+
+import pytest
+
+import app.lake as lake
+import app.query_data as qd
+
+
+def _record(i, term_year=2025, season="Fall", **fields):
+    decision = fields.get("decision", "Accepted")
+    return {
+        "url": f"u{i}", "rid": i, "date_added": date(2025, 9, 5), "program": "CS",
+        "comments": "", "status": decision, "term": f"{season} {term_year}",
+        "us_or_international": "American" if i % 2 else "International",
+        "gpa": 3.5, "gre": None, "gre_v": None, "gre_aw": None, "degree": "PhD",
+        "llm_generated_program": "Computer Science",
+        "llm_generated_university": "Georgetown University",
+        "term_season": season, "term_year": term_year, "decision": decision,
+        "decision_date": None,
+    } | fields
+
+
+@pytest.mark.db
+def test_missing_pyarrow_is_a_clear_error(monkeypatch, tmp_path):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    with pytest.raises(RuntimeError, match="pyarrow"):
+        lake.append([_record(1)], tmp_path)
+
+
+@pytest.mark.db
+def test_append_partitions_by_term_and_scrape_date(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    written = lake.append([_record(1), _record(2, term_year=None, season=None)], tmp_path,
+                          scraped=date(2026, 10, 19))
+
+    parts = sorted(str(p.parent.relative_to(tmp_path)) for p in written)
+    assert parts[0] == "term_year=2025/term_season=Fall/scrape_date=2026-10-19"
+    assert parts[1].startswith("term_year=__HIVE_DEFAULT_PARTITION__")
+    table = pq.read_table(written[0])
+    assert "term_year" not in table.column_names and table.num_rows == 1
+    assert not lake.append([], tmp_path)
+
+
+@pytest.mark.db
+def test_compact_merges_small_files_of_a_partition(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(lake, "COMPACT_MIN_FILES", 100)  # appends leave files alone
+    for i in range(4):
+        lake.append([_record(i)], tmp_path, scraped=date(2026, 10, 19))
+    lake.append([_record(9, term_year=2024)], tmp_path, scraped=date(2026, 10, 19))
+    leaf = tmp_path / "term_year=2025" / "term_season=Fall" / "scrape_date=2026-10-19"
+    assert len(list(leaf.glob("*.parquet"))) == 4
+
+    assert lake.compact(tmp_path, min_files=3) == 4  # the 2024 partition has one file
+    files = list(leaf.glob("*.parquet"))
+    assert len(files) == 1 and files[0].name.startswith("compact-")
+    assert not list(leaf.glob(".*"))
+    assert lake.load(tmp_path).size == 5
+
+
+@pytest.mark.db
+def test_interrupted_compaction_is_read_once_and_finished_later(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(lake, "COMPACT_MIN_FILES", 100)
+    for i in range(3):
+        lake.append([_record(i)], tmp_path, scraped=date(2026, 10, 19))
+    leaf = tmp_path / "term_year=2025" / "term_season=Fall" / "scrape_date=2026-10-19"
+
+    # Stop right after the merged file is renamed into place.
+    settle = lake._settle  # pylint: disable=protected-access
+    monkeypatch.setattr(lake, "_settle", lambda _leaf: 0)
+    assert lake.compact(tmp_path, min_files=3) == 0
+    assert len(list(leaf.glob("*.parquet"))) == 4 and (leaf / lake.MANIFEST).exists()
+    assert lake.load(tmp_path).size == 3  # merged file and small files never both
+
+    monkeypatch.setattr(lake, "_settle", settle)
+    assert lake.compact(tmp_path, min_files=3) == 3
+    assert [f.name[:8] for f in leaf.iterdir()] == ["compact-"]
+    assert lake.load(tmp_path).size == 3
+
+    # Stopped before the rename: the hidden file is dropped, nothing else.
+    (leaf / ".compact-x.parquet").write_bytes(b"")
+    (leaf / lake.MANIFEST).write_text('{"compact-x.parquet": ["a.parquet"]}')
+    assert lake.compact(tmp_path) == 0
+    assert [f.name[:8] for f in leaf.iterdir()] == ["compact-"]
+
+
+@pytest.mark.db
+def test_report_answers_dashboard_from_the_lake(tmp_path):
+    pytest.importorskip("pyarrow")
+    importlib.reload(qd)  # undo the conftest stubs
+    lake.append([
+        _record(1), _record(2, degree="Masters", decision="Rejected", gpa=3.0),
+        _record(3, term_year=2024), _record(4, gpa=None),
+    ], tmp_path)
+    before = qd.columnar.store
+    dash = lake.report(tmp_path)
+
+    assert dash.applicant_count == 3
+    assert dash.accept_rate == pytest.approx(200 / 3)
+    assert dash.avg_gpa_accept == pytest.approx(3.5)
+    assert dash.georgetown_phd_cs == 2
+    assert sorted(dash.degree_counts) == [("Masters", 1), ("PhD", 2)]
+    assert qd.columnar.store is before
+
+
+@pytest.mark.db
+def test_report_on_missing_lake_is_empty(tmp_path):
+    pytest.importorskip("pyarrow")
+    importlib.reload(qd)
+    assert lake.report(tmp_path / "none").applicant_count == 0
+
+
+@pytest.mark.db
+def test_append_compacts_a_partition_at_the_threshold(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(lake, "COMPACT_MIN_FILES", 3)
+    for i in range(3):
+        lake.append([_record(i)], tmp_path, scraped=date(2026, 10, 19))
+    assert [f.name[:8] for f in tmp_path.rglob("*.parquet")] == ["compact-"]
+    assert lake.load(tmp_path).size == 3
@@ -0,0 +1,152 @@
+# pylint: disable=missing-function-docstring,protected-access
+"""Unit tests for llm_hosting/lexicon.py (artifact round-trip and hot reload)."""
+
+import importlib
+import os
+
+import pytest
+
+TABLES = {
+    "abbrev": [[r"(?i)^(ubc|u\.?b\.?c\.?)$", "University of British Columbia"],
+              [r"^MIT$", "Massachusetts Institute of Technology"]],
+    "uni_fixes": {"Mcgill University": "McGill University"},
+    "prog_fixes": {"Mathematic": "Mathematics"},
+}
+
+
+@pytest.fixture(name="lexicon")
+def lexicon_fixture(llm_hosting):  # pylint: disable=unused-argument
+    return importlib.import_module("lexicon")
+
+
+@pytest.fixture(name="sources")
+def sources_fixture(tmp_path):
+    (tmp_path / "programs.txt").write_text("Mathematics\n\n Physics \n", encoding="utf-8")
+    (tmp_path / "universities.txt").write_text(
+        "McGill University\nUniversity of British Columbia\n", encoding="utf-8"
+    )
+    return {"programs": str(tmp_path / "programs.txt"),
+            "universities": str(tmp_path / "universities.txt")}
+
+
+def _touch(path, text):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+def test_names_only_round_trip(lexicon, sources, tmp_path):
+    path = str(tmp_path / "lex.bin")
+    lexicon.build(path, sources, TABLES, thresholds={"programs": 0.7})
+    lex = lexicon.Lexicon(path)
+
+    assert lex.version == lexicon.FORMAT_VERSION and not lex.has_vectors
+    assert lex.programs == ["Mathematics", "Physics"]
+    assert "University of British Columbia" in lex.university_set
+    assert lex.prog_fixes == TABLES["prog_fixes"] and lex.uni_fixes == TABLES["uni_fixes"]
+    assert lex.thresholds == {"programs": 0.7}
+    assert lex.expand_abbrev("U.B.C.") == "University of British Columbia"
+    assert lex.expand_abbrev("MIT") == "Massachusetts Institute of Technology"
+    assert lex.expand_abbrev("mit") is None
+    assert lex.is_current(sources, TABLES)
+    assert not lex.is_current(sources, dict(TABLES, prog_fixes={}))
+    lex.close()
+
+
+def test_vector_arrays_round_trip_as_mapped_views(lexicon, sources, tmp_path):
+    np = pytest.importorskip("numpy")
+    resolver = importlib.import_module("resolver")
+    path = str(tmp_path / "lex.bin")
+    lexicon.build(path, sources, TABLES, vectors=True)
+    lex = lexicon.Lexicon(path)
+    assert lex.has_vectors and lex._mm is None  # mapped on first use
+
+    index = lex.canon_index("universities")
+    fresh = resolver.CanonIndex(lex.universities)
+    assert lex._mm is not None and lex.canon_index("universities") is index
+    assert np.array_equal(index.matrix, fresh.matrix) and np.array_equal(index.idf, fresh.idf)
+    assert not index.matrix.flags.writeable  # zero-copy view of the file
+
+    lex.close()  # the index still holds views: the mapping outlives close()
+    assert index.resolve(["mcgill"], 0.3) == ["McGill University"]
+
+
+def test_canon_index_embeds_when_arrays_are_missing(lexicon, sources, tmp_path):
+    pytest.importorskip("numpy")
+    path = str(tmp_path / "lex.bin")
+    lexicon.build(path, sources, TABLES)
+    lex = lexicon.Lexicon(path)
+    assert lex.canon_index("programs").resolve(["physic"], 0.3) == ["Physics"]
+    assert lex._mm is None
+    lex.close()
+
+
+def test_missing_sources_build_empty_lists_that_stay_current(lexicon, tmp_path):
+    sources = {"programs": str(tmp_path / "none.txt"),
+               "universities": str(tmp_path / "gone.txt")}
+    path = str(tmp_path / "new" / "lex.bin")  # parent directory is created
+    lexicon.build(path, sources, dict(TABLES, abbrev=[]))
+    lex = lexicon.Lexicon(path)
+
+    assert lex.programs == [] and lex.header["sources"]["programs"]["size"] == -1
+    assert lex.expand_abbrev("UBC") is None  # no abbreviation table
+    assert lex.is_current(sources, dict(TABLES, abbrev=[]))
+    lex.close()
+
+
+def test_other_format_version_is_stale(lexicon, sources, tmp_path, monkeypatch):
+    path = str(tmp_path / "lex.bin")
+    lexicon.build(path, sources, TABLES)
+    monkeypatch.setattr(lexicon, "FORMAT_VERSION", lexicon.FORMAT_VERSION + 1)
+    lex = lexicon.Lexicon(path)
+    assert not lex.is_current(sources, TABLES)
+    lex.close()
+
+
+def test_rejects_files_that_are_not_artifacts(lexicon, tmp_path):
+    for name, data in (("other.bin", b"PNG...."), ("cut.bin", b"GCLEX\x00\x10")):
+        (tmp_path / name).write_bytes(data)
+        with pytest.raises(ValueError, match="not a lexicon artifact"):
+            lexicon.Lexicon(str(tmp_path / name))
+
+
+def test_store_builds_vectors_on_demand_and_hot_reloads(lexicon, sources, tmp_path):
+    pytest.importorskip("numpy")
+    store = lexicon.LexiconStore(str(tmp_path / "lex.bin"), sources, TABLES,
+                                 check_interval=0.0)
+    first = store.get()
+    assert not first.has_vectors and store.get() is first
+    store.set_thresholds({"universities": 0.4})
+    names = store.get()
+    assert names is not first and first._file.closed
+
+    vectors = store.get(vectors=True)
+    assert vectors.has_vectors and vectors.thresholds == {"universities": 0.4}
+    assert names._file.closed and store.get() is vectors
+
+    _touch(sources["programs"], "Chemistry\n")
+    reloaded = store.get()
+    assert reloaded is not vectors and vectors._file.closed
+    assert "Chemistry" in reloaded.program_set
+    assert reloaded.has_vectors and reloaded.thresholds == {"universities": 0.4}
+
+
+def test_store_rebuilds_stale_or_corrupt_artifact(lexicon, sources, tmp_path):
+    path = tmp_path / "lex.bin"
+    path.write_bytes(b"garbage")
+    assert lexicon.LexiconStore(str(path), sources, TABLES).get().programs == [
+        "Mathematics", "Physics",
+    ]
+    lexicon.build(str(path), sources, TABLES, thresholds={"programs": 0.9})
+    _touch(sources["universities"], "Stanford University\n")
+    lex = lexicon.LexiconStore(str(path), sources, TABLES).get()
+    assert "Stanford University" in lex.university_set
+    assert lex.thresholds == {"programs": 0.9}
+
+
+def test_store_reuses_a_current_artifact(lexicon, sources, tmp_path):
+    path = str(tmp_path / "lex.bin")
+    lexicon.build(path, sources, TABLES)
+    built_at = lexicon.Lexicon(path).header["built_at"]
+    assert lexicon.LexiconStore(path, sources, TABLES).get().header["built_at"] == built_at
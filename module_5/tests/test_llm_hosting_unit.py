@@ -0,0 +1,352 @@
+# pylint: disable=missing-function-docstring,protected-access
+"""Unit tests for llm_hosting/app.py (streaming input, resume, backends, model registry)."""
+
+import io
+import json
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+ROWS = [
+    {"url": "u1", "program": "Information Studies, McGill University"},
+    {"url": "u2", "program": "Mathematics, UBC"},
+    {"url": "u3", "program": "Computer Science at McG"},
+]
+
+
+@pytest.fixture(name="llm")
+def llm_fixture(llm_hosting, monkeypatch):
+    """The standardizer module with the deterministic stub backend selected."""
+    monkeypatch.setattr(llm_hosting, "_BACKEND", llm_hosting.StubBackend(0))
+    monkeypatch.setattr(llm_hosting, "BACKEND_NAME", "stub")
+    return llm_hosting
+
+
+def _write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def _read_jsonl(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+# ---------- streaming input ----------
+
+@pytest.mark.parametrize("layout", ["array", "jsonl", "rows"])
+def test_iter_input_rows_reads_every_layout_across_chunks(llm, monkeypatch, tmp_path, layout):
+    monkeypatch.setattr(llm, "_CHUNK_SIZE", 7)  # values straddle every chunk boundary
+    text = {
+        "array": "  " + json.dumps(ROWS, indent=1),
+        "jsonl": "\n".join(json.dumps(r) for r in ROWS) + "\n",
+        "rows": json.dumps({"rows": ROWS}),
+    }[layout]
+    assert list(llm._iter_input_rows(_write(tmp_path / "in.json", text))) == ROWS
+
+
+def test_iter_json_values_does_not_cut_numbers_at_chunk_boundaries(llm, monkeypatch):
+    monkeypatch.setattr(llm, "_CHUNK_SIZE", 4)
+    values = llm._iter_json_values(io.StringIO("123456789 42 [1, 2]"), array=False)
+    assert list(values) == [123456789, 42, [1, 2]]
+
+
+def test_iter_input_rows_empty_and_unterminated_input(llm, tmp_path):
+    assert not list(llm._iter_input_rows(_write(tmp_path / "empty.json", "  \n")))
+    with pytest.raises(ValueError, match="Unterminated"):
+        list(llm._iter_input_rows(_write(tmp_path / "cut.json", '[{"url": "u1"}, ')))
+    with pytest.raises(json.JSONDecodeError):
+        list(llm._iter_input_rows(_write(tmp_path / "bad.jsonl", '{"url": ')))
+
+
+# ---------- resume ----------
+
+def test_prepare_resume_collects_urls_and_drops_torn_line(llm, tmp_path):
+    out = tmp_path / "out.jsonl"
+    assert llm._prepare_resume(str(out)) == (set(), 0)
+    out.write_bytes(b'{"url": "u1"}\nnot json\n{"no_url": 1}\n{"url": "u2"}\n{"url": "u3", "pro')
+
+    assert llm._prepare_resume(str(out)) == ({"u1", "u2"}, 1)
+    assert out.read_bytes().endswith(b'{"url": "u2"}\n')
+
+
+def test_cli_resume_skips_done_rows_and_redoes_torn_row(llm, tmp_path):
+    in_path = _write(tmp_path / "in.json", json.dumps(ROWS))
+    out = tmp_path / "out.jsonl"
+    llm._cli_process_file(in_path, str(out), append=False, to_stdout=False)
+    first = _read_jsonl(out)
+    assert [r["url"] for r in first] == ["u1", "u2", "u3"]
+    assert first[1]["llm-generated-university"] == "University of British Columbia"
+
+    # Simulate a crash in the middle of writing the last row.
+    text = out.read_text(encoding="utf-8")
+    out.write_text(text[:text.rindex('{"url": "u3"') + 20], encoding="utf-8")
+    llm._cli_process_file(in_path, str(out), append=False, to_stdout=False, resume=True)
+    assert _read_jsonl(out) == first
+
+    llm._cli_process_file(in_path, str(out), append=False, to_stdout=False, resume=True)
+    assert _read_jsonl(out) == first  # nothing left to do: no duplicates
+
+
+def test_cli_resume_counts_rows_without_url(llm, tmp_path):
+    rows = [{"program": "Physics, UBC"}, ROWS[0], {"program": "Mathematics, McG"}]
+    in_path = _write(tmp_path / "in.json", json.dumps(rows))
+    out = tmp_path / "out.jsonl"
+    llm._cli_process_file(in_path, str(out), append=False, to_stdout=False)
+    first = _read_jsonl(out)
+
+    text = out.read_text(encoding="utf-8")
+    out.write_text(text[:text.rindex('{"program": "Mathematics')], encoding="utf-8")
+    llm._cli_process_file(in_path, str(out), append=False, to_stdout=False, resume=True)
+    assert _read_jsonl(out) == first
+
+    llm._cli_process_file(in_path, str(out), append=False, to_stdout=False, resume=True)
+    assert _read_jsonl(out) == first  # url-less rows are not written again
+
+
+def test_cli_batches_rows_and_writes_stdout(llm, monkeypatch, tmp_path, capsys):
+    seen = []
+    backend = llm.get_backend()
+    monkeypatch.setattr(llm, "BATCH_SIZE", 2)
+    monkeypatch.setattr(
+        backend, "standardize_many", lambda texts: seen.append(len(texts)) or [
+            llm.StubBackend.standardize(backend, t) for t in texts
+        ],
+    )
+    llm._cli_process_file(_write(tmp_path / "in.json", json.dumps(ROWS)), None,
+                          append=False, to_stdout=True)
+    assert seen == [2, 1]
+    assert [json.loads(line)["url"] for line in capsys.readouterr().out.splitlines()] == [
+        "u1", "u2", "u3",
+    ]
+
+
+# ---------- local model registry ----------
+
+@pytest.fixture(name="models")
+def models_fixture(llm, monkeypatch, tmp_path):
+    """An empty model directory with one model file, online by default."""
+    monkeypatch.setattr(llm, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(llm, "MODEL_REGISTRY", str(tmp_path / "registry.json"))
+    monkeypatch.setattr(llm, "MODEL_FILE", "tiny.gguf")
+    monkeypatch.setattr(llm, "MODEL_SHA256", "")
+    monkeypatch.setattr(llm, "OFFLINE", False)
+    monkeypatch.setattr(llm, "_LLM", None)
+    monkeypatch.setattr(llm, "MODEL_STATS", {"path": None, "resolve_s": None, "load_s": None})
+    (tmp_path / "tiny.gguf").write_bytes(b"weights")
+    return tmp_path
+
+
+def test_verify_registers_once_and_skips_hash_while_stamp_matches(llm, models, monkeypatch):
+    path = str(models / "tiny.gguf")
+    assert llm._resolve_model_path() == path
+    entry = json.loads((models / "registry.json").read_text(encoding="utf-8"))["tiny.gguf"]
+    assert entry["sha256"] == llm._sha256(path) and entry["size"] == 7
+
+    monkeypatch.setattr(llm, "_sha256", lambda _p: pytest.fail("hashed a registered model"))
+    assert llm._verify(path) == path
+
+
+def test_verify_rejects_checksum_mismatch(llm, models, monkeypatch):
+    monkeypatch.setattr(llm, "MODEL_SHA256", "0" * 64)
+    with pytest.raises(RuntimeError, match="Checksum mismatch"):
+        llm._verify(str(models / "tiny.gguf"))
+
+
+def test_missing_model_downloads_unless_offline(llm, models, monkeypatch):
+    (models / "tiny.gguf").unlink()
+    monkeypatch.setattr(llm, "OFFLINE", True)
+    with pytest.raises(FileNotFoundError, match="offline"):
+        llm._resolve_model_path()
+
+    def fake_download(repo_id, filename, local_dir):
+        assert (repo_id, local_dir) == (llm.MODEL_REPO, str(models))
+        path = models / "hub" / filename
+        path.parent.mkdir()
+        path.write_bytes(b"weights")
+        return str(path)
+
+    monkeypatch.setattr(llm, "OFFLINE", False)
+    monkeypatch.setitem(
+        sys.modules, "huggingface_hub", SimpleNamespace(hf_hub_download=fake_download)
+    )
+    assert llm._resolve_model_path().endswith("hub/tiny.gguf")
+
+
+def test_model_dir_does_not_depend_on_the_working_directory(llm):
+    assert llm.MODEL_DIR == llm.os.path.join(llm.HERE, "models")
+    assert llm.os.path.isabs(llm.MODEL_DIR)
+
+
+def test_main_check_model_prints_the_verified_path(llm, models, capsys):
+    llm.main(["--check-model"])
+    assert capsys.readouterr().out.strip() == str(models / "tiny.gguf")
+
+
+def test_load_llm_imports_llama_cpp_once_and_times_it(llm, models, monkeypatch):
+    loaded = []
+
+    class Llama:
+        """Records the model path it was opened with."""
+
+        def __init__(self, **kwargs):
+            loaded.append(kwargs["model_path"])
+
+    monkeypatch.setitem(sys.modules, "llama_cpp", SimpleNamespace(Llama=Llama))
+    assert llm._load_llm() is llm._load_llm()
+    assert loaded == [str(models / "tiny.gguf")]
+    assert llm.MODEL_STATS["path"] == loaded[0] and llm.MODEL_STATS["load_s"] >= 0
+
+
+# ---------- backends ----------
+
+@pytest.fixture(name="lex_store")
+def lex_store_fixture(llm, monkeypatch, tmp_path):
+    """Compile the lexicon into ``tmp_path`` instead of next to app.py."""
+    store = llm.lexicon.LexiconStore(
+        str(tmp_path / "lexicon.bin"), llm._LEXICON.sources, llm._LEXICON.tables,
+    )
+    monkeypatch.setattr(llm, "_LEXICON", store)
+    return store
+
+
+def test_backend_is_abstract(llm):
+    with pytest.raises(TypeError):
+        llm.Backend()  # pylint: disable=abstract-class-instantiated
+
+    class Upper(llm.Backend):
+        """Minimal concrete backend."""
+
+        name = "upper"
+
+        def standardize(self, program_text):
+            return {"standardized_program": program_text.upper(),
+                    "standardized_university": "Unknown"}
+
+    assert Upper().standardize_many(["a", "b"])[1]["standardized_program"] == "B"
+
+
+def test_get_backend_selects_by_name_and_caches(llm, monkeypatch):
+    monkeypatch.setattr(llm, "_BACKEND", None)
+    monkeypatch.setattr(llm, "BACKEND_NAME", "rules")
+    backend = llm.get_backend()
+    assert isinstance(backend, llm.RulesBackend) and llm.get_backend() is backend
+
+    assert isinstance(llm.set_backend("stub"), llm.StubBackend)
+    stub = llm.StubBackend(latency_ms=3)
+    assert llm.set_backend(stub) is stub and llm.BACKEND_NAME == "stub"
+    assert stub.latency_s == pytest.approx(0.003)
+
+    monkeypatch.setattr(llm, "_BACKEND", None)
+    monkeypatch.setattr(llm, "BACKEND_NAME", "gpt")
+    with pytest.raises(ValueError, match="Unknown backend 'gpt'"):
+        llm.get_backend()
+
+
+def test_stub_latency_defaults_to_env_and_sleeps(llm, monkeypatch):
+    monkeypatch.setenv("STUB_LATENCY_MS", "2")
+    slept = []
+    monkeypatch.setattr(llm.time, "sleep", slept.append)
+    assert llm.StubBackend().standardize("Math, UBC") == {
+        "standardized_program": "Math",
+        "standardized_university": "University of British Columbia",
+    }
+    assert slept == [0.002]
+
+
+@pytest.mark.usefixtures("lex_store")
+def test_rules_backend_maps_onto_canonical_names(llm):
+    out = llm.RulesBackend().standardize_many([
+        "Mathematic, University Of British Columbia",
+        "Information Studies, mcgill",
+        "Underwater Basket Weaving",
+    ])
+    assert out[0] == {"standardized_program": "Mathematics",
+                      "standardized_university": "University of British Columbia"}
+    assert out[1]["standardized_university"] == "McGill University"
+    assert out[2]["standardized_university"] == "Unknown"
+
+
+def test_best_match_needs_a_name_and_candidates(llm):
+    assert llm._best_match("", ["Physics"]) is None
+    assert llm._best_match("Physic", []) is None
+    assert llm._best_match("Physic", ["Physics"]) == "Physics"
+
+
+@pytest.mark.usefixtures("lex_store")
+def test_llama_backend_parses_json_and_falls_back_to_rules(llm, monkeypatch):
+    answers = iter([
+        'Sure! {"standardized_program": "information studies",'
+        ' "standardized_university": "McG"} Hope this helps.',
+        "I cannot answer that.",
+    ])
+
+    class Model:
+        """Chat model returning canned answers."""
+
+        def create_chat_completion(self, messages, **_kwargs):
+            assert json.loads(messages[-1]["content"]) == {"program": "Info Studies, McG"}
+            return {"choices": [{"message": {"content": next(answers)}}]}
+
+    monkeypatch.setattr(llm, "_LLM", Model())
+    expected = {"standardized_program": "Information Studies",
+                "standardized_university": "McGill University"}
+    assert llm.LlamaBackend().standardize("Info Studies, McG") == expected
+    assert llm.LlamaBackend().standardize("Info Studies, McG") == expected
+
+
+def test_http_endpoints_use_the_selected_backend(llm):
+    client = llm.app.test_client()
+    assert client.get("/").get_json()["backend"] == "stub"
+    rows = client.post("/standardize", json={"rows": [{"program": "Physics, UBC"}]}).get_json()
+    assert rows["rows"][0]["llm-generated-university"] == "University of British Columbia"
+    rows = client.post("/standardize", json=[{"program": "Physics, UBC"}]).get_json()
+    assert rows["rows"][0]["llm-generated-program"] == "Physics"
+    assert client.post("/standardize", data="nope").get_json() == {"rows": []}
+
+
+# ---------- command line ----------
+
+def test_main_serves_without_a_file(llm, monkeypatch):
+    monkeypatch.setenv("PORT", "8123")
+    runs = []
+    monkeypatch.setattr(llm.app, "run", lambda **kwargs: runs.append(kwargs))
+    llm.main([])
+    llm.main(["--serve", "--file", "in.json"])
+    assert runs == [{"host": "0.0.0.0", "port": 8123, "debug": False}] * 2
+
+
+def test_main_rejects_stub_latency_for_other_backends(llm, capsys):
+    with pytest.raises(SystemExit) as exc:
+        llm.main(["--backend", "rules", "--stub-latency-ms", "5", "--file", "in.json"])
+    assert exc.value.code == 2
+    assert "only applies to the stub backend" in capsys.readouterr().err
+    with pytest.raises(SystemExit):
+        llm.main(["--file", "in.json", "--resume", "--stdout"])
+
+
+def test_lexicon_defaults_outside_the_source_tree(llm):
+    assert not llm.LEXICON_PATH.startswith(llm.HERE)
+
+
+def test_main_build_lexicon_writes_the_vectors(llm, lex_store, monkeypatch, capsys):
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(llm, "LEXICON_PATH", lex_store.path)
+    llm.main(["--build-lexicon"])
+    assert capsys.readouterr().out.strip() == lex_store.path
+    lex = llm.lexicon.Lexicon(lex_store.path)
+    assert lex.has_vectors
+    lex.close()
+
+
+@pytest.mark.usefixtures("lex_store")
+def test_main_applies_options_and_processes_file(llm, monkeypatch, tmp_path):
+    monkeypatch.setattr(llm, "BATCH_SIZE", llm.BATCH_SIZE)
+    in_path = _write(tmp_path / "in.json", json.dumps(ROWS[:1]))
+    llm.main(["--file", in_path, "--backend", "stub", "--stub-latency-ms", "0",
+              "--batch-size", "8"])
+    assert llm.BATCH_SIZE == 8 and isinstance(llm.get_backend(), llm.StubBackend)
+    assert _read_jsonl(tmp_path / "in.json.jsonl")[0]["url"] == "u1"
+
+    llm.main(["--file", in_path, "--backend", "rules", "--out", str(tmp_path / "o.jsonl")])
+    assert llm.BACKEND_NAME == "rules"
@@ -0,0 +1,484 @@
+# pylint: disable=missing-function-docstring
+"""Unit tests for app.migrations (runner, helpers and the backfills)."""
+
+from contextlib import contextmanager
+from datetime import date
+import importlib
+import inspect
+from types import SimpleNamespace
+
+import pytest
+
+import app.migrations as mig
+from app.migrations import (
+    v001_create_applicants, v002_rid, v003_term_decision, v004_indexes, v005_applicant_summary,
+)
+
+
+# ---------- tiny fake DB plumbing ----------
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchone(self):
+        return self._rows[0]
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+class _FakeConn:
+    """Autocommit-style connection that logs statements and transactions."""
+
+    def __init__(self, applied=None, responses=None):
+        self.applied = dict(applied or {})
+        self.responses = responses or {}
+        self.log = []
+        self.autocommit = False
+
+    def execute(self, stmt, params=None):
+        self.log.append((stmt, params))
+        if stmt is mig.SELECT_APPLIED:
+            return _Result(sorted(self.applied.items()))
+        if stmt is mig.RECORD_VERSION:
+            self.applied[params[0]] = "now"
+        return _Result(self.responses.get(id(stmt), [(None,)]))
+
+    @contextmanager
+    def transaction(self):
+        self.log.append(("BEGIN", None))
+        yield
+        self.log.append(("COMMIT", None))
+
+    def statements(self):
+        return [stmt for stmt, _params in self.log]
+
+
+class _FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @contextmanager
+    def connection(self, **kwargs):
+        self.conn.checkout = kwargs
+        yield self.conn
+
+
+def _module(tag, transactional=True):
+    return SimpleNamespace(
+        TRANSACTIONAL=transactional, up=lambda conn: conn.log.append((tag, None))
+    )
+
+
+@pytest.fixture(name="runner")
+def _runner(monkeypatch):
+    def install(applied=None):
+        conn = _FakeConn(applied)
+        modules = {
+            "v001_base": _module("up1"),
+            "v002_index": _module("up2", transactional=False),
+            "v003_more": _module("up3"),
+        }
+        monkeypatch.setattr(mig, "pool", _FakePool(conn))
+        monkeypatch.setattr(mig, "discover", lambda: [
+            (1, "base", "v001_base"), (2, "index", "v002_index"), (3, "more", "v003_more"),
+        ])
+        monkeypatch.setattr(mig.importlib, "import_module",
+                            lambda name: modules[name.rsplit(".", 1)[1]])
+        return conn
+    return install
+
+
+# ---------- runner ----------
+
+@pytest.mark.db
+def test_migrate_applies_pending_in_order_and_records_versions(runner):
+    conn = runner(applied={1: "earlier"})
+
+    assert mig.migrate() == ["002_index", "003_more"]
+
+    stmts = conn.statements()
+    assert "up1" not in stmts
+    assert stmts.index("up2") < stmts.index("up3")
+    # v002 is non-transactional, v003 runs with its bookkeeping in one txn
+    assert stmts[stmts.index("up3") - 1] == "BEGIN"
+    assert stmts[stmts.index("up3") + 2] == "COMMIT"
+    assert set(conn.applied) == {1, 2, 3}
+    assert "pg_advisory_lock" in stmts[0] and "pg_advisory_unlock" in stmts[-1]
+    assert conn.autocommit is False
+    assert conn.checkout == {"statement_timeout_ms": 0}
+
+
+@pytest.mark.db
+def test_migrate_stops_at_target_and_is_idempotent(runner):
+    conn = runner()
+    assert mig.migrate(target=1) == ["001_base"]
+    assert not mig.migrate(target=1)
+    assert set(conn.applied) == {1}
+
+
+@pytest.mark.db
+def test_status_lists_applied_and_pending(runner):
+    conn = runner(applied={1: "t1"})
+    conn.responses[id(mig.HAS_SCHEMA_VERSION)] = [(True,)]
+    assert mig.status() == [(1, "base", "t1"), (2, "index", None), (3, "more", None)]
+
+    conn.responses[id(mig.HAS_SCHEMA_VERSION)] = [(False,)]
+    assert [applied for _v, _n, applied in mig.status()] == [None, None, None]
+
+
+@pytest.mark.db
+def test_discover_finds_the_shipped_migrations_in_order():
+    found = mig.discover()
+    versions = [v for v, _name, _mod in found]
+    assert versions == sorted(versions) == list(range(1, len(found) + 1))
+    assert found[0][1] == "create_applicants"
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("invalid, dropped", [(True, True), (False, False)])
+def test_create_index_concurrently_drops_invalid_leftover(invalid, dropped):
+    conn = _FakeConn(responses={id(mig.HAS_INVALID_INDEX): [(invalid,)]})
+    mig.create_index_concurrently(conn, "ix", "applicants", ("a", "b"))
+
+    text = [s.as_string(None) for s in conn.statements()[1:]]
+    assert any(t.startswith("DROP INDEX CONCURRENTLY") for t in text) is dropped
+    assert text[-1] == 'CREATE INDEX CONCURRENTLY IF NOT EXISTS "ix" ON "applicants" ("a", "b")'
+
+
+@pytest.mark.db
+def test_create_index_concurrently_with_access_method():
+    conn = _FakeConn(responses={id(mig.HAS_INVALID_INDEX): [(False,)]})
+    mig.create_index_concurrently(conn, "ix", "applicant_rows", ("comments_tsv",), using="gin")
+    assert conn.statements()[-1].as_string(None) == (
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS "ix" ON "applicant_rows"'
+        ' USING gin ("comments_tsv")'
+    )
+
+
+@pytest.mark.db
+def test_add_unique_constraint_dedupes_then_builds_the_key_concurrently():
+    conn = _FakeConn()
+    mig.add_unique_constraint(conn, "applicants", "url")
+
+    assert conn.log[0] == (mig.HAS_UNIQUE_INDEX, ("applicants", "url"))
+    text = [s.as_string(None) for s in conn.statements()[1:]]
+    assert 'DELETE FROM "applicants" AS a USING "applicants" AS b' in text[0]
+    assert 'a."url" = b."url" AND a."p_id" > b."p_id"' in text[0]
+    assert text[-2] == (
+        'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS "applicants_url_key"'
+        ' ON "applicants" ("url")'
+    )
+    assert text[-1] == (
+        'ALTER TABLE "applicants" ADD CONSTRAINT "applicants_url_key"'
+        ' UNIQUE USING INDEX "applicants_url_key"'
+    )
+
+
+@pytest.mark.db
+def test_add_unique_constraint_keeps_an_existing_key():
+    conn = _FakeConn(responses={id(mig.HAS_UNIQUE_INDEX): [(True,)]})
+    mig.add_unique_constraint(conn, "applicants", "url")
+    assert conn.statements() == [mig.HAS_UNIQUE_INDEX]
+
+
+# ---------- migrations ----------
+
+@pytest.mark.db
+def test_v002_backfills_rid_in_p_id_batches(monkeypatch):
+    monkeypatch.setattr(v002_rid, "BATCH_SIZE", 10)
+    conn = _FakeConn(responses={id(v002_rid.ID_RANGE): [(1, 25)]})
+
+    v002_rid.up(conn)
+
+    batches = [p for s, p in conn.log if s is v002_rid.BACKFILL]
+    assert batches == [(1, 10), (11, 20), (21, 30)]
+    assert conn.statements()[:2] == [v002_rid.ADD_COLUMN, v002_rid.DROP_EXPRESSION]
+
+
+class _Copy:
+    def __init__(self, sink):
+        self._sink = sink
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):  # pylint: disable=unused-argument
+        return False
+
+    def write_row(self, row):
+        self._sink.append(tuple(row))
+
+
+class _BackfillCursor:
+    def __init__(self, rows, staged):
+        self._rows = rows
+        self._staged = staged
+        self._result = []
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):  # pylint: disable=unused-argument
+        return False
+
+    def execute(self, stmt, params=None):
+        if stmt is v003_term_decision.SELECT_SOURCE:
+            last, limit = params
+            self._result = [r for r in self._rows if r[0] > last][:limit]
+        elif stmt is v003_term_decision.APPLY_STAGE:
+            self.rowcount = len(self._result)
+
+    def fetchall(self):
+        return list(self._result)
+
+    def copy(self, _stmt):
+        return _Copy(self._staged)
+
+
+class _BackfillConn(_FakeConn):
+    def __init__(self, rows):
+        super().__init__()
+        self.staged = []
+        self._rows = rows
+
+    def cursor(self):
+        return _BackfillCursor(self._rows, self.staged)
+
+
+@pytest.mark.db
+def test_v003_backfill_derives_values_in_committed_batches():
+    conn = _BackfillConn([
+        (1, "Fall 2025", "Accepted on 1 Mar", date(2025, 3, 5)),
+        (2, "Spring 2026", "Rejected", None),
+        (3, "Summer", "Other", None),
+    ])
+
+    assert v003_term_decision.backfill(conn, batch_size=2) == 3
+    assert conn.staged == [
+        (1, "Fall", 2025, "Accepted", date(2025, 3, 1)),
+        (2, "Spring", 2026, "Rejected", None),
+        (3, "Summer", None, None, None),
+    ]
+    assert conn.statements().count("BEGIN") == 3  # two batches + the empty probe
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("status, added", [
+    ("Accepted on 1 Mar", date(2025, 3, 10)),
+    ("Rejected on 15 Dec", date(2025, 3, 10)),
+    ("Accepted on 30 Feb", date(2025, 3, 10)),
+    ("Accepted on 1 Xyz", None),
+    ("Interviewed on 01/02/2023", None),
+    ("Accepted on 05/03", date(2025, 3, 10)),
+    ("Accepted on 05/03", None),
+    ("Wait listed", None),
+    ("Accepted", None),
+    (None, None),
+])
+def test_v003_frozen_parsing_matches_the_loader(status, added):
+    from app import records  # pylint: disable=C0415
+
+    # pylint: disable=protected-access
+    assert v003_term_decision._decision_parts(status, added) == (
+        records.decision_parts(status, added))
+
+
+@pytest.mark.db
+def test_v003_and_later_migrations_wire_their_steps(monkeypatch):
+    calls = []
+    monkeypatch.setattr(v003_term_decision, "backfill", lambda conn: calls.append("backfill"))
+    conn = _FakeConn()
+    v003_term_decision.up(conn)
+    assert conn.statements() == [
+        v003_term_decision.CREATE_DECISION_TYPE, v003_term_decision.ADD_COLUMNS,
+    ]
+    assert calls == ["backfill"]
+
+    built = []
+    monkeypatch.setattr(v004_indexes, "create_index_concurrently",
+                        lambda _conn, name, _table, _cols: built.append(name))
+    v004_indexes.up(conn)
+    assert built == ["applicants_rid_idx", "applicants_term_decision_idx"]
+
+    keyed = []
+    monkeypatch.setattr(v001_create_applicants, "add_unique_constraint",
+                        lambda _conn, table, column: keyed.append((table, column)))
+    v001_create_applicants.up(conn)
+    assert conn.statements()[-1] is v001_create_applicants.CREATE_TABLE
+    assert keyed == [("applicants", "url")]
+    assert v001_create_applicants.TRANSACTIONAL is False
+
+
+@pytest.mark.db
+def test_migrations_do_not_import_app_modules():
+    # A migration's SQL must not change when the app code it once used does.
+    for _version, _name, modname in mig.discover():
+        source = inspect.getsource(importlib.import_module(f"{mig.__name__}.{modname}"))
+        assert "from .." not in source, modname
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("existed, filled", [(False, True), (True, False)])
+def test_v005_creates_summary_and_fills_only_a_new_table(existed, filled):
+    v005 = v005_applicant_summary
+    conn = _FakeConn(responses={id(v005.HAS_SUMMARY): [(existed,)]})
+    v005.up(conn)
+
+    assert conn.statements() == [
+        v005.HAS_SUMMARY, v005.CREATE_SUMMARY, v005.CREATE_TRIGGER_FUNCTION, v005.CREATE_TRIGGERS,
+    ] + [v005.FILL_SUMMARY] * filled
+    # Before v009 the triggers read the text columns of the applicants table.
+    assert "AFTER INSERT ON applicants" in v005.CREATE_TRIGGERS.as_string(None)
+    body = v005.CREATE_TRIGGER_FUNCTION.as_string(None)
+    assert "FROM (SELECT 1 AS sign, * FROM new_rows) AS d" in body and "_sq" not in body
+
+
+@pytest.mark.db
+def test_v006_adds_squares_and_refills_summary():
+    from app.migrations import v006_summary_squares as v006  # pylint: disable=C0415
+
+    conn = _FakeConn()
+    v006.up(conn)
+
+    assert conn.statements() == [v006.ADD_COLUMNS, v006.CREATE_TRIGGER_FUNCTION, v006.FILL_SUMMARY]
+    text = v006.ADD_COLUMNS.as_string(None)
+    for col in ("gpa_sq", "gre_sq", "gre_v_sq", "gre_aw_sq"):
+        assert f"ADD COLUMN IF NOT EXISTS {col} " in text
+    body = v006.CREATE_TRIGGER_FUNCTION.as_string(None)
+    assert body.count("SUM(sign * gre_aw * gre_aw)") == 3
+    assert v006.FILL_SUMMARY.as_string(None).startswith("LOCK TABLE applicants IN SHARE MODE")
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("existed, filled", [(False, True), (True, False)])
+def test_v007_creates_score_bins(existed, filled):
+    from app.migrations import v007_score_bins as v007  # pylint: disable=C0415
+
+    conn = _FakeConn(responses={id(v007.HAS_BINS): [(existed,)]})
+    v007.up(conn)
+
+    assert conn.statements() == [
+        v007.HAS_BINS, v007.CREATE_BINS, v007.CREATE_TRIGGER_FUNCTION, v007.CREATE_TRIGGERS,
+    ] + [v007.FILL_BINS] * filled
+    assert "AFTER DELETE ON applicants" in v007.CREATE_TRIGGERS.as_string(None)
+    assert "floor(gpa / 0.01 + 1e-09)" in v007.FILL_BINS.as_string(None)
+
+
+@pytest.mark.db
+def test_v008_creates_metric_snapshots():
+    from app.migrations import v008_metric_snapshots as v008  # pylint: disable=C0415
+
+    conn = _FakeConn()
+    v008.up(conn)
+    assert conn.statements() == [v008.CREATE_TABLE]
+    text = v008.CREATE_TABLE.as_string(None)
+    assert "day DATE PRIMARY KEY" in text and "top_programs JSONB NOT NULL" in text
+
+
+class _CaptureConn(_FakeConn):
+    """Hands out queued ``CLAIM_CHANGES`` results, one list per claim."""
+
+    def __init__(self, claim, claims, **kwargs):
+        super().__init__(**kwargs)
+        self.claim, self.claims = claim, list(claims)
+
+    def execute(self, stmt, params=None):
+        if stmt is self.claim:
+            self.log.append((stmt, params))
+            return _Result(self.claims.pop(0))
+        return super().execute(stmt, params)
+
+
+@pytest.mark.db
+def test_v009_copies_in_batches_then_swaps_under_a_short_lock(monkeypatch):
+    from app.migrations import v009_dimension_tables as v009  # pylint: disable=C0415
+
+    keyed = []
+    monkeypatch.setattr(v009, "add_unique_constraint",
+                        lambda _conn, table, column: keyed.append((table, column)))
+    monkeypatch.setattr(v009, "BATCH_SIZE", 10)
+    conn = _CaptureConn(
+        v009.CLAIM_CHANGES,
+        # After the copy: a full batch, then a short one; after the indexes:
+        # nothing; under the lock: the last write.
+        [[(3,)] * 9 + [(30,)], [(3,)], [], [(31,)]],
+        responses={id(v009.SWAPPED): [(False,)], id(v009.ID_RANGE): [(1, 25)]},
+    )
+    v009.up(conn)
+    statements = conn.statements()
+
+    assert v009.TRANSACTIONAL is False
+    assert keyed == [("applicants", "url")]
+    setup = [*v009.CREATE_DIMENSIONS, v009.CREATE_ROWS, v009.CREATE_CHANGES, *v009.CREATE_CAPTURE]
+    assert statements[1:1 + len(setup)] == setup
+    assert [p for s, p in conn.log if s is v009.COPY_BATCH] == [(1, 10), (11, 20), (21, 30)]
+    assert [p for s, p in conn.log if s is v009.FILL_BATCH[0]] == [(1, 10), (11, 20), (21, 30)]
+    assert [p for s, p in conn.log if s is v009.COPY_CHANGED] == [([3, 30],), ([3],), ([31],)]
+    assert (v009.DROP_CHANGED, ([31], [31])) in conn.log
+
+    # Only the last catch-up and the swap run while writers are locked out.
+    lock = statements.index(v009.LOCK)
+    assert statements[lock - 1] == "BEGIN" and v009.COPY_BATCH not in statements[lock:]
+    assert v009.CREATE_INDEXES in statements[:lock]
+    swap = [v009.RESTART_P_ID, v009.DROP_TABLE, *v009.DROP_CAPTURE, v009.CREATE_VIEW]
+    assert [statements.index(s) for s in swap] == sorted(statements.index(s) for s in swap)
+    assert statements[-6:] == v009.CREATE_SUMMARY_TRIGGERS + v009.CREATE_BINS_TRIGGERS + [
+        "COMMIT", v009.ANALYZE,
+    ]
+    assert lock < conn.log.index((v009.COPY_CHANGED, ([31],))) < statements.index(v009.CREATE_VIEW)
+
+    # The triggers move to applicant_rows and decode their transition rows.
+    summary_fn, summary_triggers = (s.as_string(None) for s in v009.CREATE_SUMMARY_TRIGGERS)
+    assert "FUNCTION applicant_summary_apply()" in summary_fn
+    assert 'FROM "old_rows" AS r LEFT JOIN "dim_program"' in summary_fn
+    assert "AFTER UPDATE ON applicant_rows" in summary_triggers
+    bins_fn = v009.CREATE_BINS_TRIGGERS[0].as_string(None)
+    assert "TRUNCATE applicant_score_bins" in bins_fn and '"new_rows" AS r' in bins_fn
+
+    copy = v009.COPY_BATCH.as_string(None)
+    assert '"degree".id' in copy and 'ON "degree".value = a."degree"' in copy
+    assert copy.endswith("WHERE a.p_id BETWEEN %s AND %s ON CONFLICT DO NOTHING")
+    assert "degree_id SMALLINT REFERENCES dim_degree (id)" in v009.CREATE_ROWS.as_string(None)
+    assert v009.CREATE_VIEW.as_string(None).startswith('CREATE VIEW "applicants" AS SELECT')
+    assert "AFTER INSERT OR UPDATE OR DELETE ON \"applicants\"" in (
+        v009.CREATE_CAPTURE[1].as_string(None))
+
+
+@pytest.mark.db
+def test_v009_does_nothing_once_swapped():
+    from app.migrations import v009_dimension_tables as v009  # pylint: disable=C0415
+
+    conn = _FakeConn(responses={id(v009.SWAPPED): [(True,)]})
+    v009.up(conn)
+    assert conn.statements() == [v009.SWAPPED]
+
+
+@pytest.mark.db
+def test_v010_adds_generated_tsvector_and_gin_index(monkeypatch):
+    from app.migrations import v010_comment_search as v010  # pylint: disable=C0415
+
+    built = []
+    monkeypatch.setattr(v010, "create_index_concurrently",
+                        lambda _conn, *args, **kwargs: built.append((args, kwargs)))
+    conn = _FakeConn()
+    v010.up(conn)
+    assert v010.TRANSACTIONAL is False
+    assert conn.statements() == [v010.ADD_COLUMN]
+    assert "GENERATED ALWAYS AS (to_tsvector('english'::regconfig" in (
+        v010.ADD_COLUMN.as_string(None))
+    assert built == [(v010.INDEX, {"using": "gin"})]
+
+
+@pytest.mark.db
+def test_v011_builds_keyset_indexes(monkeypatch):
+    from app.migrations import v011_browse_indexes as v011  # pylint: disable=C0415
+
+    built = []
+    monkeypatch.setattr(v011, "create_index_concurrently",
+                        lambda _conn, name, _table, cols: built.append((name, cols)))
+    v011.up(_FakeConn())
+    assert v011.TRANSACTIONAL is False
+    assert [cols[-2:] for _name, cols in built] == [("date_added", "p_id")] * 3
@@ -81,8 +81,6 @@ def test_run_llm_hosting_bubbles_error_and_logs(monkeypatch, tmp_path):
 
 def test_run_pipeline_returns_no_new_rows(monkeypatch):
     """When run_clean returns 0, pipeline should short-circuit and not call LLM."""
-    # existing rids doesn't matter here
-    monkeypatch.setattr(pipeline, "existing_rids", lambda: {"r1"})
     # make run_clean return 0 (nothing new)
     monkeypatch.setattr(pipeline, "run_clean", lambda **kwargs: 0)
 
@@ -99,7 +97,7 @@ def test_run_pipeline_returns_no_new_rows(monkeypatch):
     )
     monkeypatch.setattr(
         pipeline,
-        "insert_records_by_url",
+        "insert_records_bulk",
         lambda *_a, **_k: (_ for _ in ()).throw(AssertionError("should not insert")),
     )
 
@@ -109,11 +107,14 @@ def test_run_pipeline_returns_no_new_rows(monkeypatch):
 
 def test_run_pipeline_happy_path(monkeypatch):
     """Full happy path: clean -> LLM -> read -> insert, returning a summary."""
-    # 1) already-have set
-    monkeypatch.setattr(pipeline, "existing_rids", lambda: {"abc", "def"})
+    # 1-2) run_clean returns N new rows written to CLEAN_JSON by the cleaner
+    clean_kwargs = {}
 
-    # 2) run_clean returns N new rows written to CLEAN_JSON by the cleaner
-    monkeypatch.setattr(pipeline, "run_clean", lambda **kwargs: 3)  # report 3 cleaned
+    def fake_clean(**kwargs):
+        clean_kwargs.update(kwargs)
+        return 3  # report 3 cleaned
+
+    monkeypatch.setattr(pipeline, "run_clean", fake_clean)
 
     # 3) LLM hosting is a no-op (we just need it to be called without error)
     llm_called = {}
@@ -127,23 +128,79 @@ def test_run_pipeline_happy_path(monkeypatch):
     rows = [{"url": "u1"}, {"url": "u2"}]
     monkeypatch.setattr(pipeline, "read_json", lambda _p: rows)
 
-    # 5) DB insert returns number inserted (e.g., 2)
+    # 5) DB insert returns the URLs inserted (e.g., both)
     inserted_capture = {}
 
     def fake_insert(objs, dt):
         inserted_capture["objs"] = objs
         inserted_capture["dt"] = dt
-        return 2
+        return ["u1", "u2"]
+
+    monkeypatch.setattr(pipeline, "insert_records_bulk", fake_insert)
 
-    monkeypatch.setattr(pipeline, "insert_records_by_url", fake_insert)
+    # 6) a metric snapshot is stored after inserting
+    snapshots = []
+    monkeypatch.setattr(pipeline, "take_snapshot", lambda: snapshots.append(True))
 
     # Execute
     result = pipeline.run_pipeline(max_records=10, delay=0.0)
 
     # Assertions
+    assert clean_kwargs["known_rids"] is pipeline.known_rids  # per-page DB lookup
     assert llm_called["args"] == (pipeline.CLEAN_JSON, pipeline.FINAL_JSON)
     assert inserted_capture["objs"] is rows  # same list passed through
     assert result["cleaned"] == 3
     assert result["llm"] == 2
     assert result["inserted"] == 2
     assert "Cleaned 3, LLM rows 2, inserted 2" in result["message"]
+    assert snapshots == [True]
+
+
+def test_run_pipeline_logs_failed_snapshot(monkeypatch, caplog):
+    """A snapshot error after a committed insert is logged, not raised."""
+    monkeypatch.setattr(pipeline, "run_clean", lambda **kwargs: 1)
+    monkeypatch.setattr(pipeline, "run_llm_hosting", lambda *_a: None)
+    monkeypatch.setattr(pipeline, "read_json", lambda _p: [{"url": "u1"}])
+    monkeypatch.setattr(pipeline, "insert_records_bulk", lambda *_a: ["u1"])
+
+    def broken():
+        raise pipeline.psycopg.OperationalError("relation does not exist")
+
+    monkeypatch.setattr(pipeline, "take_snapshot", broken)
+    result = pipeline.run_pipeline(max_records=1, delay=0.0)
+    assert result["inserted"] == 1
+    assert "metric snapshot failed" in caplog.text
+
+
+def test_run_pipeline_appends_inserted_rows_to_lake(monkeypatch, caplog):
+    """With the data lake on, only inserted rows are appended; failures are logged."""
+    rows = [{"url": "u1", "term": "Fall 2025"}, {"url": "u2", "term": "Spring 2026"},
+            {"url": "u2", "term": "Fall 2026"}]
+    inserted = ["u2"]  # u1 was already stored
+    monkeypatch.setattr(pipeline, "run_clean", lambda **kwargs: 3)
+    monkeypatch.setattr(pipeline, "run_llm_hosting", lambda *_a: None)
+    monkeypatch.setattr(pipeline, "read_json", lambda _p: rows)
+    monkeypatch.setattr(pipeline, "insert_records_bulk", lambda *_a: inserted)
+    monkeypatch.setattr(pipeline, "take_snapshot", lambda: None)
+    monkeypatch.setattr(pipeline.lake, "ENABLED", True)
+    batches = []
+    monkeypatch.setattr(pipeline.lake, "append", batches.append)
+
+    pipeline.run_pipeline(max_records=3, delay=0.0)
+    # The first row of a URL is the one the database keeps.
+    assert [(r["url"], r["term_season"], r["term_year"]) for r in batches[0]] == [
+        ("u2", "Spring", 2026)
+    ]
+
+    inserted = []
+    pipeline.run_pipeline(max_records=3, delay=0.0)
+    assert len(batches) == 1  # nothing new, nothing appended
+
+    inserted = ["u1"]
+
+    def broken(_rows):
+        raise RuntimeError("Parquet support needs pyarrow")
+
+    monkeypatch.setattr(pipeline.lake, "append", broken)
+    assert pipeline.run_pipeline(max_records=1, delay=0.0)["inserted"] == 1
+    assert "data lake append failed" in caplog.text
@@ -28,10 +28,13 @@ def _reset_query_data(monkeypatch):
     """Override the global conftest stubbing for this test file.
 
     Reloads the `query_data` module to restore its functions and points
-    `app.routes.query_data` back to the fresh module.
+    `app.routes.query_data` back to the fresh module. The result cache is
+    emptied so each test reaches its fake pool.
     """
     importlib.reload(qd)
     monkeypatch.setattr(routes, "query_data", qd)
+    qd.query_cache.clear()
+    qd.query_cache.bump()
 
 
 # -------------------------------------------------------------------
@@ -120,8 +123,8 @@ def test_count_fall_2025(monkeypatch):
 
 @pytest.mark.db
 def test_percent_international(monkeypatch):
-    """Test `percent_international` correctly maps tuple to dictionary."""
-    _patch_pool(monkeypatch, [(4, 5, 1)])
+    """Test `percent_international` folds citizenship groups into three buckets."""
+    _patch_pool(monkeypatch, [("American", 5), ("International", 4), ("Other", 1), (None, 2)])
     out = qd.percent_international()
     assert out == {"international_count": 4, "us_count": 5, "other_count": 1}
 
@@ -187,3 +190,46 @@ def test_top_5_programs(monkeypatch):
     rows = [("CS", 8), ("DS", 5)]
     _patch_pool(monkeypatch, rows)
     assert qd.top_5_programs() == rows
+
+
+@pytest.mark.db
+def test_dashboard_maps_single_row_to_typed_result(monkeypatch):
+    """Test `dashboard` maps its one result row onto the `Dashboard` fields."""
+    row = (13, 4, 5, 1, 3.4, 165.0, 158.0, 4.5, 3.2, 42.0, 3.6, 7, 2,
+           [["Masters", 10], ["PhD", 3]], [["CS", 8]])
+    _patch_pool(monkeypatch, [row])
+    out = qd.dashboard()
+    assert out.applicant_count == 13
+    assert out.citizenship == {"international_count": 4, "us_count": 5, "other_count": 1}
+    assert out.avg_scores == {
+        "avg_gpa": 3.4, "avg_gre": 165.0, "avg_gre_v": 158.0, "avg_gre_aw": 4.5,
+    }
+    assert (out.avg_gpa_us, out.accept_rate, out.avg_gpa_accept) == (3.2, 42.0, 3.6)
+    assert (out.jhu_ms_cs, out.georgetown_phd_cs) == (7, 2)
+    assert out.degree_counts == [("Masters", 10), ("PhD", 3)]
+    assert out.top_programs == [("CS", 8)]
+
+    data = out.as_template_data()
+    assert data["q1_applicant_count"] == 13
+    assert data["q2_percent_international"] == 40.0
+    assert data["q10_top_programs"] == [("CS", 8)]
+
+
+@pytest.mark.db
+def test_dashboard_percent_international_without_rows(monkeypatch):
+    """Test an empty summary yields 0% international instead of dividing by zero."""
+    _patch_pool(monkeypatch, [(0, 0, 0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0, 0, [], [])])
+    out = qd.dashboard()
+    assert out.percent_international == 0.0
+    assert not out.degree_counts and not out.top_programs
+
+
+@pytest.mark.db
+def test_query_results_are_cached_until_bump(monkeypatch):
+    """Test a second call is served from the cache until the data version changes."""
+    _patch_pool(monkeypatch, [(13,)])
+    assert qd.count_fall_2025() == 13
+    _patch_pool(monkeypatch, [(14,)])
+    assert qd.count_fall_2025() == 13
+    qd.query_cache.bump()
+    assert qd.count_fall_2025() == 14
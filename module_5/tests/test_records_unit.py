@@ -0,0 +1,72 @@
+# pylint: disable=missing-function-docstring
+"""Unit tests for the derived term/decision fields in app.records."""
+
+from datetime import date
+
+import pytest
+
+from app import records as rec
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("term, expected", [
+    ("Fall 2025", ("Fall", 2025)),
+    (" spring  2026 ", ("Spring", 2026)),
+    ("Summer", ("Summer", None)),
+    ("2024", (None, 2024)),
+    (None, (None, None)),
+])
+def test_term_parts(term, expected):
+    assert rec.term_parts(term) == expected
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("status, expected", [
+    ("Accepted on 1 Mar", ("Accepted", date(2025, 3, 1))),
+    ("Rejected on 15 Dec", ("Rejected", date(2024, 12, 15))),  # after date_added
+    ("Interviewed on 01/02/2023", ("Interview", date(2023, 2, 1))),
+    ("Wait listed", ("Waitlisted", None)),
+    ("Accepted on 30 Feb", ("Accepted", None)),
+    ("Accepted on 1 Xyz", ("Accepted", None)),
+    ("Other", (None, None)),
+    ("", (None, None)),
+])
+def test_decision_parts(status, expected):
+    assert rec.decision_parts(status, date(2025, 3, 10)) == expected
+
+
+@pytest.mark.db
+def test_decision_parts_without_year_or_date_added():
+    assert rec.decision_parts("Accepted on 1 Mar") == ("Accepted", None)
+
+
+@pytest.mark.db
+def test_data_type_fills_derived_columns():
+    row = rec.data_type({
+        "status": "Accepted on 1 Mar",
+        "date_added": "March 5, 2025",
+        "term": "Fall 2025",
+    })
+    assert (row["term_season"], row["term_year"]) == ("Fall", 2025)
+    assert (row["decision"], row["decision_date"]) == ("Accepted", date(2025, 3, 1))
+
+
+@pytest.mark.db
+def test_scalar_normalizers():
+    assert rec.norm_str(None) == ""
+    assert rec.norm_str("  MIT ") == "MIT"
+    assert rec.to_date("") == ""
+    assert rec.to_date(" March 5, 2025 ") == date(2025, 3, 5)
+    assert rec.to_date("5 March 2025") == ""
+    assert rec.to_float(None) is None
+    assert rec.to_float("") is None
+    assert rec.to_float("GPA 3.9") == 3.9
+    assert rec.to_float("nan") is None
+    assert rec.to_float("n/a") is None
+
+
+@pytest.mark.db
+def test_to_rid():
+    assert rec.to_rid("https://www.thegradcafe.com/result/123456") == 123456
+    assert rec.to_rid("https://www.thegradcafe.com/survey") is None
+    assert rec.to_rid(None) is None
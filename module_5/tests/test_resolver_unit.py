@@ -0,0 +1,142 @@
+# pylint: disable=missing-function-docstring,protected-access
+"""Unit tests for llm_hosting/resolver.py (vector matching and threshold calibration)."""
+
+import importlib
+import json
+
+import pytest
+
+PROGRAMS = ["Computer Science", "Mathematics", "Information Studies", "Physics"]
+UNIVERSITIES = ["McGill University", "University of British Columbia", "Stanford University"]
+
+
+@pytest.fixture(name="resolver")
+def resolver_fixture(llm_hosting):  # pylint: disable=unused-argument
+    pytest.importorskip("numpy")
+    return importlib.import_module("resolver")
+
+
+def test_topk_ranks_closest_entries_first(resolver):
+    index = resolver.CanonIndex(PROGRAMS)
+    idx, scores = index.topk(["Computer Sciences", "Maths"], k=2)
+    assert [PROGRAMS[i] for i in idx[:, 0]] == ["Computer Science", "Mathematics"]
+    assert (scores[:, 0] >= scores[:, 1]).all() and scores[0, 0] > 0.8
+    assert index.topk([], k=1)[0].shape == (0, 0)
+
+
+def test_resolve_applies_thresholds_and_fallbacks(resolver):
+    vectors = resolver.VectorResolver.from_lists(
+        PROGRAMS, UNIVERSITIES, prog_threshold=0.6, uni_threshold=0.6
+    )
+    assert vectors.resolve([("computer  science", "mcgill univ"), ("basket weaving", "xyz")]) == [
+        ("Computer Science", "McGill University"),
+        ("Basket Weaving", "Unknown"),
+    ]
+
+
+def test_calibrate_picks_the_most_accurate_cut(resolver):
+    index = resolver.CanonIndex(UNIVERSITIES)
+    texts = ["McGill Univ", "Univ British Columbia", "Stanford", "Hogwarts", "Narnia U"]
+    labels = ["McGill University", "University of British Columbia", "Stanford University",
+              "Unknown", "Unknown"]
+    threshold, accuracy = resolver.calibrate(index, texts, labels)
+    assert accuracy == 1.0
+    assert index.resolve(texts, threshold, default="Unknown") == labels
+    assert resolver.calibrate(index, [], []) == (0.0, 0.0)
+
+
+def test_holdout_split_is_reproducible_and_disjoint(resolver):
+    fit, held = resolver.holdout_split(10, 0.3, seed=1)
+    assert len(held) == 3 and sorted(fit + held) == list(range(10))
+    assert resolver.holdout_split(10, 0.3, seed=1) == (fit, held)
+    assert resolver.holdout_split(2, 0.0)[1] and resolver.holdout_split(2, 1.0)[0]
+    with pytest.raises(ValueError):
+        resolver.holdout_split(1)
+
+
+def test_calibrate_resolver_scores_only_held_out_rows(resolver):
+    vectors = resolver.VectorResolver.from_lists(PROGRAMS, UNIVERSITIES)
+    pairs = [("Comp Sci", "McGill"), ("Math", "UBC"), ("Physics", "Stanford Univ"),
+             ("Info Studies", "Hogwarts")] * 3
+    programs = ["Computer Science", "Mathematics", "Physics", "Information Studies"] * 3
+    universities = ["McGill University", "University of British Columbia",
+                    "Stanford University", "Unknown"] * 3
+
+    report = resolver.calibrate_resolver(vectors, pairs, programs, universities, holdout=0.25)
+    assert report["calibration"]["rows"] == 9 and report["held_out"]["rows"] == 3
+    assert report["thresholds"] == {"programs": vectors.prog_threshold,
+                                    "universities": vectors.uni_threshold}
+    held = report["held_out"]
+    assert 0.0 <= held["agreement"] <= min(held["program_agreement"],
+                                            held["university_agreement"])
+
+
+def test_score_reports_overall_and_per_field_agreement(resolver):
+    vectors = resolver.VectorResolver.from_lists(PROGRAMS, UNIVERSITIES,
+                                                 prog_threshold=0.5, uni_threshold=0.5)
+    out = resolver.score(vectors, [("Physics", "McGill University"), ("Physics", "Narnia")],
+                         ["Physics", "Chemistry"], ["McGill University", "Unknown"])
+    assert out["rows"] == 2
+    assert out["agreement"] == 0.5 and out["program_agreement"] == 0.5
+    assert out["university_agreement"] == 1.0
+    assert out["university_agreement_on_canonical"] == 1.0
+    assert resolver.score(vectors, [], [], [])["agreement"] == 0.0
+
+
+# ---------- calibration stored in the lexicon ----------
+
+@pytest.fixture(name="llm")
+def llm_fixture(llm_hosting, monkeypatch, tmp_path):
+    """The standardizer with a small lexicon compiled into ``tmp_path``."""
+    sources = {}
+    for name, entries in (("programs", PROGRAMS), ("universities", UNIVERSITIES)):
+        path = tmp_path / f"{name}.txt"
+        path.write_text("\n".join(entries) + "\n", encoding="utf-8")
+        sources[name] = str(path)
+    store = llm_hosting.lexicon.LexiconStore(
+        str(tmp_path / "lexicon.bin"), sources, llm_hosting._LEXICON.tables
+    )
+    monkeypatch.setattr(llm_hosting, "_LEXICON", store)
+    monkeypatch.delenv("VECTOR_PROG_THRESHOLD", raising=False)
+    monkeypatch.delenv("VECTOR_UNI_THRESHOLD", raising=False)
+    return llm_hosting
+
+
+def test_vector_backend_uses_defaults_until_calibrated(llm, resolver, tmp_path, monkeypatch):
+    backend = llm.VectorBackend()
+    assert backend._resolver.prog_threshold == resolver.PROG_THRESHOLD
+    assert backend.standardize("Mathematic, U British Columbia") == {
+        "standardized_program": "Mathematics",
+        "standardized_university": "University of British Columbia",
+    }
+
+    rows = [{"program": f"{p}, {u}", "llm-generated-program": p,
+             "llm-generated-university": u}
+            for p, u in zip(PROGRAMS, UNIVERSITIES * 2)]
+    rows.append({"program": "no reference"})
+    rows.append({"program": "Physics, UBC", "llm-generated-university": UNIVERSITIES[0]})
+    ref = tmp_path / "llm.jsonl"
+    ref.write_text("\n".join(json.dumps(r) for r in rows), encoding="utf-8")
+
+    report = llm.calibrate_vector(str(ref), holdout=0.25)
+    assert report["held_out"]["rows"] == 1 and report["calibration"]["rows"] == 3
+    assert llm._lexicon().thresholds == report["thresholds"]
+    backend = llm.VectorBackend()
+    assert backend._resolver.prog_threshold == report["thresholds"]["programs"]
+    assert backend._resolver.uni_threshold == report["thresholds"]["universities"]
+
+    monkeypatch.setenv("VECTOR_UNI_THRESHOLD", "0.99")
+    assert llm.VectorBackend()._resolver.uni_threshold == 0.99
+
+
+def test_main_calibrate_prints_the_report(llm, tmp_path, capsys):
+    rows = [{"program": f"{p}, {u}", "llm-generated-program": p,
+             "llm-generated-university": u}
+            for p, u in zip(PROGRAMS, UNIVERSITIES * 2)]
+    ref = tmp_path / "llm.json"
+    ref.write_text(json.dumps(rows), encoding="utf-8")
+
+    llm.main(["--calibrate", str(ref), "--holdout", "0.25"])
+    report = json.loads(capsys.readouterr().out)
+    assert report["held_out"]["rows"] == 1
+    assert llm._lexicon().thresholds == report["thresholds"]
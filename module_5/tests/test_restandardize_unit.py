@@ -0,0 +1,246 @@
+# pylint: disable=missing-function-docstring
+"""Unit tests for app.restandardize (streaming, dedupe, batched UPDATE, resume)."""
+
+from types import SimpleNamespace
+
+import pytest
+
+import app.restandardize as rs
+
+
+# ---------- tiny fake DB plumbing ----------
+
+class _FakeTable:
+    """In-memory ``applicants`` rows keyed by p_id: (program, llm_prog, llm_uni)."""
+
+    def __init__(self, rows):
+        self.rows = dict(rows)
+        self.commits = 0
+        self.update_batches = 0
+
+
+class _ScanCursor:
+    """Server-side (named) cursor over the fake table."""
+
+    def __init__(self, table):
+        self._table = table
+        self._pending = []
+        self.itersize = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):  # pylint: disable=unused-argument
+        return False
+
+    def execute(self, _stmt, params):
+        last = params[0]
+        self._pending = [
+            (pid, vals[0]) for pid, vals in sorted(self._table.rows.items()) if pid > last
+        ]
+
+    def fetchmany(self, size):
+        out, self._pending = self._pending[:size], self._pending[size:]
+        return out
+
+
+class _Copy:
+    def __init__(self, sink):
+        self._sink = sink
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):  # pylint: disable=unused-argument
+        return False
+
+    def write_row(self, row):
+        self._sink.append(row)
+
+
+class _WriteCursor:
+    """Cursor that stages COPY rows and applies them on the UPDATE statement."""
+
+    def __init__(self, table):
+        self._table = table
+        self._stage = []
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):  # pylint: disable=unused-argument
+        return False
+
+    def execute(self, stmt, _params=None):
+        if stmt is rs.APPLY_STAGE:
+            self.rowcount = 0
+            for pid, prog, uni in self._stage:
+                program = self._table.rows[pid][0]
+                if self._table.rows[pid][1:] != (prog, uni):
+                    self._table.rows[pid] = (program, prog, uni)
+                    self.rowcount += 1
+            self._stage = []
+            self._table.update_batches += 1
+
+    def copy(self, _stmt):
+        return _Copy(self._stage)
+
+
+class _FakeConn:
+    def __init__(self, table):
+        self._table = table
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):  # pylint: disable=unused-argument
+        return False
+
+    def cursor(self, name=None):
+        return _ScanCursor(self._table) if name else _WriteCursor(self._table)
+
+    def commit(self):
+        self._table.commits += 1
+
+
+class _FakePool:
+    def __init__(self, table):
+        self._table = table
+
+    def connection(self):
+        return _FakeConn(self._table)
+
+
+class _FakeBackend:
+    """Uppercases programs and counts how many strings it was asked for."""
+
+    def __init__(self, calls):
+        self._calls = calls
+
+    def standardize_many(self, texts):
+        self._calls.extend(texts)
+        return [
+            {"standardized_program": t.upper(), "standardized_university": "Uni"}
+            for t in texts
+        ]
+
+
+class _FakeStandardizer:
+    def __init__(self):
+        self.calls = []
+        self.backend_name = None
+
+    def get_backend(self):
+        return _FakeBackend(self.calls)
+
+    def set_backend(self, name):
+        self.backend_name = name
+
+
+@pytest.fixture(name="setup")
+def _setup(monkeypatch, tmp_path):
+    table = _FakeTable({
+        1: ("cs", None, None),
+        2: ("math", None, None),
+        3: ("cs", None, None),
+        4: ("bio", "BIO", "Uni"),  # already correct -> not counted as updated
+        5: (None, None, None),
+    })
+    std = _FakeStandardizer()
+    monkeypatch.setattr(rs, "pool", _FakePool(table))
+    monkeypatch.setattr(rs, "CHECKPOINT", tmp_path / "ckpt.json")
+    monkeypatch.setattr(rs, "_STANDARDIZER", std)
+    # Keep text in the fake table: dimension ids are covered in test_dimensions_unit.
+    monkeypatch.setattr(rs.dimensions, "cache", SimpleNamespace(encode=lambda rows, _cols: rows))
+    return table, std
+
+
+# ---------- tests ----------
+
+@pytest.mark.db
+def test_restandardize_dedupes_and_updates_in_batches(setup):
+    table, std = setup
+    out = rs.restandardize(batch_size=2, workers=0, backend="stub")
+
+    assert std.backend_name == "stub"
+    assert sorted(std.calls) == ["", "bio", "cs", "math"]  # each distinct once
+    assert table.rows[1] == ("cs", "CS", "Uni")
+    assert table.rows[3] == ("cs", "CS", "Uni")
+    assert table.rows[5] == (None, "", "Uni")
+    assert out["scanned"] == 5
+    assert out["updated"] == 4
+    assert out["distinct_programs"] == 4
+    assert out["last_p_id"] == 5
+    assert table.update_batches == 3 and table.commits == 3
+    assert not rs.CHECKPOINT.exists()  # cleared on completion
+
+
+@pytest.mark.db
+def test_restandardize_resumes_from_checkpoint(setup):
+    table, std = setup
+    rs.write_checkpoint({"last_p_id": 3, "scanned": 3, "updated": 2})
+
+    out = rs.restandardize(batch_size=10, workers=0)
+
+    assert sorted(std.calls) == ["", "bio"]
+    assert table.rows[1] == ("cs", None, None)  # before checkpoint: untouched
+    assert out["scanned"] == 5 and out["updated"] == 3
+
+
+@pytest.mark.db
+def test_restandardize_restart_ignores_checkpoint(setup):
+    _table, std = setup
+    rs.write_checkpoint({"last_p_id": 5, "scanned": 5, "updated": 0})
+    out = rs.restandardize(batch_size=10, workers=0, restart=True)
+    assert out["scanned"] == 5
+    assert len(std.calls) == 4
+
+
+@pytest.mark.db
+def test_restandardize_uses_worker_pool(setup, monkeypatch):
+    _table, std = setup
+    seen = {}
+
+    class _Executor:
+        def __init__(self, max_workers, initializer, initargs):
+            seen["workers"] = max_workers
+            initializer(*initargs)
+
+        def map(self, fn, parts):
+            return [fn(p) for p in parts]
+
+        def shutdown(self):
+            seen["shutdown"] = True
+
+    monkeypatch.setattr(rs, "ProcessPoolExecutor", _Executor)
+    out = rs.restandardize(batch_size=5, workers=3, backend="vector")
+    assert seen == {"workers": 3, "shutdown": True}
+    assert std.backend_name == "vector"
+    assert out["updated"] == 4
+
+
+@pytest.mark.db
+def test_read_checkpoint_defaults_when_missing_or_corrupt(setup):
+    _table, _std = setup
+    assert rs.read_checkpoint() == {"last_p_id": 0, "scanned": 0, "updated": 0}
+    rs.CHECKPOINT.write_text("{not json", encoding="utf-8")
+    assert rs.read_checkpoint()["last_p_id"] == 0
+
+
+@pytest.mark.db
+def test_load_standardizer_imports_llm_hosting_module(monkeypatch, tmp_path):
+    (tmp_path / "app.py").write_text(
+        "picked = []\n"
+        "def set_backend(name):\n"
+        "    picked.append(name)\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(rs, "LLM_HOSTING_DIR", tmp_path)
+    monkeypatch.setattr(rs, "_STANDARDIZER", None)
+    monkeypatch.setattr(rs.sys, "path", list(rs.sys.path))
+
+    mod = rs._load_standardizer("rules")  # pylint: disable=protected-access
+    assert mod.picked == ["rules"]
+    assert str(tmp_path) in rs.sys.path
+    assert rs._load_standardizer() is mod  # pylint: disable=protected-access
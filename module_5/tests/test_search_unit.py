@@ -0,0 +1,114 @@
+# pylint: disable=missing-function-docstring
+"""Unit tests for app.search (comment full-text search) and app.pagination."""
+
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+
+import app.search as search
+from app.pagination import decode_cursor, encode_cursor
+
+
+class _Pool:
+    """Returns canned rows and records the executed statement."""
+
+    def __init__(self, rows):
+        self.rows, self.executed = rows, []
+
+    @contextmanager
+    def connection(self):
+        yield self
+
+    @contextmanager
+    def cursor(self):
+        yield self
+
+    def execute(self, stmt, params):
+        self.executed.append((stmt, params))
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+def _row(p_id, rank, snippet="a <mark>b</mark>"):
+    return (p_id, rank, date(2025, 1, 2), f"u{p_id}", "Fall", 2025, "Accepted",
+            "Computer Science", "MIT", "PhD", snippet)
+
+
+@pytest.mark.db
+def test_cursor_round_trip_and_rejects_garbage():
+    token = encode_cursor([0.25, 7])
+    assert "=" not in token and decode_cursor(token, 2) == [0.25, 7]
+    assert decode_cursor(encode_cursor([date(2025, 1, 2), 3]), 2) == ["2025-01-02", 3]
+    for bad in ("%%%", encode_cursor([1]), "bm90IGpzb24"):
+        with pytest.raises(ValueError, match="invalid cursor"):
+            decode_cursor(bad, 2)
+
+
+@pytest.mark.db
+def test_build_ranks_filters_and_pages_by_keyset():
+    stmt, params = search.build(
+        "funding",
+        search.Filters(term="Fall 2025", program="Computer Science", decision="Accepted"),
+        after=[0.5, 9], limit=11,
+    )
+    text = stmt.as_string(None)
+    assert "websearch_to_tsquery('english', %s)" in text
+    assert "r.comments_tsv @@ query.q" in text
+    assert "(ts_rank_cd(r.comments_tsv, query.q), r.p_id) < (%s::real, %s)" in text
+    assert 'SELECT id FROM "dim_llm_generated_program" WHERE value = %s' in text
+    assert "ORDER BY rank DESC, r.p_id DESC" in text and "ts_headline('english'" in text
+    assert params == ["funding", "Fall", 2025, "Computer Science", "Accepted", 0.5, 9, 11]
+
+    text = search.build("funding")[0].as_string(None)
+    assert "WHERE r.comments_tsv @@ query.q\n" in text and "::real" not in text
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("kwargs", [{"term": "someday"}, {"decision": "Maybe"}])
+def test_build_rejects_bad_filters(kwargs):
+    with pytest.raises(ValueError):
+        search.build("funding", search.Filters(**kwargs))
+
+
+@pytest.mark.db
+def test_highlight_escapes_everything_but_marks():
+    out = search.highlight('<script>x</script> <mark>fund</mark> & "more"')
+    assert str(out) == ("&lt;script&gt;x&lt;/script&gt; <mark>fund</mark> "
+                        "&amp; &#34;more&#34;")
+    assert str(search.highlight(None)) == ""
+
+
+@pytest.mark.db
+def test_search_returns_page_and_next_cursor(monkeypatch):
+    fake = _Pool([_row(9, 0.5), _row(4, 0.5), _row(2, 0.1)])
+    monkeypatch.setattr(search, "pool", fake)
+
+    page = search.search("funding", limit=2)
+
+    assert [r["p_id"] for r in page["results"]] == [9, 4]
+    assert page["results"][0]["date_added"] == "2025-01-02"
+    assert str(page["results"][0]["snippet"]) == "a <mark>b</mark>"
+    assert fake.executed[0][1][-1] == 3  # one extra row tells whether there is more
+    assert decode_cursor(page["next"], 2) == [0.5, 4]
+
+    fake.rows = [_row(2, 0.1)]
+    page = search.search("funding", cursor=page["next"], limit=2)
+    assert page["next"] is None and fake.executed[1][1][-3:] == [0.5, 4, 3]
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("text, kwargs", [
+    ("  ", {}),
+    ("funding", {"limit": 0}),
+    ("funding", {"limit": search.MAX_LIMIT + 1}),
+    ("funding", {"cursor": "garbage"}),
+    ("funding", {"cursor": encode_cursor(["x", "y"])}),
+])
+def test_search_validates_before_querying(monkeypatch, text, kwargs):
+    fake = _Pool([])
+    monkeypatch.setattr(search, "pool", fake)
+    with pytest.raises(ValueError):
+        search.search(text, **kwargs)
+    assert not fake.executed
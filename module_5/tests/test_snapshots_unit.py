@@ -0,0 +1,108 @@
+# pylint: disable=missing-function-docstring
+"""Unit tests for app.snapshots (daily metric snapshots and trends)."""
+
+from contextlib import contextmanager
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+import app.snapshots as snap
+from app.query_data import Dashboard
+
+DASH = Dashboard(
+    applicant_count=40,
+    citizenship={"international_count": 10, "us_count": 25, "other_count": 5},
+    avg_scores={"avg_gpa": 3.5, "avg_gre": 160.0, "avg_gre_v": 155.0, "avg_gre_aw": 4.0},
+    avg_gpa_us=3.4,
+    accept_rate=Decimal("37.50"),
+    avg_gpa_accept=3.8,
+    jhu_ms_cs=3,
+    georgetown_phd_cs=1,
+    degree_counts=[("Masters", 30), ("PhD", 10)],
+    top_programs=[("Computer Science", 12)],
+)
+
+
+class _Cursor:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def execute(self, stmt, params):
+        self._conn.log.append((stmt, params))
+
+    def fetchone(self):
+        return self._conn.rows[0]
+
+    def fetchall(self):
+        return list(self._conn.rows)
+
+
+class _Pool:
+    def __init__(self, rows):
+        self.rows, self.log, self.commits = rows, [], 0
+
+    @contextmanager
+    def connection(self):
+        yield self
+
+    @contextmanager
+    def cursor(self):
+        yield _Cursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.mark.db
+def test_snapshot_values_flatten_every_metric():
+    values = snap.snapshot_values(DASH)
+    assert tuple(values) == snap.COLUMNS
+    assert values["percent_international"] == 25.0
+    assert values["accept_rate"] == 37.5 and isinstance(values["accept_rate"], float)
+    assert values["degree_counts"] == [["Masters", 30], ["PhD", 10]]
+
+
+@pytest.mark.db
+def test_take_snapshot_upserts_fresh_metrics(monkeypatch):
+    fake = _Pool([(date(2025, 9, 5),)])
+    monkeypatch.setattr(snap, "pool", fake)
+
+    def cached():
+        raise AssertionError("the cached dashboard must not be used")
+
+    cached.__wrapped__ = lambda: DASH
+    monkeypatch.setattr(snap.query_data, "dashboard", cached)
+
+    assert snap.take_snapshot() == date(2025, 9, 5)
+    stmt, params = fake.log[0]
+    assert stmt is snap.UPSERT_SNAPSHOT
+    assert params[:2] == [None, 40]
+    assert params[-2].obj == [["Masters", 30], ["PhD", 10]]
+    assert fake.commits == 1
+    assert "ON CONFLICT (day) DO UPDATE" in stmt.as_string(None)
+
+
+@pytest.mark.db
+def test_trend_reads_only_the_snapshot_table(monkeypatch):
+    fake = _Pool([(date(2025, 9, 4), 36.0, 24.0), (date(2025, 9, 5), 37.5, 25.0)])
+    monkeypatch.setattr(snap, "pool", fake)
+
+    points = snap.trend(["accept_rate", "percent_international", "accept_rate"], days=30)
+    assert points == [
+        {"day": "2025-09-04", "accept_rate": 36.0, "percent_international": 24.0},
+        {"day": "2025-09-05", "accept_rate": 37.5, "percent_international": 25.0},
+    ]
+    stmt, params = fake.log[0]
+    assert stmt.as_string(None) == (
+        'SELECT day, "accept_rate", "percent_international" FROM "metric_snapshots" '
+        "WHERE day > CURRENT_DATE - %s ORDER BY day"
+    )
+    assert params == [30]
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("series, days", [(["password"], None), ([], None), (["avg_gpa"], 0)])
+def test_build_trend_rejects_bad_arguments(series, days):
+    with pytest.raises(ValueError):
+        snap.build_trend(series, days)
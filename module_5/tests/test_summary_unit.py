@@ -0,0 +1,69 @@
+# pylint: disable=missing-function-docstring
+"""Unit tests for app.summary (trigger-maintained dashboard aggregate)."""
+
+import pytest
+
+import app.summary as summary
+
+
+class _FakeCursor:
+    def __init__(self, exists):
+        self._exists = exists
+        self.statements = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):  # pylint: disable=unused-argument
+        return False
+
+    def execute(self, stmt, _params=None):
+        self.statements.append(stmt)
+
+    def fetchone(self):
+        return (self._exists,)
+
+
+class _FakeConn:
+    def __init__(self, cur):
+        self.cur = cur
+
+    def cursor(self):
+        return self.cur
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("exists, rebuilt", [(False, True), (True, False)])
+def test_ensure_summary_fills_only_a_new_table(exists, rebuilt):
+    cur = _FakeCursor(exists)
+    summary.ensure_summary(_FakeConn(cur))
+
+    assert cur.statements[:4] == [
+        summary.HAS_SUMMARY,
+        summary.CREATE_SUMMARY,
+        summary.CREATE_TRIGGER_FUNCTION,
+        summary.CREATE_TRIGGERS,
+    ]
+    assert (summary.REBUILD_SUMMARY in cur.statements) is rebuilt
+
+
+@pytest.mark.db
+def test_trigger_function_has_a_branch_per_event():
+    body = summary.CREATE_TRIGGER_FUNCTION.as_string(None)
+
+    for op in ("INSERT", "UPDATE", "DELETE", "TRUNCATE"):
+        assert f"TG_OP = '{op}'" in body
+    # Deltas are signed so UPDATE/DELETE subtract the old rows, decoded to text.
+    assert "SELECT -1 AS sign, * FROM (SELECT r.\"p_id\"" in body
+    assert 'FROM "old_rows" AS r LEFT JOIN "dim_program"' in body
+    assert body.count("DELETE FROM \"applicant_summary\" WHERE n = 0") == 2
+    assert 'AFTER INSERT ON "applicant_rows"' in summary.CREATE_TRIGGERS.as_string(None)
+
+
+@pytest.mark.db
+def test_rebuild_groups_by_every_key_and_measure():
+    text = summary.REBUILD_SUMMARY.as_string(None)
+    assert text.startswith('LOCK TABLE "applicants" IN SHARE MODE')
+    for col in summary.KEY_COLUMNS + summary.MEASURES:
+        assert f'"{col}"' in text
+    assert '"gpa" BETWEEN 0.01 AND 4.3' in text